@@ -12,10 +12,12 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import re
-import time
+from collections import deque
+from concurrent.futures import Future
 import class_PromptBank_DPI_type2 as PB
 from .state import VideoAnalysisState
 from .video_processor_agent import VideoProcessorAgent
+from app_server import analysis_journal, analysis_progress
 
 
 class VideoAnalyzerAgent:
@@ -35,8 +37,58 @@ class VideoAnalyzerAgent:
     """
 
     MAX_CONSECUTIVE_API_ERRORS = 10
+    # API 오류 구간은 탐색을 멈추지 않고 재시도 큐로 보내 백오프 후 다시 요청 (공용 LLM 루프에서 비동기 대기)
+    SEARCH_RETRY_LIMIT = 3  # 구간당 재시도 횟수 (초과 시 그 구간 제외)
+    SEARCH_RETRY_QUEUE_SIZE = 4  # 재시도 중인 구간이 이만큼 쌓이면 새 구간 요청을 멈추고 재시도 결과를 기다림
     ERROR_RESPONSE_PREFIXES = ("API Error:", "Image Error:", "Video Error:")
 
+    # 기준 시점별 speculative 탐색 폭 W (다음 W개 구간의 LLM 요청을 동시에 보냄, 1이면 순차 탐색)
+    # - inhalerIN은 영상 초반에 YES가 나오는 경우가 많아 폐기되는 요청이 적도록 작게 설정
+    SPECULATIVE_WINDOWS = {"inhalerIN": 2, "faceONinhaler": 4, "inhalerOUT": 4}
+
+    # 기준 시점별 탐색 전략
+    # - "linear": offset_time 간격으로 처음부터 탐색 (speculative_window개 구간 동시 요청)
+    # - "coarse_to_fine": COARSE_SEARCH_STRIDE 구간 간격으로 첫 YES 범위를 찾은 뒤 세분/이분 탐색 (LLM 요청 O(log))
+    # faceONinhaler/inhalerOUT은 ReporterAgent 구간 규칙(T_in~T_face, T_face~T_out)이 모든 구간의 Q 답변을 사용하므로 linear
+    # (1단계 분석 모드에서 사용, 2단계 분석 모드는 TWO_PHASE_SEARCH_STRATEGIES)
+    SEARCH_STRATEGIES = {"inhalerIN": "coarse_to_fine", "faceONinhaler": "linear", "inhalerOUT": "linear"}
+    COARSE_SEARCH_STRIDE = 4  # coarse 탐색 간격 (구간 수, inhalerIN 기준 8초)
+    GRID_PREFETCH_DEPTH = 2  # LLM 응답을 기다리는 동안 미리 생성할 다음 구간 그리드 수
+
+    # 2단계 분석 모드
+    # - 탐색 단계: 구간마다 Overall_Answer만 질문 (출력 한도 SEARCH_MAX_OUTPUT_TOKENS)하여 기준 시점만 찾음
+    # - 행동 Q 단계: 기준 시점을 찾은 뒤 ReporterAgent 규칙이 쓰는 구간에만 Q를 동시에 요청 (_analyze_action_windows)
+    # False이면 탐색 구간마다 Overall_Answer와 모든 Q를 함께 묻는 1단계 방식
+    TWO_PHASE_ANALYSIS = True
+    SEARCH_MAX_OUTPUT_TOKENS = 16
+    # 2단계 분석에서는 구간 규칙의 Q 답변을 행동 Q 단계가 채우므로 inhalerIN/inhalerOUT은 coarse_to_fine으로 탐색
+    # faceONinhaler는 잠깐 나타났다 사라지는 이벤트라 coarse 간격(2초)보다 짧으면 건너뛸 수 있으므로 linear 유지
+    # (잘못된 T_face는 ReporterAgent의 모든 시점/구간 규칙을 어긋나게 함)
+    TWO_PHASE_SEARCH_STRATEGIES = {"inhalerIN": "coarse_to_fine", "faceONinhaler": "linear", "inhalerOUT": "coarse_to_fine"}
+    # ReporterAgent가 T_face 시점과 직전 구간에서만 판정하는 행동 (행동 Q 단계에서 이 두 구간에서만 질문)
+    POINT_RULE_ACTIONS = ("sit_stand", "remove_cover", "inspect_mouthpiece", "hold_inhaler")
+
+    # 기준 시점별 Q 번호 → 행동 key (PromptBank 저장, 행동 Q 프롬프트 생성에 사용)
+    Q_MAPPINGS = {
+        "inhalerIN": {'Q1': 'sit_stand'},
+        "faceONinhaler": {
+            'Q1': 'sit_stand',
+            'Q2': 'remove_cover',
+            'Q3': 'load_dose',
+            'Q4': 'inspect_mouthpiece',
+            'Q5': 'hold_inhaler',
+            'Q6': 'exhale_before'
+        },
+        "inhalerOUT": {
+            'Q1': 'exhale_before',
+            'Q2': 'seal_lips',
+            'Q3': 'inhale_deeply',
+            'Q4': 'remove_inhaler',
+            'Q5': 'hold_breath',
+            'Q6': 'exhale_after'
+        },
+    }
+
     def __init__(self, mllm, video_processor: VideoProcessorAgent, model_id: str, model_name: str):
         """
         Args:
@@ -51,6 +103,7 @@ class VideoAnalyzerAgent:
         self.model_name = model_name
         self.name = f"VideoAnalyzerAgent_{model_id}"
         self.promptbank = PB.PromptBank()
+        self.journal = None  # 분석 체크포인트 저널 (state["journal_path"]가 있으면 process()에서 설정)
     
     def process(self, state: VideoAnalysisState) -> VideoAnalysisState:
         """
@@ -66,6 +119,8 @@ class VideoAnalyzerAgent:
             video_path = state["video_path"]
             video_info = state["video_info"]
             play_time = video_info["play_time"]
+            # 체크포인트 저널: 이전 실행에서 답을 받은 구간은 LLM 요청 없이 재사용, 새 응답은 구간마다 기록
+            self.journal = analysis_journal.get_journal(state.get("journal_path"))
             
             state["agent_logs"].append({
                 "agent": self.name,
@@ -83,47 +138,36 @@ class VideoAnalyzerAgent:
             ref_time_in, q_answers_in = self._detect_inhaler_in(
                 video_path, play_time, start_time=0.0
             )
-            # PromptBank에 저장
-            q_mapping_in = {'Q1': 'sit_stand'}
-            self.promptbank.save_to_promptbank('inhalerIN', ref_time_in, q_answers_in, q_mapping_in)
-            
             print(f"[{self.name}] inhalerIN 탐지 완료: {ref_time_in}초")
+            analysis_progress.report("search_done", model_id=self.model_id, event="inhalerIN", reference_time=ref_time_in)
             
             # 2. faceONinhaler 탐지
             print(f"\n[{self.name}] faceONinhaler 탐지 시작...")
             ref_time_face, q_answers_face = self._detect_face_on_inhaler(
                 video_path, play_time, start_time=ref_time_in
             )
-            # PromptBank에 저장
-            q_mapping_face = {
-                'Q1': 'sit_stand',
-                'Q2': 'remove_cover',
-                'Q3': 'load_dose',
-                'Q4': 'inspect_mouthpiece',
-                'Q5': 'hold_inhaler',
-                'Q6': 'exhale_before'
-            }
-            self.promptbank.save_to_promptbank('faceONinhaler', ref_time_face, q_answers_face, q_mapping_face)
-            
             print(f"[{self.name}] faceONinhaler 탐지 완료: {ref_time_face}초")
+            analysis_progress.report("search_done", model_id=self.model_id, event="faceONinhaler", reference_time=ref_time_face)
             
             # 3. inhalerOUT 탐지
             print(f"\n[{self.name}] inhalerOUT 탐지 시작...")
             ref_time_out, q_answers_out = self._detect_inhaler_out(
                 video_path, play_time, start_time=ref_time_face
             )
-            # PromptBank에 저장
-            q_mapping_out = {
-                'Q1': 'exhale_before',
-                'Q2': 'seal_lips',
-                'Q3': 'inhale_deeply',
-                'Q4': 'remove_inhaler',
-                'Q5': 'hold_breath',
-                'Q6': 'exhale_after'
-            }
-            self.promptbank.save_to_promptbank('inhalerOUT', ref_time_out, q_answers_out, q_mapping_out)
-            
             print(f"[{self.name}] inhalerOUT 탐지 완료: {ref_time_out}초")
+            analysis_progress.report("search_done", model_id=self.model_id, event="inhalerOUT", reference_time=ref_time_out)
+            
+            # 4. 2단계 분석: ReporterAgent 규칙이 쓰는 구간에만 행동 Q 요청
+            if self.TWO_PHASE_ANALYSIS:
+                print(f"\n[{self.name}] 행동 Q 분석 시작...")
+                q_answers_in, q_answers_face, q_answers_out = self._analyze_action_windows(
+                    video_path, ref_time_in, ref_time_face, ref_time_out
+                )
+            
+            # PromptBank에 저장
+            self.promptbank.save_to_promptbank('inhalerIN', ref_time_in, q_answers_in, self.Q_MAPPINGS['inhalerIN'])
+            self.promptbank.save_to_promptbank('faceONinhaler', ref_time_face, q_answers_face, self.Q_MAPPINGS['faceONinhaler'])
+            self.promptbank.save_to_promptbank('inhalerOUT', ref_time_out, q_answers_out, self.Q_MAPPINGS['inhalerOUT'])
             
             # PromptBank 데이터 저장
             promptbank_data = {
@@ -182,6 +226,7 @@ class VideoAnalyzerAgent:
                 "action": "complete",
                 "message": f"비디오 분석 완료 (기준 시점 탐지 + 행동 분석) - {self.model_name}"
             })
+            analysis_progress.report("analyzer_done", model_id=self.model_id)
             
         except Exception as e:
             error_msg = f"[{self.name}] 비디오 분석 중 오류: {str(e)}"
@@ -234,9 +279,10 @@ Q1_Answer: [YES or NO]
 Q1_Confidence: [0.0 to 1.0, indicating your confidence level in the answer]
 """
         
+        user_prompt, search_options = self._search_options("inhalerIN", user_prompt)
         final_start_time, q_answers_acc = self._search_reference_time(
             video_path, system_prompt, user_prompt, play_time, 
-            start_time, segment_time, offset_time, sampling_time
+            start_time, segment_time, offset_time, sampling_time, **search_options
         )
         
         return final_start_time, q_answers_acc
@@ -293,9 +339,10 @@ Q6_Answer: [YES or NO]
 Q6_Confidence: [0.0 to 1.0, indicating your confidence level in the answer]
 """
         
+        user_prompt, search_options = self._search_options("faceONinhaler", user_prompt)
         final_start_time, q_answers_acc = self._search_reference_time(
             video_path, system_prompt, user_prompt, play_time,
-            start_time, segment_time, offset_time, sampling_time
+            start_time, segment_time, offset_time, sampling_time, **search_options
         )
         
         return final_start_time, q_answers_acc
@@ -352,86 +399,556 @@ Q6_Answer: [YES or NO]
 Q6_Confidence: [0.0 to 1.0, indicating your confidence level in the answer]
 """
         
+        user_prompt, search_options = self._search_options("inhalerOUT", user_prompt)
         final_start_time, q_answers_acc = self._search_reference_time(
             video_path, system_prompt, user_prompt, play_time,
-            start_time, segment_time, offset_time, sampling_time
+            start_time, segment_time, offset_time, sampling_time, **search_options
         )
         
         return final_start_time, q_answers_acc
     
     def _search_reference_time(self, video_path: str, system_prompt: str, user_prompt: str,
                               play_time: float, start_time: float, segment_time: float,
-                              offset_time: float, sampling_time: float):
+                              offset_time: float, sampling_time: float, speculative_window: int = 1,
+                              search_strategy: str = "linear", max_output_tokens: int = None,
+                              event_key: str = None):
         """
         기준 시간 탐색
+
+        speculative_window(W) > 1이면 다음 W개 구간의 LLM 요청을 미리 동시에 보내고, 결과는 시간 순서대로 반영합니다.
+        첫 Overall_Answer: YES 이후 구간의 요청은 취소/폐기하므로 q_answers_accumulated는 순차 탐색(W=1)과 동일합니다.
+        API 오류 구간은 재시도 큐에서 백오프 후 다시 요청하고 탐색은 계속 진행합니다.
+        기준 시간은 재시도 결과까지 반영한 첫 YES 구간이며, 답변은 구간 시각 순서로 누적합니다.
+        search_strategy="coarse_to_fine"이면 _search_reference_time_coarse_to_fine으로 탐색합니다.
+        max_output_tokens: LLM 응답 출력 한도 (None이면 모델 기본값, 2단계 분석 탐색에서는 SEARCH_MAX_OUTPUT_TOKENS)
+        event_key: 기준 시점 key (분석 저널의 구간 식별에 사용)
         """
+        if search_strategy == "coarse_to_fine":
+            return self._search_reference_time_coarse_to_fine(
+                video_path, system_prompt, user_prompt, play_time,
+                start_time, segment_time, offset_time, sampling_time, speculative_window, max_output_tokens, event_key
+            )
+
         M, N = 1, int(segment_time / sampling_time)
         gridSize = (int(1280/2)*N, int(720/2)*M)
-        
-        q_answers_accumulated = {}
-        final_start_time = start_time
+
+        search_start_time = start_time
+        results = {}  # 응답을 받은 구간 시작 시각 -> (overall_answer, q_answers, q_confidence)
+        retrying = {}  # 재시도 중인 구간 시작 시각 -> (future, 재시도 횟수)
         consecutive_errors = 0
         iteration_count = 0
         max_possible_iterations = int((play_time - start_time) / offset_time) + 1
         MAX_ITERATIONS = min(max_possible_iterations, 2000)  # 영상 길이에 비례, 안전 상한 2000
+        speculative_window = max(1, int(speculative_window))
 
-        while start_time <= play_time - segment_time:
-            iteration_count += 1
-            if iteration_count > MAX_ITERATIONS:
-                print(f'[{self.model_id}] 최대 반복 횟수 초과, 탐색 종료')
-                break
+        pending = deque()  # 요청을 보낸 구간 (구간 시작 시각, future) (시간 순서, 맨 앞이 현재 start_time)
+        next_start_time = start_time  # 다음에 요청을 보낼 구간 시작 시각 (start_time과 같은 방식으로 누적)
 
-            print(f'[{self.model_id}] 검색 중... start_time={start_time:.1f}초')
-            end_time = start_time + segment_time
-
-            # 프레임 추출
-            output_image, _, _ = self.video_processor.extract_frames(
-                video_path, start_time, end_time, M, N, gridSize, (0, 0)
+        def submit(window_start, attempt=0):
+            return self._submit_search_query(
+                video_path, system_prompt, user_prompt, window_start, window_start + segment_time, M, N, gridSize,
+                max_output_tokens, delay=self._search_retry_delay(attempt), event_key=event_key
             )
 
-            # LLM 쿼리
-            response = self.mllm.query_answer_chatGPT(
-                system_prompt, user_prompt, image_array=output_image
-            )
-
-            # API 에러 감지 (백오프 재시도 포함)
+        def handle_response(window_start, response, attempt):
+            """응답 반영. API 오류이면 백오프 후 재시도하도록 재시도 큐에 넣음 (연속 오류 한도 도달 시 RuntimeError)"""
+            nonlocal consecutive_errors
             if isinstance(response, str) and response.startswith(self.ERROR_RESPONSE_PREFIXES):
                 consecutive_errors += 1
-                wait_time = min(2 ** consecutive_errors, 30)  # 최대 30초 대기
-                print(f'[{self.model_id}] API 오류 ({consecutive_errors}/{self.MAX_CONSECUTIVE_API_ERRORS}), {wait_time}초 대기: {response[:100]}')
                 if consecutive_errors >= self.MAX_CONSECUTIVE_API_ERRORS:
-                    print(f'[{self.model_id}] 연속 API 오류 한도 도달, 탐색 종료')
+                    raise RuntimeError(f"연속 API 오류 한도 도달 ({consecutive_errors}회): {response[:100]}")
+                if attempt < self.SEARCH_RETRY_LIMIT:
+                    print(f'[{self.model_id}] API 오류 ({consecutive_errors}/{self.MAX_CONSECUTIVE_API_ERRORS}), '
+                          f'start_time={window_start:.1f}초 구간 재시도 예약 ({attempt + 1}/{self.SEARCH_RETRY_LIMIT}): {response[:100]}')
+                    retrying[window_start] = (submit(window_start, attempt + 1), attempt + 1)
+                else:
+                    print(f'[{self.model_id}] 재시도 한도 초과, start_time={window_start:.1f}초 구간 제외: {response[:100]}')
+                return
+            consecutive_errors = 0
+            overall_answer = self._parse_overall_answer(response)
+            current_q_answers, current_q_confidence = self._parse_q_answers(response)
+            results[window_start] = (overall_answer, current_q_answers, current_q_confidence)
+
+        def service_retries(wait=False):
+            """재시도 큐에서 끝난 요청 반영 (wait=True이면 가장 이른 구간의 재시도가 끝날 때까지 대기)"""
+            for window_start in sorted(retrying):
+                future, attempt = retrying[window_start]
+                if not (wait or future.done()):
+                    continue
+                wait = False
+                del retrying[window_start]
+                handle_response(window_start, future.result(), attempt)
+
+        def first_yes():
+            yes_times = [t for t, (overall_answer, _, _) in results.items() if overall_answer == "YES"]
+            return min(yes_times) if yes_times else None
+
+        aborted = False
+        try:
+            while start_time <= play_time - segment_time:
+                iteration_count += 1
+                if iteration_count > MAX_ITERATIONS:
+                    print(f'[{self.model_id}] 최대 반복 횟수 초과, 탐색 종료')
+                    break
+
+                # 재시도 큐: 끝난 재시도 반영 (탐색은 기다리지 않고 계속)
+                # 재시도가 SEARCH_RETRY_QUEUE_SIZE개 쌓이면 (장애 지속) 가장 이른 재시도가 끝날 때까지 새 구간 요청을 멈춤
+                service_retries()
+                while len(retrying) >= self.SEARCH_RETRY_QUEUE_SIZE:
+                    service_retries(wait=True)
+                if first_yes() is not None:
+                    break  # 이전 구간의 재시도가 YES
+
+                # 현재 구간부터 W개 구간까지 요청 (그리드 생성은 이 스레드, LLM 호출은 공용 LLM 루프에서 동시 진행)
+                while (len(pending) < speculative_window and next_start_time <= play_time - segment_time
+                       and iteration_count - 1 + len(pending) < MAX_ITERATIONS):
+                    pending.append((next_start_time, submit(next_start_time)))
+                    next_start_time += offset_time
+
+                # 그 다음 구간 그리드를 미리 생성 (LLM 응답 대기 중 디코딩/인코딩 → 반복당 지연 = max(디코딩, LLM))
+                prefetch_times = []
+                prefetch_start_time = next_start_time
+                while len(prefetch_times) < self.GRID_PREFETCH_DEPTH and prefetch_start_time <= play_time - segment_time:
+                    prefetch_times.append(prefetch_start_time)
+                    prefetch_start_time += offset_time
+                self._prefetch_search_grids(video_path, prefetch_times, segment_time, M, N, gridSize)
+
+                print(f'[{self.model_id}] 검색 중... start_time={start_time:.1f}초')
+
+                # LLM 응답 (현재 구간, API 오류이면 재시도 큐로 보내고 다음 구간 진행)
+                window_start, future = pending.popleft()
+                handle_response(window_start, future.result(), 0)
+                analysis_progress.report(
+                    "search", model_id=self.model_id, event=event_key, position=round(window_start + segment_time, 1),
+                    segments=iteration_count, max_segments=max_possible_iterations
+                )
+
+                # 종료 조건
+                if first_yes() is not None:
                     break
-                time.sleep(wait_time)
+
                 start_time += offset_time
+
+            # 첫 YES 이전 구간의 재시도가 모두 끝날 때까지 대기 (재시도 구간이 YES이면 그 구간이 기준 시간)
+            while retrying:
+                yes_time = first_yes()
+                if yes_time is not None and min(retrying) > yes_time:
+                    break
+                service_retries(wait=True)
+        except RuntimeError as e:
+            # 연속 오류 한도: 기준 시간은 시작 시각, 그때까지 받은 답변은 유지
+            print(f'[{self.model_id}] {e}, 탐색 종료')
+            aborted = True
+        finally:
+            # 종료 이후 구간의 요청은 취소 (이미 완료된 응답은 폐기)
+            if pending:
+                print(f'[{self.model_id}] speculative 요청 {len(pending)}개 취소')
+            for _, future in pending:
+                future.cancel()
+            for future, _ in retrying.values():
+                future.cancel()
+
+        # 루프 종료 후 처리
+        yes_time = None if aborted else first_yes()
+        if yes_time is not None:
+            final_start_time = round(yes_time, 1)
+        elif not aborted and start_time > play_time - segment_time:
+            print("  영상 거의 끝까지 탐색했습니다.")
+            final_start_time = round(start_time - offset_time, 1)
+        else:
+            final_start_time = search_start_time
+
+        # 기준 시간 이하의 구간 답변을 시간 순서대로 누적 (재시도로 늦게 받은 구간도 제자리에)
+        q_answers_accumulated = {}
+        for window_start in sorted(results):
+            if yes_time is not None and window_start > yes_time:
                 continue
+            _, current_q_answers, current_q_confidence = results[window_start]
+            for q_key, answer in current_q_answers.items():
+                if q_key not in q_answers_accumulated:
+                    q_answers_accumulated[q_key] = []
+                confidence = current_q_confidence.get(q_key, None)
+                q_answers_accumulated[q_key].append((round(window_start, 1), answer, confidence))
+
+        return final_start_time, q_answers_accumulated
+
+    def _search_reference_time_coarse_to_fine(self, video_path: str, system_prompt: str, user_prompt: str,
+                                              play_time: float, start_time: float, segment_time: float,
+                                              offset_time: float, sampling_time: float, speculative_window: int = 1,
+                                              max_output_tokens: int = None, event_key: str = None):
+        """
+        coarse-to-fine 기준 시간 탐색 (단조 증가 이벤트: 한 번 YES가 되면 이후에도 YES라고 가정)
+
+        1. coarse 탐색: COARSE_SEARCH_STRIDE 구간 간격으로 탐색하여 첫 YES 구간을 포함하는 범위를 찾음
+        2. 세분 탐색: 범위 안의 구간 수가 speculative_window 이하이면 한 번에 모두 요청하여 첫 YES를 찾고,
+           더 크면 이분 탐색으로 offset_time 해상도까지 좁힘
+        - 구간 시작 시각은 순차 탐색과 같은 방식으로 누적하므로 찾은 기준 시간은 순차 탐색의 격자 위에 있음
+        - q_answers_accumulated에는 찾은 기준 시간 이하의 탐색한 구간만 시간 순서대로 저장
+          (ReporterAgent 시점 규칙이 쓰는 기준 시간과 그 직전 구간은 항상 포함)
+        """
+        M, N = 1, int(segment_time / sampling_time)
+        gridSize = (int(1280/2)*N, int(720/2)*M)
+
+        # 순차 탐색과 같은 방식으로 누적한 구간 시작 시각 목록 (안전 상한 2000)
+        window_times = []
+        window_start = start_time
+        while window_start <= play_time - segment_time and len(window_times) < 2000:
+            window_times.append(window_start)
+            window_start += offset_time
+
+        if not window_times:
+            print("  영상 거의 끝까지 탐색했습니다.")
+            return round(start_time - offset_time, 1), {}
+
+        results = {}  # 구간 index -> (overall_answer, q_answers, q_confidence), API 오류 구간은 None
+        consecutive_errors = 0
+
+        def probe(indices, stop_on_yes, prefetch_indices=()):
+            """
+            구간들을 동시에 요청하고 시간 순서대로 반영 (stop_on_yes면 첫 YES 이후 요청 취소). 첫 YES index 반환
+            prefetch_indices: 응답을 기다리는 동안 그리드를 미리 생성할 다음 탐색 후보 구간
+            """
+            nonlocal consecutive_errors
+
+            def submit(i, attempt=0):
+                return self._submit_search_query(
+                    video_path, system_prompt, user_prompt, window_times[i], window_times[i] + segment_time, M, N, gridSize,
+                    max_output_tokens, delay=self._search_retry_delay(attempt), event_key=event_key
+                )
+
+            pending = deque((i, submit(i), 0) for i in indices if i not in results)
+            self._prefetch_search_grids(
+                video_path, [window_times[i] for i in prefetch_indices if 0 <= i < len(window_times) and i not in results],
+                segment_time, M, N, gridSize
+            )
+            first_yes = None
+            try:
+                while pending:
+                    i, future, attempt = pending.popleft()
+                    print(f'[{self.model_id}] 검색 중... start_time={window_times[i]:.1f}초')
+                    response = future.result()
+                    if isinstance(response, str) and response.startswith(self.ERROR_RESPONSE_PREFIXES):
+                        consecutive_errors += 1
+                        print(f'[{self.model_id}] API 오류 ({consecutive_errors}/{self.MAX_CONSECUTIVE_API_ERRORS}): {response[:100]}')
+                        if consecutive_errors >= self.MAX_CONSECUTIVE_API_ERRORS:
+                            results[i] = None
+                            raise RuntimeError("연속 API 오류 한도 도달")
+                        if attempt < self.SEARCH_RETRY_LIMIT:
+                            # 같은 자리에서 백오프 후 재시도 (뒤 구간 요청은 그동안 계속 진행)
+                            pending.appendleft((i, submit(i, attempt + 1), attempt + 1))
+                        else:
+                            results[i] = None
+                        continue
+                    consecutive_errors = 0
+                    overall_answer = self._parse_overall_answer(response)
+                    current_q_answers, current_q_confidence = self._parse_q_answers(response)
+                    results[i] = (overall_answer, current_q_answers, current_q_confidence)
+                    analysis_progress.report(
+                        "search", model_id=self.model_id, event=event_key, position=round(window_times[i] + segment_time, 1),
+                        segments=len(results), max_segments=len(window_times)
+                    )
+                    if overall_answer == "YES" and first_yes is None:
+                        first_yes = i
+                        if stop_on_yes:
+                            break
+            finally:
+                for _, future, _ in pending:
+                    future.cancel()
+            return first_yes
+
+        final_index = None
+        try:
+            # 1. coarse 탐색 (speculative_window개씩 동시에 요청)
+            stride = max(1, self.COARSE_SEARCH_STRIDE)
+            coarse_indices = list(range(0, len(window_times), stride))
+            hi = None
+            batch_size = max(1, speculative_window)
+            for batch_start in range(0, len(coarse_indices), batch_size):
+                hi = probe(
+                    coarse_indices[batch_start:batch_start + batch_size], stop_on_yes=True,
+                    prefetch_indices=coarse_indices[batch_start + batch_size:batch_start + batch_size + self.GRID_PREFETCH_DEPTH]
+                )
+                if hi is not None:
+                    break
+
+            if hi is None:
+                # 마지막 coarse 구간 이후 남은 구간 (stride 미만)
+                hi = probe(range(coarse_indices[-1] + 1, len(window_times)), stop_on_yes=True)
+                lo = coarse_indices[-1]
             else:
-                consecutive_errors = 0
+                lo = hi - stride  # 직전 coarse 구간 (NO), 첫 구간이 YES이면 -1 이하
 
-            # 응답 파싱
-            overall_answer = self._parse_overall_answer(response)
-            current_q_answers, current_q_confidence = self._parse_q_answers(response)
+            if hi is not None:
+                lo = max(lo, -1)
+                # 2. 세분 탐색: (lo, hi) 사이 구간
+                if hi - lo - 1 <= max(1, speculative_window):
+                    first_yes = probe(range(lo + 1, hi), stop_on_yes=True)
+                    final_index = first_yes if first_yes is not None else hi
+                else:
+                    while hi - lo > 1:
+                        mid = (lo + hi) // 2
+                        # 다음 이분 탐색 후보(YES/NO 각각의 중간점)를 미리 생성
+                        if probe([mid], stop_on_yes=True, prefetch_indices=[(lo + mid) // 2, (mid + hi) // 2]) is not None:
+                            hi = mid
+                        else:
+                            lo = mid
+                    final_index = hi
+                    # 시점 규칙(기준 시간과 직전 구간)에 필요한 직전 구간 답변 확보
+                    if hi > 0:
+                        probe([hi - 1], stop_on_yes=False)
+        except RuntimeError as e:
+            # 순차 탐색과 동일: 기준 시간은 시작 시각, 그때까지 받은 답변은 유지
+            print(f'[{self.model_id}] {e}, 탐색 종료')
+            aborted = True
+            final_index = None
+        else:
+            aborted = False
+        last_index = final_index if final_index is not None else len(window_times) - 1
 
-            # 누적 저장
+        # 기준 시간 이하의 탐색한 구간만 시간 순서대로 누적
+        q_answers_accumulated = {}
+        for i in sorted(results):
+            if i > last_index or results[i] is None:
+                continue
+            _, current_q_answers, current_q_confidence = results[i]
             for q_key, answer in current_q_answers.items():
                 if q_key not in q_answers_accumulated:
                     q_answers_accumulated[q_key] = []
                 confidence = current_q_confidence.get(q_key, None)
-                q_answers_accumulated[q_key].append((round(start_time, 1), answer, confidence))
-
-            # 종료 조건
-            if overall_answer == "YES":
-                final_start_time = round(start_time, 1)
-                break
+                q_answers_accumulated[q_key].append((round(window_times[i], 1), answer, confidence))
 
-            start_time += offset_time
-        
-        # 루프 종료 후 처리
-        if start_time > play_time - segment_time:
+        if final_index is not None:
+            final_start_time = round(window_times[final_index], 1)
+        elif aborted:
+            final_start_time = start_time
+        else:
             print("  영상 거의 끝까지 탐색했습니다.")
-            final_start_time = round(start_time - offset_time, 1)
-        
+            final_start_time = round(window_times[-1], 1)
+
+        print(f'[{self.model_id}] coarse-to-fine 탐색: LLM 요청 {len(results)}개 (순차 탐색 시 최대 {len(window_times)}개)')
         return final_start_time, q_answers_accumulated
+
+    def _search_options(self, event_key: str, user_prompt: str):
+        """
+        기준 시점 탐색 설정 반환: (user_prompt, _search_reference_time 키워드 인자)
+        2단계 분석 모드이면 Overall_Answer만 묻는 탐색 프롬프트와 작은 출력 한도를 사용
+        """
+        if not self.TWO_PHASE_ANALYSIS:
+            return user_prompt, {
+                "speculative_window": self.SPECULATIVE_WINDOWS[event_key],
+                "search_strategy": self.SEARCH_STRATEGIES[event_key],
+                "event_key": event_key,
+            }
+        return self._build_search_prompt(event_key), {
+            "speculative_window": self.SPECULATIVE_WINDOWS[event_key],
+            "search_strategy": self.TWO_PHASE_SEARCH_STRATEGIES[event_key],
+            "max_output_tokens": self.SEARCH_MAX_OUTPUT_TOKENS,
+            "event_key": event_key,
+        }
+
+    def _build_search_prompt(self, event_key: str) -> str:
+        """2단계 분석 탐색 프롬프트 (Task 1의 Overall_Answer만, Reason 생략)"""
+        return f"""
+[Task] Individual Image Analysis
+Analyze each image independently without using context from other images.
+
+Question: {self.promptbank.search_reference_time[event_key]['action']}
+
+* Judgment Criteria (apply all):
+- Each image is evaluated as a standalone frame.
+- If the person holds an object, treat it as an inhaler.
+- If consecutive images satisfy the above conditions, the overall answer is YES; otherwise, NO.
+
+* Output Format (output this single line only):
+Overall_Answer: [YES or NO]
+"""
+
+    def _build_action_qa_prompt(self, event_key: str, q_keys: list) -> str:
+        """2단계 분석 행동 Q 프롬프트 (Task 2에서 q_keys 질문만, Q 번호는 Q_MAPPINGS와 동일)"""
+        q_mapping = self.Q_MAPPINGS[event_key]
+        action_steps = self.promptbank.check_action_step_DPI_type2
+        questions = "\n".join(f"{q_key}. {action_steps[q_mapping[q_key]]['action']}" for q_key in q_keys)
+        output_format = "\n".join(
+            f"{q_key}_Answer: [YES or NO]\n{q_key}_Confidence: [0.0 to 1.0, indicating your confidence level in the answer]"
+            for q_key in q_keys
+        )
+        return f"""
+[Task] Sequential Video Analysis
+Analyze the sequence of images as consecutive video frames.
+
+{questions}
+
+* Judgment Criteria (apply all):
+- Treat all frames as parts of a continuous video.
+- Use temporal continuity to determine whether the inhaler appears across frames.
+- Allow inference of inhaler visibility even if partially obscured in some frames, based on continuity.
+
+* Output Format:
+{output_format}
+"""
+
+    def _analyze_action_windows(self, video_path: str, ref_time_in: float, ref_time_face: float, ref_time_out: float):
+        """
+        2단계 분석의 행동 Q 단계: ReporterAgent 규칙이 쓰는 구간에만 Q를 질문 (모든 요청을 동시에 보냄)
+
+        - faceONinhaler: T_in~T_face 구간 (faceONinhaler 탐색과 같은 격자)
+          POINT_RULE_ACTIONS는 T_face와 직전 구간에서만, 구간 규칙에 쓰는 나머지 Q는 모든 구간에서 질문
+        - inhalerOUT: T_face~T_out 구간, 모든 Q 질문
+        - inhalerIN: Q1(sit_stand)은 T_face 시점 규칙에만 쓰이고 faceONinhaler Q1로 확보하므로 질문하지 않음
+          단, T_face == T_in이면 faceONinhaler 구간이 하나뿐이라 직전 구간이 없으므로 T_in 직전 구간에서 질문
+          (1단계 방식에서 inhalerIN 마지막 구간이 채우던 직전 구간 점수)
+
+        Returns:
+            (q_answers_in, q_answers_face, q_answers_out) - 탐색 결과와 같은 형식 {Q번호: [(time, answer, confidence), ...]}
+        """
+        segment_time = 0.5  # faceONinhaler/inhalerOUT 탐색과 같은 구간 길이와 간격
+        sampling_time = segment_time / 10.0
+        offset_time = segment_time
+        M, N = 1, int(segment_time / sampling_time)
+        gridSize = (int(1280/2)*N, int(720/2)*M)
+        system_prompt = "You are a helpful assistant that analyzes images and videos to determine if the user is performing a specific action."
+
+        # (기준 시점 key, 구간 시작 시각, 질문할 Q 번호 목록)
+        windows = []
+        face_times = self._window_times(ref_time_in, ref_time_face, offset_time)
+        if len(face_times) < 2 and ref_time_in - offset_time >= 0:
+            q_keys = [q_key for q_key, action_key in self.Q_MAPPINGS['inhalerIN'].items()
+                      if action_key in self.POINT_RULE_ACTIONS]
+            if q_keys:
+                windows.append(('inhalerIN', ref_time_in - offset_time, q_keys))
+        for idx, window_start in enumerate(face_times):
+            at_point = idx >= len(face_times) - 2  # T_face와 직전 구간
+            q_keys = [q_key for q_key, action_key in self.Q_MAPPINGS['faceONinhaler'].items()
+                      if at_point or action_key not in self.POINT_RULE_ACTIONS]
+            if q_keys:
+                windows.append(('faceONinhaler', window_start, q_keys))
+        for window_start in self._window_times(ref_time_face, ref_time_out, offset_time):
+            windows.append(('inhalerOUT', window_start, list(self.Q_MAPPINGS['inhalerOUT'])))
+
+        def submit(event_key, window_start, q_keys, attempt=0):
+            return self._submit_search_query(
+                video_path, system_prompt, self._build_action_qa_prompt(event_key, q_keys),
+                window_start, window_start + segment_time, M, N, gridSize,
+                delay=self._search_retry_delay(attempt), event_key=event_key
+            )
+
+        responses = {}  # 구간 index -> 응답
+        futures = []
+        analysis_progress.report("action_qa", model_id=self.model_id, done=0, total=len(windows))
+        try:
+            for idx, (event_key, window_start, q_keys) in enumerate(windows):
+                # 다음 구간 그리드를 미리 생성 (faceONinhaler/inhalerOUT 탐색에서 만든 구간은 캐시 재사용)
+                self._prefetch_search_grids(
+                    video_path, [w[1] for w in windows[idx + 1:idx + 1 + self.GRID_PREFETCH_DEPTH]],
+                    segment_time, M, N, gridSize
+                )
+                futures.append(submit(event_key, window_start, q_keys))
+
+            # API 오류 구간은 모아서 백오프 후 다시 요청 (SEARCH_RETRY_LIMIT회까지)
+            in_flight = list(enumerate(futures))
+            for attempt in range(self.SEARCH_RETRY_LIMIT + 1):
+                failed = []
+                for idx, future in in_flight:
+                    response = future.result()
+                    if isinstance(response, str) and response.startswith(self.ERROR_RESPONSE_PREFIXES):
+                        event_key, window_start, _ = windows[idx]
+                        print(f'[{self.model_id}] 행동 Q API 오류 ({event_key}, start_time={window_start:.1f}초): {response[:100]}')
+                        failed.append(idx)
+                    else:
+                        responses[idx] = response
+                        analysis_progress.report("action_qa", model_id=self.model_id, done=len(responses), total=len(windows))
+                if not failed or attempt == self.SEARCH_RETRY_LIMIT:
+                    break
+                print(f'[{self.model_id}] 행동 Q 오류 구간 {len(failed)}개 재시도 ({attempt + 1}/{self.SEARCH_RETRY_LIMIT})')
+                in_flight = [(idx, submit(*windows[idx], attempt=attempt + 1)) for idx in failed]
+                futures.extend(future for _, future in in_flight)
+        finally:
+            for future in futures:
+                future.cancel()
+
+        # 시간 순서대로 반영
+        q_answers = {'inhalerIN': {}, 'faceONinhaler': {}, 'inhalerOUT': {}}
+        for idx, (event_key, window_start, q_keys) in enumerate(windows):
+            if idx not in responses:
+                continue
+            current_q_answers, current_q_confidence = self._parse_q_answers(responses[idx])
+            for q_key in q_keys:
+                if q_key not in current_q_answers:
+                    continue
+                if q_key not in q_answers[event_key]:
+                    q_answers[event_key][q_key] = []
+                confidence = current_q_confidence.get(q_key, None)
+                q_answers[event_key][q_key].append((round(window_start, 1), current_q_answers[q_key], confidence))
+
+        print(f'[{self.model_id}] 행동 Q 분석: 구간 {len(windows)}개, LLM 요청 {len(futures)}개 (제외 {len(windows) - len(responses)}개)')
+        return q_answers['inhalerIN'], q_answers['faceONinhaler'], q_answers['inhalerOUT']
+
+    def _window_times(self, start_time: float, end_time: float, offset_time: float) -> list:
+        """start_time부터 offset_time 간격으로 end_time 이하의 구간 시작 시각 목록 (탐색과 같은 방식으로 누적, 안전 상한 2000)"""
+        window_times = []
+        window_start = start_time
+        while round(window_start, 1) <= end_time and len(window_times) < 2000:
+            window_times.append(window_start)
+            window_start += offset_time
+        return window_times
+
+    def _prefetch_search_grids(self, video_path: str, start_times: list, segment_time: float,
+                               M: int, N: int, gridSize: tuple):
+        """다음에 요청할 구간들의 그리드를 VideoProcessorAgent 백그라운드 스레드에서 미리 생성"""
+        for prefetch_start_time in start_times:
+            self.video_processor.prefetch_encoded_frames(
+                video_path, prefetch_start_time, prefetch_start_time + segment_time, M, N, gridSize, (0, 0)
+            )
+
+    def _submit_search_query(self, video_path: str, system_prompt: str, user_prompt: str,
+                             start_time: float, end_time: float, M: int, N: int, gridSize: tuple,
+                             max_output_tokens: int = None, delay: float = 0.0, event_key: str = None):
+        """
+        구간 그리드를 만들고 LLM 요청을 제출 (concurrent.futures.Future 반환, delay초 뒤 전송)
+        분석 저널에 같은 구간/프롬프트의 응답이 있으면 그리드 생성과 LLM 요청 없이 완료된 Future 반환
+        """
+        prompt = None
+        if self.journal is not None:
+            prompt = analysis_journal.prompt_digest(system_prompt, user_prompt, max_output_tokens)
+            response = self.journal.lookup(self.model_id, event_key, start_time, prompt)
+            if response is not None:
+                future = Future()
+                future.set_result(response)
+                return future
+
+        # 프레임 추출 (JPEG 인코딩된 그리드를 모든 analyzer가 공유)
+        output_image, _, _ = self.video_processor.extract_encoded_frames(
+            video_path, start_time, end_time, M, N, gridSize, (0, 0)
+        )
+
+        # LLM 쿼리 (공용 LLM 루프에서 비동기 실행)
+        future = self.mllm.submit_query_answer(
+            system_prompt, user_prompt, image_array=output_image, max_output_tokens=max_output_tokens, delay=delay
+        )
+        if self.journal is not None:
+            future.add_done_callback(
+                lambda f: self._record_journal(f, event_key, start_time, end_time, prompt)
+            )
+        return future
+
+    def _record_journal(self, future, event_key: str, start_time: float, end_time: float, prompt: str):
+        """완료된 구간 응답을 분석 저널에 기록 (취소/예외/API 오류 응답은 기록하지 않음)"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        response = future.result()
+        if not isinstance(response, str) or response.startswith(self.ERROR_RESPONSE_PREFIXES):
+            return
+        q_answers, q_confidence = self._parse_q_answers(response)
+        answers = {q_key: [answer, q_confidence.get(q_key)] for q_key, answer in q_answers.items()}
+        overall = self._parse_overall_answer(response) if "Overall_Answer" in response else None
+        try:
+            self.journal.record(self.model_id, event_key, start_time, end_time, prompt, overall, answers, response)
+        except (OSError, ValueError) as e:
+            print(f'[{self.model_id}] 분석 저널 기록 실패: {e}')
+
+    def _search_retry_delay(self, attempt: int) -> float:
+        """재시도 백오프 시간 (첫 요청은 0, 재시도마다 2배, 최대 30초)"""
+        return 0.0 if attempt <= 0 else float(min(2 ** attempt, 30))
     
     def _parse_overall_answer(self, response: str) -> str:
         """Overall_Answer 파싱"""
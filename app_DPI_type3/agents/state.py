@@ -66,6 +66,10 @@ class VideoAnalysisState(TypedDict):
         errors: 발생한 오류들
         status: 현재 처리 상태
         agent_logs: 각 Agent의 로그
+        
+        # 실행 환경 (분석별 값, 컴파일된 워크플로우를 재사용해도 state로 전달)
+        app_dir: 디바이스 app 디렉토리 (개별 시각화 HTML 저장 경로)
+        journal_path: 분석 체크포인트 저널 경로 (없으면 저널 미사용)
     """
     # 입력 (병렬 실행 시 첫 번째 값 유지)
     video_path: Annotated[str, keep_first]
@@ -74,6 +78,11 @@ class VideoAnalysisState(TypedDict):
     api_key: Annotated[Optional[str], keep_first]
     save_individual_report: Annotated[Optional[bool], keep_first]
     
+    # 실행 환경 (병렬 실행 시 첫 번째 값 유지)
+    # StateGraph는 스키마에 선언된 키만 노드로 전달하므로 반드시 선언해야 함
+    app_dir: Annotated[Optional[str], keep_first]
+    journal_path: Annotated[Optional[str], keep_first]
+    
     # 비디오 정보 (병렬 실행 시 첫 번째 값 유지)
     video_info: Annotated[Optional[Dict[str, Any]], keep_first]
     
@@ -94,7 +103,9 @@ class VideoAnalysisState(TypedDict):
     agent_logs: Annotated[List[Dict[str, str]], operator.add]
 
 
-def create_initial_state(video_path: str, llm_models: List[str] = None, api_key: str = None, save_individual_report: bool = False) -> VideoAnalysisState:
+def create_initial_state(video_path: str, llm_models: List[str] = None, api_key: str = None, save_individual_report: bool = False,
+                         video_info: Optional[Dict[str, Any]] = None, app_dir: Optional[str] = None,
+                         journal_path: Optional[str] = None) -> VideoAnalysisState:
     """
     초기 상태 생성
     
@@ -103,6 +114,9 @@ def create_initial_state(video_path: str, llm_models: List[str] = None, api_key:
         llm_models: 사용할 LLM 모델 리스트 (예: ["gpt-5-nano", "gpt-5-mini"])
         api_key: OpenAI API 키
         save_individual_report: 개별 에이전트 결과물에 대한 시각화 HTML 저장 여부 (기본값: False)
+        video_info: 업로드 ingest에서 미리 계산된 비디오 메타데이터 (기본값: None, 없으면 VideoProcessorAgent가 탐색)
+        app_dir: 디바이스 app 디렉토리 (기본값: None, 없으면 reporter_agent가 추정)
+        journal_path: 분석 체크포인트 저널 경로 (기본값: None, 저널 미사용)
         
     Returns:
         초기화된 VideoAnalysisState
@@ -118,7 +132,9 @@ def create_initial_state(video_path: str, llm_models: List[str] = None, api_key:
         llm_models=llm_models,
         api_key=api_key,
         save_individual_report=save_individual_report,
-        video_info=None,
+        app_dir=app_dir,
+        journal_path=journal_path,
+        video_info=video_info,
         model_results={},
         reference_times_avg=None,
         promptbank_data_avg=None,
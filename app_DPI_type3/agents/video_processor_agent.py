@@ -8,10 +8,13 @@ Video Processor Agent
 
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 # app_server 모듈 경로 추가 (상위 2단계 디렉토리)
 sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), '..'))
 
 from app_server import class_Media_Edit_251107 as ME
+from app_server import class_MultimodalLLM_QA_251107 as mLLM
+from app_server import analysis_progress
 from .state import VideoAnalysisState
 
 
@@ -21,11 +24,24 @@ class VideoProcessorAgent:
     - 비디오 메타데이터 추출
     - 프레임 샘플링 및 전처리
     - 이미지 그리드 생성
+    - 비디오별 프레임 세션 관리 (VideoCapture를 한 번만 열고 모든 analyzer가 공유)
+    - 그리드 캐시 관리 (병렬 analyzer가 같은 구간을 요청하면 한 번만 생성)
+    - 그리드 JPEG 인코딩 공유 (구간당 한 번만 인코딩하여 모든 analyzer/provider가 같은 바이트 사용)
+    - 그리드 prefetch (LLM 응답을 기다리는 동안 다음 구간 그리드를 백그라운드에서 디코딩/인코딩)
     """
+
+    PREFETCH_WORKERS = 2  # 그리드 prefetch 스레드 수 (디코딩은 세션 lock으로 직렬화, JPEG 인코딩/리사이즈는 병렬)
     
-    def __init__(self):
+    def __init__(self, num_consumers: int = 1):
+        """
+        Args:
+            num_consumers: 같은 그리드를 요청할 analyzer 수 (모두 가져가면 캐시에서 해제)
+        """
         self.video_edit = ME.MediaEdit()
         self.name = "VideoProcessorAgent"
+        self.frame_sessions = {}  # video_path -> VideoFrameSession
+        self.grid_cache = ME.FrameGridCache(consumers=num_consumers)
+        self._prefetch_executor = self._new_prefetch_executor()  # 스레드는 첫 prefetch 시 생성됨
     
     def process(self, state: VideoAnalysisState) -> VideoAnalysisState:
         """
@@ -47,22 +63,36 @@ class VideoProcessorAgent:
                 "message": f"비디오 파일 처리 시작: {video_path}"
             })
             
-            # 비디오 정보 추출
-            video_name, play_time, frame_count, video_width, video_height, file_size = \
-                self.video_edit.query_videoInfo(video_path)
+            video_info = state.get("video_info")
+            if video_info:
+                # 업로드 ingest에서 미리 계산된 메타데이터 사용 (파일 재탐색 생략)
+                video_name = video_info["video_name"]
+                play_time = video_info["play_time"]
+                frame_count = video_info["frame_count"]
+                video_width = video_info["video_width"]
+                video_height = video_info["video_height"]
+            else:
+                # 비디오 정보 추출
+                video_name, play_time, frame_count, video_width, video_height, file_size = \
+                    self.video_edit.query_videoInfo(video_path)
+                
+                if video_name is None:
+                    raise ValueError(f"비디오 파일을 열 수 없습니다: {video_path}")
+                
+                video_info = {
+                    "video_name": video_name,
+                    "play_time": play_time,
+                    "frame_count": frame_count,
+                    "video_width": video_width,
+                    "video_height": video_height,
+                    "file_size": file_size
+                }
             
-            if video_name is None:
-                raise ValueError(f"비디오 파일을 열 수 없습니다: {video_path}")
+            # 프레임 세션 오픈 (이후 모든 extract_frames 호출이 이 세션을 재사용)
+            self.open_session(video_path)
             
             # 비디오 정보를 상태에 저장
-            state["video_info"] = {
-                "video_name": video_name,
-                "play_time": play_time,
-                "frame_count": frame_count,
-                "video_width": video_width,
-                "video_height": video_height,
-                "file_size": file_size
-            }
+            state["video_info"] = video_info
             
             # 상태 업데이트
             state["status"] = "video_processed"
@@ -75,6 +105,7 @@ class VideoProcessorAgent:
             })
             
             print(f"[{self.name}] 비디오 정보: {video_name}, {play_time}초, {frame_count}프레임")
+            analysis_progress.report("video_loaded", play_time=play_time)
             
         except Exception as e:
             error_msg = f"[{self.name}] 비디오 처리 중 오류: {str(e)}"
@@ -99,11 +130,66 @@ class VideoProcessorAgent:
             padSize: 패딩 크기
             
         Returns:
-            output_image: 생성된 이미지 배열
+            output_image: 생성된 이미지 배열 (다른 analyzer와 공유되므로 수정 금지)
             image_W: 이미지 너비
             image_H: 이미지 높이
         """
-        output_image, image_W, image_H = self.video_edit.extract_frames_to_MxN_image(
+        cache_key = (video_path, round(start_time, 3), round(end_time, 3), (M, N), tuple(gridSize), tuple(padSize))
+        
+        def build_grid():
+            return self._build_grid(video_path, start_time, end_time, M, N, gridSize, padSize)
+        
+        output_image, image_W, image_H = self.grid_cache.get_or_build(cache_key, build_grid)
+        
+        return output_image, image_W, image_H
+    
+    def extract_encoded_frames(self, video_path: str, start_time: float, end_time: float,
+                               M: int, N: int, gridSize: tuple = (640, 360), padSize: tuple = (0, 0)):
+        """
+        extract_frames와 같은 그리드를 JPEG로 인코딩하여 반환 (구간당 한 번만 인코딩)
+        
+        Returns:
+            encoded_image: mLLM.EncodedImage (그리드 생성/인코딩 실패 시 None)
+                           multimodalLLM.query_answer_chatGPT(image_array=...)에 그대로 전달
+            image_W: 이미지 너비
+            image_H: 이미지 높이
+        """
+        cache_key, build_encoded_grid = self._encoded_grid_job(video_path, start_time, end_time, M, N, gridSize, padSize)
+        encoded_image, image_W, image_H = self.grid_cache.get_or_build(cache_key, build_encoded_grid)
+        
+        return encoded_image, image_W, image_H
+    
+    def prefetch_encoded_frames(self, video_path: str, start_time: float, end_time: float,
+                                M: int, N: int, gridSize: tuple = (640, 360), padSize: tuple = (0, 0)):
+        """
+        곧 요청할 구간의 JPEG 그리드를 백그라운드에서 미리 생성 (extract_encoded_frames가 완료된 결과를 바로 가져감)
+        prefetch 대기열이 가득 찼거나 이미 캐시에 있으면 아무것도 하지 않음
+        """
+        cache_key, build_encoded_grid = self._encoded_grid_job(video_path, start_time, end_time, M, N, gridSize, padSize)
+        self.grid_cache.prefetch(cache_key, build_encoded_grid, self._prefetch_executor)
+    
+    def _new_prefetch_executor(self):
+        return ThreadPoolExecutor(max_workers=self.PREFETCH_WORKERS, thread_name_prefix="grid-prefetch")
+    
+    def _encoded_grid_job(self, video_path, start_time, end_time, M, N, gridSize, padSize):
+        """JPEG 그리드 캐시 키와 생성 함수 (extract_encoded_frames/prefetch_encoded_frames 공용)"""
+        cache_key = ("jpeg", video_path, round(start_time, 3), round(end_time, 3), (M, N), tuple(gridSize), tuple(padSize))
+        
+        def build_encoded_grid():
+            output_image, image_W, image_H = self._build_grid(video_path, start_time, end_time, M, N, gridSize, padSize)
+            if output_image is None:
+                return None, image_W, image_H
+            try:
+                return mLLM.EncodedImage.from_array(output_image), image_W, image_H
+            except ValueError as e:
+                print(f"[{self.name}] 그리드 JPEG 인코딩 실패 ({start_time:.1f}~{end_time:.1f}초): {e}")
+                return None, image_W, image_H
+        
+        return cache_key, build_encoded_grid
+    
+    def _build_grid(self, video_path, start_time, end_time, M, N, gridSize, padSize):
+        """그리드 이미지 생성 (열려 있는 프레임 세션 사용)"""
+        return self.video_edit.extract_frames_to_MxN_image(
             option='time',
             start=start_time,
             end=end_time,
@@ -111,8 +197,36 @@ class VideoProcessorAgent:
             video_path=video_path,
             output_dir=None,  # None이면 image_array를 반환
             gridSize=gridSize,
-            padSize=padSize
+            padSize=padSize,
+            session=self.frame_sessions.get(video_path)
         )
+    
+    def open_session(self, video_path: str):
+        """
+        비디오 프레임 세션을 열어 등록 (이미 열려 있으면 기존 세션 반환)
         
-        return output_image, image_W, image_H
+        Args:
+            video_path: 비디오 파일 경로
+            
+        Returns:
+            VideoFrameSession 또는 None (열기 실패 시 기존 방식으로 프레임 추출)
+        """
+        session = self.frame_sessions.get(video_path)
+        if session is None:
+            session = self.video_edit.open_frame_session(video_path)
+            if session is not None:
+                self.frame_sessions[video_path] = session
+        return session
+    
+    def close_sessions(self):
+        """열려 있는 모든 프레임 세션 및 그리드 캐시 해제"""
+        # 진행 중인 prefetch가 끝난 뒤 세션 해제 (대기 중인 prefetch는 취소)
+        self._prefetch_executor.shutdown(wait=True, cancel_futures=True)
+        self._prefetch_executor = self._new_prefetch_executor()
+        for session in self.frame_sessions.values():
+            session.close()
+        self.frame_sessions.clear()
+        if self.grid_cache.hits or self.grid_cache.misses:
+            print(f"[{self.name}] 그리드 캐시: 생성 {self.grid_cache.misses}회 (prefetch {self.grid_cache.prefetched}회), 재사용 {self.grid_cache.hits}회")
+        self.grid_cache.clear()
 
@@ -7,6 +7,7 @@ Multi-Agent 워크플로우를 구성합니다. (동적 모델 지원)
 """
 
 from langgraph.graph import StateGraph, END
+from langchain_core.runnables import RunnableConfig
 from agents.state import VideoAnalysisState
 from agents.video_processor_agent import VideoProcessorAgent
 from agents.video_analyzer_agent import VideoAnalyzerAgent
@@ -22,6 +23,10 @@ class InhalerAnalysisWorkflow:
     2. VideoAnalyzer (병렬):
        - 리스트로 지정된 모델 개수만큼 병렬 실행
     3. Reporter: 결과 취합 및 평균값 시각화
+    
+    컴파일된 그래프는 노드 구성(모델 슬롯)만 가지고, 분석별 객체(LLM 인스턴스, PromptBank를 가진 analyzer,
+    프레임 세션/그리드 캐시를 가진 video processor)는 run()마다 새로 만들어 config["configurable"]["run_context"]로 주입합니다.
+    → 같은 (device_type, 모델 리스트)의 워크플로우 인스턴스를 여러 분석에 재사용 가능 (그래프 생성/컴파일은 한 번만)
     """
     
     def __init__(self, mllm_instances: list, llm_models: list):
@@ -29,27 +34,19 @@ class InhalerAnalysisWorkflow:
         워크플로우 초기화
         
         Args:
-            mllm_instances: Multimodal LLM 인스턴스 리스트
+            mllm_instances: Multimodal LLM 인스턴스 리스트 (run()에 LLM 인스턴스를 넘기지 않을 때 사용)
             llm_models: 사용할 LLM 모델 이름 리스트 (예: ["gpt-4o", "gpt-4o-mini", ...])
         """
         if len(mllm_instances) != len(llm_models):
             raise ValueError("mllm_instances와 llm_models의 개수가 일치해야 합니다.")
         
         self.mllm_instances = mllm_instances
-        self.llm_models = llm_models
-        
-        # Agent 초기화
-        self.video_processor = VideoProcessorAgent()
+        self.llm_models = list(llm_models)
         
-        # 동적으로 VideoAnalyzerAgent 생성
-        self.video_analyzers = []
-        self.analyzer_nodes = {}
-        for idx, (mllm, model_name) in enumerate(zip(mllm_instances, llm_models)):
-            model_id = f"{model_name}_{idx}"
-            analyzer = VideoAnalyzerAgent(mllm, self.video_processor, model_id, model_name)
-            self.video_analyzers.append(analyzer)
-            self.analyzer_nodes[model_id] = analyzer
+        # 모델별 analyzer 노드 ID (analyzer 인스턴스는 run()마다 생성)
+        self.model_ids = [f"{model_name}_{idx}" for idx, model_name in enumerate(self.llm_models)]
         
+        # ReporterAgent는 분석별 상태가 없으므로 공유
         self.reporter = ReporterAgent()
         
         # 워크플로우 그래프 생성
@@ -66,9 +63,9 @@ class InhalerAnalysisWorkflow:
         workflow.add_node("video_processor", self._video_processor_node)
         
         # 2. 동적으로 VideoAnalyzer 노드들 추가
-        for model_id, analyzer in self.analyzer_nodes.items():
+        for model_id in self.model_ids:
             node_name = f"video_analyzer_{model_id}"
-            workflow.add_node(node_name, self._create_analyzer_node(analyzer, model_id))
+            workflow.add_node(node_name, self._create_analyzer_node(model_id))
         
         # 3. Reporter 노드 추가
         workflow.add_node("reporter", self._reporter_node)
@@ -77,12 +74,12 @@ class InhalerAnalysisWorkflow:
         workflow.set_entry_point("video_processor")
         
         # 병렬 실행: video_processor -> 모든 analyzer가 병렬로 실행
-        for model_id in self.analyzer_nodes.keys():
+        for model_id in self.model_ids:
             node_name = f"video_analyzer_{model_id}"
             workflow.add_edge("video_processor", node_name)
         
         # 모든 analyzer 결과를 reporter로 전달
-        for model_id in self.analyzer_nodes.keys():
+        for model_id in self.model_ids:
             node_name = f"video_analyzer_{model_id}"
             workflow.add_edge(node_name, "reporter")
         
@@ -90,20 +87,39 @@ class InhalerAnalysisWorkflow:
         
         return workflow
     
-    def _video_processor_node(self, state: VideoAnalysisState) -> VideoAnalysisState:
+    def _create_run_context(self, mllm_instances: list) -> dict:
+        """
+        분석 한 건에 사용할 에이전트 생성
+        (모든 analyzer가 같은 구간을 요청하므로 그리드 캐시 소비자 수 = 모델 수)
+        """
+        video_processor = VideoProcessorAgent(num_consumers=len(self.llm_models))
+        video_analyzers = {}
+        for model_id, mllm, model_name in zip(self.model_ids, mllm_instances, self.llm_models):
+            video_analyzers[model_id] = VideoAnalyzerAgent(mllm, video_processor, model_id, model_name)
+        return {
+            "video_processor": video_processor,
+            "video_analyzers": video_analyzers,
+        }
+    
+    @staticmethod
+    def _run_context(config: RunnableConfig) -> dict:
+        """노드 config에서 분석별 에이전트 조회"""
+        return config["configurable"]["run_context"]
+    
+    def _video_processor_node(self, state: VideoAnalysisState, config: RunnableConfig) -> VideoAnalysisState:
         """비디오 처리 노드"""
         print("\n" + "="*50)
         print("=== 1. Video Processor Agent 실행 ===")
         print("="*50)
-        return self.video_processor.process(state)
+        return self._run_context(config)["video_processor"].process(state)
     
-    def _create_analyzer_node(self, analyzer, model_id):
+    def _create_analyzer_node(self, model_id):
         """동적으로 Analyzer 노드 함수 생성"""
-        def analyzer_node(state: VideoAnalysisState) -> VideoAnalysisState:
+        def analyzer_node(state: VideoAnalysisState, config: RunnableConfig) -> VideoAnalysisState:
             print("\n" + "="*50)
             print(f"=== 2. Video Analyzer Agent ({model_id}) 실행 ===")
             print("="*50)
-            return analyzer.process(state)
+            return self._run_context(config)["video_analyzers"][model_id].process(state)
         return analyzer_node
     
     def _reporter_node(self, state: VideoAnalysisState) -> VideoAnalysisState:
@@ -113,22 +129,34 @@ class InhalerAnalysisWorkflow:
         print("="*50)
         return self.reporter.process(state)
     
-    def run(self, initial_state: VideoAnalysisState) -> VideoAnalysisState:
+    def run(self, initial_state: VideoAnalysisState, mllm_instances: list = None) -> VideoAnalysisState:
         """
         워크플로우 실행
         
         Args:
             initial_state: 초기 상태
+            mllm_instances: 이번 분석에 사용할 Multimodal LLM 인스턴스 리스트 (기본값: None, 생성 시 전달한 인스턴스 사용)
             
         Returns:
             최종 상태
         """
+        if mllm_instances is None:
+            mllm_instances = self.mllm_instances
+        if len(mllm_instances) != len(self.llm_models):
+            raise ValueError("mllm_instances와 llm_models의 개수가 일치해야 합니다.")
+        
         print("\n" + "#"*50)
         print("### LangGraph Multi-Agent 워크플로우 시작 ###")
         print("#"*50)
         
-        # 워크플로우 실행
-        final_state = self.app.invoke(initial_state)
+        # 분석별 에이전트 생성 후 config로 주입 (컴파일된 그래프는 재사용)
+        run_context = self._create_run_context(mllm_instances)
+        
+        # 워크플로우 실행 (종료 후 프레임 세션 해제)
+        try:
+            final_state = self.app.invoke(initial_state, config={"configurable": {"run_context": run_context}})
+        finally:
+            run_context["video_processor"].close_sessions()
         
         print("\n" + "#"*50)
         print("### LangGraph Multi-Agent 워크플로우 완료 ###")
@@ -18,6 +18,7 @@ from .state import VideoAnalysisState
 # app_server 모듈 경로 추가 (상위 2단계 디렉토리)
 sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), '..'))
 from app_server import class_MultimodalLLM_QA_251107 as mLLM
+from app_server import analysis_progress
 
 # .env 파일 로드 (app_server 디렉토리)
 app_server_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'app_server')
@@ -105,6 +106,7 @@ class ReporterAgent:
                 individual_agent_decisions[model_id] = decisions
                 
                 print(f"[{self.name}] {model_id} 개별 판정 완료")
+                analysis_progress.report("reporter", step="individual", done=len(individual_agent_decisions), total=num_models + 1)
                 
                 # 2. 개별 agent 시각화 생성 (save_individual_report_flag가 True일 때만)
                 if save_individual_report_flag:
@@ -150,7 +152,8 @@ class ReporterAgent:
             final_decisions = self._apply_multi_agent_rule(individual_agent_decisions)
             print(f"[{self.name}] 복수 agent 판정 완료")
             
-            # 4. 최종 리포트 생성
+            # 4. 최종 리포트 생성 (종합 기술 LLM 요청 포함)
+            analysis_progress.report("reporter", step="final_report", done=num_models, total=num_models + 1)
             final_report = self._create_final_report(
                 state, individual_agent_decisions, final_decisions, individual_html_paths
             )
@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+분석 체크포인트 저널 (분석별 JSONL 파일)
+VideoAnalyzerAgent가 LLM 응답을 받은 구간마다 한 줄씩 추가하고,
+같은 저널로 다시 분석하면 이미 답을 받은 구간은 LLM 요청 없이 저널의 응답을 사용합니다.
+
+[용도]
+- 분석 프로세스가 죽거나 PROCESS_TIMEOUT으로 종료되거나 서버가 재시작되어도
+  같은 (영상, deviceType, 모델, prompt-bank 버전)으로 다시 분석하면 중단된 지점부터 이어서 진행
+- 성공적으로 완료된 분석의 저널은 api_server가 결과 저장 후 삭제
+
+[기록 항목] (한 줄 = 한 구간)
+- model_id, event, start_time, end_time, prompt (프롬프트/출력 한도 SHA-256), overall, answers, response, created_at
+- 구간 식별: (model_id, event, start_time, prompt) → 프롬프트가 바뀌면 저장된 응답을 재사용하지 않음
+
+[파일]
+- ANALYSIS_JOURNAL_DIR/<journal_id>.jsonl (기본값: <project_root>/data/journals)
+- 한 분석 프로세스 안의 모든 analyzer 스레드가 같은 인스턴스를 공유 (get_journal)
+- 줄마다 flush하므로 프로세스가 강제 종료되어도 마지막 줄까지 보존 (잘린 마지막 줄은 로드 시 무시)
+
+[프로세스 간 잠금]
+- ANALYSIS_JOURNAL_DIR/<journal_id>.lock (JournalLock, fcntl.flock)
+- 여러 API 워커(uvicorn)가 같은 저널로 동시에 분석하지 않도록 api_server가 분석 실행~저널 삭제 동안 보유
+- 잠금을 가진 프로세스가 죽으면 OS가 잠금을 해제 (fcntl이 없는 플랫폼에서는 잠금 없이 진행)
+"""
+
+import os
+import re
+import json
+import time
+import glob
+import hashlib
+import threading
+from typing import Optional, Dict, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 진행 (단일 API 워커 전제)
+    fcntl = None
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ANALYSIS_JOURNAL_DIR = os.getenv("ANALYSIS_JOURNAL_DIR", os.path.join(project_root, "data", "journals"))
+
+
+def prompt_digest(system_prompt: str, user_prompt: str, max_output_tokens) -> str:
+    """구간 요청 프롬프트 식별자 (SHA-256 앞 16자리)"""
+    payload = json.dumps([system_prompt, user_prompt, max_output_tokens], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def journal_path(journal_id: str) -> str:
+    """journal_id의 저널 파일 경로 (파일명에 쓸 수 없는 문자는 '_'로 치환)"""
+    safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", journal_id)
+    return os.path.join(ANALYSIS_JOURNAL_DIR, f"{safe_id}.jsonl")
+
+
+class AnalysisJournal:
+    """분석 한 건의 구간 응답 저널 (JSONL, 스레드 안전)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str, float, str], str] = {}
+        self.resumed = 0  # 저널에서 재사용한 구간 수
+        self.recorded = 0  # 이번 실행에서 추가한 구간 수
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        needs_newline = self._load()
+        self._file = open(path, "a", encoding="utf-8")
+        if needs_newline:
+            self._file.write("\n")  # 강제 종료로 잘린 마지막 줄 뒤에 이어 쓰지 않도록
+            self._file.flush()
+
+    def _load(self) -> bool:
+        """기존 저널 로드 (잘린 줄은 무시). 파일이 줄바꿈으로 끝나지 않으면 True"""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, "r", encoding="utf-8") as f:
+            content = f.read()
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                key = self._key(entry["model_id"], entry["event"], entry["start_time"], entry["prompt"])
+                self._entries[key] = entry["response"]
+            except (ValueError, KeyError, TypeError):
+                continue
+        if self._entries:
+            print(f"[분석 저널] 기존 저널 로드: {len(self._entries)}개 구간 ({self.path})")
+        return bool(content) and not content.endswith("\n")
+
+    @staticmethod
+    def _key(model_id: str, event: Optional[str], start_time: float, prompt: str):
+        return (model_id, event or "", round(float(start_time), 3), prompt)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def lookup(self, model_id: str, event: Optional[str], start_time: float, prompt: str) -> Optional[str]:
+        """저장된 구간 응답 반환 (없으면 None)"""
+        with self._lock:
+            response = self._entries.get(self._key(model_id, event, start_time, prompt))
+            if response is not None:
+                self.resumed += 1
+            return response
+
+    def record(self, model_id: str, event: Optional[str], start_time: float, end_time: float, prompt: str,
+               overall: Optional[str], answers: dict, response: str):
+        """구간 응답 한 줄 추가 (answers: {Q번호: [answer, confidence]})"""
+        entry = {
+            "model_id": model_id,
+            "event": event or "",
+            "start_time": round(float(start_time), 3),
+            "end_time": round(float(end_time), 3),
+            "prompt": prompt,
+            "overall": overall,
+            "answers": answers,
+            "response": response,
+            "created_at": time.time(),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            key = self._key(model_id, event, start_time, prompt)
+            if key in self._entries or self._file.closed:
+                return
+            self._entries[key] = response
+            self._file.write(line)
+            self._file.flush()
+            self.recorded += 1
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class JournalLock:
+    """
+    저널 ID별 프로세스 간 배타 잠금 (<journal_id>.lock 파일의 fcntl.flock)
+    같은 저널로 분석을 실행하는 API 워커는 하나뿐이도록 보장 (다른 워커는 해제될 때까지 대기)
+    """
+
+    def __init__(self, journal_id: str):
+        self.path = os.path.splitext(journal_path(journal_id))[0] + ".lock"
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> bool:
+        """대기하지 않고 잠금 시도 (획득했거나 이미 보유 중이면 True)"""
+        if self._fd is not None or fcntl is None:
+            return True
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+            try:
+                same_file = os.fstat(fd).st_ino == os.stat(self.path).st_ino
+            except FileNotFoundError:
+                same_file = False
+            if same_file:
+                self._fd = fd
+                return True
+            os.close(fd)  # 잠그는 사이 cleanup_journals가 잠금 파일을 지움 → 새 파일로 다시 시도
+
+    def release(self):
+        if self._fd is not None:
+            os.close(self._fd)  # close 시 flock 해제
+            self._fd = None
+
+
+_journals: Dict[str, AnalysisJournal] = {}
+_journals_lock = threading.Lock()
+
+
+def get_journal(path: Optional[str]) -> Optional[AnalysisJournal]:
+    """프로세스 공용 저널 인스턴스 (path가 없거나 열기 실패 시 None → 저널 없이 진행)"""
+    if not path:
+        return None
+    with _journals_lock:
+        if path not in _journals:
+            try:
+                _journals[path] = AnalysisJournal(path)
+            except OSError as e:
+                print(f"[분석 저널] 열기 실패, 저널 없이 진행: {e}")
+                return None
+        return _journals[path]
+
+
+def close_journal(path: Optional[str]):
+    """분석이 끝난 저널 인스턴스를 닫고 레지스트리에서 제거 (파일은 유지 → 같은 경로로 다시 열면 재개)"""
+    if not path:
+        return
+    with _journals_lock:
+        journal = _journals.pop(path, None)
+    if journal is not None:
+        journal.close()
+
+
+def remove_journal(journal_id: str):
+    """완료된 분석의 저널 삭제"""
+    path = journal_path(journal_id)
+    with _journals_lock:
+        journal = _journals.pop(path, None)
+    if journal is not None:
+        journal.close()
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def cleanup_journals(cutoff_timestamp: float) -> int:
+    """마지막 기록 시각이 cutoff_timestamp보다 오래된 저널 삭제, 삭제한 파일 수 반환"""
+    deleted = 0
+    for path in glob.glob(os.path.join(ANALYSIS_JOURNAL_DIR, "*.jsonl")):
+        try:
+            if os.path.getmtime(path) < cutoff_timestamp:
+                os.remove(path)
+                deleted += 1
+        except OSError as e:
+            print(f"[분석 저널] 삭제 실패: {path} - {e}")
+    # 오래된 잠금 파일은 잠금을 얻은 상태에서만 삭제 (사용 중인 잠금은 유지)
+    for path in glob.glob(os.path.join(ANALYSIS_JOURNAL_DIR, "*.lock")):
+        try:
+            if fcntl is None or os.path.getmtime(path) >= cutoff_timestamp:
+                continue
+            fd = os.open(path, os.O_RDWR)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                os.remove(path)
+            except BlockingIOError:
+                pass
+            finally:
+                os.close(fd)
+        except OSError as e:
+            print(f"[분석 저널] 잠금 파일 삭제 실패: {path} - {e}")
+    return deleted
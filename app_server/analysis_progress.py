@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+분석 진행 이벤트 (분석 프로세스 → API 프로세스)
+분석 프로세스(워커)의 에이전트가 구간 응답을 받을 때마다 구조화된 이벤트를 보내고,
+API 프로세스가 이벤트로부터 진행률(%)과 예상 남은 시간(ETA)을 계산합니다.
+
+[분석 프로세스 측]
+- set_reporter(callback) / clear_reporter(): app_main.run_device_analysis가 분석 한 건 동안 설정
+  (callback은 결과 큐에 {"progress": event}를 넣음, 한 프로세스는 한 번에 분석 한 건만 실행)
+- report(stage, **fields): 에이전트에서 호출 (reporter가 없으면 무시 → CLI 단독 실행에는 영향 없음)
+
+[이벤트] (stage별 필드)
+- start: models (LLM 모델 수), device_type
+- video_loaded: play_time
+- search: model_id, event (기준 시점 key), position (구간 끝 시각), segments (응답 받은 구간 수), max_segments (최대 구간 수)
+- search_done: model_id, event, reference_time
+- action_qa: model_id, done, total (행동 Q 단계 구간 수)
+- analyzer_done: model_id
+- reporter: step (individual / final_report), done, total
+
+[API 측]
+- ProgressTracker: 이벤트 → (진행률, 현재 단계 문구, ETA)
+  - 비중: 비디오 로드 VIDEO_WEIGHT, 분석 에이전트 ANALYZER_WEIGHT (모델 평균), 리포트 REPORTER_WEIGHT
+  - 분석 에이전트 한 개: 기준 시점 탐색(탐색한 영상 위치 / 영상 길이) + 행동 Q 단계(응답 받은 구간 / 전체 구간)
+  - 완료 전까지 최대 99%, 진행률은 감소하지 않음
+- estimate_analysis_seconds(play_time): 분석 시작 전 예상 소요 시간
+  (완료된 분석의 영상 1초당 소요 시간 이동 평균, 없으면 ANALYSIS_SECONDS_PER_VIDEO_SECOND)
+"""
+
+import os
+import time
+import threading
+from typing import Optional, Dict, Any, Callable
+
+ANALYSIS_SECONDS_PER_VIDEO_SECOND = float(os.getenv("ANALYSIS_SECONDS_PER_VIDEO_SECOND", "6.0"))  # 초기 추정값
+ANALYSIS_DEFAULT_ESTIMATE_SECONDS = int(os.getenv("ANALYSIS_DEFAULT_ESTIMATE_SECONDS", "300"))  # 영상 길이를 모를 때
+DURATION_EMA_ALPHA = 0.3  # 영상 1초당 소요 시간 이동 평균 가중치 (최근 분석 비중)
+
+
+# ============================================
+# 분석 프로세스 측
+# ============================================
+_reporter: Optional[Callable[[Dict[str, Any]], None]] = None
+
+
+def set_reporter(callback: Optional[Callable[[Dict[str, Any]], None]]):
+    """이 프로세스의 진행 이벤트 전달 함수 설정 (None이면 해제)"""
+    global _reporter
+    _reporter = callback
+
+
+def clear_reporter():
+    set_reporter(None)
+
+
+def report(stage: str, **fields):
+    """진행 이벤트 전달 (reporter가 없거나 전달에 실패해도 분석은 계속)"""
+    reporter = _reporter
+    if reporter is None:
+        return
+    event = dict(fields, stage=stage, time=time.time())
+    try:
+        reporter(event)
+    except Exception as e:
+        print(f"[분석 진행] 이벤트 전달 실패: {e}")
+
+
+# ============================================
+# API 프로세스 측
+# ============================================
+_duration_lock = threading.Lock()
+_seconds_per_video_second = ANALYSIS_SECONDS_PER_VIDEO_SECOND
+
+
+def estimate_analysis_seconds(play_time: Optional[float]) -> int:
+    """영상 길이(초)로 분석 소요 시간 추정 (영상 길이를 모르면 ANALYSIS_DEFAULT_ESTIMATE_SECONDS)"""
+    if not play_time:
+        return ANALYSIS_DEFAULT_ESTIMATE_SECONDS
+    with _duration_lock:
+        return int(round(play_time * _seconds_per_video_second))
+
+
+def record_analysis_duration(play_time: Optional[float], seconds: float):
+    """완료된 분석의 소요 시간 반영 (이후 estimate_analysis_seconds에 사용)"""
+    global _seconds_per_video_second
+    if not play_time or seconds <= 0:
+        return
+    with _duration_lock:
+        rate = seconds / play_time
+        _seconds_per_video_second += DURATION_EMA_ALPHA * (rate - _seconds_per_video_second)
+
+
+class ProgressTracker:
+    """진행 이벤트로부터 분석 한 건의 진행률과 ETA 계산 (API 프로세스, 스레드 안전)"""
+
+    VIDEO_WEIGHT = 0.02
+    ANALYZER_WEIGHT = 0.88
+    REPORTER_WEIGHT = 0.10
+    SEARCH_SHARE = 0.6  # 분석 에이전트 안에서 기준 시점 탐색 비중 (나머지는 행동 Q 단계)
+    ETA_MIN_PROGRESS = 0.2  # 이 진행률부터는 실제 진행 속도만으로 ETA 계산 (그 전에는 초기 추정값과 혼합)
+
+    def __init__(self, num_models: int = 1, play_time: Optional[float] = None):
+        self.num_models = max(1, int(num_models))
+        self.play_time = play_time
+        self.started = time.monotonic()
+        self.estimate = estimate_analysis_seconds(play_time)
+        self.stage = "분석 초기화 중..."
+        self._lock = threading.Lock()
+        self._video_loaded = False
+        self._search = {}  # model_id -> 탐색한 영상 위치 비율 (0~1)
+        self._action_qa = {}  # model_id -> 행동 Q 단계 비율 (0~1)
+        self._reporter = 0.0
+        self._fraction = 0.0
+
+    def update(self, event: Dict[str, Any]) -> bool:
+        """이벤트 반영, 진행률(%) 또는 단계 문구가 바뀌면 True"""
+        with self._lock:
+            before = (self.progress, self.stage)
+            stage = event.get("stage")
+            model_id = event.get("model_id")
+            if stage == "start":
+                self.num_models = max(1, int(event.get("models") or self.num_models))
+            elif stage == "video_loaded":
+                self._video_loaded = True
+                if event.get("play_time"):
+                    self.play_time = float(event["play_time"])
+                    self.estimate = estimate_analysis_seconds(self.play_time)
+                self.stage = "비디오 분석 중..."
+            elif stage == "search" and model_id:
+                if self.play_time:
+                    position = min(1.0, float(event.get("position", 0)) / self.play_time)
+                else:
+                    position = min(1.0, event.get("segments", 0) / max(1, event.get("max_segments") or 1))
+                self._search[model_id] = max(self._search.get(model_id, 0.0), position)
+                self.stage = f"{event.get('event')} 탐색 중... ({float(event.get('position', 0)):.1f}초)"
+            elif stage == "search_done":
+                self.stage = f"{event.get('event')} 탐지 완료 ({event.get('reference_time')}초)"
+            elif stage == "action_qa" and model_id:
+                self._search[model_id] = 1.0
+                self._action_qa[model_id] = max(self._action_qa.get(model_id, 0.0),
+                                                event.get("done", 0) / max(1, event.get("total") or 1))
+                self.stage = f"행동 단계 분석 중... ({event.get('done', 0)}/{event.get('total', 0)}구간)"
+            elif stage == "analyzer_done" and model_id:
+                self._search[model_id] = 1.0
+                self._action_qa[model_id] = 1.0
+            elif stage == "reporter":
+                self._reporter = max(self._reporter, event.get("done", 0) / max(1, event.get("total") or 1))
+                self.stage = "리포트 생성 중..."
+            self._fraction = max(self._fraction, self._compute_fraction())
+            return (self.progress, self.stage) != before
+
+    def _compute_fraction(self) -> float:
+        analyzers = sum(
+            self.SEARCH_SHARE * self._search.get(model_id, 0.0) + (1 - self.SEARCH_SHARE) * self._action_qa.get(model_id, 0.0)
+            for model_id in set(self._search) | set(self._action_qa)
+        ) / self.num_models
+        return (self.VIDEO_WEIGHT * self._video_loaded
+                + self.ANALYZER_WEIGHT * min(1.0, analyzers)
+                + self.REPORTER_WEIGHT * self._reporter)
+
+    @property
+    def progress(self) -> int:
+        """진행률 (0~99, 완료는 api_server가 100으로 표시)"""
+        return min(99, int(self._fraction * 100))
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def eta_seconds(self) -> int:
+        """예상 남은 시간 (초): 진행 속도 기반 추정과 초기 추정값을 진행률에 따라 혼합"""
+        with self._lock:
+            fraction = self._fraction
+        elapsed = self.elapsed
+        prior = max(0.0, self.estimate - elapsed)
+        if fraction <= 0:
+            return int(round(prior))
+        measured = elapsed * (1 - fraction) / fraction
+        weight = min(1.0, fraction / self.ETA_MIN_PROGRESS)
+        return int(round(weight * measured + (1 - weight) * prior))
@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+분석 스케줄러 (api_server의 asyncio.Semaphore 대체)
+동시 실행 슬롯을 우선순위 클래스와 tenant(병원) 단위로 공정하게 배정하고,
+대기 작업의 대기 순서와 예상 시작 시각을 계산합니다.
+
+[배정 규칙]
+- 동시 실행 슬롯: api_server가 지정 (MAX_CONCURRENT_ANALYSES)
+- 우선순위 클래스: interactive (웹 UI, 기본값) / batch (일괄 분석)
+  - PRIORITY_WEIGHTS 비율의 가중 라운드 로빈 (기본 interactive 3 : batch 1)
+  - 한쪽 클래스만 대기 중이면 그 클래스가 모든 슬롯 사용, batch도 굶지 않음
+- 같은 클래스 안에서는 tenant 라운드 로빈, tenant 안에서는 FIFO
+  → 한 병원이 영상을 대량으로 올려도 다른 병원의 분석은 다음 빈 슬롯에서 시작
+
+[대기열 제한]
+- 전체 대기 ANALYSIS_QUEUE_LIMIT개, tenant당 대기 ANALYSIS_TENANT_QUEUE_LIMIT개를 넘으면 QueueFullError
+  (retry_after: 대기열에 자리가 생길 때까지의 예상 시간, api_server가 429 + Retry-After로 응답)
+
+[대기 순서 / 예상 시작 시각]
+- 배정 규칙을 대기열 복사본으로 모의 실행하여 각 대기 작업의 순서 계산
+- 실행 중인 작업의 남은 예상 시간과 앞선 대기 작업의 예상 소요 시간으로 슬롯이 비는 시각을 모의
+
+[주의]
+- 이벤트 루프 스레드에서만 호출 (submit / acquire / slot / release / update_remaining)
+- API 프로세스마다 독립적인 스케줄러 (여러 uvicorn 워커를 실행하면 워커별로 슬롯을 가짐)
+"""
+
+import os
+import math
+import time
+import heapq
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, Tuple, Callable
+
+ANALYSIS_QUEUE_LIMIT = int(os.getenv("ANALYSIS_QUEUE_LIMIT", "50"))
+ANALYSIS_TENANT_QUEUE_LIMIT = int(os.getenv("ANALYSIS_TENANT_QUEUE_LIMIT", "10"))
+PRIORITY_WEIGHTS = {"interactive": 3, "batch": 1}  # 우선순위 클래스별 배정 비율
+DEFAULT_PRIORITY = "interactive"
+
+
+class QueueFullError(RuntimeError):
+    """대기열이 가득 참 (retry_after: 다시 시도할 때까지 기다릴 시간, 초)"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AnalysisScheduler:
+    """우선순위 클래스 가중 라운드 로빈 + tenant 공정 대기열"""
+
+    def __init__(self, slots: int, queue_limit: int = ANALYSIS_QUEUE_LIMIT,
+                 tenant_queue_limit: int = ANALYSIS_TENANT_QUEUE_LIMIT,
+                 priority_weights: Optional[Dict[str, int]] = None,
+                 on_change: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            slots: 동시 실행 슬롯 수
+            queue_limit: 전체 대기 작업 상한
+            tenant_queue_limit: tenant당 대기 작업 상한
+            priority_weights: 우선순위 클래스별 배정 비율 (기본값: PRIORITY_WEIGHTS)
+            on_change: 대기열/실행 목록이 바뀔 때 호출 (대기 순서 게시용)
+        """
+        self.slots = max(1, int(slots))
+        self.queue_limit = max(1, int(queue_limit))
+        self.tenant_queue_limit = max(1, int(tenant_queue_limit))
+        weights = priority_weights or PRIORITY_WEIGHTS
+        self.priorities = tuple(weights)
+        # 가중 라운드 로빈 순서 (예: interactive, interactive, interactive, batch)
+        self._cycle = [priority for priority, weight in weights.items() for _ in range(max(1, int(weight)))]
+        self._cycle_pos = 0
+        self._queues: Dict[str, "OrderedDict[str, deque]"] = {priority: OrderedDict() for priority in self.priorities}
+        self._queued: Dict[str, Dict[str, Any]] = {}  # analysis_id -> 대기 작업
+        self._running: Dict[str, Dict[str, Any]] = {}  # analysis_id -> 실행 중인 작업 (expected_end 포함)
+        self._waiters: Dict[str, asyncio.Future] = {}
+        self.on_change = on_change
+        self.started_total = 0
+
+    # ----------------------------------------
+    # 대기열
+    # ----------------------------------------
+    def submit(self, analysis_id: str, tenant: str, priority: str = DEFAULT_PRIORITY, estimated_seconds: float = 0):
+        """
+        분석을 대기열에 추가 (빈 슬롯이 있으면 바로 배정, 실행은 acquire로 대기)
+
+        Raises:
+            ValueError: 알 수 없는 우선순위 클래스
+            QueueFullError: 전체 또는 tenant 대기열이 가득 참
+        """
+        if priority not in self._queues:
+            raise ValueError(f"알 수 없는 우선순위: {priority} (허용: {', '.join(self.priorities)})")
+        if len(self._running) >= self.slots:
+            # 빈 슬롯이 없을 때만 대기열 상한 적용 (바로 실행되는 요청은 대기열을 차지하지 않음)
+            if len(self._queued) >= self.queue_limit:
+                raise QueueFullError(
+                    f"분석 대기열이 가득 찼습니다 ({len(self._queued)}/{self.queue_limit}개).",
+                    self._retry_after(None)
+                )
+            tenant_queued = sum(1 for job in self._queued.values() if job["tenant"] == tenant)
+            if tenant_queued >= self.tenant_queue_limit:
+                raise QueueFullError(
+                    f"이 기관의 분석 대기 건수가 한도에 도달했습니다 ({tenant_queued}/{self.tenant_queue_limit}개).",
+                    self._retry_after(tenant)
+                )
+
+        job = {
+            "analysis_id": analysis_id,
+            "tenant": tenant,
+            "priority": priority,
+            "estimated_seconds": max(0.0, float(estimated_seconds or 0)),
+            "submitted_at": time.time(),
+        }
+        self._queued[analysis_id] = job
+        self._queues[priority].setdefault(tenant, deque()).append(job)
+        self._waiters[analysis_id] = asyncio.get_running_loop().create_future()
+        self._dispatch()
+        self._changed()
+
+    async def acquire(self, analysis_id: str):
+        """submit한 분석의 슬롯이 배정될 때까지 대기 (취소되면 대기열에서 제거)"""
+        waiter = self._waiters[analysis_id]
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            self.release(analysis_id)
+            raise
+        finally:
+            self._waiters.pop(analysis_id, None)
+
+    @asynccontextmanager
+    async def slot(self, analysis_id: str):
+        """async with scheduler.slot(analysis_id): 슬롯 배정 대기 → 실행 → 슬롯 반환"""
+        await self.acquire(analysis_id)
+        try:
+            yield
+        finally:
+            self.release(analysis_id)
+
+    def release(self, analysis_id: str):
+        """실행이 끝난 분석의 슬롯 반환 (대기 중이면 대기열에서 제거)"""
+        job = self._queued.pop(analysis_id, None)
+        if job is not None:
+            tenant_queue = self._queues[job["priority"]].get(job["tenant"])
+            if tenant_queue is not None:
+                tenant_queue.remove(job)
+                if not tenant_queue:
+                    del self._queues[job["priority"]][job["tenant"]]
+            waiter = self._waiters.pop(analysis_id, None)
+            if waiter is not None and not waiter.done():
+                waiter.cancel()
+        elif self._running.pop(analysis_id, None) is None:
+            return
+        else:
+            self._waiters.pop(analysis_id, None)  # 배정되었지만 acquire하지 않은 경우 (결과 공유로 실행하지 않음)
+        self._dispatch()
+        self._changed()
+
+    def update_remaining(self, analysis_id: str, remaining_seconds: float):
+        """실행 중인 분석의 남은 예상 시간 갱신 (대기 작업의 예상 시작 시각 계산에 사용)"""
+        job = self._running.get(analysis_id)
+        if job is not None:
+            job["expected_end"] = time.time() + max(0.0, float(remaining_seconds))
+
+    def cancel_all(self):
+        """대기 중인 모든 분석 취소 (서버 종료 시)"""
+        for analysis_id in list(self._queued):
+            self.release(analysis_id)
+
+    # ----------------------------------------
+    # 배정
+    # ----------------------------------------
+    def _pick(self, queues: Dict[str, "OrderedDict[str, deque]"], cycle_pos: int) -> Tuple[Optional[Dict[str, Any]], int]:
+        """
+        다음에 실행할 대기 작업 선택 (queues에서 제거) → (작업, 다음 cycle_pos)
+        실제 배정과 대기 순서 모의 실행이 같은 규칙을 사용
+        """
+        waiting = [priority for priority in self.priorities if queues[priority]]
+        if not waiting:
+            return None, cycle_pos
+        if len(waiting) == 1:
+            # 한 클래스만 대기 중이면 가중치 순서를 소비하지 않음 (다른 클래스가 들어오면 그때부터 비율 적용)
+            priority = waiting[0]
+        else:
+            for offset in range(len(self._cycle)):
+                priority = self._cycle[(cycle_pos + offset) % len(self._cycle)]
+                if queues[priority]:
+                    cycle_pos = (cycle_pos + offset + 1) % len(self._cycle)
+                    break
+        # 클래스 안에서 tenant 라운드 로빈: 맨 앞 tenant의 첫 작업 → 남은 작업이 있으면 맨 뒤로
+        tenants = queues[priority]
+        tenant, tenant_queue = next(iter(tenants.items()))
+        job = tenant_queue.popleft()
+        del tenants[tenant]
+        if tenant_queue:
+            tenants[tenant] = tenant_queue
+        return job, cycle_pos
+
+    def _dispatch(self):
+        """빈 슬롯에 대기 작업 배정"""
+        while len(self._running) < self.slots and self._queued:
+            job, self._cycle_pos = self._pick(self._queues, self._cycle_pos)
+            if job is None:
+                break
+            del self._queued[job["analysis_id"]]
+            now = time.time()
+            job["started_at"] = now
+            job["expected_end"] = now + job["estimated_seconds"]
+            self._running[job["analysis_id"]] = job
+            self.started_total += 1
+            waiter = self._waiters.get(job["analysis_id"])
+            if waiter is not None and not waiter.done():
+                waiter.set_result(None)
+
+    def _changed(self):
+        if self.on_change is not None:
+            try:
+                self.on_change()
+            except Exception as e:
+                print(f"[분석 스케줄러] 대기 순서 게시 실패: {e}")
+
+    # ----------------------------------------
+    # 대기 순서 / 예상 시작 시각
+    # ----------------------------------------
+    def queue_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        대기 작업별 대기 순서와 예상 시작 시각
+        {analysis_id: {"position": 1부터, "estimated_start_at": epoch 초}}
+        """
+        if not self._queued:
+            return {}
+        now = time.time()
+        queues = {
+            priority: OrderedDict((tenant, deque(jobs)) for tenant, jobs in tenants.items())
+            for priority, tenants in self._queues.items()
+        }
+        # 슬롯이 비는 시각 (실행 중인 작업의 예상 종료 시각, 남은 슬롯은 지금)
+        free_at = [max(now, job["expected_end"]) for job in self._running.values()]
+        free_at += [now] * max(0, self.slots - len(free_at))
+        heapq.heapify(free_at)
+
+        snapshot = {}
+        cycle_pos = self._cycle_pos
+        position = 0
+        while True:
+            job, cycle_pos = self._pick(queues, cycle_pos)
+            if job is None:
+                break
+            position += 1
+            start_at = heapq.heappop(free_at)
+            snapshot[job["analysis_id"]] = {"position": position, "estimated_start_at": start_at}
+            heapq.heappush(free_at, start_at + job["estimated_seconds"])
+        return snapshot
+
+    def _retry_after(self, tenant: Optional[str]) -> int:
+        """대기열(tenant 지정 시 그 tenant의 대기열)에서 첫 작업이 시작될 때까지의 예상 시간 (초, 최소 1)"""
+        snapshot = self.queue_snapshot()
+        starts = [
+            entry["estimated_start_at"] for analysis_id, entry in snapshot.items()
+            if tenant is None or self._queued[analysis_id]["tenant"] == tenant
+        ]
+        if not starts:
+            return 1
+        return max(1, int(math.ceil(min(starts) - time.time())))
+
+    def stats(self) -> Dict[str, Any]:
+        queued_by_priority = {priority: 0 for priority in self.priorities}
+        for job in self._queued.values():
+            queued_by_priority[job["priority"]] += 1
+        return {
+            "slots": self.slots,
+            "running": len(self._running),
+            "queued": len(self._queued),
+            "queuedByPriority": queued_by_priority,
+            "queuedTenants": len({job["tenant"] for job in self._queued.values()}),
+            "queueLimit": self.queue_limit,
+            "tenantQueueLimit": self.tenant_queue_limit,
+            "startedTotal": self.started_total,
+        }
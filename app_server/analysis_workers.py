@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+분석 워커 풀 (디바이스 패키지를 미리 로드한 장기 실행 워커 프로세스)
+분석마다 새 프로세스를 만들고 langgraph/openai/google-genai/plotly/cv2 및 디바이스 패키지를
+처음부터 import하는 대신, 워커 프로세스가 시작할 때 한 번만 로드해 두고 분석 요청을 큐로 받아 실행합니다.
+
+[워커 시작]
+- 6개 app_* 디바이스 패키지를 고유 모듈 이름(app_<device_type>.agents.*, app_<device_type>.graph_workflow)으로 미리 로드
+- 디바이스마다 워크플로우를 미리 컴파일하여 (device_type, 모델 리스트)별로 캐시 (app_main.warm_up_workflows)
+
+[분석 실행]
+- 워커마다 전용 task/result 큐를 두고, 유휴 워커 하나에 분석 한 건을 배정 (모두 사용 중이면 대기)
+- 분석 중 진행 이벤트({"progress": event})도 result 큐로 전달 → run(on_progress=...)로 호출자에게 전달
+- 프로세스 격리 유지: 분석 중 워커가 죽거나 timeout을 넘기면 해당 워커만 종료하고 새 워커로 교체
+- ANALYSIS_WORKER_MAX_JOBS건 처리한 워커는 스스로 종료하고 새 워커로 교체 (메모리 누수 방지)
+
+[설정]
+- ANALYSIS_WORKER_MAX_JOBS: 워커 교체 주기 (기본값: 20건)
+- 워커 수는 api_server가 지정 (ANALYSIS_WORKERS, 기본값: 동시 분석 제한 수)
+"""
+
+import os
+import sys
+import time
+import threading
+import traceback
+import multiprocessing
+import queue as queue_module
+from typing import Optional, Dict, Any, List, Callable
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+ANALYSIS_WORKER_MAX_JOBS = int(os.getenv("ANALYSIS_WORKER_MAX_JOBS", "20"))
+WORKER_POLL_INTERVAL = 1.0  # 결과 대기 중 워커 생존 확인 주기 (초)
+WORKER_STOP_TIMEOUT = 10  # 종료 요청 후 대기 시간 (초), 넘기면 강제 종료
+
+
+def _worker_main(task_queue, result_queue, device_types: List[str], warmup_models: Optional[List[str]], max_jobs: int):
+    """
+    워커 프로세스 본체: 디바이스 패키지를 미리 로드한 뒤 task_queue의 분석 요청을 차례로 실행
+    (None을 받거나 max_jobs건을 처리하면 종료)
+    """
+    from app_server import app_main
+
+    started = time.time()
+    app_main.preload_device_packages(device_types)
+    if warmup_models:
+        app_main.warm_up_workflows(warmup_models)
+    print(f"[분석 워커] 준비 완료 (PID: {os.getpid()}, {time.time() - started:.1f}초)")
+
+    jobs = 0
+    while jobs < max_jobs:
+        kwargs = task_queue.get()
+        if kwargs is None:
+            break
+        try:
+            result = app_main.run_device_analysis(
+                **kwargs, progress_callback=lambda event: result_queue.put({"progress": event})
+            )
+            result_queue.put({
+                "success": True,
+                "result": result
+            })
+        except Exception as e:
+            result_queue.put({
+                "success": False,
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            })
+        jobs += 1
+    print(f"[분석 워커] {jobs}건 처리 후 종료 (PID: {os.getpid()})")
+
+
+class _AnalysisWorker:
+    """워커 프로세스 하나와 전용 task/result 큐"""
+
+    def __init__(self, ctx, device_types: List[str], warmup_models: Optional[List[str]], max_jobs: int):
+        self.task_queue = ctx.Queue()
+        self.result_queue = ctx.Queue()
+        self.max_jobs = max_jobs
+        self.jobs = 0
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(self.task_queue, self.result_queue, device_types, warmup_models, max_jobs),
+            name="AnalysisWorker"
+        )
+        self.process.start()
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    @property
+    def exhausted(self) -> bool:
+        return self.jobs >= self.max_jobs
+
+    def stop(self, kill: bool = False):
+        """워커 종료 (kill=True면 즉시 종료, 아니면 종료 요청 후 대기)"""
+        if not kill and self.process.is_alive():
+            try:
+                self.task_queue.put(None)
+            except (OSError, ValueError):
+                pass
+            self.process.join(timeout=WORKER_STOP_TIMEOUT)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=10)
+            if self.process.is_alive():
+                print(f"[분석 워커] terminate 실패, kill 시도 (PID: {self.pid})")
+                self.process.kill()
+                self.process.join(timeout=5)
+        for q in (self.task_queue, self.result_queue):
+            q.cancel_join_thread()
+            q.close()
+
+
+class AnalysisWorkerPool:
+    """디바이스 패키지를 미리 로드한 분석 워커 프로세스 풀 (스레드 안전)"""
+
+    def __init__(self, num_workers: int, device_types: Optional[List[str]] = None, warmup_models: Optional[List[str]] = None,
+                 max_jobs: int = ANALYSIS_WORKER_MAX_JOBS, start_method: str = "spawn"):
+        """
+        Args:
+            num_workers: 워커 프로세스 수
+            device_types: 미리 로드할 디바이스 타입 (기본값: app_main.DEVICE_TYPES 전체)
+            warmup_models: 워크플로우 워밍업에 사용할 LLM 모델 리스트 (None이면 워밍업 생략)
+            max_jobs: 워커 교체 주기 (처리 건수)
+            start_method: multiprocessing 시작 방식 (기본값: spawn, 서버 프로세스의 스레드/상태를 물려받지 않도록)
+        """
+        if device_types is None:
+            from app_server.app_main import DEVICE_TYPES
+            device_types = list(DEVICE_TYPES)
+        self.num_workers = max(1, int(num_workers))
+        self.device_types = list(device_types)
+        self.warmup_models = list(warmup_models) if warmup_models else None
+        self.max_jobs = max(1, int(max_jobs))
+        self._ctx = multiprocessing.get_context(start_method)
+        self._lock = threading.Lock()
+        self._idle: "queue_module.Queue[_AnalysisWorker]" = queue_module.Queue()
+        self._workers = set()
+        self._closed = False
+        self.jobs_completed = 0
+        self.workers_recycled = 0
+        for _ in range(self.num_workers):
+            self._idle.put(self._spawn())
+        print(f"[분석 워커 풀] 워커 {self.num_workers}개 시작 (디바이스 {len(self.device_types)}종 미리 로드, {self.max_jobs}건마다 교체)")
+
+    def _spawn(self) -> _AnalysisWorker:
+        worker = _AnalysisWorker(self._ctx, self.device_types, self.warmup_models, self.max_jobs)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _replace(self, worker: _AnalysisWorker, kill: bool = False):
+        """워커를 종료하고 새 워커를 유휴 큐에 추가 (풀이 닫혔으면 추가하지 않음)"""
+        with self._lock:
+            self._workers.discard(worker)
+            self.workers_recycled += 1
+            closed = self._closed
+        worker.stop(kill=kill)
+        if not closed:
+            self._idle.put(self._spawn())
+
+    def run(self, timeout: float, on_progress: Optional[Callable[[Dict[str, Any]], None]] = None, **kwargs) -> Dict[str, Any]:
+        """
+        유휴 워커에서 app_main.run_device_analysis(**kwargs) 실행 (블로킹, run_in_executor에서 호출)
+        on_progress: 분석 진행 이벤트를 받을 함수 (이 스레드에서 호출)
+
+        Returns:
+            {"success": True, "result": ...} 또는 {"success": False, "error": ..., "traceback": ...}
+            워커가 결과 없이 종료되면 {"success": False, "error": "...비정상 종료..."}
+
+        Raises:
+            TimeoutError: timeout 초 안에 결과를 받지 못한 경우 (워커는 강제 종료 후 교체)
+            RuntimeError: 풀이 이미 종료된 경우
+        """
+        if self._closed:
+            raise RuntimeError("분석 워커 풀이 종료되었습니다.")
+        worker = self._idle.get()  # 모든 워커가 사용 중이면 반환될 때까지 대기
+        worker.jobs += 1
+        worker.task_queue.put(kwargs)
+        print(f"[분석 워커 풀] 분석 배정 (device_type: {kwargs.get('device_type')}, 워커 PID: {worker.pid}, "
+              f"{worker.jobs}/{self.max_jobs}건째)")
+
+        # 워커가 결과를 put한 뒤 종료할 수 있으므로 결과를 먼저 읽고 생존 여부는 큐가 비었을 때만 확인
+        deadline = time.monotonic() + timeout
+        queue_result = None
+        try:
+            while queue_result is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    print(f"[분석 워커 풀] 타임아웃 ({timeout}s) - 워커 강제 종료 후 교체 (PID: {worker.pid})")
+                    self._replace(worker, kill=True)
+                    raise TimeoutError(f"분석 시간 초과 ({timeout}초). 분석 워커가 강제 종료되었습니다.")
+                try:
+                    message = worker.result_queue.get(timeout=min(WORKER_POLL_INTERVAL, remaining))
+                except queue_module.Empty:
+                    if worker.process.is_alive():
+                        continue
+                    try:
+                        message = worker.result_queue.get(timeout=WORKER_POLL_INTERVAL)
+                    except queue_module.Empty:
+                        exitcode = worker.process.exitcode
+                        print(f"[분석 워커 풀] 워커 비정상 종료 (PID: {worker.pid}, exit_code: {exitcode})")
+                        self._replace(worker, kill=True)
+                        return {
+                            "success": False,
+                            "error": f"분석 워커가 비정상 종료됨 (exit_code: {exitcode})"
+                        }
+                if "progress" in message:
+                    if on_progress is not None:
+                        on_progress(message["progress"])
+                    continue
+                queue_result = message
+        except BaseException:
+            if worker.process.is_alive() and queue_result is None:
+                # 결과 수신 중 예외 (워커 상태를 알 수 없으므로 교체)
+                self._replace(worker, kill=True)
+            raise
+
+        with self._lock:
+            self.jobs_completed += 1
+        if worker.exhausted:
+            # max_jobs건을 처리한 워커는 스스로 종료 → 새 워커로 교체 (다음 분석 전에 미리 로드 시작)
+            self._replace(worker)
+        else:
+            self._idle.put(worker)
+        return queue_result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": len(self._workers),
+                "idle": self._idle.qsize(),
+                "jobs_completed": self.jobs_completed,
+                "workers_recycled": self.workers_recycled,
+                "max_jobs": self.max_jobs,
+            }
+
+    def shutdown(self):
+        """모든 워커 종료 (진행 중인 분석 워커도 강제 종료)"""
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+            self._workers.clear()
+        idle = set()
+        while True:
+            try:
+                idle.add(self._idle.get_nowait())
+            except queue_module.Empty:
+                break
+        for worker in workers:
+            worker.stop(kill=worker not in idle)
+        print(f"[분석 워커 풀] 종료 (워커 {len(workers)}개)")
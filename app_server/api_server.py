@@ -17,8 +17,11 @@ import os
 import sys
 import uuid
 import asyncio
+import json
+import hashlib
+import functools
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Set
 from datetime import datetime, timedelta
 import shutil
 import multiprocessing
@@ -28,11 +31,11 @@ import traceback
 import threading
 import time
 import signal
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 # 프로젝트 루트 경로 추가
@@ -144,6 +147,9 @@ MAX_CONCURRENT_ANALYSES = 5
 # 프로세스 타임아웃 (초)
 PROCESS_TIMEOUT = 7200  # 2시간 (1시간 이상 영상 분석 지원, LLM API timeout + 에러 재시도 + 백오프 대기 포함)
 
+# 분석 워커 풀 (디바이스 패키지를 미리 로드한 장기 실행 워커 프로세스 수, 0이면 분석마다 새 프로세스 생성)
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", str(MAX_CONCURRENT_ANALYSES)))
+
 # 파일 업로드 제한
 MAX_FILE_SIZE = 2 * 1024 * 1024 * 1024  # 2GB
 ALLOWED_EXTENSIONS = {'.mp4', '.mov', '.avi', '.mkv'}
@@ -151,9 +157,20 @@ ALLOWED_EXTENSIONS = {'.mp4', '.mov', '.avi', '.mkv'}
 # 파일 정리 스케줄러 설정
 CLEANUP_OLD_FILES_DURATION = 48  # 48 hours (대용량 파일 보관 기간 연장)
 
-# 분석 결과 보관 시간 (완료/에러 상태)
+# 분석 진행 상황 SSE 스트림 (/api/analysis/events/{id})
+SSE_STORE_CHECK_INTERVAL = 1.0  # 작업 저장소 변경 확인 주기 (초, 다른 API 워커가 실행 중인 작업용)
+SSE_KEEPALIVE_INTERVAL = 15  # 변경이 없을 때 keepalive 주석 전송 주기 (초, 프록시 유휴 연결 종료 방지)
+
+# 분석 진행률 저장 주기 (초, 분석 프로세스의 진행 이벤트는 이 간격 또는 진행률(%)이 바뀔 때만 작업 저장소에 반영)
+PROGRESS_STORE_INTERVAL = 1.0
+
+# 분석 결과 보관 시간 (완료/에러 상태, JOB_STORE_BACKEND=memory일 때)
+# SQLite 작업 저장소(기본값)는 job_store.JOB_RETENTION_HOURS 동안 보관
 ANALYSIS_STORAGE_TTL_HOURS = 2
 
+# 다른 API 워커가 같은 저널로 실행 중인 분석의 종료 확인 주기 (초, analysis_journal.JournalLock)
+JOURNAL_LOCK_POLL_INTERVAL = 2.0
+
 # ============================================
 # FastAPI 앱 초기화
 # ============================================
@@ -168,6 +185,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],  # status 조회 조건부 요청 (If-None-Match)
 )
 
 # ============================================
@@ -195,8 +213,62 @@ app.add_middleware(NoCacheMiddleware)
 # ============================================
 # 전역 상태 관리
 # ============================================
-# 분석 작업 저장소 (실제 운영에서는 DB 사용 권장)
-analysis_storage: Dict[str, Dict[str, Any]] = {}
+# 분석 작업 저장소 (JOB_STORE_BACKEND: sqlite(기본값, WAL, 여러 API 워커 공유/재시작 후 유지) | memory)
+job_store = None
+job_store_lock = threading.Lock()
+
+def get_job_store():
+    """작업 저장소를 lazy 초기화하여 반환"""
+    global job_store
+    with job_store_lock:
+        if job_store is None:
+            from app_server.job_store import create_job_store
+            job_store = create_job_store()
+    return job_store
+
+# SSE 구독자 알림 (analysis_id -> 스트림별 asyncio.Event, 이벤트 루프 스레드에서만 접근)
+# 같은 프로세스의 작업 변경은 즉시 전송하고, 다른 API 워커의 변경은 SSE_STORE_CHECK_INTERVAL마다 확인
+job_update_events: Dict[str, Set[asyncio.Event]] = {}
+
+def notify_job_update(analysis_id: str):
+    """analysis_id 스트림 구독자 깨우기"""
+    for event in job_update_events.get(analysis_id, ()):
+        event.set()
+
+# 작업 저장소 I/O 스레드 (SQLite 연결/잠금 대기가 이벤트 루프를 막지 않도록)
+# - 쓰기: 단일 스레드에서 요청 순서대로 실행 (대기 순서 게시와 상태 변경 순서가 뒤바뀌지 않도록)
+# - 읽기: asyncio 기본 스레드 풀
+job_store_write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job_store")
+
+async def read_job_store(func, *args, **kwargs):
+    """작업 저장소 조회 함수를 이벤트 루프 밖에서 실행"""
+    return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+async def write_job_store(func, *args, **kwargs):
+    """작업 저장소 쓰기 함수를 쓰기 스레드에서 실행 (요청 순서 유지)"""
+    return await asyncio.get_running_loop().run_in_executor(job_store_write_executor, functools.partial(func, *args, **kwargs))
+
+async def update_job(analysis_id: str, **fields):
+    """작업 필드 갱신 후 SSE 구독자 알림"""
+    await write_job_store(get_job_store().update, analysis_id, **fields)
+    notify_job_update(analysis_id)
+
+async def append_job_log(analysis_id: str, message: str):
+    """작업 로그 추가 후 SSE 구독자 알림"""
+    await write_job_store(get_job_store().append_log, analysis_id, message)
+    notify_job_update(analysis_id)
+
+def schedule_job_update(analysis_id: str, **fields):
+    """작업 필드 갱신 예약 (이벤트 루프의 동기 콜백용, 완료 후 SSE 구독자 알림)"""
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(job_store_write_executor, functools.partial(get_job_store().update, analysis_id, **fields))
+
+    def done(f):
+        if not f.cancelled() and f.exception() is not None:
+            print(f"[작업 저장소] 갱신 실패: {analysis_id} - {f.exception()}")
+        notify_job_update(analysis_id)
+
+    future.add_done_callback(done)
 
 # 업로드된 비디오 저장 디렉토리
 UPLOAD_DIR = Path(project_root) / "uploads"
@@ -209,22 +281,88 @@ analysis_executor = ThreadPoolExecutor(
     thread_name_prefix="analysis"
 )
 
-# 동시 분석 제한을 위한 Semaphore
-analysis_semaphore: Optional[asyncio.Semaphore] = None
+# 업로드 ingest 전용 프로세스 풀 (메타데이터/썸네일/프레임 저장소 생성, CPU 작업을 이벤트 루프 밖에서 실행)
+INGEST_MAX_WORKERS = 2
+ingest_executor: Optional[ProcessPoolExecutor] = None
 
-def get_analysis_semaphore() -> asyncio.Semaphore:
+def get_ingest_executor() -> ProcessPoolExecutor:
     """
-    asyncio Semaphore를 lazy 초기화하여 반환
-    (이벤트 루프가 실행 중일 때만 생성 가능)
+    ingest 프로세스 풀을 lazy 초기화하여 반환
+    (spawn 방식으로 생성하여 분석 프로세스와 동일하게 격리)
     """
-    global analysis_semaphore
-    if analysis_semaphore is None:
-        analysis_semaphore = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
-    return analysis_semaphore
+    global ingest_executor
+    if ingest_executor is None:
+        ingest_executor = ProcessPoolExecutor(
+            max_workers=INGEST_MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return ingest_executor
+
+# 분석 워커 풀 (디바이스 패키지/워크플로우를 미리 로드한 워커 프로세스, 분석을 큐로 배정)
+analysis_worker_pool = None
+analysis_worker_pool_lock = threading.Lock()
 
-# 현재 진행 중인 분석 수 추적
-current_analysis_count = 0
-analysis_count_lock = threading.Lock()
+def get_analysis_worker_pool():
+    """
+    분석 워커 풀을 lazy 초기화하여 반환 (ANALYSIS_WORKERS가 0이면 None)
+    서버 시작 시 미리 생성하여 첫 분석 전에 워커가 디바이스 패키지를 로드해 두도록 함
+    """
+    global analysis_worker_pool
+    if ANALYSIS_WORKERS <= 0:
+        return None
+    with analysis_worker_pool_lock:
+        if analysis_worker_pool is None:
+            from app_server.analysis_workers import AnalysisWorkerPool
+            analysis_worker_pool = AnalysisWorkerPool(
+                num_workers=ANALYSIS_WORKERS,
+                warmup_models=FIXED_LLM_MODELS
+            )
+    return analysis_worker_pool
+
+# 분석 결과 영구 저장소 (업로드 해시 인덱스 + 중복 분석 방지)
+result_store = None
+
+def get_result_store():
+    """ResultStore를 lazy 초기화하여 반환"""
+    global result_store
+    if result_store is None:
+        from app_server.result_store import ResultStore
+        result_store = ResultStore()
+    return result_store
+
+# 동시 분석 스케줄러 (우선순위 클래스/기관별 공정 대기열, 이벤트 루프 스레드에서만 접근)
+analysis_scheduler = None
+
+def get_analysis_scheduler():
+    """AnalysisScheduler를 lazy 초기화하여 반환"""
+    global analysis_scheduler
+    if analysis_scheduler is None:
+        from app_server.analysis_scheduler import AnalysisScheduler
+        analysis_scheduler = AnalysisScheduler(MAX_CONCURRENT_ANALYSES, on_change=publish_queue_positions)
+    return analysis_scheduler
+
+# 작업 저장소에 마지막으로 저장한 대기 순서 (analysis_id -> (대기 순서, 예상 시작 시각))
+published_queue_positions: Dict[str, tuple] = {}
+
+def publish_queue_positions():
+    """대기열이 바뀌면 대기 작업의 대기 순서/예상 시작 시각을 작업 저장소에 저장하고 SSE 구독자 알림 (바뀐 작업만)"""
+    snapshot = get_analysis_scheduler().queue_snapshot()
+    for analysis_id in list(published_queue_positions):
+        if analysis_id not in snapshot:
+            del published_queue_positions[analysis_id]
+    for analysis_id, entry in snapshot.items():
+        position, start_at = entry["position"], round(entry["estimated_start_at"])
+        previous = published_queue_positions.get(analysis_id)
+        # 예상 시작 시각은 몇 초 단위로 흔들리므로 대기 순서가 같고 5초 이내 차이면 저장 생략
+        if previous is not None and previous[0] == position and abs(previous[1] - start_at) < 5:
+            continue
+        published_queue_positions[analysis_id] = (position, start_at)
+        schedule_job_update(
+            analysis_id,
+            queue_position=position,
+            estimated_start_at=start_at,
+            current_stage=f"대기 중... (대기 순서 {position}번째)"
+        )
 
 # ============================================
 # Pydantic 모델
@@ -234,14 +372,20 @@ class StartAnalysisRequest(BaseModel):
     deviceType: str  # 프론트엔드와 일치
     # llmModels는 제거됨 (항상 FIXED_LLM_MODELS 사용)
     saveIndividualReport: bool = False
+    clinicId: Optional[str] = None  # 공정 대기열 단위 (없으면 요청 IP)
+    priority: str = "interactive"  # 'interactive' (웹 UI) | 'batch' (일괄 분석)
 
 
 class AnalysisStatusResponse(BaseModel):
     status: str  # 'pending' | 'processing' | 'completed' | 'error'
     progress: int  # 0-100
     current_stage: str
-    logs: List[str]
+    logs: List[str]  # since 커서 이후의 로그 (since가 없으면 전체)
     error: Optional[str] = None
+    cursor: int = 0  # 마지막 로그 커서 (다음 조회 시 ?since=cursor로 전달)
+    eta_seconds: Optional[int] = None  # 예상 남은 시간 (초, 분석 진행 이벤트 기반, 대기 중이면 대기 시간 포함)
+    queue_position: Optional[int] = None  # 대기 순서 (1부터, 대기 중일 때만)
+    estimated_start_seconds: Optional[int] = None  # 분석 시작까지 예상 대기 시간 (초, 대기 중일 때만)
 
 
 # ============================================
@@ -377,7 +521,8 @@ def convert_backend_report_to_frontend(report: Dict[str, Any], final_state: Dict
 # ============================================
 # 프로세스 격리 기반 분석 실행 함수
 # ============================================
-def _run_analysis_in_process(result_queue: Queue, device_type: str, video_path: str, llm_models: List[str], save_individual_report: bool):
+def _run_analysis_in_process(result_queue: Queue, device_type: str, video_path: str, llm_models: List[str], save_individual_report: bool, video_info: Optional[Dict[str, Any]] = None,
+                             journal_id: Optional[str] = None):
     """
     별도 프로세스에서 분석을 실행하는 함수
 
@@ -387,11 +532,13 @@ def _run_analysis_in_process(result_queue: Queue, device_type: str, video_path:
     - 메모리 격리로 상태 오염 방지
 
     Args:
-        result_queue: 결과 전달용 큐
+        result_queue: 결과 전달용 큐 (분석 중 진행 이벤트 {"progress": event}도 같은 큐로 전달)
         device_type: 디바이스 타입
         video_path: 비디오 파일 경로
         llm_models: LLM 모델 리스트
         save_individual_report: 개별 리포트 저장 여부
+        video_info: 업로드 ingest에서 미리 계산된 비디오 메타데이터 (없으면 분석 중 탐색)
+        journal_id: 분석 체크포인트 저널 ID (같은 ID로 다시 실행하면 기록된 구간부터 재개)
     """
     try:
         # 프로세스 내에서 app_main import (격리된 환경)
@@ -401,7 +548,10 @@ def _run_analysis_in_process(result_queue: Queue, device_type: str, video_path:
             device_type=device_type,
             video_path=video_path,
             llm_models=llm_models,
-            save_individual_report=save_individual_report
+            save_individual_report=save_individual_report,
+            video_info=video_info,
+            journal_id=journal_id,
+            progress_callback=lambda event: result_queue.put({"progress": event})
         )
 
         # 결과를 큐에 전달
@@ -418,7 +568,8 @@ def _run_analysis_in_process(result_queue: Queue, device_type: str, video_path:
         })
 
 
-def _run_analysis_with_process_isolation(device_type: str, video_path: str, llm_models: List[str], save_individual_report: bool) -> Dict[str, Any]:
+def _run_analysis_with_process_isolation(device_type: str, video_path: str, llm_models: List[str], save_individual_report: bool, video_info: Optional[Dict[str, Any]] = None,
+                                         journal_id: Optional[str] = None, on_progress=None) -> Dict[str, Any]:
     """
     multiprocessing을 사용하여 프로세스 격리된 환경에서 분석 실행
 
@@ -441,17 +592,26 @@ def _run_analysis_with_process_isolation(device_type: str, video_path: str, llm_
         video_path: 비디오 파일 경로
         llm_models: LLM 모델 리스트
         save_individual_report: 개별 리포트 저장 여부
+        video_info: 업로드 ingest에서 미리 계산된 비디오 메타데이터
+        journal_id: 분석 체크포인트 저널 ID
+        on_progress: 분석 프로세스의 진행 이벤트를 받을 함수 (이 스레드에서 호출)
 
     Returns:
         분석 결과 딕셔너리
     """
+    # 분석 워커 풀이 있으면 미리 로드된 워커에서 실행 (프로세스 생성/모듈 로드 비용 없음)
+    worker_pool = get_analysis_worker_pool()
+    if worker_pool is not None:
+        return _run_analysis_in_worker_pool(worker_pool, device_type, video_path, llm_models, save_individual_report, video_info, journal_id,
+                                            on_progress)
+
     # 결과 전달용 큐 생성
     result_queue = Queue()
 
     # 별도 프로세스에서 분석 실행
     process = Process(
         target=_run_analysis_in_process,
-        args=(result_queue, device_type, video_path, llm_models, save_individual_report)
+        args=(result_queue, device_type, video_path, llm_models, save_individual_report, video_info, journal_id)
     )
 
     print(f"[프로세스 격리] 분석 프로세스 시작 (device_type: {device_type}, PID: {os.getpid()}, timeout: {PROCESS_TIMEOUT}s)")
@@ -462,9 +622,17 @@ def _run_analysis_with_process_isolation(device_type: str, video_path: str, llm_
     # terminating until all the buffered items are fed by the 'feeder' thread to
     # the underlying pipe. You should join the process AFTER you have consumed all
     # items from the queue."
+    # 최종 결과 전까지 받은 진행 이벤트는 on_progress로 전달
+    deadline = time.monotonic() + PROCESS_TIMEOUT
     queue_result = None
     try:
-        queue_result = result_queue.get(timeout=PROCESS_TIMEOUT)
+        while queue_result is None:
+            message = result_queue.get(timeout=max(0, deadline - time.monotonic()))
+            if "progress" in message:
+                if on_progress is not None:
+                    on_progress(message["progress"])
+                continue
+            queue_result = message
     except queue_module.Empty:
         # 타임아웃: 결과가 오지 않음
         print(f"[프로세스 격리] 타임아웃 ({PROCESS_TIMEOUT}s) - Queue에서 결과를 받지 못함 (device_type: {device_type})")
@@ -526,15 +694,160 @@ def _run_analysis_with_process_isolation(device_type: str, video_path: str, llm_
         }
 
 
+def _run_analysis_in_worker_pool(worker_pool, device_type: str, video_path: str, llm_models: List[str], save_individual_report: bool,
+                                 video_info: Optional[Dict[str, Any]] = None, journal_id: Optional[str] = None,
+                                 on_progress=None) -> Dict[str, Any]:
+    """
+    분석 워커 풀의 유휴 워커에서 분석 실행 (_run_analysis_with_process_isolation과 같은 결과 형식)
+
+    - 워커는 디바이스 패키지/공통 라이브러리를 미리 로드하고 있어 분석 시작 시 프로세스 생성·모듈 로드가 없음
+    - PROCESS_TIMEOUT을 넘기거나 워커가 비정상 종료되면 해당 워커만 종료하고 새 워커로 교체
+    """
+    try:
+        queue_result = worker_pool.run(
+            timeout=PROCESS_TIMEOUT,
+            on_progress=on_progress,
+            device_type=device_type,
+            video_path=video_path,
+            llm_models=llm_models,
+            save_individual_report=save_individual_report,
+            video_info=video_info,
+            journal_id=journal_id
+        )
+    except TimeoutError as e:
+        return {
+            "status": "error",
+            "errors": [str(e)]
+        }
+    except Exception as e:
+        traceback.print_exc()
+        return {
+            "status": "error",
+            "errors": [f"결과 수신 중 오류: {str(e)}"]
+        }
+
+    if queue_result.get("success"):
+        print(f"[분석 워커 풀] 분석 완료 (device_type: {device_type})")
+        return queue_result.get("result")
+
+    error_msg = queue_result.get("error", "알 수 없는 오류")
+    tb = queue_result.get("traceback", "")
+    print(f"[분석 워커 풀] 분석 오류: {error_msg}")
+    if tb:
+        print(tb)
+    return {
+        "status": "error",
+        "errors": [error_msg]
+    }
+
+
+def _make_progress_handler(analysis_ids: List[str], tracker, loop: asyncio.AbstractEventLoop):
+    """
+    분석 프로세스 진행 이벤트 → 작업 저장소 (진행률, 현재 단계, 예상 남은 시간)
+    - analysis_ids: 실행 중인 분석과 그 결과를 공유하는 분석들 (실행 중 추가될 수 있음, 첫 번째가 실행 중인 분석)
+    - executor 스레드에서 호출되므로 SSE 구독자 알림은 이벤트 루프로 넘김
+    - 진행률(%)이 바뀌거나 PROGRESS_STORE_INTERVAL이 지났을 때만 저장
+    """
+    last_saved = {"time": 0.0, "progress": None}
+
+    def on_progress(event: Dict[str, Any]):
+        try:
+            if not tracker.update(event):
+                return
+            now = time.monotonic()
+            if tracker.progress == last_saved["progress"] and now - last_saved["time"] < PROGRESS_STORE_INTERVAL:
+                return
+            last_saved.update(time=now, progress=tracker.progress)
+            eta_seconds = tracker.eta_seconds()
+            for analysis_id in list(analysis_ids):
+                get_job_store().update(
+                    analysis_id, progress=tracker.progress, current_stage=tracker.stage, eta_seconds=eta_seconds
+                )
+                loop.call_soon_threadsafe(notify_job_update, analysis_id)
+            loop.call_soon_threadsafe(get_analysis_scheduler().update_remaining, analysis_ids[0], eta_seconds)
+        except Exception as e:
+            print(f"[분석 진행] 진행 상황 저장 실패: {analysis_ids[0]} - {e}")
+
+    return on_progress
+
+
 # ============================================
 # 비동기 분석 실행 함수
 # ============================================
+# 진행 중인 분석 (저널 ID -> {"future": 결과 Future, "analysis_ids": [실행 중인 분석, 결과를 공유하는 분석...]})
+# 이벤트 루프 스레드에서만 접근
+inflight_analyses: Dict[str, Dict[str, Any]] = {}
+
+
+async def _set_analysis_outcome(analysis_id: str, outcome: Dict[str, Any], log_message: str):
+    """공유받은 분석 결과(완료/오류)를 이 작업의 상태로 저장"""
+    if outcome["status"] == "completed":
+        await update_job(
+            analysis_id, status="completed", progress=100, current_stage="분석 완료", eta_seconds=0,
+            queue_position=None, estimated_start_at=None, result=outcome["result"], raw_result=outcome["raw_result"]
+        )
+    else:
+        await update_job(analysis_id, status="error", error=outcome["error"], queue_position=None, estimated_start_at=None)
+    await append_job_log(analysis_id, f"[{datetime.now().strftime('%H:%M:%S')}] {log_message}")
+
+
+async def _follow_inflight_analysis(analysis_id: str, inflight: Dict[str, Any], dedup: Optional[Dict[str, str]]):
+    """같은 저널 ID로 진행 중인 분석의 결과를 기다려 이 작업의 결과로 저장 (동시 분석 슬롯을 사용하지 않음)"""
+    get_analysis_scheduler().release(analysis_id)
+    leader_id = inflight["analysis_ids"][0]
+    inflight["analysis_ids"].append(analysis_id)
+    await update_job(
+        analysis_id, status="processing", current_stage="같은 영상의 분석 진행 중...",
+        queue_position=None, estimated_start_at=None
+    )
+    await append_job_log(
+        analysis_id,
+        f"[{datetime.now().strftime('%H:%M:%S')}] 같은 영상/deviceType의 분석이 진행 중이므로 결과를 공유합니다 ({leader_id})"
+    )
+    print(f"[분석 공유] {analysis_id} → 진행 중인 분석 {leader_id}의 결과 대기")
+
+    outcome = await asyncio.shield(inflight["future"])
+    if outcome["status"] == "completed":
+        await _set_analysis_outcome(analysis_id, outcome, f"분석 완료 (결과 공유: {leader_id})")
+        if dedup:
+            try:
+                get_result_store().link_analysis(analysis_id, dedup["key"])
+            except Exception as e:
+                print(f"[결과 저장소] 연결 실패: {analysis_id} - {e}")
+    else:
+        await _set_analysis_outcome(analysis_id, outcome, f"오류 발생 (결과 공유: {leader_id})")
+
+
+async def _wait_for_journal_lock(analysis_id: str, journal_lock, dedup: Optional[Dict[str, str]]) -> Optional[Dict[str, Any]]:
+    """
+    다른 API 워커가 같은 저널로 실행 중인 분석이 끝날 때까지 대기 (저널 잠금 획득)
+    그 분석이 완료되어 결과가 저장되었으면 저장된 결과를 반환, 아니면 None (저널에서 재개하여 직접 실행)
+    """
+    await update_job(analysis_id, current_stage="다른 서버 워커에서 같은 영상의 분석 진행 중...")
+    await append_job_log(
+        analysis_id,
+        f"[{datetime.now().strftime('%H:%M:%S')}] 다른 서버 워커에서 같은 영상/deviceType의 분석이 진행 중이므로 종료를 기다립니다"
+    )
+    print(f"[분석 공유] {analysis_id} → 다른 API 워커의 같은 저널 분석 종료 대기 ({journal_lock.path})")
+    while not await asyncio.to_thread(journal_lock.acquire):
+        await asyncio.sleep(JOURNAL_LOCK_POLL_INTERVAL)
+    if not dedup:
+        return None
+    try:
+        return await asyncio.to_thread(get_result_store().get_result, dedup["key"])
+    except Exception as e:
+        print(f"[결과 저장소] 조회 실패: {analysis_id} - {e}")
+        return None
+
+
 async def run_analysis_async(
     analysis_id: str,
     device_type: str,
     video_path: str,
     llm_models: List[str],
-    save_individual_report: bool
+    save_individual_report: bool,
+    video_info: Optional[Dict[str, Any]] = None,
+    dedup: Optional[Dict[str, str]] = None
 ):
     """
     백그라운드에서 분석을 실행하는 비동기 함수
@@ -545,103 +858,195 @@ async def run_analysis_async(
     - sys.path, sys.modules 오염 없음
     
     [동시 분석 제한]
-    - Semaphore를 사용하여 동시 분석 수 제한 (MAX_CONCURRENT_ANALYSES)
-    """
-    global current_analysis_count
+    - start_analysis가 스케줄러 대기열에 추가한 분석의 슬롯 배정을 기다린 뒤 실행 (MAX_CONCURRENT_ANALYSES)
+    - 대기 순서는 우선순위 클래스 가중 라운드 로빈 + 기관별 라운드 로빈 (analysis_scheduler)
     
-    # Semaphore 획득 대기
-    semaphore = get_analysis_semaphore()
-    
-    # 대기 상태 로그
-    with analysis_count_lock:
-        waiting_count = MAX_CONCURRENT_ANALYSES - semaphore._value if hasattr(semaphore, '_value') else current_analysis_count
+    [결과 영구 저장]
+    - dedup(key, content_hash, promptbank_version)이 있으면 완료된 결과를 ResultStore에 저장
+
+    [진행률]
+    - 분석 프로세스가 구간 응답마다 보내는 진행 이벤트로 진행률(%)/현재 단계/예상 남은 시간 계산 (analysis_progress.ProgressTracker)
+    - 완료된 분석의 소요 시간은 이후 분석의 예상 시간 추정에 반영
+
+    [체크포인트 재개]
+    - 분석 저널 ID = dedup 키 (없으면 영상 경로/deviceType/모델 해시)
+    - 같은 저널 ID의 분석이 이미 진행 중이면 새로 실행하지 않고 그 결과를 공유 (두 분석 프로세스가 같은 저널에 쓰지 않도록)
+    - 다른 API 워커가 같은 저널로 실행 중이면 저널 잠금(analysis_journal.JournalLock)이 풀릴 때까지 대기 후
+      저장된 결과가 있으면 공유, 없으면 저널에서 재개하여 실행
+    - 프로세스 종료/타임아웃/서버 재시작 후 같은 분석을 다시 시작하면 저널에 기록된 구간은 LLM 요청 없이 재사용
+    - 완료된 분석의 저널은 삭제, 실패한 분석의 저널은 재개를 위해 유지 (CLEANUP_OLD_FILES_DURATION 후 정리)
+    """
+    if dedup:
+        journal_id = dedup["key"]
+    else:
+        journal_id = hashlib.sha256(json.dumps([video_path, device_type, llm_models]).encode("utf-8")).hexdigest()
     
-    if waiting_count >= MAX_CONCURRENT_ANALYSES:
-        analysis_storage[analysis_id]["current_stage"] = f"대기 중... (동시 분석 제한: {MAX_CONCURRENT_ANALYSES}개)"
-        analysis_storage[analysis_id]["logs"].append(
-            f"[{datetime.now().strftime('%H:%M:%S')}] 동시 분석 제한으로 대기 중 (현재 {waiting_count}개 실행 중)"
-        )
+    # 같은 저널 ID의 분석이 이미 진행 중이면 그 결과를 기다려 공유
+    inflight = inflight_analyses.get(journal_id)
+    if inflight is not None:
+        await _follow_inflight_analysis(analysis_id, inflight, dedup)
+        return
+    inflight = {"future": asyncio.get_running_loop().create_future(), "analysis_ids": [analysis_id]}
+    inflight_analyses[journal_id] = inflight
+    outcome = {"status": "error", "error": "분석이 중단되었습니다. 분석을 다시 시작해 주세요."}
+    from app_server import analysis_journal
+    journal_lock = analysis_journal.JournalLock(journal_id)
+
+    try:
+        # 다른 API 워커가 같은 저널로 실행 중이면 종료 대기, 완료된 결과가 저장되었으면 실행하지 않고 공유
+        scheduler = get_analysis_scheduler()
+        if not await asyncio.to_thread(journal_lock.acquire):
+            stored = await _wait_for_journal_lock(analysis_id, journal_lock, dedup)
+            if stored is not None:
+                scheduler.release(analysis_id)
+                outcome = {"status": "completed", "result": stored["result"], "raw_result": stored["raw_result"]}
+                await _set_analysis_outcome(analysis_id, outcome, "분석 완료 (다른 서버 워커의 결과 공유)")
+                try:
+                    get_result_store().link_analysis(analysis_id, dedup["key"])
+                except Exception as e:
+                    print(f"[결과 저장소] 연결 실패: {analysis_id} - {e}")
+                return
+
+        # 슬롯 배정 대기 (start_analysis에서 대기열에 추가됨)
+        queued = scheduler.queue_snapshot().get(analysis_id)
+        if queued is not None:
+            start_at = datetime.fromtimestamp(queued["estimated_start_at"]).strftime('%H:%M:%S')
+            await append_job_log(
+                analysis_id,
+                f"[{datetime.now().strftime('%H:%M:%S')}] 동시 분석 제한으로 대기 중 (대기 순서 {queued['position']}번째, 예상 시작 {start_at})"
+            )
     
-    async with semaphore:
-        # 현재 분석 수 증가
-        with analysis_count_lock:
-            current_analysis_count += 1
-            print(f"[동시 분석 제한] 분석 시작 (현재 {current_analysis_count}/{MAX_CONCURRENT_ANALYSES}개)")
+        async with scheduler.slot(analysis_id):
+            stats = scheduler.stats()
+            print(f"[분석 스케줄러] 분석 시작: {analysis_id} (실행 {stats['running']}/{stats['slots']}개, 대기 {stats['queued']}개)")
         
-        try:
-            # 상태 업데이트: processing
-            analysis_storage[analysis_id]["status"] = "processing"
-            analysis_storage[analysis_id]["current_stage"] = "분석 초기화 중..."
-            analysis_storage[analysis_id]["logs"].append(
-                f"[{datetime.now().strftime('%H:%M:%S')}] 분석 시작 (device_type: {device_type}, 프로세스 격리 모드, 타임아웃: {PROCESS_TIMEOUT}s)"
-            )
-            
-            # 프로세스 격리된 환경에서 분석 실행
-            # run_in_executor로 비동기 래핑 (블로킹 방지)
-            # [FIX] asyncio.wait_for로 비동기 레벨 타임아웃 추가
-            #   - 프로세스 타임아웃(PROCESS_TIMEOUT) + 정리 여유(60초)
-            #   - executor 스레드가 stuck 되어도 세마포어/상태는 해제됨
-            loop = asyncio.get_running_loop()
             try:
-                result = await asyncio.wait_for(
-                    loop.run_in_executor(
-                        analysis_executor,
-                        _run_analysis_with_process_isolation,
-                        device_type,
-                        video_path,
-                        llm_models,
-                        save_individual_report
-                    ),
-                    timeout=PROCESS_TIMEOUT + 60
+                from app_server.analysis_progress import ProgressTracker, record_analysis_duration
+                tracker = ProgressTracker(num_models=len(llm_models), play_time=(video_info or {}).get("play_time"))
+
+                # 상태 업데이트: processing
+                await update_job(
+                    analysis_id, status="processing", current_stage="분석 초기화 중...", eta_seconds=tracker.eta_seconds(),
+                    queue_position=None, estimated_start_at=None
                 )
-            except asyncio.TimeoutError:
-                print(f"[비동기 타임아웃] analysis_id={analysis_id}, 타임아웃={PROCESS_TIMEOUT + 60}초")
-                result = {
-                    "status": "error",
-                    "errors": [f"비동기 실행 타임아웃 ({PROCESS_TIMEOUT + 60}초). 분석 프로세스가 응답하지 않습니다."]
-                }
+                await append_job_log(
+                    analysis_id,
+                    f"[{datetime.now().strftime('%H:%M:%S')}] 분석 시작 (device_type: {device_type}, 프로세스 격리 모드, 타임아웃: {PROCESS_TIMEOUT}s)"
+                )
+            
+                # 프로세스 격리된 환경에서 분석 실행
+                # run_in_executor로 비동기 래핑 (블로킹 방지)
+                # [FIX] asyncio.wait_for로 비동기 레벨 타임아웃 추가
+                #   - 프로세스 타임아웃(PROCESS_TIMEOUT) + 정리 여유(60초)
+                #   - executor 스레드가 stuck 되어도 세마포어/상태는 해제됨
+                loop = asyncio.get_running_loop()
+                try:
+                    result = await asyncio.wait_for(
+                        loop.run_in_executor(
+                            analysis_executor,
+                            _run_analysis_with_process_isolation,
+                            device_type,
+                            video_path,
+                            llm_models,
+                            save_individual_report,
+                            video_info,
+                            journal_id,
+                            _make_progress_handler(inflight["analysis_ids"], tracker, loop)
+                        ),
+                        timeout=PROCESS_TIMEOUT + 60
+                    )
+                except asyncio.TimeoutError:
+                    print(f"[비동기 타임아웃] analysis_id={analysis_id}, 타임아웃={PROCESS_TIMEOUT + 60}초")
+                    result = {
+                        "status": "error",
+                        "errors": [f"비동기 실행 타임아웃 ({PROCESS_TIMEOUT + 60}초). 분석 프로세스가 응답하지 않습니다."]
+                    }
             
-            if result and result.get("status") == "completed":
-                # 성공
-                analysis_storage[analysis_id]["status"] = "completed"
-                analysis_storage[analysis_id]["progress"] = 100
-                analysis_storage[analysis_id]["current_stage"] = "분석 완료"
-                analysis_storage[analysis_id]["logs"].append(f"[{datetime.now().strftime('%H:%M:%S')}] 분석 완료")
+                if result and result.get("status") == "completed":
+                    # 성공: 결과 저장
+                    frontend_result = convert_backend_report_to_frontend(
+                        result.get("final_report", {}),
+                        result
+                    )
+                    frontend_result["deviceType"] = device_type
+                    await update_job(
+                        analysis_id,
+                        status="completed",
+                        progress=100,
+                        current_stage="분석 완료",
+                        eta_seconds=0,
+                        result=frontend_result,
+                        raw_result=result
+                    )
+                    await append_job_log(analysis_id, f"[{datetime.now().strftime('%H:%M:%S')}] 분석 완료 ({tracker.elapsed:.0f}초)")
+                    outcome = {"status": "completed", "result": frontend_result, "raw_result": result}
+                    record_analysis_duration(tracker.play_time, tracker.elapsed)
                 
-                # 결과 저장
-                analysis_storage[analysis_id]["result"] = convert_backend_report_to_frontend(
-                    result.get("final_report", {}),
-                    result
-                )
-                analysis_storage[analysis_id]["result"]["deviceType"] = device_type
-                analysis_storage[analysis_id]["raw_result"] = result
-            else:
-                # 실패
-                analysis_storage[analysis_id]["status"] = "error"
-                analysis_storage[analysis_id]["error"] = "분석 중 오류가 발생했습니다."
-                if result and result.get("errors"):
-                    analysis_storage[analysis_id]["error"] = "; ".join(result.get("errors", []))
-                analysis_storage[analysis_id]["logs"].append(f"[{datetime.now().strftime('%H:%M:%S')}] 오류 발생")
+                    # 같은 (영상, deviceType, 모델, prompt-bank) 재분석 방지용 영구 저장
+                    if dedup:
+                        try:
+                            store = get_result_store()
+                            store.save_result(
+                                dedup["key"], dedup["content_hash"], device_type, llm_models,
+                                dedup["promptbank_version"], frontend_result, result
+                            )
+                            store.link_analysis(analysis_id, dedup["key"])
+                        except Exception as e:
+                            print(f"[결과 저장소] 저장 실패: {analysis_id} - {e}")
+
+                    # 완료된 분석의 체크포인트 저널 삭제 (저널 잠금 보유 중)
+                    try:
+                        analysis_journal.remove_journal(journal_id)
+                    except OSError as e:
+                        print(f"[분석 저널] 삭제 실패: {journal_id} - {e}")
+                else:
+                    # 실패
+                    error = "분석 중 오류가 발생했습니다."
+                    if result and result.get("errors"):
+                        error = "; ".join(result.get("errors", []))
+                    await update_job(analysis_id, status="error", error=error)
+                    await append_job_log(analysis_id, f"[{datetime.now().strftime('%H:%M:%S')}] 오류 발생")
+                    outcome = {"status": "error", "error": error}
         
-        except Exception as e:
-            # 예외 처리
-            analysis_storage[analysis_id]["status"] = "error"
-            analysis_storage[analysis_id]["error"] = str(e)
-            analysis_storage[analysis_id]["logs"].append(f"[{datetime.now().strftime('%H:%M:%S')}] 예외 발생: {str(e)}")
-            traceback.print_exc()
+            except Exception as e:
+                # 예외 처리
+                outcome = {"status": "error", "error": str(e)}
+                await update_job(analysis_id, status="error", error=str(e))
+                await append_job_log(analysis_id, f"[{datetime.now().strftime('%H:%M:%S')}] 예외 발생: {str(e)}")
+                traceback.print_exc()
         
-        finally:
-            # 현재 분석 수 감소
-            with analysis_count_lock:
-                current_analysis_count -= 1
-                print(f"[동시 분석 제한] 분석 종료 (현재 {current_analysis_count}/{MAX_CONCURRENT_ANALYSES}개)")
+            finally:
+                stats = scheduler.stats()
+                print(f"[분석 스케줄러] 분석 종료: {analysis_id} (실행 {stats['running'] - 1}/{stats['slots']}개, 대기 {stats['queued']}개)")
+    finally:
+        journal_lock.release()
+        inflight_analyses.pop(journal_id, None)
+        if not inflight["future"].done():
+            inflight["future"].set_result(outcome)
 
 
 # ============================================
 # API 엔드포인트
 # ============================================
+async def build_derived_media_for_upload(video_path: str):
+    """
+    업로드된 비디오의 저해상도 프레임 저장소(.npy memmap) 생성 (백그라운드 실행)
+
+    - ingest 프로세스 풀에서 한 번의 디코딩으로 생성 (video_ingest.build_derived_media)
+    - 이후 분석 프로세스들은 코덱 대신 memmap 슬라이싱으로 그리드 생성
+    - 실패해도 분석은 기존 디코딩 경로로 동작하므로 오류는 로그만 남김
+    """
+    try:
+        from app_server import video_ingest
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(get_ingest_executor(), video_ingest.build_derived_media, video_path)
+    except Exception as e:
+        print(f"[ingest] 프레임 저장소 생성 실패: {video_path} - {e}")
+
+
 @app.post("/api/video/upload")
 async def upload_video(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     deviceType: str = None
 ):
@@ -651,6 +1056,12 @@ async def upload_video(
     [파일 검증]
     - 확장자 검증: ALLOWED_EXTENSIONS (.mp4, .mov, .avi, .mkv)
     - 파일 크기 검증: MAX_FILE_SIZE (500MB)
+    
+    [ingest]
+    - 업로드 중: 청크 단위로 SHA-256 해시 계산
+    - 업로드 직후: 메타데이터/썸네일 생성 (ingest 프로세스 풀) → 응답에 포함
+    - 응답 이후: 저해상도 프레임 저장소 생성 (build_derived_media_for_upload)
+    - 결과는 <videoId>_ingest.json에 저장되어 분석 시작 시 재사용
     """
     try:
         # 1. 확장자 검증
@@ -665,7 +1076,9 @@ async def upload_video(
         video_id = str(uuid.uuid4())
         saved_path = UPLOAD_DIR / f"{video_id}{file_extension}"
         
-        # 파일을 청크 단위로 저장하면서 크기 검증
+        # 파일을 청크 단위로 저장하면서 크기 검증 및 해시 계산
+        from app_server import video_ingest
+        hasher = video_ingest.ContentHasher()
         total_size = 0
         chunk_size = 1024 * 1024  # 1MB 청크
         
@@ -686,20 +1099,55 @@ async def upload_video(
                     )
                 
                 buffer.write(chunk)
+                hasher.update(chunk)
         
-        print(f"[파일 업로드] 성공: {file.filename} ({total_size / (1024*1024):.2f}MB)")
+        content_hash = hasher.hexdigest()
+        print(f"[파일 업로드] 성공: {file.filename} ({total_size / (1024*1024):.2f}MB, sha256: {content_hash[:12]})")
         
+        # 같은 내용의 기존 업로드가 있으면 새 파일을 버리고 기존 videoId 재사용 (ingest/분석 결과 재사용)
+        store = get_result_store()
+        existing = store.find_upload(content_hash)
+        record = None
+        if existing and existing["video_path"] != str(saved_path):
+            saved_path.unlink(missing_ok=True)
+            video_id = existing["video_id"]
+            saved_path = Path(existing["video_path"])
+            video_ingest.touch_video(str(saved_path))  # 파일 정리 기준(mtime) 갱신 (ingest 기록/썸네일/프레임 저장소 포함)
+            record = video_ingest.load_ingest_record(str(saved_path))
+            print(f"[파일 업로드] 동일한 영상 재업로드 감지 → 기존 videoId 재사용: {video_id}")
+        else:
+            store.register_upload(content_hash, video_id, str(saved_path))
+        
+        if record is None:
+            # 메타데이터/썸네일 생성 (ingest 프로세스 풀, 이벤트 루프 블로킹 없음)
+            loop = asyncio.get_running_loop()
+            record = await loop.run_in_executor(
+                get_ingest_executor(),
+                video_ingest.probe_video,
+                str(saved_path),
+                content_hash,
+                file.filename
+            )
+        video_info = record.get("video_info") or {}
+        
+        # 저해상도 프레임 저장소 생성 (응답 반환 후 실행)
+        if record.get("status") != "complete":
+            background_tasks.add_task(build_derived_media_for_upload, str(saved_path))
+        
+        width = video_info.get("video_width", 0)
+        height = video_info.get("video_height", 0)
         return {
             "videoId": video_id,
-            "thumbnail": "",  # 썸네일 생성 필요
+            "thumbnail": video_ingest.thumbnail_data_url(str(saved_path)),
+            "contentHash": content_hash,
             "metadata": {
                 "fileName": file.filename,
-                "duration": 0,  # 비디오 분석 필요
+                "duration": video_info.get("play_time", 0),
                 "size": total_size,
-                "resolution": "",
+                "resolution": f"{width}x{height}" if width and height else "",
                 "type": file.content_type,
-                "width": 0,
-                "height": 0
+                "width": width,
+                "height": height
             }
         }
     
@@ -712,11 +1160,16 @@ async def upload_video(
 @app.post("/api/analysis/start")
 async def start_analysis(
     request: StartAnalysisRequest,
-    background_tasks: BackgroundTasks
+    background_tasks: BackgroundTasks,
+    http_request: Request
 ):
     """
     분석 시작
+
+    - 분석 스케줄러 대기열에 추가 (clinicId 단위 공정 대기, priority: interactive/batch)
+    - 대기열이 가득 차면 429 + Retry-After (대기열에 자리가 생길 때까지의 예상 시간, 초)
     """
+    analysis_id = None
     try:
         analysis_id = str(uuid.uuid4())
         
@@ -738,19 +1191,78 @@ async def start_analysis(
                 detail=f"업로드된 비디오 파일을 찾을 수 없습니다. {debug_info}"
             )
         
-        # 분석 작업 초기화
-        analysis_storage[analysis_id] = {
-            "status": "pending",
-            "progress": 0,
-            "current_stage": "대기 중...",
-            "logs": [],
-            "error": None,
-            "result": None,
-            "raw_result": None,
-            "device_type": request.deviceType,
-            "video_path": video_file,
-            "created_at": datetime.now(),
-        }
+        # 업로드 ingest 결과 (미리 계산된 메타데이터, 없으면 분석 중 탐색)
+        from app_server import video_ingest
+        ingest_record = video_ingest.load_ingest_record(video_file) or {}
+        video_info = ingest_record.get("video_info")
+        
+        # 중복 분석 방지: 같은 (영상 해시, deviceType, 모델 리스트, prompt-bank 버전)의 저장된 결과가 있으면 바로 반환
+        dedup = None
+        content_hash = ingest_record.get("content_hash")
+        app_dir = os.path.join(project_root, f"app_{request.deviceType}")
+        if content_hash and os.path.isdir(app_dir):
+            from app_server.result_store import compute_promptbank_version, make_dedup_key
+            promptbank_version = compute_promptbank_version(app_dir)
+            dedup = {
+                "key": make_dedup_key(content_hash, request.deviceType, FIXED_LLM_MODELS, promptbank_version),
+                "content_hash": content_hash,
+                "promptbank_version": promptbank_version,
+            }
+            store = get_result_store()
+            stored = store.get_result(dedup["key"])
+            if stored is not None:
+                await write_job_store(
+                    get_job_store().create,
+                    analysis_id,
+                    logs=[f"[{datetime.now().strftime('%H:%M:%S')}] 동일한 영상의 저장된 분석 결과 재사용 ({stored['created_at']})"],
+                    status="completed",
+                    progress=100,
+                    current_stage="분석 완료",
+                    result=stored["result"],
+                    raw_result=stored["raw_result"],
+                    device_type=request.deviceType,
+                    video_path=video_file
+                )
+                store.link_analysis(analysis_id, dedup["key"])
+                print(f"[중복 분석 방지] 저장된 결과 반환: {analysis_id} (sha256: {content_hash[:12]}, {request.deviceType})")
+                return {
+                    "analysisId": analysis_id,
+                    "estimatedTime": 0,
+                    "cached": True
+                }
+        
+        # 예상 소요 시간 (영상 길이 × 완료된 분석의 영상 1초당 소요 시간)
+        from app_server.analysis_progress import estimate_analysis_seconds
+        estimated_time = estimate_analysis_seconds((video_info or {}).get("play_time"))
+
+        # 스케줄러 대기열에 추가 (빈 슬롯이 있으면 바로 배정)
+        from app_server.analysis_scheduler import QueueFullError
+        scheduler = get_analysis_scheduler()
+        tenant = request.clinicId or (http_request.client.host if http_request.client else "unknown")
+        try:
+            scheduler.submit(analysis_id, tenant, request.priority, estimated_time)
+        except QueueFullError as e:
+            analysis_id = None
+            print(f"[분석 스케줄러] 대기열 가득 참: {tenant} ({request.priority}) - Retry-After {e.retry_after}초")
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+        except ValueError as e:
+            analysis_id = None
+            raise HTTPException(status_code=400, detail=str(e))
+        queued = scheduler.queue_snapshot().get(analysis_id)
+
+        # 분석 작업 초기화 (대기 중이면 예상 대기 시간을 예상 남은 시간에 포함)
+        await write_job_store(
+            get_job_store().create,
+            analysis_id,
+            status="pending",
+            progress=0,
+            current_stage=f"대기 중... (대기 순서 {queued['position']}번째)" if queued else "대기 중...",
+            device_type=request.deviceType,
+            video_path=video_file,
+            eta_seconds=estimated_time,
+            queue_position=queued["position"] if queued else None,
+            estimated_start_at=round(queued["estimated_start_at"]) if queued else None
+        )
         
         # 백그라운드 작업으로 분석 시작
         # llm_models는 고정값 사용 (요청의 llmModels는 무시)
@@ -760,34 +1272,179 @@ async def start_analysis(
             request.deviceType,
             video_file,
             FIXED_LLM_MODELS,  # 고정된 LLM 모델 사용 (요청의 llmModels 무시)
-            request.saveIndividualReport
+            request.saveIndividualReport,
+            video_info,
+            dedup
         )
         
-        return {
+        response = {
             "analysisId": analysis_id,
-            "estimatedTime": 300  # 예상 시간 (초) - 실제로는 계산 필요
+            "estimatedTime": estimated_time  # 예상 소요 시간 (초)
         }
+        if queued:
+            response["queuePosition"] = queued["position"]
+            response["estimatedStartSeconds"] = max(0, round(queued["estimated_start_at"] - time.time()))
+        return response
     
+    except HTTPException:
+        raise
     except Exception as e:
+        if analysis_id is not None:
+            get_analysis_scheduler().release(analysis_id)
         raise HTTPException(status_code=500, detail=f"분석 시작 실패: {str(e)}")
 
 
+def get_analysis_record(analysis_id: str, include_result: bool = True, include_logs: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    분석 작업 조회 (작업 저장소 → 결과 저장소 순)
+    - 작업 저장소에서 보관 기간이 지나 정리된 완료 결과는 ResultStore에서 복원
+    - include_result=False: 상태 조회용 (압축된 결과 BLOB을 읽지 않음)
+    - include_logs=False: 로그를 읽지 않음 (로그는 get_job_store().get_logs로 커서 이후만 조회)
+    """
+    try:
+        job = get_job_store().get(analysis_id, include_result=include_result, include_logs=include_logs)
+    except Exception as e:
+        print(f"[작업 저장소] 조회 실패: {analysis_id} - {e}")
+        job = None
+    if job is not None:
+        return job
+    try:
+        stored = get_result_store().get_analysis(analysis_id)
+    except Exception as e:
+        print(f"[결과 저장소] 조회 실패: {analysis_id} - {e}")
+        return None
+    if stored is None:
+        return None
+    return {
+        "status": "completed",
+        "progress": 100,
+        "current_stage": "분석 완료",
+        "logs": [],
+        "error": None,
+        "result": stored["result"],
+        "raw_result": stored["raw_result"],
+    }
+
+
 @app.get("/api/analysis/status/{analysis_id}")
-async def get_analysis_status(analysis_id: str):
+async def get_analysis_status(analysis_id: str, request: Request, response: Response, since: int = 0):
     """
     분석 상태 조회
+
+    - since: 이전 응답의 cursor → 그 이후의 로그만 반환 (생략하면 전체 로그)
+    - ETag: 상태와 마지막 로그 커서가 같으면 같은 값 → If-None-Match가 일치하면 본문 없이 304 반환
     """
-    if analysis_id not in analysis_storage:
+    analysis = await read_job_store(get_analysis_record, analysis_id, include_result=False, include_logs=False)
+    if analysis is None:
         raise HTTPException(status_code=404, detail="분석 작업을 찾을 수 없습니다.")
-    
-    analysis = analysis_storage[analysis_id]
-    
-    return AnalysisStatusResponse(
-        status=analysis["status"],
-        progress=analysis["progress"],
-        current_stage=analysis["current_stage"],
-        logs=analysis["logs"],
-        error=analysis.get("error")
+
+    since = max(0, since)
+    try:
+        new_logs = await read_job_store(get_job_store().get_logs, analysis_id, after=since)
+    except Exception as e:
+        print(f"[작업 저장소] 로그 조회 실패: {analysis_id} - {e}")
+        new_logs = []
+    cursor = new_logs[-1][0] if new_logs else since
+
+    # ETag = (상태, 마지막 로그 커서): 일치하면 클라이언트가 이미 최신 상태와 cursor까지의 로그를 가지고 있음
+    state = [
+        analysis["status"], analysis["progress"], analysis["current_stage"], analysis.get("error"), analysis.get("eta_seconds"),
+        analysis.get("queue_position"), analysis.get("estimated_start_at"), cursor
+    ]
+    etag = '"' + hashlib.sha1(json.dumps(state, ensure_ascii=False).encode("utf-8")).hexdigest()[:16] + '"'
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+    return AnalysisStatusResponse(logs=[message for _, message in new_logs], cursor=cursor, **_public_status(analysis))
+
+
+def _public_status(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    작업 레코드 → 상태 응답 필드 (상태 조회 / SSE status 이벤트 공통)
+    - 대기 중이면 estimated_start_seconds(예상 시작까지 남은 시간)를 계산하고 eta_seconds에 더함
+    """
+    queue_position = estimated_start_seconds = None
+    eta_seconds = analysis.get("eta_seconds")
+    if analysis["status"] == "pending" and analysis.get("queue_position"):
+        queue_position = analysis["queue_position"]
+        if analysis.get("estimated_start_at") is not None:
+            estimated_start_seconds = max(0, int(round(analysis["estimated_start_at"] - time.time())))
+            if eta_seconds is not None:
+                eta_seconds += estimated_start_seconds
+    return {
+        "status": analysis["status"],
+        "progress": analysis["progress"],
+        "current_stage": analysis["current_stage"],
+        "error": analysis.get("error"),
+        "eta_seconds": eta_seconds,
+        "queue_position": queue_position,
+        "estimated_start_seconds": estimated_start_seconds,
+    }
+
+
+# 상태 응답/SSE status 이벤트를 다시 보낼지 판단하는 저장 필드
+STATUS_FIELDS = ("status", "progress", "current_stage", "error", "eta_seconds", "queue_position", "estimated_start_at")
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Server-Sent Events 메시지 한 건"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.get("/api/analysis/events/{analysis_id}")
+async def stream_analysis_events(analysis_id: str, request: Request):
+    """
+    분석 진행 상황 스트림 (Server-Sent Events, status 폴링 대체)
+
+    [이벤트]
+    - status: {status, progress, current_stage, error, eta_seconds, queue_position, estimated_start_seconds} (바뀔 때만 전송)
+    - completed/error 상태를 전송한 뒤 스트림 종료
+    - 로그는 전송하지 않음 (필요하면 status 조회의 ?since=cursor 사용)
+    """
+    if await read_job_store(get_analysis_record, analysis_id, include_result=False, include_logs=False) is None:
+        raise HTTPException(status_code=404, detail="분석 작업을 찾을 수 없습니다.")
+
+    async def event_stream():
+        update_event = asyncio.Event()
+        job_update_events.setdefault(analysis_id, set()).add(update_event)
+        last_status = None
+        last_sent = time.monotonic()
+        try:
+            while True:
+                update_event.clear()
+                analysis = await read_job_store(get_analysis_record, analysis_id, include_result=False, include_logs=False)
+                if analysis is None:
+                    break
+
+                status = {key: analysis.get(key) for key in STATUS_FIELDS}
+                if status != last_status:
+                    last_status = status
+                    last_sent = time.monotonic()
+                    yield _sse_event("status", _public_status(analysis))
+                if status["status"] in ("completed", "error"):
+                    break
+
+                if await request.is_disconnected():
+                    break
+                try:
+                    await asyncio.wait_for(update_event.wait(), timeout=SSE_STORE_CHECK_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                if time.monotonic() - last_sent >= SSE_KEEPALIVE_INTERVAL:
+                    last_sent = time.monotonic()
+                    yield ": keepalive\n\n"
+        finally:
+            subscribers = job_update_events.get(analysis_id)
+            if subscribers is not None:
+                subscribers.discard(update_event)
+                if not subscribers:
+                    job_update_events.pop(analysis_id, None)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"X-Accel-Buffering": "no"}  # nginx 등 리버스 프록시의 응답 버퍼링 비활성화
     )
 
 
@@ -796,11 +1453,10 @@ async def get_analysis_result(analysis_id: str):
     """
     분석 결과 조회
     """
-    if analysis_id not in analysis_storage:
+    analysis = await read_job_store(get_analysis_record, analysis_id)
+    if analysis is None:
         raise HTTPException(status_code=404, detail="분석 작업을 찾을 수 없습니다.")
     
-    analysis = analysis_storage[analysis_id]
-    
     if analysis["status"] != "completed":
         raise HTTPException(status_code=400, detail="분석이 아직 완료되지 않았습니다.")
     
@@ -815,11 +1471,10 @@ async def download_result(analysis_id: str, format: str = "json"):
     """
     분석 결과 다운로드
     """
-    if analysis_id not in analysis_storage:
+    analysis = await read_job_store(get_analysis_record, analysis_id)
+    if analysis is None:
         raise HTTPException(status_code=404, detail="분석 작업을 찾을 수 없습니다.")
     
-    analysis = analysis_storage[analysis_id]
-    
     if analysis["status"] != "completed":
         raise HTTPException(status_code=400, detail="분석이 아직 완료되지 않았습니다.")
     
@@ -859,9 +1514,11 @@ def cleanup_old_files():
     [정리 대상]
     - uploads/ 디렉토리의 오래된 비디오 파일
     - uploads/ 디렉토리의 오래된 결과 JSON 파일
+    - 재개되지 않은 분석 체크포인트 저널 (data/journals)
     
     [정리 기준]
     - CLEANUP_OLD_FILES_DURATION 시간(기본 24시간)보다 오래된 파일
+    - 비디오 파생 파일(ingest 기록, 썸네일, 프레임 저장소)은 자체 수정 시각이 아니라 원본 비디오 기준으로 함께 정리
     """
     try:
         cutoff = datetime.now() - timedelta(hours=CLEANUP_OLD_FILES_DURATION)
@@ -872,19 +1529,38 @@ def cleanup_old_files():
         
         # uploads 디렉토리 정리
         if UPLOAD_DIR.exists():
-            for file in UPLOAD_DIR.iterdir():
-                if file.is_file():
+            from app_server import video_ingest
+            files = [file for file in UPLOAD_DIR.iterdir() if file.is_file()]
+            # 파생 파일 → 원본 비디오 (원본이 없는 파생 파일은 자체 수정 시각 기준)
+            source_videos = {}
+            for file in files:
+                if file.suffix.lower() in ALLOWED_EXTENSIONS:
+                    for derived_path in video_ingest.derived_file_paths(str(file)):
+                        source_videos[derived_path] = file
+            # 삭제 전에 기준 시각을 모두 계산 (원본 비디오를 먼저 삭제해도 파생 파일이 같은 기준으로 정리되도록)
+            file_mtimes = {}
+            for file in files:
+                try:
+                    file_mtimes[file] = source_videos.get(str(file), file).stat().st_mtime
+                except OSError:
+                    pass
+            for file, file_mtime in file_mtimes.items():
+                if file_mtime < cutoff_timestamp:
                     try:
-                        file_mtime = file.stat().st_mtime
-                        if file_mtime < cutoff_timestamp:
-                            file_size = file.stat().st_size
-                            file.unlink()
-                            deleted_count += 1
-                            deleted_size += file_size
-                            print(f"[파일 정리] 삭제: {file.name} (생성: {datetime.fromtimestamp(file_mtime).strftime('%Y-%m-%d %H:%M:%S')})")
+                        file_size = file.stat().st_size
+                        file.unlink()
+                        deleted_count += 1
+                        deleted_size += file_size
+                        print(f"[파일 정리] 삭제: {file.name} (생성: {datetime.fromtimestamp(file_mtime).strftime('%Y-%m-%d %H:%M:%S')})")
                     except Exception as e:
                         print(f"[파일 정리] 삭제 실패: {file.name} - {e}")
         
+        # 재개되지 않은 분석 저널 정리 (원본 업로드가 정리되면 재개할 수 없음)
+        from app_server import analysis_journal
+        journal_count = analysis_journal.cleanup_journals(cutoff_timestamp)
+        if journal_count > 0:
+            print(f"[파일 정리] 분석 저널 {journal_count}개 삭제")
+
         if deleted_count > 0:
             print(f"[파일 정리] 완료: {deleted_count}개 파일 삭제 ({deleted_size / (1024*1024):.2f}MB)")
         else:
@@ -895,17 +1571,23 @@ def cleanup_old_files():
 
 
 def cleanup_old_analyses():
-    """TTL이 지난 completed/error 상태의 분석 결과 삭제"""
-    cutoff = datetime.now() - timedelta(hours=ANALYSIS_STORAGE_TTL_HOURS)
-    ids_to_remove = [
-        aid for aid, data in analysis_storage.items()
-        if data.get("status") not in ("pending", "processing")
-        and data.get("created_at") and data["created_at"] < cutoff
-    ]
-    for aid in ids_to_remove:
-        del analysis_storage[aid]
-    if ids_to_remove:
-        print(f"[분석 결과 정리] {len(ids_to_remove)}개 항목 삭제")
+    """
+    보관 기간이 지난 completed/error 상태의 분석 작업 삭제
+    - 메모리 저장소: ANALYSIS_STORAGE_TTL_HOURS, SQLite 저장소: JOB_RETENTION_HOURS
+    - 실행하던 API 프로세스가 종료되어 끝나지 않을 pending/processing 작업은 오류로 표시
+    """
+    from app_server.job_store import JOB_RETENTION_HOURS
+    jobs = get_job_store()
+    try:
+        orphaned = jobs.fail_orphaned("서버 재시작으로 분석이 중단되었습니다. 분석을 다시 시작해 주세요.")
+        if orphaned:
+            print(f"[분석 결과 정리] 중단된 작업 {orphaned}개 오류 처리")
+        ttl_hours = JOB_RETENTION_HOURS if jobs.persistent else ANALYSIS_STORAGE_TTL_HOURS
+        deleted = jobs.delete_expired(datetime.now() - timedelta(hours=ttl_hours))
+        if deleted:
+            print(f"[분석 결과 정리] {deleted}개 항목 삭제")
+    except Exception as e:
+        print(f"[분석 결과 정리] 오류 발생: {e}")
 
 
 def run_cleanup_scheduler():
@@ -961,7 +1643,13 @@ async def startup_event():
     print("AI Inhaler Analysis API 서버 시작")
     print("=" * 60)
     print(f"[설정] 동시 분석 제한: {MAX_CONCURRENT_ANALYSES}개")
+    from app_server.analysis_scheduler import ANALYSIS_QUEUE_LIMIT, ANALYSIS_TENANT_QUEUE_LIMIT, PRIORITY_WEIGHTS
+    print(f"[설정] 분석 대기열: 최대 {ANALYSIS_QUEUE_LIMIT}개 (기관당 {ANALYSIS_TENANT_QUEUE_LIMIT}개), "
+          f"우선순위 비율 {', '.join(f'{k}={v}' for k, v in PRIORITY_WEIGHTS.items())}")
     print(f"[설정] 프로세스 타임아웃: {PROCESS_TIMEOUT}초 ({PROCESS_TIMEOUT/60:.0f}분)")
+    print(f"[설정] 분석 워커 풀: {ANALYSIS_WORKERS}개" + (" (비활성, 분석마다 새 프로세스)" if ANALYSIS_WORKERS <= 0 else ""))
+    jobs = get_job_store()
+    print(f"[설정] 작업 저장소: {type(jobs).__name__}" + (f" ({jobs.db_path})" if jobs.persistent else ""))
     print(f"[설정] 최대 파일 크기: {MAX_FILE_SIZE / (1024*1024):.0f}MB")
     print(f"[설정] 허용 확장자: {', '.join(ALLOWED_EXTENSIONS)}")
     print(f"[설정] 파일 정리 주기: {CLEANUP_OLD_FILES_DURATION}시간")
@@ -975,6 +1663,9 @@ async def startup_event():
     cleanup_old_files()
     cleanup_old_analyses()
 
+    # 분석 워커 풀 시작 (워커가 백그라운드에서 디바이스 패키지를 미리 로드)
+    get_analysis_worker_pool()
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -984,7 +1675,14 @@ async def shutdown_event():
     - PID 파일 삭제
     """
     print("[종료] 서버 종료 이벤트 수신, 정리 중...")
+    if analysis_scheduler is not None:
+        analysis_scheduler.cancel_all()
     analysis_executor.shutdown(wait=False)
+    job_store_write_executor.shutdown(wait=True)  # 예약된 작업 상태 쓰기 반영
+    if analysis_worker_pool is not None:
+        analysis_worker_pool.shutdown()
+    if ingest_executor is not None:
+        ingest_executor.shutdown(wait=False, cancel_futures=True)
     cleanup_child_processes()
     remove_pid_file()
     print("[종료] 정리 완료")
@@ -1012,10 +1710,11 @@ async def get_stats():
     """
     서버 상태 통계 반환
     """
-    # 현재 분석 중인 작업 수
-    active_analyses = sum(1 for a in analysis_storage.values() if a["status"] in ["pending", "processing"])
-    completed_analyses = sum(1 for a in analysis_storage.values() if a["status"] == "completed")
-    error_analyses = sum(1 for a in analysis_storage.values() if a["status"] == "error")
+    # 상태별 작업 수 (SQLite 저장소는 status 인덱스 집계)
+    status_counts = await read_job_store(get_job_store().count_by_status)
+    active_analyses = status_counts.get("pending", 0) + status_counts.get("processing", 0)
+    completed_analyses = status_counts.get("completed", 0)
+    error_analyses = status_counts.get("error", 0)
     
     # 업로드 디렉토리 크기
     upload_size = 0
@@ -1026,8 +1725,11 @@ async def get_stats():
                 upload_size += file.stat().st_size
                 upload_count += 1
     
+    scheduler_stats = get_analysis_scheduler().stats()
+
     return {
-        "currentAnalyses": current_analysis_count,
+        "currentAnalyses": scheduler_stats["running"],
+        "queuedAnalyses": scheduler_stats["queued"],
         "maxConcurrentAnalyses": MAX_CONCURRENT_ANALYSES,
         "activeAnalyses": active_analyses,
         "completedAnalyses": completed_analyses,
@@ -1035,7 +1737,8 @@ async def get_stats():
         "uploadedFiles": upload_count,
         "uploadedSizeMB": round(upload_size / (1024*1024), 2),
         "processTimeoutSeconds": PROCESS_TIMEOUT,
-        "cleanupDurationHours": CLEANUP_OLD_FILES_DURATION
+        "cleanupDurationHours": CLEANUP_OLD_FILES_DURATION,
+        "scheduler": scheduler_stats
     }
 
 
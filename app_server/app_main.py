@@ -8,6 +8,7 @@
 
 import os
 import sys
+import threading
 import importlib.util
 from dotenv import load_dotenv
 
@@ -24,6 +25,18 @@ load_dotenv(dotenv_path=env_path)
 openai_api_key = os.getenv("OPENAI_API_KEY")
 google_api_key = os.getenv("GOOGLE_API_KEY")
 
+# 지원 디바이스 타입 (app_<device_type> 디렉토리)
+DEVICE_TYPES = ('pMDI_type1', 'pMDI_type2', 'DPI_type1', 'DPI_type2', 'DPI_type3', 'SMI_type1')
+
+# 이 프로세스에 미리 로드된 디바이스 패키지 (device_type -> load_device_package 결과)
+# 분석 워커 프로세스(analysis_workers)가 시작 시 한 번 채우고, run_device_analysis가 재사용
+_preloaded_packages = {}
+
+# 이 프로세스에서 컴파일한 워크플로우 ((device_type, tuple(llm_models)) -> InhalerAnalysisWorkflow)
+# 미리 로드된 디바이스 패키지만 캐시 (분석별 LLM 인스턴스/PromptBank는 workflow.run()에서 주입되므로 재사용 가능)
+_compiled_workflows = {}
+_compiled_workflows_lock = threading.Lock()
+
 
 def print_analysis_summary(report: dict):
     """
@@ -82,58 +95,55 @@ def print_analysis_summary(report: dict):
     print("\n" + "="*50)
 
 
-def run_device_analysis(device_type: str, video_path: str, llm_models: list, save_individual_report: bool = False):
+def load_device_package(device_type: str) -> dict:
     """
-    특정 디바이스 타입에 대한 분석 실행
-    
+    디바이스 패키지(agents.state, agents.*, graph_workflow)를 파일 경로로 직접 로드
+
+    - 고유한 모듈 이름(app_<device_type>.agents.*, app_<device_type>.graph_workflow)으로 등록하여
+      한 프로세스에 여러 디바이스 패키지를 함께 로드해도 서로 충돌하지 않음
+    - graph_workflow의 "from agents.xxx import ..."를 위해 로드하는 동안에만 일반 이름(agents, agents.*)을 등록하고,
+      로드가 끝나면 일반 이름과 sys.path를 원래대로 복원
+
     Args:
         device_type: 디바이스 타입 (예: 'pMDI_type1', 'DPI_type1' 등)
-        video_path: 분석할 비디오 파일 경로
-        llm_models: 사용할 LLM 모델 리스트
-        save_individual_report: 개별 에이전트 결과물에 대한 시각화 HTML 저장 여부 (기본값: False)
-        
+
     Returns:
-        분석 결과 상태
+        {"device_type", "app_dir", "create_initial_state", "create_workflow"}
+
+    Raises:
+        FileNotFoundError: app 디렉토리 또는 agents/state.py, graph_workflow.py가 없는 경우
     """
-    print("\n" + "="*80)
-    print(f"디바이스 타입: {device_type}")
-    print("="*80)
-    
     # 해당 디바이스 타입의 app 디렉토리 경로
     app_dir = os.path.join(project_root, f"app_{device_type}")
-    
     if not os.path.exists(app_dir):
-        print(f"❌ 오류: {app_dir} 디렉토리가 존재하지 않습니다.")
-        return None
-    
+        raise FileNotFoundError(f"{app_dir} 디렉토리가 존재하지 않습니다.")
+
     # importlib.util을 사용하여 모듈을 파일 경로로 직접 로드 (캐싱 문제 방지)
     # 고유한 모듈 이름 사용 (device_type 포함하여 충돌 방지)
     module_prefix = f"app_{device_type.replace('-', '_')}"
-    
+
     # 다른 app_* 경로들을 sys.path에서 임시 제거하여 경쟁 조건 방지
     # 모듈 로드 시 올바른 디바이스 타입의 모듈만 사용하도록 보장
     original_sys_path = sys.path.copy()
-    other_app_paths = [p for p in sys.path if os.path.basename(p).startswith('app_') and p != app_dir]
-    for path in other_app_paths:
-        if path in sys.path:
-            sys.path.remove(path)
-    
+    sys.path[:] = [p for p in sys.path if not os.path.basename(p).startswith('app_')]
     # agents 모듈의 상대 import를 지원하기 위해 app_dir을 sys.path 맨 앞에 추가
-    if app_dir not in sys.path:
-        sys.path.insert(0, app_dir)
-    elif sys.path.index(app_dir) != 0:
-        # 이미 있지만 맨 앞이 아니면 맨 앞으로 이동
-        sys.path.remove(app_dir)
-        sys.path.insert(0, app_dir)
-    
+    sys.path.insert(0, app_dir)
+
     try:
+        # 이전에 로드된 일반 이름 agents 모듈과 같은 디바이스의 고유 이름 모듈 캐시 제거
+        # (다른 디바이스의 고유 이름 모듈은 유지 → 여러 디바이스 패키지 동시 보유 가능)
+        for module_name in list(sys.modules.keys()):
+            if (module_name == 'agents' or module_name.startswith('agents.') or
+                    module_name.startswith(f"{module_prefix}.")):
+                del sys.modules[module_name]
+
         # 1. agents.state 모듈 로드
         agents_state_path = os.path.join(app_dir, "agents", "state.py")
         if not os.path.exists(agents_state_path):
             raise FileNotFoundError(f"agents/state.py 파일을 찾을 수 없습니다: {agents_state_path}")
-        
+
         agents_state_spec = importlib.util.spec_from_file_location(
-            f"{module_prefix}.agents.state", 
+            f"{module_prefix}.agents.state",
             agents_state_path
         )
         agents_state_module = importlib.util.module_from_spec(agents_state_spec)
@@ -142,34 +152,7 @@ def run_device_analysis(device_type: str, video_path: str, llm_models: list, sav
         sys.modules[f"{module_prefix}.agents.state"] = agents_state_module
         sys.modules["agents.state"] = agents_state_module
         agents_state_spec.loader.exec_module(agents_state_module)
-        create_initial_state = agents_state_module.create_initial_state
-        
-        # graph_workflow가 agents 모듈을 import하기 전에 기존 agents 모듈 캐시 제거
-        # graph_workflow는 "from agents.xxx import ..."를 사용하므로, 
-        # sys.modules에 있는 기존 agents 모듈들이 재사용되지 않도록 제거
-        agents_modules_to_remove = []
-        for module_name in list(sys.modules.keys()):
-            # agents 패키지와 관련된 모든 모듈 제거
-            # 단, 방금 로드한 module_prefix.agents.state는 제외
-            if (module_name.startswith('agents.') or 
-                module_name == 'agents' or
-                (module_name.startswith('app_') and 'agents' in module_name and module_name != f"{module_prefix}.agents.state")):
-                agents_modules_to_remove.append(module_name)
-        
-        for module_name in agents_modules_to_remove:
-            del sys.modules[module_name]
-        
-        # sys.path 격리 상태 재확인 (graph_workflow 로드 전)
-        current_other_app_paths = [p for p in sys.path if os.path.basename(p).startswith('app_') and p != app_dir]
-        for path in current_other_app_paths:
-            if path in sys.path:
-                sys.path.remove(path)
-        
-        if app_dir not in sys.path or sys.path.index(app_dir) != 0:
-            if app_dir in sys.path:
-                sys.path.remove(app_dir)
-            sys.path.insert(0, app_dir)
-        
+
         # agents 패키지 자체를 올바른 경로에서 미리 로드
         # graph_workflow가 "from agents.xxx import ..."를 실행할 때 올바른 패키지를 사용하도록
         agents_init_path = os.path.join(app_dir, "agents", "__init__.py")
@@ -183,14 +166,14 @@ def run_device_analysis(device_type: str, video_path: str, llm_models: list, sav
             sys.modules["agents"] = agents_pkg
             sys.modules[f"{module_prefix}.agents"] = agents_pkg
             agents_pkg_spec.loader.exec_module(agents_pkg)
-            
+
             # agents의 하위 모듈들도 미리 로드하여 올바른 모듈이 사용되도록 보장
             agents_modules = [
                 ("agents.reporter_agent", "reporter_agent.py"),
                 ("agents.video_processor_agent", "video_processor_agent.py"),
                 ("agents.video_analyzer_agent", "video_analyzer_agent.py"),
             ]
-            
+
             for module_name, filename in agents_modules:
                 module_path = os.path.join(app_dir, "agents", filename)
                 if os.path.exists(module_path):
@@ -203,13 +186,13 @@ def run_device_analysis(device_type: str, video_path: str, llm_models: list, sav
                     sys.modules[module_name] = module
                     sys.modules[f"{module_prefix}.{module_name}"] = module
                     module_spec.loader.exec_module(module)
-        
+
         # 2. graph_workflow 모듈 로드
         # graph_workflow는 agents 모듈을 import하므로, sys.path 격리 상태에서 로드해야 함
         graph_workflow_path = os.path.join(app_dir, "graph_workflow.py")
         if not os.path.exists(graph_workflow_path):
             raise FileNotFoundError(f"graph_workflow.py 파일을 찾을 수 없습니다: {graph_workflow_path}")
-        
+
         graph_workflow_spec = importlib.util.spec_from_file_location(
             f"{module_prefix}.graph_workflow",
             graph_workflow_path
@@ -218,83 +201,245 @@ def run_device_analysis(device_type: str, video_path: str, llm_models: list, sav
         # 고유한 모듈 이름으로 등록하여 다른 device_type과 충돌 방지
         sys.modules[f"{module_prefix}.graph_workflow"] = graph_workflow_module
         graph_workflow_spec.loader.exec_module(graph_workflow_module)
-        create_workflow = graph_workflow_module.create_workflow
-        
-        # 3. app_server 모듈은 공통이므로 일반 import 사용
-        from app_server import class_MultimodalLLM_QA_251107 as mLLM
-        
-        print(f"[모듈 로드] {device_type} 모듈을 독립적으로 로드했습니다.")
-        print(f"  - agents.state: {agents_state_path}")
-        print(f"  - graph_workflow: {graph_workflow_path}")
-        
+
+        return {
+            "device_type": device_type,
+            "app_dir": app_dir,
+            "create_initial_state": agents_state_module.create_initial_state,
+            "create_workflow": graph_workflow_module.create_workflow,
+        }
+    except Exception:
+        unload_device_package(device_type)
+        raise
+    finally:
+        # 일반 이름 agents 모듈 제거 (다음 디바이스 패키지 로드 시 재사용되지 않도록)
+        for module_name in list(sys.modules.keys()):
+            if module_name == 'agents' or module_name.startswith('agents.'):
+                del sys.modules[module_name]
+        # sys.path 복원 (로드된 모듈은 고유 이름으로 sys.modules에 남아 있으므로 경로가 더 필요하지 않음)
+        sys.path[:] = original_sys_path
+
+
+def unload_device_package(device_type: str):
+    """
+    load_device_package로 로드한 모듈을 sys.modules에서 제거 (메모리 정리 및 다음 요청을 위한 준비)
+    단, app_server 모듈은 공통이므로 제거하지 않음
+    """
+    module_prefix = f"app_{device_type.replace('-', '_')}"
+    for module_name in list(sys.modules.keys()):
+        if module_name.startswith(f"{module_prefix}."):
+            del sys.modules[module_name]
+    _preloaded_packages.pop(device_type, None)
+    with _compiled_workflows_lock:
+        for key in [key for key in _compiled_workflows if key[0] == device_type]:
+            del _compiled_workflows[key]
+
+
+def preload_device_packages(device_types=DEVICE_TYPES) -> dict:
+    """
+    여러 디바이스 패키지를 이 프로세스에 미리 로드 (분석 워커 프로세스 시작 시 한 번 호출)
+    로드에 실패한 디바이스는 건너뛰며, 해당 디바이스 분석 시 run_device_analysis가 기존 방식으로 다시 로드
+
+    Returns:
+        미리 로드된 디바이스 패키지 (device_type -> load_device_package 결과)
+    """
+    # 공통 모듈 (class_MultimodalLLM_QA, class_Media_Edit 등)은 디바이스 패키지 로드 시 함께 import됨
+    from app_server import class_MultimodalLLM_QA_251107  # noqa: F401
+
+    for device_type in device_types:
+        if device_type in _preloaded_packages:
+            continue
+        try:
+            _preloaded_packages[device_type] = load_device_package(device_type)
+        except Exception as e:
+            print(f"[모듈 로드] {device_type} 미리 로드 실패 (분석 시 다시 로드): {e}")
+    print(f"[모듈 로드] 디바이스 패키지 {len(_preloaded_packages)}개 미리 로드: {', '.join(_preloaded_packages)}")
+    return _preloaded_packages
+
+
+def create_mllm_instances(llm_models: list) -> list:
+    """
+    각 모델의 provider에 따라 적절한 API 키를 사용하여 Multimodal LLM 인스턴스 생성
+
+    Raises:
+        ValueError: 모델 provider의 API 키가 설정되지 않은 경우
+    """
+    from app_server import class_MultimodalLLM_QA_251107 as mLLM
+
+    mllm_instances = []
+    for model_name in llm_models:
+        if "gemini" in model_name:
+            if not google_api_key:
+                raise ValueError(
+                    f"Google Gemini 모델({model_name})을 사용하려면 GOOGLE_API_KEY가 필요합니다.\n"
+                    ".env 파일에 'GOOGLE_API_KEY=your-key' 형식으로 추가하세요."
+                )
+            mllm_instances.append(mLLM.multimodalLLM(llm_name=model_name, api_key=google_api_key))
+        else:  # OpenAI 모델
+            if not openai_api_key:
+                raise ValueError(
+                    f"OpenAI 모델({model_name})을 사용하려면 OPENAI_API_KEY가 필요합니다.\n"
+                    ".env 파일에 'OPENAI_API_KEY=your-key' 형식으로 추가하세요."
+                )
+            mllm_instances.append(mLLM.multimodalLLM(llm_name=model_name, api_key=openai_api_key))
+    return mllm_instances
+
+
+def get_compiled_workflow(device_type: str, llm_models: list, mllm_instances: list):
+    """
+    미리 로드된 디바이스 패키지의 컴파일된 워크플로우 반환 ((device_type, 모델 리스트)별로 한 번만 생성/컴파일)
+
+    Args:
+        device_type: 디바이스 타입 (preload_device_packages로 미리 로드되어 있어야 함)
+        llm_models: 사용할 LLM 모델 리스트
+        mllm_instances: 처음 생성할 때 사용할 Multimodal LLM 인스턴스 (분석마다 workflow.run()에 다시 전달)
+    """
+    key = (device_type, tuple(llm_models))
+    with _compiled_workflows_lock:
+        workflow = _compiled_workflows.get(key)
+        if workflow is None:
+            workflow = _preloaded_packages[device_type]["create_workflow"](mllm_instances, llm_models)
+            _compiled_workflows[key] = workflow
+        return workflow
+
+
+def warm_up_workflows(llm_models: list):
+    """
+    미리 로드된 디바이스 패키지마다 llm_models 워크플로우를 미리 생성/컴파일하여 캐시
+    (LangGraph 그래프 컴파일과 에이전트/PromptBank 초기화 경로의 지연 import를 첫 분석 전에 끝내 둠)
+    """
+    try:
+        mllm_instances = create_mllm_instances(llm_models)
+    except ValueError as e:
+        print(f"[워크플로우 워밍업] 건너뜀: {e}")
+        return
+    for device_type in list(_preloaded_packages):
+        try:
+            get_compiled_workflow(device_type, llm_models, mllm_instances)
+        except Exception as e:
+            print(f"[워크플로우 워밍업] {device_type} 실패: {e}")
+    print(f"[워크플로우 워밍업] 컴파일된 워크플로우 {len(_compiled_workflows)}개 ({', '.join(llm_models)})")
+
+
+def run_device_analysis(device_type: str, video_path: str, llm_models: list, save_individual_report: bool = False, video_info: dict = None,
+                        journal_id: str = None, progress_callback=None):
+    """
+    특정 디바이스 타입에 대한 분석 실행
+    (preload_device_packages로 미리 로드된 디바이스 패키지가 있으면 재사용, 없으면 로드 후 분석이 끝나면 제거)
+    (미리 로드된 패키지는 컴파일된 워크플로우도 (device_type, 모델 리스트)별로 캐시하여 재사용)
+
+    Args:
+        device_type: 디바이스 타입 (예: 'pMDI_type1', 'DPI_type1' 등)
+        video_path: 분석할 비디오 파일 경로
+        llm_models: 사용할 LLM 모델 리스트
+        save_individual_report: 개별 에이전트 결과물에 대한 시각화 HTML 저장 여부 (기본값: False)
+        video_info: 업로드 ingest에서 미리 계산된 비디오 메타데이터 (기본값: None, 없으면 VideoProcessorAgent가 탐색)
+        journal_id: 분석 체크포인트 저널 ID (기본값: None, 저널 미사용)
+            같은 journal_id로 다시 실행하면 저널에 기록된 구간은 LLM 요청 없이 재사용 (중단된 분석 재개)
+        progress_callback: 진행 이벤트를 받을 함수 (기본값: None, analysis_progress.report 이벤트 dict 전달)
+
+    Returns:
+        분석 결과 상태
+    """
+    print("\n" + "="*80)
+    print(f"디바이스 타입: {device_type}")
+    print("="*80)
+
+    # 해당 디바이스 타입의 app 디렉토리 경로
+    app_dir = os.path.join(project_root, f"app_{device_type}")
+
+    if not os.path.exists(app_dir):
+        print(f"❌ 오류: {app_dir} 디렉토리가 존재하지 않습니다.")
+        return None
+
+    from app_server import analysis_journal, analysis_progress
+    package = _preloaded_packages.get(device_type)
+    preloaded = package is not None
+    analysis_progress.set_reporter(progress_callback)
+
+    try:
+        analysis_progress.report("start", models=len(llm_models), device_type=device_type)
+        if preloaded:
+            print(f"[모듈 로드] {device_type} 미리 로드된 모듈을 사용합니다. (PID: {os.getpid()})")
+        else:
+            package = load_device_package(device_type)
+            print(f"[모듈 로드] {device_type} 모듈을 독립적으로 로드했습니다.")
+            print(f"  - agents.state: {os.path.join(app_dir, 'agents', 'state.py')}")
+            print(f"  - graph_workflow: {os.path.join(app_dir, 'graph_workflow.py')}")
+        create_initial_state = package["create_initial_state"]
+        create_workflow = package["create_workflow"]
+
         print(f"LLM 모델 초기화 ({len(llm_models)}개):")
         for idx, model_name in enumerate(llm_models):
             print(f"  {idx+1}. {model_name}")
-        
+
         # 각 모델의 provider에 따라 적절한 API 키 사용하여 인스턴스 생성
-        mllm_instances = []
-        for model_name in llm_models:
-            if "gemini" in model_name:
-                if not google_api_key:
-                    raise ValueError(
-                        f"Google Gemini 모델({model_name})을 사용하려면 GOOGLE_API_KEY가 필요합니다.\n"
-                        ".env 파일에 'GOOGLE_API_KEY=your-key' 형식으로 추가하세요."
-                    )
-                mllm_instances.append(mLLM.multimodalLLM(llm_name=model_name, api_key=google_api_key))
-            else:  # OpenAI 모델
-                if not openai_api_key:
-                    raise ValueError(
-                        f"OpenAI 모델({model_name})을 사용하려면 OPENAI_API_KEY가 필요합니다.\n"
-                        ".env 파일에 'OPENAI_API_KEY=your-key' 형식으로 추가하세요."
-                    )
-                mllm_instances.append(mLLM.multimodalLLM(llm_name=model_name, api_key=openai_api_key))
-        
+        mllm_instances = create_mllm_instances(llm_models)
+
         print(f"\n분석할 비디오: {video_path}")
-        
+
         # 첫 번째 모델의 API 키를 전달
         first_model_api_key = google_api_key if "gemini" in llm_models[0] else openai_api_key
-        
+
+        # 분석 체크포인트 저널 경로 (VideoAnalyzerAgent가 구간마다 기록/재사용)
+        journal_path = analysis_journal.journal_path(journal_id) if journal_id else None
+        if journal_path:
+            journal = analysis_journal.get_journal(journal_path)
+            if journal is not None and len(journal) > 0:
+                print(f"[분석 저널] 중단된 분석 재개: 기록된 구간 {len(journal)}개 재사용 ({journal_id})")
+
         # 초기 상태 생성
+        # app_dir: reporter_agent가 올바른 경로에 개별 시각화 HTML을 저장하도록
         initial_state = create_initial_state(
             video_path=video_path,
             llm_models=llm_models,
             api_key=first_model_api_key,
-            save_individual_report=save_individual_report
+            save_individual_report=save_individual_report,
+            video_info=video_info,
+            app_dir=app_dir,
+            journal_path=journal_path
         )
-        
-        # app_dir 정보를 initial_state에 추가 (reporter_agent가 올바른 경로를 사용하도록)
-        # TypedDict에 없는 필드이지만 런타임에는 문제없음
-        initial_state["app_dir"] = app_dir
-        
-        # 워크플로우 생성
-        workflow = create_workflow(mllm_instances, llm_models)
-        
-        # 워크플로우 실행 전에 sys.path 격리 상태 확인 및 유지
-        # 다른 app_* 경로가 다시 추가되었는지 확인하고 제거
-        current_other_app_paths = [p for p in sys.path if os.path.basename(p).startswith('app_') and p != app_dir]
-        for path in current_other_app_paths:
-            if path in sys.path:
-                sys.path.remove(path)
-        
-        # app_dir이 맨 앞에 있는지 확인
-        if app_dir not in sys.path:
-            sys.path.insert(0, app_dir)
-        elif sys.path.index(app_dir) != 0:
-            sys.path.remove(app_dir)
-            sys.path.insert(0, app_dir)
-        
-        # 워크플로우 실행 (sys.path 격리 상태 유지)
-        final_state = workflow.run(initial_state)
+
+        # 워크플로우 생성 (미리 로드된 패키지는 컴파일된 워크플로우 재사용)
+        if preloaded:
+            workflow = get_compiled_workflow(device_type, llm_models, mllm_instances)
+        else:
+            workflow = create_workflow(mllm_instances, llm_models)
+
+        # 워크플로우 실행 (이번 분석의 LLM 인스턴스 주입)
+        # (디바이스 모듈은 고유 이름으로 로드되어 있고 reporter_agent는 state의 app_dir을 사용하므로 sys.path 격리 불필요)
+        final_state = workflow.run(initial_state, mllm_instances)
+
+        # LLM 응답 캐시 통계 출력
+        from app_server import llm_cache
+        cache = llm_cache.get_llm_cache()
+        if cache is not None:
+            stats = cache.stats()
+            print(f"[LLM 캐시] mode={stats['mode']}, hit {stats['hits']} / miss {stats['misses']} "
+                  f"(hit rate {stats['hit_rate']:.0%}), 저장 {stats['entries']}개 ({stats['size_bytes'] / 1024:.0f}KB)")
+
+        # 분석 저널 통계 (재사용/새로 기록한 구간 수)
+        if journal_path:
+            journal = analysis_journal.get_journal(journal_path)
+            if journal is not None:
+                print(f"[분석 저널] 재사용 {journal.resumed}개 구간, 새로 기록 {journal.recorded}개 구간")
+
+        # provider/모델별 rate limiter 상태 출력 (AIMD 동시 요청 수)
+        from app_server import rate_limiter
+        limiter = rate_limiter.get_rate_limiter()
+        if limiter is not None:
+            for key, limiter_stats in limiter.stats().items():
+                print(f"[rate limiter] {key}: 동시 요청 한도 {limiter_stats['concurrency']}, 진행 중 {limiter_stats['in_flight']}")
 
         # 결과 출력
         if final_state["status"] == "completed":
             print("\n✅ 분석이 성공적으로 완료되었습니다!")
-            
+
             if final_state.get("final_report"):
                 report = final_state["final_report"]
                 # 분석 결과 요약 출력
                 print_analysis_summary(report)
-            
+
             print(f"\n총 {len(final_state['agent_logs'])}개의 Agent 로그가 기록되었습니다.")
         else:
             print("\n❌ 분석 중 오류가 발생했습니다.")
@@ -302,46 +447,22 @@ def run_device_analysis(device_type: str, video_path: str, llm_models: list, sav
                 print("오류 목록:")
                 for error in final_state["errors"]:
                     print(f"  - {error}")
-        
+
         return final_state
-        
+
     except Exception as e:
         print(f"❌ {device_type} 분석 중 오류 발생: {e}")
         import traceback
         traceback.print_exc()
         return None
     finally:
-        # 로드한 모듈을 sys.modules에서 제거 (메모리 정리 및 다음 요청을 위한 준비)
-        # 단, app_server 모듈은 공통이므로 제거하지 않음
-        modules_to_remove = [
-            f"{module_prefix}.agents.state",
-            f"{module_prefix}.graph_workflow"
-        ]
-        for module_name in modules_to_remove:
-            if module_name in sys.modules:
-                del sys.modules[module_name]
-        
-        # agents 패키지 관련 모듈도 제거 (상대 import로 로드된 모듈들)
-        agents_modules_to_remove = [
-            f"{module_prefix}.agents",
-            f"{module_prefix}.agents.video_processor_agent",
-            f"{module_prefix}.agents.video_analyzer_agent",
-            f"{module_prefix}.agents.reporter_agent",
-        ]
-        for module_name in agents_modules_to_remove:
-            if module_name in sys.modules:
-                del sys.modules[module_name]
-        
-        # sys.path 복원: 다른 app_* 경로들을 다시 추가
-        # 단, app_dir은 제거 (다음 요청을 위해)
-        if app_dir in sys.path:
-            sys.path.remove(app_dir)
-        
-        # 원래 있던 다른 app_* 경로들을 복원
-        for path in other_app_paths:
-            if path not in sys.path:
-                # 원래 위치에 가깝게 복원 (하지만 정확한 위치는 보장하지 않음)
-                sys.path.append(path)
+        analysis_progress.clear_reporter()
+        # 미리 로드된 패키지가 아니면 로드한 모듈을 sys.modules에서 제거
+        if not preloaded:
+            unload_device_package(device_type)
+        # 저널 파일 핸들 정리 (워커 프로세스가 다음 분석에서 같은 저널의 이전 인스턴스를 재사용하지 않도록)
+        if journal_id:
+            analysis_journal.close_journal(analysis_journal.journal_path(journal_id))
 
 
 def main():
@@ -352,7 +473,7 @@ def main():
     # 사용자 지정 변수
     # ========================================
     video_path = r"/workspaces/AI_inhaler/app_server/test_clip.mp4"
-    device_list = ['pMDI_type1', 'pMDI_type2', 'DPI_type1', 'DPI_type2', 'DPI_type3', 'SMI_type1']
+    device_list = list(DEVICE_TYPES)
     device_type = device_list[1]
 
     # "gpt-4.1", "gpt-5-nano", "gpt-5.1", "gpt-5.2"
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+extract_frames_to_MxN_image 프레임 읽기 벤치마크
+프레임마다 seek하는 기존 방식('seek')과 seek 계획 방식('auto': 한 번 seek 후 grab으로 건너뜀)의
+초당 그리드 생성 수(grids/sec)를 비교합니다.
+
+사용법:
+    python benchmark_extract_frames.py [비디오 경로] [--grids N] [--duration 초]
+    (비디오 경로를 생략하면 1080p 30fps 합성 비디오를 임시로 생성하여 사용)
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+import cv2
+
+app_server_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(app_server_dir)
+
+import class_Media_Edit_251107 as ME
+
+
+def create_synthetic_video(video_path, seconds=30, fps=30, size=(1920, 1080)):
+    """움직이는 패턴이 있는 1080p 합성 비디오 생성 (키프레임 간격은 코덱 기본값)"""
+    width, height = size
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    writer = cv2.VideoWriter(video_path, fourcc, fps, size)
+    base = np.random.default_rng(0).integers(0, 255, (height // 8, width // 8, 3), dtype=np.uint8)
+    base = cv2.resize(base, size, interpolation=cv2.INTER_LINEAR)
+    for i in range(int(seconds * fps)):
+        frame = np.roll(base, i * 4, axis=1)
+        cv2.putText(frame, f"{i:05d}", (50, 150), cv2.FONT_HERSHEY_SIMPLEX, 4, (255, 255, 255), 8)
+        writer.write(frame)
+    writer.release()
+
+
+def run_benchmark(media_edit, video_path, seek_strategy, windows, MxN, gridSize, padSize):
+    """주어진 seek 방식으로 모든 구간의 그리드를 생성하고 (grids/sec, 그리드 목록)을 반환"""
+    grids = []
+    start_time = time.perf_counter()
+    for start, end in windows:
+        grid, _, _ = media_edit.extract_frames_to_MxN_image(
+            'time', start, end, MxN, video_path,
+            gridSize=gridSize, padSize=padSize, seek_strategy=seek_strategy
+        )
+        grids.append(grid)
+    elapsed = time.perf_counter() - start_time
+    return len(windows) / elapsed if elapsed > 0 else float('inf'), grids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="extract_frames_to_MxN_image seek 방식 벤치마크")
+    parser.add_argument("video_path", nargs="?", default=None, help="1080p 스마트폰 비디오 경로 (생략 시 합성 비디오 생성)")
+    parser.add_argument("--grids", type=int, default=20, help="생성할 그리드 수 (기본값: 20)")
+    parser.add_argument("--duration", type=float, default=2.0, help="그리드 1개의 구간 길이(초) (기본값: 2.0)")
+    args = parser.parse_args()
+
+    temp_dir = None
+    video_path = args.video_path
+    if video_path is None:
+        temp_dir = tempfile.TemporaryDirectory()
+        video_path = os.path.join(temp_dir.name, "synthetic_1080p.mp4")
+        print("1080p 합성 비디오 생성 중...")
+        create_synthetic_video(video_path)
+
+    media_edit = ME.MediaEdit()
+    _, video_length, total_frames, video_width, video_height, _ = media_edit.query_videoInfo(video_path)
+    if video_length is None:
+        print(f"❌ 비디오 정보를 읽을 수 없습니다: {video_path}")
+        sys.exit(1)
+
+    # 비디오 전체에 걸쳐 구간을 균등 배치 (search 반복과 유사한 패턴)
+    last_start = max(0.0, video_length - args.duration)
+    windows = [(round(last_start * i / max(1, args.grids - 1), 3), 0.0) for i in range(args.grids)]
+    windows = [(start, min(video_length, start + args.duration)) for start, _ in windows]
+
+    MxN, gridSize, padSize = (3, 3), (640, 360), (0, 0)  # VideoProcessorAgent.extract_frames 기본 설정
+
+    print("=" * 80)
+    print(f"비디오: {video_path}")
+    print(f"해상도: {video_width}x{video_height}, 프레임 수: {total_frames}, 길이: {video_length:.2f}초")
+    print(f"그리드: {args.grids}개 x {MxN[0]}x{MxN[1]} 프레임, 구간 {args.duration}초")
+    print("=" * 80)
+
+    before, before_grids = run_benchmark(media_edit, video_path, 'seek', windows, MxN, gridSize, padSize)
+    after, after_grids = run_benchmark(media_edit, video_path, 'auto', windows, MxN, gridSize, padSize)
+
+    identical = all(
+        a is not None and b is not None and np.array_equal(a, b)
+        for a, b in zip(before_grids, after_grids)
+    )
+    print(f"  before (프레임마다 seek): {before:8.2f} grids/sec")
+    print(f"  after  (seek 계획+grab) : {after:8.2f} grids/sec")
+    print(f"  속도 향상: x{after / before:.2f}" if before > 0 else "  속도 향상: N/A")
+    print(f"  결과 일치: {'✅' if identical else '❌'}")
+
+    if temp_dir is not None:
+        temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
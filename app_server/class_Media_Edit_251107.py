@@ -3,10 +3,338 @@ import os
 import numpy as np
 from pathlib import Path
 import uuid
+import json
+import shutil
+import tempfile
+import threading
+import subprocess
+from collections import OrderedDict
+
+# 프레임 세션 설정
+# 세션당 디코딩 프레임 캐시 상한 (병렬 analyzer 간 시간 차이 흡수용, 그리드 셀 크기로 축소하여 보관)
+# 64MB = 640x360 셀 약 90장 (1080p 원본 프레임으로는 약 10장)
+FRAME_SESSION_CACHE_BYTES = 64 * 1024 * 1024
+
+# 그리드 캐시 설정
+FRAME_GRID_CACHE_SIZE = 32  # 보관할 그리드 이미지 최대 개수 (일부 analyzer가 먼저 탐색을 끝낸 경우의 상한)
+FRAME_GRID_PREFETCH_MAX = 8  # 동시에 미리 생성 중인 그리드 최대 개수 (prefetch 대기열 상한)
+
+# 저해상도 프레임 저장소 설정 (업로드 시 1회 디코딩 → .npy memmap)
+FRAME_STORE_CELL_SIZE = (640, 360)  # analyzer 그리드 셀 크기와 동일 (리사이즈 없이 슬라이싱만으로 그리드 생성)
+FRAME_STORE_TARGET_FPS = 20  # 저장 프레임레이트 하한 기준 (analyzer 최소 샘플링 간격 0.05초)
+# 비디오당 저장소 크기 상한 (기본 2GB, 640x360 @30fps 기준 약 100초 분량)
+# 초과하는 비디오는 앞부분만 저장하고, 저장소 밖 구간은 원본 디코딩 경로 사용 (업로드 보관 기간 동안 디스크 점유)
+FRAME_STORE_MAX_BYTES = int(os.getenv("FRAME_STORE_MAX_MB", "2048")) * 1024 * 1024
+
+# seek 계획 설정
+SEEK_GOP_SECONDS = 1.0  # 추정 GOP 길이 (스마트폰 H.264/HEVC 기본 키프레임 간격 약 1초)
+
+# ffmpeg stream copy 설정 (재인코딩 없이 잘라내기/분할, 미설치 시 OpenCV 디코딩 경로 사용)
+FFMPEG_PATH = os.getenv("FFMPEG_PATH") or shutil.which("ffmpeg")
+FFMPEG_TIMEOUT = 600  # 초
+
+
+def estimate_gop_frames(fps, gop_seconds=SEEK_GOP_SECONDS):
+    """fps로부터 GOP(키프레임 간격) 프레임 수를 추정합니다. (OpenCV는 키프레임 정보를 제공하지 않음)"""
+    if not fps or fps <= 0:
+        return 30
+    return max(1, int(round(fps * gop_seconds)))
+
+
+def plan_frame_reads(frame_indices, position, gop_frames):
+    """
+    프레임 번호 목록을 읽기 위한 seek/grab/retrieve 계획을 생성합니다.
+
+    - 다음 프레임까지의 간격이 GOP 이하이면 seek 없이 grab()으로 건너뜀 (이미 디코딩 중인 GOP를 재사용)
+    - 간격이 GOP보다 크거나 이미 지나간 프레임이면 seek (seek 비용 ≈ 키프레임부터 재디코딩)
+    Args:
+        frame_indices: 읽을 프레임 번호 목록 (중복/역순 허용, 내부에서 정렬)
+        position: 다음 grab()/read()가 반환할 프레임 번호 (None이면 알 수 없음 → 첫 프레임에서 seek)
+        gop_frames: GOP 프레임 수
+    Returns:
+        list: [('seek', frame_index) | ('grab', count) | ('retrieve', frame_index), ...]
+    """
+    plan = []
+    for frame_index in sorted(set(frame_indices)):
+        gap = None if position is None else frame_index - position
+        if gap is None or gap < 0 or gap > gop_frames:
+            plan.append(('seek', frame_index))
+        elif gap > 0:
+            plan.append(('grab', gap))
+        plan.append(('retrieve', frame_index))
+        position = frame_index + 1
+    return plan
+
+
+def execute_frame_plan(capture, plan, position):
+    """
+    plan_frame_reads()의 계획을 실행합니다.
+    Returns:
+        dict: {frame_index: frame} (실패한 지점 이전까지)
+        int/None: 실행 후 디코딩 위치 (알 수 없으면 None)
+    """
+    frames = {}
+    for action, value in plan:
+        if action == 'seek':
+            capture.set(cv2.CAP_PROP_POS_FRAMES, value)
+            position = value
+        elif action == 'grab':
+            # 건너뛸 프레임은 grab()만 수행 (디코딩된 프레임을 BGR로 변환하지 않음)
+            for _ in range(value):
+                if not capture.grab():
+                    return frames, None
+            position += value
+        else:  # retrieve
+            if not capture.grab():
+                return frames, None
+            success, frame = capture.retrieve()
+            position = value + 1
+            if not success or frame is None:
+                return frames, position
+            frames[value] = frame
+    return frames, position
+
+
+class VideoFrameSession:
+    """
+    비디오 1개에 대해 VideoCapture를 한 번만 열어 두고 프레임을 제공하는 세션
+
+    [디코딩 재사용]
+    - 요청된 프레임이 현재 디코딩 위치보다 앞에 있으면 seek 없이 grab()으로 순방향 진행
+    - 한 번 디코딩한 프레임은 그리드 셀 크기로 축소하여 LRU 캐시(max_cache_bytes)에 보관하고 재요청 시 메모리에서 바로 반환
+    - 이미 지나간 프레임이 캐시에 없거나 GOP보다 멀리 떨어진 경우에만 seek 수행 (plan_frame_reads)
+
+    [스레드 안전]
+    - 병렬 analyzer 노드가 하나의 세션을 공유하므로 모든 디코딩은 lock으로 직렬화
+    """
+
+    def __init__(self, video_path, max_cache_bytes=FRAME_SESSION_CACHE_BYTES):
+        self.video_path = video_path
+        self.max_cache_bytes = max_cache_bytes
+        self.capture = cv2.VideoCapture(video_path)
+        if not self.capture.isOpened():
+            raise ValueError(f"비디오를 열 수 없습니다: {video_path}")
+
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS)
+        self.frame_count = int(self.capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.gop_frames = estimate_gop_frames(self.fps)
+        self._next_index = 0  # 다음 grab()/read()가 반환할 프레임 번호 (None이면 알 수 없음)
+        self._cache = OrderedDict()  # (frame_index, cell_size) -> frame (LRU)
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+
+    def read_frames(self, frame_indices, cell_size=None):
+        """
+        지정된 프레임 번호들의 프레임 리스트를 반환합니다. (요청 순서 유지)
+        cell_size (너비, 높이)를 지정하면 그 크기로 축소한 프레임을 반환/캐시합니다. (그리드 합성과 같은 보간법)
+        하나라도 읽지 못하면 None을 반환합니다.
+        """
+        cell_size = tuple(cell_size) if cell_size else None
+        with self._lock:
+            if self.capture is None:
+                return None
+
+            decoded = {}
+            missing = []
+            for frame_index in set(frame_indices):
+                frame = self._cache.get((frame_index, cell_size))
+                if frame is not None:
+                    self._cache.move_to_end((frame_index, cell_size))
+                    decoded[frame_index] = frame
+                else:
+                    missing.append(frame_index)
+
+            if missing:
+                plan = plan_frame_reads(missing, self._next_index, self.gop_frames)
+                frames, self._next_index = execute_frame_plan(self.capture, plan, self._next_index)
+                for frame_index in sorted(missing):
+                    frame = frames.get(frame_index)
+                    if frame is None:
+                        print(f"프레임 {frame_index}을 읽을 수 없습니다.")
+                        return None
+                    if cell_size is not None:
+                        frame = cv2.resize(frame, cell_size)
+                    self._cache[(frame_index, cell_size)] = frame
+                    self._cache_bytes += frame.nbytes
+                    decoded[frame_index] = frame
+                while self._cache_bytes > self.max_cache_bytes and len(self._cache) > 1:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cache_bytes -= evicted.nbytes
+
+            return [decoded[frame_index] for frame_index in frame_indices]
+
+    def close(self):
+        """VideoCapture 해제 및 캐시 정리"""
+        with self._lock:
+            if self.capture is not None:
+                self.capture.release()
+                self.capture = None
+            self._cache.clear()
+            self._cache_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+
+class _GridEntry:
+    """FrameGridCache 내부 항목 (생성 완료 이벤트 + 결과 + 참조 횟수)"""
+
+    def __init__(self):
+        self.ready = threading.Event()
+        self.value = None
+        self.refs = 0
+        self.failed = False  # 생성(prefetch 포함)이 실패/취소된 경우 (기다리던 요청은 직접 생성)
+
+
+class FrameGridCache:
+    """
+    병렬 analyzer 노드가 공유하는 그리드 이미지 캐시 (스레드 안전, 참조 횟수 기반 해제)
+
+    - 키: (video_path, start, end, MxN, gridSize, padSize)
+    - 같은 키를 처음 요청한 analyzer가 그리드를 생성하고, 생성 중 도착한 요청은 완료를 기다렸다가 동일한 결과를 받음
+    - consumers 수만큼 가져가면 즉시 해제, 그 전이라도 max_entries를 넘으면 오래된 항목부터 해제
+    - 반환된 이미지 배열은 여러 analyzer가 공유하므로 수정하지 않아야 함
+    - prefetch(): 곧 요청될 그리드를 백그라운드 executor에서 미리 생성 (가져간 횟수에는 포함하지 않음)
+    """
+
+    def __init__(self, consumers=1, max_entries=FRAME_GRID_CACHE_SIZE, max_prefetch=FRAME_GRID_PREFETCH_MAX):
+        self.consumers = consumers
+        self.max_entries = max_entries
+        self.max_prefetch = max_prefetch
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self._prefetching = 0
+        self._entries = OrderedDict()  # key -> _GridEntry
+        self._lock = threading.Lock()
+
+    def prefetch(self, key, build_fn, executor):
+        """
+        key에 해당하는 결과가 없으면 executor에서 build_fn()으로 미리 생성합니다.
+        이미 있거나 생성 중인 prefetch가 max_prefetch개 이상이면 아무것도 하지 않습니다.
+
+        Returns:
+            bool: 새로 예약했으면 True
+        """
+        with self._lock:
+            if key in self._entries or self._prefetching >= self.max_prefetch:
+                return False
+            entry = _GridEntry()
+            self._entries[key] = entry
+            self._prefetching += 1
+            self.misses += 1
+            self.prefetched += 1
+
+        def build():
+            entry.value = build_fn()
+
+        def done(future):
+            with self._lock:
+                self._prefetching -= 1
+                if future.cancelled() or future.exception() is not None:
+                    entry.failed = True
+                    if self._entries.get(key) is entry:
+                        del self._entries[key]
+            entry.ready.set()
+
+        try:
+            future = executor.submit(build)
+        except RuntimeError:  # executor가 종료된 경우
+            with self._lock:
+                self._prefetching -= 1
+                self._entries.pop(key, None)
+            entry.failed = True
+            entry.ready.set()
+            return False
+        future.add_done_callback(done)
+        return True
+
+    def get_or_build(self, key, build_fn):
+        """key에 해당하는 결과를 반환합니다. 없으면 build_fn()으로 생성합니다."""
+        with self._lock:
+            entry = self._entries.get(key)
+            is_builder = entry is None
+            if is_builder:
+                entry = _GridEntry()
+                self._entries[key] = entry
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+
+        if is_builder:
+            try:
+                entry.value = build_fn()
+            except BaseException:
+                # 실패한 항목을 남기면 기다리던/이후 요청이 None을 받으므로 제거 (다음 요청이 다시 생성)
+                with self._lock:
+                    entry.failed = True
+                    if self._entries.get(key) is entry:
+                        del self._entries[key]
+                raise
+            finally:
+                entry.ready.set()
+        else:
+            entry.ready.wait()
+            if entry.failed:
+                return self.get_or_build(key, build_fn)
+
+        with self._lock:
+            entry.refs += 1
+            if entry.refs >= self.consumers and self._entries.get(key) is entry:
+                del self._entries[key]
+            while len(self._entries) > self.max_entries:
+                oldest_key, oldest_entry = next(iter(self._entries.items()))
+                if not oldest_entry.ready.is_set():
+                    break
+                del self._entries[oldest_key]
+        return entry.value
+
+    def clear(self):
+        """모든 항목 해제"""
+        with self._lock:
+            self._entries.clear()
+
+
+class FrameStore:
+    """
+    업로드 시 생성된 저해상도 프레임 저장소 (읽기 전용 np.memmap)
+
+    - <비디오명>_frames.npy: (프레임 수, H, W, 3) uint8 배열
+    - <비디오명>_frames.json: fps, stride, 셀 크기, 타임스탬프 인덱스
+    - 여러 분석 프로세스가 같은 파일을 memmap으로 열면 OS 페이지 캐시를 통해 프레임을 공유
+    """
+
+    def __init__(self, npy_path, index):
+        self.npy_path = npy_path
+        self.fps = index["fps"]
+        self.stride = index["stride"]
+        self.cell_size = tuple(index["cell_size"])
+        self.num_frames = index["num_frames"]
+        self.timestamps = index.get("timestamps", [])
+        self.frames = np.load(npy_path, mmap_mode='r')
+
+    def read_frames(self, frame_indices):
+        """
+        원본 프레임 번호들에 해당하는 저장 프레임 리스트를 반환합니다.
+        stride 사이의 프레임은 가장 가까운 저장 프레임으로 대체합니다. (오차 stride/2 프레임 이내)
+        저장 범위 밖(음수 또는 저장된 앞부분 이후)의 프레임이 하나라도 있으면 None을 반환합니다.
+        """
+        rows = []
+        for frame_index in frame_indices:
+            if frame_index < 0 or frame_index >= self.num_frames * self.stride:
+                return None
+            row = min((frame_index + self.stride // 2) // self.stride, self.num_frames - 1)
+            rows.append(row)
+        return [self.frames[row] for row in rows]
+
 
 class MediaEdit:
     def __init__(self):
-        pass
+        self._frame_stores = {}  # video_path -> FrameStore (없으면 None)
     
 
     def _open_video(self, video_path):
@@ -17,6 +345,123 @@ class MediaEdit:
             return None
         return capture
     
+
+    def open_frame_session(self, video_path, max_cache_bytes=FRAME_SESSION_CACHE_BYTES):
+        """비디오 프레임 세션을 열어 반환합니다. 열 수 없으면 None을 반환합니다."""
+        try:
+            return VideoFrameSession(video_path, max_cache_bytes=max_cache_bytes)
+        except ValueError as e:
+            print(e)
+            return None
+
+
+    def frame_store_paths(self, video_path):
+        """비디오 파일 옆에 생성되는 프레임 저장소 경로 (.npy, .json)를 반환합니다."""
+        base = os.path.splitext(video_path)[0]
+        return f"{base}_frames.npy", f"{base}_frames.json"
+
+
+    def build_frame_store(self, video_path, cell_size=FRAME_STORE_CELL_SIZE, max_bytes=FRAME_STORE_MAX_BYTES):
+        """
+        비디오를 한 번 디코딩하여 cell_size로 축소한 프레임을 연속된 uint8 .npy 배열로 저장합니다.
+        FRAME_STORE_TARGET_FPS 이상을 유지하는 범위에서 프레임을 stride 간격으로 저장합니다.
+        전체 크기가 max_bytes를 넘으면 max_bytes에 들어가는 앞부분만 저장합니다. (FrameStore.read_frames가 범위 밖은 None 반환)
+        인덱스(.json)는 배열 저장이 끝난 뒤 마지막에 기록되므로, 인덱스가 있으면 저장소가 완성된 것입니다.
+        Returns:
+            str: 생성된 .npy 경로 (생성하지 않았으면 None)
+        """
+        npy_path, index_path = self.frame_store_paths(video_path)
+        if os.path.exists(npy_path) and os.path.exists(index_path):
+            return npy_path
+
+        capture = self._open_video(video_path)
+        if capture is None:
+            return None
+
+        tmp_npy_path = f"{os.path.splitext(npy_path)[0]}_{uuid.uuid4().hex[:8]}.tmp.npy"
+        try:
+            fps = capture.get(cv2.CAP_PROP_FPS)
+            total_frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+            if fps <= 0 or total_frames <= 0:
+                print(f"프레임 저장소 생성 불가 (fps={fps}, frames={total_frames}): {video_path}")
+                return None
+
+            stride = max(1, int(fps // FRAME_STORE_TARGET_FPS))
+            capacity = (total_frames + stride - 1) // stride
+            cell_width, cell_height = cell_size
+            frame_bytes = cell_width * cell_height * 3
+            if capacity * frame_bytes > max_bytes:
+                limited = max_bytes // frame_bytes
+                print(f"프레임 저장소 크기 제한: 예상 크기 {capacity * frame_bytes / (1024*1024):.0f}MB > 상한 {max_bytes / (1024*1024):.0f}MB "
+                      f"→ 앞부분 {limited * stride / fps:.1f}초만 저장")
+                capacity = limited
+            if capacity <= 0:
+                return None
+
+            frames = np.lib.format.open_memmap(tmp_npy_path, mode='w+', dtype=np.uint8,
+                                               shape=(capacity, cell_height, cell_width, 3))
+            timestamps = []
+            num_frames = 0
+            frame_index = 0
+            while num_frames < capacity:
+                # 저장하지 않는 프레임은 grab()만 수행 (BGR 변환 생략)
+                if frame_index % stride != 0:
+                    if not capture.grab():
+                        break
+                    frame_index += 1
+                    continue
+                success, frame = capture.read()
+                if not success or frame is None:
+                    break
+                frames[num_frames] = cv2.resize(frame, (cell_width, cell_height))  # 기존 그리드 생성과 동일한 보간법
+                timestamps.append(round(frame_index / fps, 4))
+                num_frames += 1
+                frame_index += 1
+            frames.flush()
+            del frames
+
+            os.replace(tmp_npy_path, npy_path)
+            index = {
+                "fps": fps,
+                "stride": stride,
+                "cell_size": [cell_width, cell_height],
+                "num_frames": num_frames,
+                "source_frame_count": total_frames,
+                "timestamps": timestamps,
+            }
+            tmp_index_path = f"{index_path}.{uuid.uuid4().hex[:8]}.tmp"
+            with open(tmp_index_path, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.replace(tmp_index_path, index_path)
+            print(f"프레임 저장소 생성 완료: {npy_path} ({num_frames}프레임, stride={stride}, {cell_width}x{cell_height})")
+            return npy_path
+        finally:
+            capture.release()
+            if os.path.exists(tmp_npy_path):
+                try:
+                    os.remove(tmp_npy_path)
+                except OSError:
+                    pass
+
+
+    def load_frame_store(self, video_path):
+        """비디오에 대한 프레임 저장소를 memmap으로 열어 반환합니다. 없거나 손상되었으면 None을 반환합니다."""
+        if video_path in self._frame_stores:
+            return self._frame_stores[video_path]
+
+        store = None
+        npy_path, index_path = self.frame_store_paths(video_path)
+        if os.path.exists(npy_path) and os.path.exists(index_path):
+            try:
+                with open(index_path, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+                store = FrameStore(npy_path, index)
+            except Exception as e:
+                print(f"프레임 저장소를 열 수 없습니다: {npy_path} - {e}")
+                store = None
+        self._frame_stores[video_path] = store
+        return store
+
     
     # 파일명에 한글 포함되었을 때
     # [다중 사용자 지원] UUID 기반 고유 임시 파일명 사용
@@ -126,15 +571,16 @@ class MediaEdit:
         print("비디오 처리를 시작합니다.")
         count = 0
         frame_index = 0
-        success, frame = capture.read()
         total_frames = 0
-        while success:
+        # 건너뛸 프레임은 grab()만 수행하고, 저장할 프레임만 retrieve()로 BGR 변환
+        while capture.grab():
             if count == frame_index * interval:
+                success, frame = capture.retrieve()
+                if not success:
+                    break
                 out.write(frame)
                 frame_index += 1
                 total_frames += 1
-
-            success, frame = capture.read()
             count += 1
 
         out.release()
@@ -150,7 +596,7 @@ class MediaEdit:
         return output_file, play_time, total_frames
 
     # 핵심 함수
-    def extract_frames_to_MxN_image(self, option, start, end, MxN, video_path, output_dir=None, gridSize=(1920, 1080), padSize=(10, 10)):
+    def extract_frames_to_MxN_image(self, option, start, end, MxN, video_path, output_dir=None, gridSize=(1920, 1080), padSize=(10, 10), session=None, seek_strategy='auto'):
         """
         비디오의 지정된 구간에서 MxN 개의 프레임을 추출하여 지정된 크기의 그리드에 맞추어 하나의 PNG 이미지로 저장합니다.
         output_dir가 존재하면 출력 파일 경로를 반환하며, None이면 이미지 배열을 반환합니다.
@@ -163,67 +609,140 @@ class MediaEdit:
             output_dir (str): 출력 파일 경로 (기본값: None)
             gridSize (tuple): 그리드의 크기 (기본값: (1920, 1080))
             padSize (tuple): 그리드 간격 (기본값: (10, 10))
+            session (VideoFrameSession): 열려 있는 프레임 세션 (기본값: None, 지정 시 VideoCapture를 새로 열지 않음)
+            seek_strategy (str): VideoCapture 경로의 seek 방식 'auto' 또는 'seek' (기본값: 'auto', plan_frame_reads 참고)
         Returns:
             str/array: output_dir가 존재하면 출력 파일 경로, None이면 이미지 배열을 반환
             int: 그리드의 너비
             int: 그리드의 높이
         """
         
-        capture = self._open_video(video_path)
-        if capture is None:
-            return None, gridSize[0], gridSize[1]
-
-        fps = capture.get(cv2.CAP_PROP_FPS)
+        # 프레임 소스 우선순위: 프레임 저장소(memmap) → 프레임 세션 → VideoCapture
+        store = self.load_frame_store(video_path)
+        capture = None
+        if session is not None and session.video_path != video_path:
+            session = None
+        if store is not None:
+            fps = store.fps
+        elif session is not None:
+            fps = session.fps
+        else:
+            capture = self._open_video(video_path)
+            if capture is None:
+                return None, gridSize[0], gridSize[1]
+            fps = capture.get(cv2.CAP_PROP_FPS)
         #total_frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
 
-        if option == 'time':
-            start_frame = int(start * fps)
-            end_frame = int(end * fps)
-        elif option == 'frame':
-            start_frame = start
-            end_frame = end
-        else:
-            print("잘못된 옵션입니다. 'time' 또는 'frame'을 선택하세요.")
-            capture.release()
-            return None, gridSize[0], gridSize[1]
-        
-        #print("비디오 처리를 시작합니다.")
-        num_frames = MxN[0] * MxN[1]
-        frame_interval = max((end_frame - start_frame) // num_frames, 1)
-        
+        try:
+            if option == 'time':
+                start_frame = int(start * fps)
+                end_frame = int(end * fps)
+            elif option == 'frame':
+                start_frame = start
+                end_frame = end
+            else:
+                print("잘못된 옵션입니다. 'time' 또는 'frame'을 선택하세요.")
+                return None, gridSize[0], gridSize[1]
+            
+            #print("비디오 처리를 시작합니다.")
+            num_frames = MxN[0] * MxN[1]
+            frame_interval = max((end_frame - start_frame) // num_frames, 1)
+            frame_indices = [start_frame + i * frame_interval for i in range(num_frames)]
+            
+            selected_frames = None
+            if store is not None and store.cell_size == self._cell_size(MxN, gridSize, padSize):
+                selected_frames = store.read_frames(frame_indices)
+            if selected_frames is None:
+                if session is not None:
+                    # 세션 캐시에는 원본 대신 셀 크기로 축소한 프레임을 보관 (_compose_grid는 리사이즈 생략)
+                    cell_size = self._cell_size(MxN, gridSize, padSize)
+                    if cell_size[0] <= 0 or cell_size[1] <= 0:
+                        cell_size = None
+                    selected_frames = session.read_frames(frame_indices, cell_size=cell_size) or []
+                else:
+                    if capture is None:
+                        capture = self._open_video(video_path)
+                        if capture is None:
+                            return None, gridSize[0], gridSize[1]
+                    selected_frames = self._read_frames(capture, frame_indices, seek_strategy)
+            
+            if len(selected_frames) != num_frames:
+                print(f"선택한 프레임 수가 기대한 것보다 적습니다. (기대: {num_frames}, 실제: {len(selected_frames)})")
+                return None, gridSize[0], gridSize[1]
+            
+            # 프레임 유효성 검사
+            if not selected_frames or selected_frames[0] is None:
+                print("유효한 프레임이 없습니다.")
+                return None, gridSize[0], gridSize[1]
+            
+            output_image = self._compose_grid(selected_frames, MxN, gridSize, padSize)
+            if output_image is None:
+                return None, gridSize[0], gridSize[1]
+
+            if output_dir is not None: # 출력 파일을 생성하고 경로를 반환
+                video_name = os.path.splitext(os.path.basename(video_path))[0]
+                if not os.path.exists(output_dir):
+                    os.makedirs(output_dir)
+                output_file = os.path.join(output_dir, f"{video_name}_{start}-{end}{option}_{MxN[0]}x{MxN[1]}grid.png")
+                self.cv2_imwrite(output_file, output_image)
+                print(f"{output_file} 파일이 생성되었습니다. 크기: {gridSize[0]}x{gridSize[1]} px")
+                return output_file, gridSize[0], gridSize[1]
+            else: # 출력 파일을 생성하지 않고 이미지 배열만 반환
+                return output_image, gridSize[0], gridSize[1]
+        finally:
+            if capture is not None:
+                capture.release()
+
+
+    def _read_frames(self, capture, frame_indices, seek_strategy='auto'):
+        """
+        열린 VideoCapture에서 지정된 프레임 번호들을 순서대로 읽어 리스트로 반환합니다. (실패 시 그 전까지만 반환)
+        Args:
+            seek_strategy (str): 'auto' (seek 계획: 한 번 seek 후 grab으로 건너뜀) 또는 'seek' (프레임마다 seek, 기존 방식)
+        """
         selected_frames = []
-        capture.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
-        for i in range(num_frames):
-            capture.set(cv2.CAP_PROP_POS_FRAMES, start_frame + i * frame_interval)
-            success, frame = capture.read()
-            if not success:
-                print(f"프레임 {start_frame + i * frame_interval}을 읽을 수 없습니다.")
-                break
+        if seek_strategy == 'seek':
+            for frame_index in frame_indices:
+                capture.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+                success, frame = capture.read()
+                if not success:
+                    print(f"프레임 {frame_index}을 읽을 수 없습니다.")
+                    break
+                if frame is None:
+                    print(f"프레임 {frame_index}이 None입니다.")
+                    break
+                selected_frames.append(frame)
+            return selected_frames
+
+        position = int(capture.get(cv2.CAP_PROP_POS_FRAMES))
+        gop_frames = estimate_gop_frames(capture.get(cv2.CAP_PROP_FPS))
+        plan = plan_frame_reads(frame_indices, position, gop_frames)
+        frames, _ = execute_frame_plan(capture, plan, position)
+        for frame_index in frame_indices:
+            frame = frames.get(frame_index)
             if frame is None:
-                print(f"프레임 {start_frame + i * frame_interval}이 None입니다.")
+                print(f"프레임 {frame_index}을 읽을 수 없습니다.")
                 break
             selected_frames.append(frame)
-        
-        if len(selected_frames) != num_frames:
-            print(f"선택한 프레임 수가 기대한 것보다 적습니다. (기대: {num_frames}, 실제: {len(selected_frames)})")
-            capture.release()
-            return None, gridSize[0], gridSize[1]
-        
-        # 프레임 유효성 검사
-        if not selected_frames or selected_frames[0] is None:
-            print("유효한 프레임이 없습니다.")
-            capture.release()
-            return None, gridSize[0], gridSize[1]
-        
-        #frame_height, frame_width = selected_frames[0].shape[:2]
+        return selected_frames
+
+
+    def _cell_size(self, MxN, gridSize, padSize):
+        """그리드 셀 하나의 (너비, 높이)를 반환합니다."""
         cell_width = (gridSize[0] - (MxN[1] - 1) * padSize[0]) // MxN[1]
         cell_height = (gridSize[1] - (MxN[0] - 1) * padSize[1]) // MxN[0]
+        return cell_width, cell_height
+
+
+    def _compose_grid(self, selected_frames, MxN, gridSize, padSize):
+        """프레임 리스트를 MxN 그리드 이미지 배열로 합성합니다. 셀 크기가 유효하지 않으면 None을 반환합니다."""
+        #frame_height, frame_width = selected_frames[0].shape[:2]
+        cell_width, cell_height = self._cell_size(MxN, gridSize, padSize)
         
         # 셀 크기 유효성 검사
         if cell_width <= 0 or cell_height <= 0:
             print(f"셀 크기가 유효하지 않습니다: {cell_width}x{cell_height}")
-            capture.release()
-            return None, gridSize[0], gridSize[1]
+            return None
 
         output_image = np.zeros((gridSize[1], gridSize[0], 3), dtype=np.uint8)
 
@@ -238,28 +757,26 @@ class MediaEdit:
             start_y = row * (cell_height + padSize[1])
             
             try:
-                resized_frame = cv2.resize(frame, (cell_width, cell_height))
+                if frame.shape[:2] == (cell_height, cell_width):
+                    resized_frame = frame  # 프레임 저장소/세션 캐시 등 이미 셀 크기인 경우 리사이즈 생략
+                else:
+                    resized_frame = cv2.resize(frame, (cell_width, cell_height))
                 output_image[start_y:start_y + cell_height, start_x:start_x + cell_width, :] = resized_frame
             except Exception as e:
                 print(f"프레임 {idx} 리사이즈 중 오류 발생: {e}")
                 continue
 
-        if output_dir is not None: # 출력 파일을 생성하고 경로를 반환
-            video_name = os.path.splitext(os.path.basename(video_path))[0]
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-            output_file = os.path.join(output_dir, f"{video_name}_{start}-{end}{option}_{MxN[0]}x{MxN[1]}grid.png")
-            self.cv2_imwrite(output_file, output_image)
-            print(f"{output_file} 파일이 생성되었습니다. 크기: {gridSize[0]}x{gridSize[1]} px")
-            capture.release()
-            return output_file, gridSize[0], gridSize[1]
-        else: # 출력 파일을 생성하지 않고 이미지 배열만 반환
-            capture.release()
-            return output_image, gridSize[0], gridSize[1]
+        return output_image
 
     
-    def trim_video_segment(self, option, start, end, video_path, output_dir):
-        """비디오를 주어진 시작과 종료 지점에서 잘라 output_dir에 저장합니다. 생성된 비디오 파일의 경로와 재생 시간, 총 프레임 수를 반환합니다."""
+    def trim_video_segment(self, option, start, end, video_path, output_dir, stream_copy=False):
+        """
+        비디오를 주어진 시작과 종료 지점에서 잘라 output_dir에 저장합니다. 생성된 비디오 파일의 경로와 재생 시간, 총 프레임 수를 반환합니다.
+        Args:
+            stream_copy (bool): True이면 ffmpeg로 재인코딩 없이 잘라냄 (기본값: False)
+                - 시작 지점 이전 키프레임부터 잘리므로 구간이 약간 앞당겨질 수 있음
+                - ffmpeg가 없거나 실패하면 OpenCV 디코딩 경로로 대체
+        """
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
@@ -270,11 +787,6 @@ class MediaEdit:
         fps = capture.get(cv2.CAP_PROP_FPS)
         video_name = os.path.splitext(os.path.basename(video_path))[0]
         output_file = os.path.join(output_dir, f"{video_name}_trimmed.mp4")
-        out = cv2.VideoWriter(output_file, cv2.VideoWriter_fourcc(*'mp4v'), fps, (int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)), int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))))
-
-        print("비디오 처리를 시작합니다.")
-        success, frame = capture.read()
-        count = 0
 
         if option == 'time':
             start_frame = int(start * fps)
@@ -284,17 +796,36 @@ class MediaEdit:
             end_frame = end
         else:
             print("잘못된 옵션입니다. 'time' 또는 'frame'을 선택하세요.")
-            out.release()
             capture.release()
             return None
 
+        if stream_copy:
+            capture.release()
+            result = self._trim_stream_copy(video_path, start_frame / fps, end_frame / fps, output_file)
+            if result is not None:
+                print(f"{video_name} 비디오가 {start} sec 에서 {end} sec까지 잘라서 {output_dir}에 저장되었습니다. (stream copy)")
+                print(f"재생 시간: {result[1]} 초, 총 프레임 수: {result[2]} 프레임")
+                return result
+            capture = self._open_video(video_path)
+            if capture is None:
+                return None, None, None
+
+        out = cv2.VideoWriter(output_file, cv2.VideoWriter_fourcc(*'mp4v'), fps, (int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)), int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))))
+
+        print("비디오 처리를 시작합니다.")
         total_frames = 0
-        while success and count < end_frame:
-            if count >= start_frame:
+        if start_frame < end_frame:
+            # 시작 지점까지는 seek 계획으로 이동 (GOP보다 멀면 seek, 가까우면 grab으로 건너뜀)
+            plan = plan_frame_reads([start_frame], 0, estimate_gop_frames(fps))
+            frames, _ = execute_frame_plan(capture, plan, 0)
+            frame = frames.get(start_frame)
+            success = frame is not None
+            count = start_frame
+            while success and count < end_frame:
                 out.write(frame)
                 total_frames += 1
-            success, frame = capture.read()
-            count += 1
+                success, frame = capture.read()
+                count += 1
 
         out.release()
         capture.release()
@@ -308,8 +839,14 @@ class MediaEdit:
         return output_file, play_time, total_frames
 
 
-    def split_video_into_segments(self, option, interval, video_path, output_dir):
-        """비디오를 시간 또는 프레임 간격으로 잘라서 output_dir에 저장합니다."""
+    def split_video_into_segments(self, option, interval, video_path, output_dir, stream_copy=False):
+        """
+        비디오를 시간 또는 프레임 간격으로 잘라서 output_dir에 저장합니다.
+        Args:
+            stream_copy (bool): True이면 ffmpeg segment muxer로 재인코딩 없이 분할 (기본값: False)
+                - 키프레임 단위로 분할되므로 세그먼트 길이가 interval과 약간 다를 수 있음
+                - ffmpeg가 없거나 실패하면 OpenCV 디코딩 경로로 대체
+        """
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
         
@@ -322,6 +859,14 @@ class MediaEdit:
         if option == 'time':
             interval = int(interval * fps)  # interval을 프레임 단위로 변환
 
+        if stream_copy and option in ('time', 'frame'):
+            result = self._split_stream_copy(video_path, interval / fps, output_dir, video_name)
+            if result is not None:
+                capture.release()
+                print(f"\n{video_name} 비디오가 {option}({interval}) 간격으로 {output_dir}에 저장되었습니다. (stream copy)")
+                print(f"비디오 수: {result[0]}, 첫번째 비디오 재생 시간: {result[1]} 초, 첫번째 비디오 총 프레임 수: {result[2]} 프레임")
+                return result
+
         print("비디오 처리를 시작합니다.")
         count = 0
         part_count = 0
@@ -366,3 +911,65 @@ class MediaEdit:
         print(f"비디오 수: {num_videos}, 첫번째 비디오 재생 시간: {firstSegment_play_time} 초, 첫번째 비디오 총 프레임 수: {firstSegment_total_frames} 프레임")
 
         return num_videos, play_time, first_segment_frames
+
+
+    def _run_ffmpeg(self, args):
+        """ffmpeg를 실행하고 성공 여부를 반환합니다. (ffmpeg 미설치/실패 시 False)"""
+        if FFMPEG_PATH is None:
+            print("ffmpeg를 찾을 수 없어 OpenCV 디코딩 경로를 사용합니다.")
+            return False
+        try:
+            result = subprocess.run(
+                [FFMPEG_PATH, "-hide_banner", "-loglevel", "error", "-y", *args],
+                capture_output=True, text=True, timeout=FFMPEG_TIMEOUT
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            print(f"ffmpeg 실행 실패: {e}")
+            return False
+        if result.returncode != 0:
+            print(f"ffmpeg 실행 실패 (code {result.returncode}): {result.stderr.strip()}")
+            return False
+        return True
+
+    def _trim_stream_copy(self, video_path, start_sec, end_sec, output_file):
+        """ffmpeg stream copy로 구간을 잘라냅니다. (-ss를 입력 앞에 두어 키프레임 기준으로 바로 이동, 앞부분 디코딩 없음)"""
+        if end_sec <= start_sec:
+            return None
+        args = [
+            "-ss", f"{start_sec:.3f}", "-i", video_path, "-t", f"{end_sec - start_sec:.3f}",
+            "-map", "0:v:0", "-map", "0:a?", "-c", "copy", "-avoid_negative_ts", "make_zero", output_file
+        ]
+        if not self._run_ffmpeg(args):
+            return None
+        _, play_time, total_frames, _, _, _ = self.query_videoInfo(output_file)
+        if play_time is None:
+            return None
+        return output_file, play_time, total_frames
+
+    def _split_stream_copy(self, video_path, segment_sec, output_dir, video_name):
+        """ffmpeg segment muxer로 재인코딩 없이 분할합니다. (세그먼트 수, 첫 세그먼트 재생 시간, 첫 세그먼트 프레임 수) 반환"""
+        if segment_sec <= 0:
+            return None
+        # 새 임시 디렉토리에 분할한 뒤 옮김 (output_dir에 남아 있는 이전 분할 결과가 섞이지 않도록)
+        prefix = f"{video_name}_part_"
+        tmp_dir = tempfile.mkdtemp(prefix=".split_", dir=output_dir)
+        try:
+            args = [
+                "-i", video_path, "-map", "0:v:0", "-map", "0:a?", "-c", "copy",
+                "-f", "segment", "-segment_time", f"{segment_sec:.3f}", "-reset_timestamps", "1",
+                os.path.join(tmp_dir, f"{prefix}%03d.mp4")
+            ]
+            if not self._run_ffmpeg(args):
+                return None
+            parts = sorted(f for f in os.listdir(tmp_dir) if f.startswith(prefix) and f.endswith(".mp4"))
+            if not parts:
+                return None
+            for f in os.listdir(output_dir):
+                if f.startswith(prefix) and f.endswith(".mp4"):
+                    os.remove(os.path.join(output_dir, f))
+            for f in parts:
+                os.replace(os.path.join(tmp_dir, f), os.path.join(output_dir, f))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        _, play_time, total_frames, _, _, _ = self.query_videoInfo(os.path.join(output_dir, parts[0]))
+        return len(parts), play_time, total_frames
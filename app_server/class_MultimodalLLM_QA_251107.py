@@ -1,36 +1,248 @@
 import base64
 import os
 import cv2
-from PIL import Image
-import io
 import uuid
 import shutil
 import time
+import asyncio
+import threading
+import importlib.util
+
+try:
+    from app_server import llm_cache, rate_limiter
+except ImportError:  # app_server 디렉토리에서 직접 실행하는 경우
+    import llm_cache
+    import rate_limiter
 
 # LLM API Timeout 설정
 LLM_API_TIMEOUT_SECONDS = 120       # 요청당 최대 대기 시간 (2분)
 LLM_API_CONNECT_TIMEOUT_SECONDS = 10  # 연결 수립 타임아웃 (10초)
 
+# 공유 연결 풀 설정 (프로세스당 provider/API 키별 클라이언트 1개를 모든 multimodalLLM 인스턴스가 공유)
+LLM_POOL_MAX_CONNECTIONS = 64  # 동시 in-flight 요청 상한
+LLM_POOL_MAX_KEEPALIVE = 32  # 유지할 keep-alive 연결 수 (TLS 핸드셰이크를 분석 간에 재사용)
+LLM_POOL_KEEPALIVE_EXPIRY = 60  # 유휴 keep-alive 연결 유지 시간 (초)
+LLM_HTTP2_ENABLED = importlib.util.find_spec("h2") is not None  # h2 패키지가 설치되어 있으면 HTTP/2 사용
+
+# 추론(thinking) 모델은 max_output_tokens에 추론 토큰이 포함되므로,
+# 짧은 답변용 작은 출력 한도(예: 기준 시점 탐색의 Overall_Answer)를 요청해도 이 값 미만으로는 낮추지 않음 (빈 응답 방지)
+REASONING_MIN_OUTPUT_TOKENS = 1024
+
+# 이미지 JPEG 인코딩 설정 (모든 provider 공통)
+JPEG_QUALITY = 95  # cv2.imencode 기본값과 동일
+JPEG_CHROMA_SUBSAMPLING = "420"  # "444" | "422" | "420" (cv2 기본값 4:2:0)
+VIDEO_MAX_PAYLOAD_BYTES = 20 * 1024 * 1024  # 비디오 입력 1회 요청의 JPEG 합계 상한 (20MB)
+_JPEG_SAMPLING_FACTORS = {
+    "444": cv2.IMWRITE_JPEG_SAMPLING_FACTOR_444,
+    "422": cv2.IMWRITE_JPEG_SAMPLING_FACTOR_422,
+    "420": cv2.IMWRITE_JPEG_SAMPLING_FACTOR_420,
+}
+
+
+class EncodedImage:
+    """
+    한 번 인코딩한 JPEG 이미지 (모든 analyzer/provider가 같은 바이트를 공유)
+
+    - jpeg_bytes: JPEG 바이트 (Gemini Part.from_bytes, LLM 응답 캐시 키에 그대로 사용)
+    - data_url: base64 data URL (OpenAI image_url용, 처음 사용할 때 한 번만 계산)
+    - multimodalLLM.query_answer_chatGPT(image_array=...)에 numpy 배열 대신 전달 가능
+    """
+
+    def __init__(self, jpeg_bytes: bytes, width: int, height: int):
+        self.jpeg_bytes = jpeg_bytes
+        self.width = width
+        self.height = height
+        self._data_url = None
+
+    @classmethod
+    def from_array(cls, image_array, quality: int = JPEG_QUALITY, subsampling: str = JPEG_CHROMA_SUBSAMPLING):
+        """
+        BGR 이미지 배열(H x W x 3)을 JPEG로 인코딩
+        Returns:
+            EncodedImage (인코딩 실패 시 ValueError)
+        """
+        if image_array is None or not hasattr(image_array, 'size') or image_array.size == 0:
+            raise ValueError("The image array is empty or None.")
+        if len(image_array.shape) != 3 or image_array.shape[2] != 3:
+            raise ValueError(f"Invalid image array format: {image_array.shape}")
+        if subsampling not in _JPEG_SAMPLING_FACTORS:
+            raise ValueError(f"Unsupported chroma subsampling: {subsampling} (allowed: {', '.join(_JPEG_SAMPLING_FACTORS)})")
+        params = [cv2.IMWRITE_JPEG_QUALITY, int(quality), cv2.IMWRITE_JPEG_SAMPLING_FACTOR, _JPEG_SAMPLING_FACTORS[subsampling]]
+        success, jpeg_image = cv2.imencode('.jpg', image_array, params)
+        if not success:
+            raise ValueError("Failed to encode image to JPEG format.")
+        height, width = image_array.shape[:2]
+        return cls(jpeg_image.tobytes(), width, height)
+
+    @property
+    def data_url(self) -> str:
+        if self._data_url is None:
+            self._data_url = "data:image/jpeg;base64," + base64.b64encode(self.jpeg_bytes).decode("utf-8")
+        return self._data_url
+
+    def __len__(self):
+        return len(self.jpeg_bytes)
+
+
+class VideoFrameSampler:
+    """
+    비디오 입력용 스트리밍 프레임 샘플러 (일정한 메모리 사용)
+
+    - every_n 프레임마다 1장만 디코딩+JPEG 인코딩하고, 나머지는 grab()으로 건너뜀 (디코딩 결과 BGR 변환 생략)
+    - 인코딩된 프레임(EncodedImage)을 하나씩 yield하며 원본 프레임은 보관하지 않음
+    - 누적 JPEG 바이트가 max_payload_bytes를 넘기 전에 샘플링 중단 (truncated=True)
+
+    사용 예:
+        sampler = VideoFrameSampler(video_path, every_n=10)
+        for encoded_image in sampler: ...
+        print(sampler.frames_read, sampler.frames_kept)
+    """
+
+    def __init__(self, video_path: str, every_n: int = 10, max_payload_bytes: int = None):
+        self.video_path = video_path
+        self.every_n = max(1, int(every_n))
+        self.max_payload_bytes = VIDEO_MAX_PAYLOAD_BYTES if max_payload_bytes is None else max_payload_bytes
+        self.frames_read = 0
+        self.frames_kept = 0
+        self.payload_bytes = 0
+        self.truncated = False
+
+    def __iter__(self):
+        video = cv2.VideoCapture(self.video_path)
+        if not video.isOpened():
+            raise IOError(f"Failed to open video file: {self.video_path}")
+        try:
+            while video.grab():
+                frame_index = self.frames_read
+                self.frames_read += 1
+                if frame_index % self.every_n != 0:
+                    continue
+                success, frame = video.retrieve()
+                if not success or frame is None:
+                    break
+                try:
+                    encoded_image = EncodedImage.from_array(frame)
+                except ValueError as e:
+                    print(f"프레임 {frame_index}을 JPEG로 변환하는 데 실패했습니다: {e}")
+                    continue
+                if self.payload_bytes + len(encoded_image) > self.max_payload_bytes:
+                    self.truncated = True
+                    print(f"video: 전송 용량 상한({self.max_payload_bytes / (1024*1024):.0f}MB) 도달, 프레임 {frame_index}부터 샘플링 중단")
+                    break
+                self.payload_bytes += len(encoded_image)
+                self.frames_kept += 1
+                yield encoded_image
+        finally:
+            video.release()
+
+
+# ============================================
+# 프로세스 공용 이벤트 루프 / 연결 풀
+# ============================================
+# - LLM 요청은 모두 하나의 백그라운드 이벤트 루프에서 AsyncOpenAI / genai aio 클라이언트로 전송
+# - sync API(query_answer_chatGPT)는 요청을 이 루프에 제출하고 결과를 기다리는 얇은 래퍼
+# - 클라이언트는 (provider, API 키)별로 한 번만 생성 → keep-alive 연결과 TLS 세션을 분석 간에 재사용
+_llm_loop = None
+_llm_loop_pid = None
+_llm_clients = {}
+_llm_pool_lock = threading.Lock()
+
+
+def get_llm_loop():
+    """프로세스 공용 LLM 이벤트 루프 (daemon 스레드에서 실행, 처음 호출 시 생성)"""
+    global _llm_loop, _llm_loop_pid
+    with _llm_pool_lock:
+        # fork된 자식 프로세스에서는 부모의 루프 스레드가 없으므로 새로 생성
+        if _llm_loop is None or _llm_loop.is_closed() or _llm_loop_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="llm-event-loop", daemon=True).start()
+            _llm_loop, _llm_loop_pid = loop, os.getpid()
+            _llm_clients.clear()
+        return _llm_loop
+
+
+def run_on_llm_loop(coro):
+    """코루틴을 공용 LLM 루프에서 실행하고 결과를 기다림 (sync 코드용)"""
+    loop = get_llm_loop()
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        running_loop = None
+    if running_loop is loop:
+        coro.close()
+        raise RuntimeError("LLM 이벤트 루프 안에서는 sync API를 호출할 수 없습니다. aquery_answer()를 사용하세요.")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+async def await_on_llm_loop(coro):
+    """코루틴을 공용 LLM 루프에서 실행하고 현재 이벤트 루프에서 결과를 await (async 코드용)"""
+    loop = get_llm_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+def get_async_client(provider: str, api_key: str):
+    """
+    provider별 공유 async 클라이언트 (공용 LLM 루프 안에서 호출)
+    - openai: AsyncOpenAI + httpx.AsyncClient (keep-alive 풀, h2 설치 시 HTTP/2)
+    - google: genai.Client (client.aio 사용, 내부 httpx 풀을 같은 설정으로 구성)
+    """
+    key = (provider, api_key)
+    with _llm_pool_lock:
+        client = _llm_clients.get(key)
+        if client is not None:
+            return client
+
+        import httpx
+        timeout = httpx.Timeout(LLM_API_TIMEOUT_SECONDS, connect=LLM_API_CONNECT_TIMEOUT_SECONDS)
+        limits = httpx.Limits(
+            max_connections=LLM_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=LLM_POOL_KEEPALIVE_EXPIRY,
+        )
+        if provider == "openai":
+            from openai import AsyncOpenAI
+            client = AsyncOpenAI(
+                api_key=api_key,
+                timeout=timeout,
+                max_retries=0,  # 재시도는 multimodalLLM._acall_with_retry에서 rate limiter를 거쳐 수행
+                http_client=httpx.AsyncClient(http2=LLM_HTTP2_ENABLED, limits=limits, timeout=timeout),
+            )
+        elif provider == "google":
+            from google import genai
+            from google.genai import types as genai_types
+            http_options = {"timeout": LLM_API_TIMEOUT_SECONDS * 1000}
+            # 구버전 SDK에는 async_client_args가 없으므로 지원할 때만 풀 설정 전달
+            if "async_client_args" in getattr(genai_types.HttpOptions, "model_fields", {}):
+                http_options["async_client_args"] = {"http2": LLM_HTTP2_ENABLED, "limits": limits}
+            client = genai.Client(api_key=api_key, http_options=genai_types.HttpOptions(**http_options))
+        else:
+            raise ValueError(f"지원하지 않는 provider: {provider}")
+        _llm_clients[key] = client
+        print(f"[LLM 풀] {provider} 공유 클라이언트 생성 (HTTP/2={'on' if LLM_HTTP2_ENABLED else 'off'}, 최대 연결 {LLM_POOL_MAX_CONNECTIONS})")
+        return client
+
 class multimodalLLM:
     """ multimodalLLM에 관한 모음집 - OpenAI GPT 및 Google Gemini 지원"""
     
     # 지원 모델 및 기본 설정
     SUPPORTED_MODELS = {
-        # OpenAI 모델 (context_window = 입력 제한, max_output_tokens = 출력 제한)
+        # OpenAI 모델 (context_window = 입력 제한, max_output_tokens = 출력 제한, reasoning = 출력 한도에 추론 토큰 포함 여부)
         # 참고: https://platform.openai.com/docs/models/gpt-4o
-        "gpt-4.1": {"context_window": 128_000, "max_output_tokens": 4_096, "supports_vision": True, "supports_video": True, "provider": "openai"},       # 공식 128k context
-        "gpt-5-nano": {"context_window": 128_000, "max_output_tokens": 4_096, "supports_vision": True, "supports_video": True, "provider": "openai"},       # 공식 128k context
-        "gpt-5.1": {"context_window": 128_000, "max_output_tokens": 4_096, "supports_vision": True, "supports_video": True, "provider": "openai"},         # 공식 수치 미공개 → gpt-4o와 동일 가정
-        "gpt-5.2": {"context_window": 400_000, "max_output_tokens": 128_000, "supports_vision": True, "supports_video": False, "provider": "openai"},         # 공식: 400k context, 128k output, vision 지원, video 미지원
+        "gpt-4.1": {"context_window": 128_000, "max_output_tokens": 4_096, "supports_vision": True, "supports_video": True, "provider": "openai", "reasoning": False},       # 공식 128k context
+        "gpt-5-nano": {"context_window": 128_000, "max_output_tokens": 4_096, "supports_vision": True, "supports_video": True, "provider": "openai", "reasoning": True},       # 공식 128k context
+        "gpt-5.1": {"context_window": 128_000, "max_output_tokens": 4_096, "supports_vision": True, "supports_video": True, "provider": "openai", "reasoning": True},         # 공식 수치 미공개 → gpt-4o와 동일 가정
+        "gpt-5.2": {"context_window": 400_000, "max_output_tokens": 128_000, "supports_vision": True, "supports_video": False, "provider": "openai", "reasoning": True},         # 공식: 400k context, 128k output, vision 지원, video 미지원
         
-        # Google Gemini 모델 (context_window = 입력 제한, max_output_tokens = 출력 제한)
+        # Google Gemini 모델 (context_window = 입력 제한, max_output_tokens = 출력 제한, reasoning = thinking 기본 사용 여부)
         # 참고: https://ai.google.dev/gemini-api/docs/models/gemini
         # [주의] gemini-2.5-flash, gemini-2.5-pro는 2026.06.17 종료 예정 → gemini-3 시리즈로 마이그레이션 권장
-        "gemini-2.5-flash": {"context_window": 1_000_000, "max_output_tokens": 8_192, "supports_vision": True, "supports_video": True, "provider": "google"},   # Stable, 2026.06.17 종료 예정
-        "gemini-2.5-flash-lite": {"context_window": 1_000_000, "max_output_tokens": 8_192, "supports_vision": True, "supports_video": True, "provider": "google"},  # Stable, gemini-2.0-flash-lite 대체
-        "gemini-2.5-pro": {"context_window": 1_000_000, "max_output_tokens": 8_192, "supports_vision": True, "supports_video": True, "provider": "google"},   # Stable, 2026.06.17 종료 예정
-        "gemini-3-flash-preview": {"context_window": 1_000_000, "max_output_tokens": 8_192, "supports_vision": True, "supports_video": True, "provider": "google"},  # Preview, gemini-2.5-flash 후속
-        "gemini-3-pro-preview": {"context_window": 1_000_000, "max_output_tokens": 8_192, "supports_vision": True, "supports_video": True, "provider": "google"},  # Preview, gemini-2.5-pro 후속
+        "gemini-2.5-flash": {"context_window": 1_000_000, "max_output_tokens": 8_192, "supports_vision": True, "supports_video": True, "provider": "google", "reasoning": True},   # Stable, 2026.06.17 종료 예정
+        "gemini-2.5-flash-lite": {"context_window": 1_000_000, "max_output_tokens": 8_192, "supports_vision": True, "supports_video": True, "provider": "google", "reasoning": False},  # Stable, gemini-2.0-flash-lite 대체
+        "gemini-2.5-pro": {"context_window": 1_000_000, "max_output_tokens": 8_192, "supports_vision": True, "supports_video": True, "provider": "google", "reasoning": True},   # Stable, 2026.06.17 종료 예정
+        "gemini-3-flash-preview": {"context_window": 1_000_000, "max_output_tokens": 8_192, "supports_vision": True, "supports_video": True, "provider": "google", "reasoning": True},  # Preview, gemini-2.5-flash 후속
+        "gemini-3-pro-preview": {"context_window": 1_000_000, "max_output_tokens": 8_192, "supports_vision": True, "supports_video": True, "provider": "google", "reasoning": True},  # Preview, gemini-2.5-pro 후속
     }
     
     def __init__(self, llm_name: str = "gpt-5-nano", api_key: str = None):
@@ -44,25 +256,11 @@ class multimodalLLM:
         
         self.model_config = self.SUPPORTED_MODELS[self.llm_name]
         self.provider = self.model_config["provider"]
-        
-        if self.provider == "openai":  # OpenAI 모델들
-            from openai import OpenAI
-            import httpx
-            self.client = OpenAI(
-                api_key=api_key,
-                timeout=httpx.Timeout(LLM_API_TIMEOUT_SECONDS, connect=LLM_API_CONNECT_TIMEOUT_SECONDS),
-                max_retries=2,
-            )
-        elif self.provider == "google":  # Google Gemini 모델들
-            from google import genai
-            from google.genai import types as genai_types
-            self.client = genai.Client(
-                api_key=api_key,
-                http_options=genai_types.HttpOptions(timeout=LLM_API_TIMEOUT_SECONDS * 1000),
-            )
+
+        # 클라이언트는 인스턴스마다 만들지 않고 프로세스 공용 풀(get_async_client)에서 API 키별로 공유
+        self.api_key = api_key
+        if self.provider == "google":  # Google Gemini 모델들
             self.llm_name_for_api = self.llm_name  # API 호출 시 사용할 모델명 저장
-        else:  # ollama 등 다른 모델
-            pass
 
 
     # 파일명에 한글 포함되었을 때
@@ -121,10 +319,53 @@ class multimodalLLM:
 
 
     def query_answer_chatGPT(self, system_prompt, user_prompt, image_path=None, image_array=None, extract_video=10, max_output_tokens=None, temperature=0.0, seed=1):
-        # Google Gemini 모델인 경우 별도 처리
-        if self.provider == "google":
-            return self._query_gemini(system_prompt, user_prompt, image_path, image_array, extract_video, max_output_tokens, temperature)
-        
+        """
+        sync API (기존 호출부 호환용 얇은 래퍼)
+        요청 준비(이미지 인코딩, 캐시 조회)는 호출 스레드에서, API 전송은 공용 LLM 루프에서 수행
+        """
+        request, answer = self._prepare_request(system_prompt, user_prompt, image_path, image_array, extract_video, max_output_tokens, temperature, seed)
+        if answer is not None:
+            return answer
+        return run_on_llm_loop(self._asend(request))
+
+    async def aquery_answer(self, system_prompt, user_prompt, image_path=None, image_array=None, extract_video=10, max_output_tokens=None, temperature=0.0, seed=1):
+        """
+        async API (query_answer_chatGPT와 같은 인자/반환값)
+        - 요청 준비(JPEG 인코딩, 비디오 샘플링, 캐시 조회)는 스레드에서 실행하여 이벤트 루프를 막지 않음
+        - API 전송은 공용 LLM 루프의 공유 클라이언트로 수행 → 스레드 하나 없이 여러 요청을 동시에 처리
+        """
+        request, answer = await asyncio.to_thread(
+            self._prepare_request, system_prompt, user_prompt, image_path, image_array, extract_video, max_output_tokens, temperature, seed
+        )
+        if answer is not None:
+            return answer
+        return await await_on_llm_loop(self._asend(request))
+
+    def submit_query_answer(self, system_prompt, user_prompt, image_path=None, image_array=None, extract_video=10, max_output_tokens=None, temperature=0.0, seed=1, delay=0.0):
+        """
+        aquery_answer를 공용 LLM 루프에 제출하고 바로 반환 (sync 코드에서 여러 요청을 동시에 보낼 때 사용)
+        delay: 요청 전 대기 시간(초). 공용 LLM 루프에서 비동기로 기다리므로 호출 스레드를 막지 않음 (재시도 백오프용)
+        Returns:
+            concurrent.futures.Future - result()로 응답 대기, cancel()로 진행 중인 요청 취소
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self._adelayed_query_answer(delay, system_prompt, user_prompt, image_path, image_array, extract_video, max_output_tokens, temperature, seed),
+            get_llm_loop()
+        )
+
+    async def _adelayed_query_answer(self, delay, *args):
+        """delay초 기다린 뒤 aquery_answer 실행"""
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return await self.aquery_answer(*args)
+
+    def _prepare_request(self, system_prompt, user_prompt, image_path, image_array, extract_video, max_output_tokens, temperature, seed):
+        """
+        API 요청 준비 (provider 공통 진입점)
+        Returns:
+            (request, None) - API 전송이 필요한 경우
+            (None, answer) - 캐시 적중 또는 입력 오류로 바로 반환할 응답이 있는 경우
+        """
         # max_output_tokens 기본값 및 상한 클램프
         if max_output_tokens is None:
             max_output_tokens = self.model_config["max_output_tokens"]
@@ -133,47 +374,43 @@ class multimodalLLM:
             if max_output_tokens > self.model_config["max_output_tokens"]:
                 print(f"경고: 요청한 max_output_tokens({max_output_tokens})이 모델 한도({self.model_config['max_output_tokens']})를 초과하여 클램프합니다.")
                 max_output_tokens = self.model_config["max_output_tokens"]
-        
-        # 비전/비디오 기능 지원 여부 확인
-        supports_vision = self.model_config["supports_vision"]
-        supports_video = self.model_config["supports_video"]
-        
+            # 추론 모델은 추론 토큰이 출력 한도를 먼저 소진하므로 하한 적용
+            if self.model_config.get("reasoning") and max_output_tokens < REASONING_MIN_OUTPUT_TOKENS:
+                max_output_tokens = min(REASONING_MIN_OUTPUT_TOKENS, self.model_config["max_output_tokens"])
+
         # 비전 기능을 지원하지 않는 모델의 경우 이미지/비디오 입력 제한
-        if (image_array is not None or image_path is not None) and not supports_vision:
+        if (image_array is not None or image_path is not None) and not self.model_config["supports_vision"]:
             print(f"경고: {self.llm_name} 모델은 이미지/비디오 입력을 지원하지 않습니다. 텍스트만 처리합니다.")
             image_array = None
             image_path = None
+
+        # Google Gemini 모델인 경우 별도 처리
+        if self.provider == "google":
+            return self._prepare_gemini_request(system_prompt, user_prompt, image_path, image_array, extract_video, max_output_tokens, temperature)
+        return self._prepare_openai_request(system_prompt, user_prompt, image_path, image_array, extract_video, max_output_tokens, temperature, seed)
+
+    def _prepare_openai_request(self, system_prompt, user_prompt, image_path, image_array, extract_video, max_output_tokens, temperature, seed):
+        """OpenAI 요청 준비 (이미지/비디오 → data URL 메시지, 캐시 조회, API 파라미터 구성)"""
+        supports_video = self.model_config["supports_video"]
+        encoded_images = []  # API로 전송하는 JPEG 바이트 (LLM 응답 캐시 키 계산용)
+        image_sizes = []  # 이미지 (가로, 세로) (rate limiter 토큰 추정용)
             
-        if image_array is not None:  # image_array가 직접 제공된 경우
+        if image_array is not None:  # image_array가 직접 제공된 경우 (numpy 배열 또는 EncodedImage)
             try:
-                # 이미지 배열 유효성 검사
-                if image_array is None or not hasattr(image_array, 'size') or image_array.size == 0:
-                    print("이미지 배열이 비어있거나 None입니다.")
-                    return "Image Error: The image array is empty or None."
-
-                # 이미지 배열 형태 검사 (H x W x 3)
-                if len(image_array.shape) != 3 or image_array.shape[2] != 3:
-                    print(f"이미지 배열 형태가 올바르지 않습니다: {image_array.shape}")
-                    return "Image Error: Invalid image array format."
-
-                # 이미지 배열을 JPEG로 변환
-                success, jpeg_image = cv2.imencode('.jpg', image_array)
-                if not success:
-                    print("이미지 배열을 JPEG로 변환하는 데 실패했습니다.")
-                    return "Image Error: Failed to encode image to JPEG format."
-
-                # Base64 인코딩 + MIME 헤더 추가
-                b64_str = base64.b64encode(jpeg_image).decode("utf-8")
-                b64_with_header = f"data:image/jpeg;base64,{b64_str}"
-
-                # GPT-4o 입력 포맷 구성
+                encoded_image = self._to_encoded_image(image_array)
+                if isinstance(encoded_image, str):
+                    return None, encoded_image
+                encoded_images.append(encoded_image.jpeg_bytes)
+                image_sizes.append((encoded_image.width, encoded_image.height))
+
+                # GPT-4o 입력 포맷 구성 (base64 data URL은 EncodedImage에서 한 번만 계산)
                 user_prompt2 = [
                     {"type": "text", "text": user_prompt},
-                    {"type": "image_url", "image_url": {"url": b64_with_header}}
+                    {"type": "image_url", "image_url": {"url": encoded_image.data_url}}
                 ]
             except Exception as e:
                 print(f"이미지 배열 처리 중 오류 발생: {e}")
-                return f"Image Error: Error processing image array: {str(e)}"
+                return None, f"Image Error: Error processing image array: {str(e)}"
                 
         elif image_path:  # image_path로 파일형태로 제공된 경우
             try:
@@ -185,13 +422,15 @@ class multimodalLLM:
                     image = self.cv2_imread(image_path)
                     if image is None:
                         print(f"이미지를 읽어들이는 데 실패했습니다: {image_path}")
-                        return f"Image Error: Failed to read image file: {image_path}"
+                        return None, f"Image Error: Failed to read image file: {image_path}"
                     
                     # 모든 이미지를 JPEG로 변환 (GPT-4o 안정성 확보)
                     success, jpeg_image = cv2.imencode('.jpg', image)
                     if not success:
                         print("이미지를 JPEG로 변환하는 데 실패했습니다.")
-                        return "Image Error: Failed to encode image to JPEG format."
+                        return None, "Image Error: Failed to encode image to JPEG format."
+                    encoded_images.append(jpeg_image.tobytes())
+                    image_sizes.append((image.shape[1], image.shape[0]))
                     
                     # Base64 인코딩 + MIME 헤더 추가
                     b64_str = base64.b64encode(jpeg_image).decode("utf-8")
@@ -207,154 +446,96 @@ class multimodalLLM:
                 elif ext.lower() in ['.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv', '.webm', '.mpeg']:  # .mp4 동작체크 완료
                     if not supports_video:
                         print(f"경고: {self.llm_name} 모델은 비디오 입력을 지원하지 않습니다.")
-                        return f"Video Error: {self.llm_name} model does not support video input."
-                    video = cv2.VideoCapture(image_path)
-                    if not video.isOpened():
-                        print(f"비디오 파일을 열 수 없습니다: {image_path}")
-                        return f"Image Error: Failed to open video file: {image_path}"
-                    
-                    base64Frames = []
-                    frame_count = 0
-                    while video.isOpened():
-                        success, frame = video.read()
-                        if not success:
-                            break
-                        success, buffer = cv2.imencode(".jpg", frame)
-                        if not success:
-                            print(f"프레임 {frame_count}을 JPEG로 변환하는 데 실패했습니다.")
-                            continue
-                        # base64 인코딩 + 접두어
-                        b64_str = base64.b64encode(buffer).decode("utf-8")
-                        base64Frames.append(f"data:image/jpeg;base64,{b64_str}")
-                        frame_count += 1
-                    video.release()
-                    
-                    if not base64Frames:
-                        print("비디오에서 프레임을 추출할 수 없습니다.")
-                        return "Image Error: Failed to extract frames from video."
-                    
-                    # 일정 간격 추출 (예: extract_video=10 → 10프레임마다)
-                    extract_base64Frames = base64Frames[0::extract_video]
-                    print(f"video: input frames {len(base64Frames)} --> extracted frames {len(extract_base64Frames)}")
+                        return None, f"Video Error: {self.llm_name} model does not support video input."
+                    # 일정 간격 추출 (예: extract_video=10 → 10프레임마다, 나머지 프레임은 디코딩/인코딩 생략)
+                    frames = self._sample_video(image_path, extract_video)
+                    if isinstance(frames, str):
+                        return None, frames
+                    encoded_images.extend(frame.jpeg_bytes for frame in frames)
+                    image_sizes.extend((frame.width, frame.height) for frame in frames)
                     
                     # GPT-4o 입력 메시지 구성
                     user_prompt2 = [
                         {"type": "text", "text": user_prompt},
-                        *map(lambda x: {"type": "image_url", "image_url": {"url": x}}, extract_base64Frames)
+                        *map(lambda x: {"type": "image_url", "image_url": {"url": x.data_url}}, frames)
                     ]
                 
                 else:
                     print(f"Unknown media file format: {ext}")
-                    return f"Image Error: Unknown media file format: {ext}"
+                    return None, f"Image Error: Unknown media file format: {ext}"
             except Exception as e:
                 print(f"이미지 파일 처리 중 오류 발생: {e}")
-                return f"Image Error: Error processing image file: {str(e)}"
+                return None, f"Image Error: Error processing image file: {str(e)}"
         else:  # text input only
             user_prompt2 = user_prompt
 
-        try:
-            # API 호출 매개변수 구성 (공통)
-            api_params = {
-                "model": self.llm_name,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt2}
-                ]
-            }
-
-            # 모델별 토큰 파라미터 호환 처리
-            # 기본값: max_tokens (gpt-4o 계열 등 일반 모델은 max_tokens가 출력 제한임)
-            api_params["max_tokens"] = max_output_tokens
-            if self.llm_name == "gpt-5" or self.llm_name.startswith("gpt-5"):
-                # gpt-5는 max_completion_tokens를 사용, temperature/seed 미지원
-                api_params.pop("max_tokens", None)
-                api_params["max_completion_tokens"] = max_output_tokens
-            elif self.llm_name.startswith("o1"):
-                # o1 계열은 max_output_tokens 사용, temperature/seed 미지원
-                api_params.pop("max_tokens", None)
-                api_params["max_output_tokens"] = max_output_tokens
-
-            # temperature 설정: gpt-5/o1은 미지원이므로 제외, 그 외 모델만 설정
-            if not (self.llm_name == "gpt-5" or self.llm_name.startswith("gpt-5") or self.llm_name.startswith("o1")):
-                api_params["temperature"] = temperature
-
-            # seed 설정: gpt-5/o1은 제외
-            if not (self.llm_name == "gpt-5" or self.llm_name.startswith("gpt-5") or self.llm_name.startswith("o1")):
-                api_params["seed"] = seed
-
-            # GPT-5의 경우 향상된 추론을 위한 추가 설정 (향후 지원 시 확장 포인트)
-            if self.llm_name == "gpt-5" or self.llm_name.startswith("gpt-5"):
-                pass
-
-            response = self.client.chat.completions.create(**api_params)
-            answer = response.choices[0].message.content
-            return answer
-            
-        except Exception as e:
-            error_msg = str(e)
-            print(f"{self.llm_name} API 호출 중 오류 발생: {error_msg}")
-            
-            # 구체적인 오류 메시지 제공
-            if "context_length_exceeded" in error_msg.lower():
-                return f"API Error: 입력이 {self.llm_name}의 최대 입력 토큰 제한(Context Window: {self.model_config['context_window']})을 초과했습니다."
-            elif "rate_limit" in error_msg.lower():
-                return f"API Error: API 호출 한도 초과. 잠시 후 다시 시도해주세요."
-            elif "model_not_found" in error_msg.lower():
-                return f"API Error: {self.llm_name} 모델을 찾을 수 없습니다. 모델명을 확인해주세요."
-            else:
-                return f"API Error: {error_msg}"
+        # LLM 응답 캐시 조회 (같은 모델/프롬프트/이미지 요청이면 API 호출 생략)
+        cache_key, cached_answer = self._lookup_cache(system_prompt, user_prompt, temperature, seed, max_output_tokens, encoded_images)
+        if cached_answer is not None:
+            return None, cached_answer
 
-    def _query_gemini(self, system_prompt, user_prompt, image_path=None, image_array=None, extract_video=10, max_output_tokens=None, temperature=0.0):
-        """Google Gemini 모델 전용 쿼리 메서드"""
-        # max_output_tokens 설정
-        if max_output_tokens is None:
-            max_output_tokens = self.model_config["max_output_tokens"]
-        else:
-            if max_output_tokens > self.model_config["max_output_tokens"]:
-                print(f"경고: 요청한 max_output_tokens({max_output_tokens})이 모델 한도({self.model_config['max_output_tokens']})를 초과하여 클램프합니다.")
-                max_output_tokens = self.model_config["max_output_tokens"]
-        
-        # 비전/비디오 지원 확인
-        supports_vision = self.model_config["supports_vision"]
+        # API 호출 매개변수 구성 (공통)
+        api_params = {
+            "model": self.llm_name,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt2}
+            ]
+        }
+
+        # 모델별 토큰 파라미터 호환 처리
+        # 기본값: max_tokens (gpt-4o 계열 등 일반 모델은 max_tokens가 출력 제한임)
+        api_params["max_tokens"] = max_output_tokens
+        if self.llm_name == "gpt-5" or self.llm_name.startswith("gpt-5"):
+            # gpt-5는 max_completion_tokens를 사용, temperature/seed 미지원
+            api_params.pop("max_tokens", None)
+            api_params["max_completion_tokens"] = max_output_tokens
+        elif self.llm_name.startswith("o1"):
+            # o1 계열은 max_output_tokens 사용, temperature/seed 미지원
+            api_params.pop("max_tokens", None)
+            api_params["max_output_tokens"] = max_output_tokens
+
+        # temperature 설정: gpt-5/o1은 미지원이므로 제외, 그 외 모델만 설정
+        if not (self.llm_name == "gpt-5" or self.llm_name.startswith("gpt-5") or self.llm_name.startswith("o1")):
+            api_params["temperature"] = temperature
+
+        # seed 설정: gpt-5/o1은 제외
+        if not (self.llm_name == "gpt-5" or self.llm_name.startswith("gpt-5") or self.llm_name.startswith("o1")):
+            api_params["seed"] = seed
+
+        # GPT-5의 경우 향상된 추론을 위한 추가 설정 (향후 지원 시 확장 포인트)
+        if self.llm_name == "gpt-5" or self.llm_name.startswith("gpt-5"):
+            pass
+
+        estimated_tokens = rate_limiter.estimate_request_tokens(self.provider, [system_prompt, user_prompt], image_sizes)
+        return {"api_params": api_params, "cache_key": cache_key, "estimated_tokens": estimated_tokens}, None
+
+    def _prepare_gemini_request(self, system_prompt, user_prompt, image_path, image_array, extract_video, max_output_tokens, temperature):
+        """Google Gemini 요청 준비 (이미지/비디오 → Part, 캐시 조회, 생성 설정 구성)"""
         supports_video = self.model_config["supports_video"]
-        
-        if (image_array is not None or image_path is not None) and not supports_vision:
-            print(f"경고: {self.llm_name} 모델은 이미지/비디오 입력을 지원하지 않습니다. 텍스트만 처리합니다.")
-            image_array = None
-            image_path = None
-        
         try:
             from google.genai import types
             
             # 프롬프트 구성 (Gemini는 system_prompt를 user_prompt에 통합)
             combined_prompt = f"{system_prompt}\n\n{user_prompt}"
             contents = [types.Part.from_text(text=combined_prompt)]
+            encoded_images = []  # API로 전송하는 JPEG 바이트 (LLM 응답 캐시 키 계산용)
+            image_sizes = []  # 이미지 (가로, 세로) (rate limiter 토큰 추정용)
             
             # 이미지/비디오 처리
             if image_array is not None:
-                # numpy array를 PIL Image로 변환
+                # numpy 배열 또는 EncodedImage → JPEG 바이트 (PIL 변환 없이 OpenAI와 같은 바이트 사용)
                 try:
-                    if image_array is None or not hasattr(image_array, 'size') or image_array.size == 0:
-                        print("이미지 배열이 비어있거나 None입니다.")
-                        return "Image Error: The image array is empty or None."
-                    
-                    if len(image_array.shape) != 3 or image_array.shape[2] != 3:
-                        print(f"이미지 배열 형태가 올바르지 않습니다: {image_array.shape}")
-                        return "Image Error: Invalid image array format."
-                    
-                    # BGR -> RGB 변환 (OpenCV는 BGR 사용)
-                    image_rgb = cv2.cvtColor(image_array, cv2.COLOR_BGR2RGB)
-                    pil_image = Image.fromarray(image_rgb)
-                    
-                    # PIL Image를 bytes로 변환
-                    img_byte_arr = io.BytesIO()
-                    pil_image.save(img_byte_arr, format='JPEG')
-                    img_bytes = img_byte_arr.getvalue()
-                    contents.append(types.Part.from_bytes(data=img_bytes, mime_type="image/jpeg"))
+                    encoded_image = self._to_encoded_image(image_array)
+                    if isinstance(encoded_image, str):
+                        return None, encoded_image
+                    contents.append(types.Part.from_bytes(data=encoded_image.jpeg_bytes, mime_type="image/jpeg"))
+                    encoded_images.append(encoded_image.jpeg_bytes)
+                    image_sizes.append((encoded_image.width, encoded_image.height))
                     
                 except Exception as e:
                     print(f"이미지 배열 처리 중 오류 발생: {e}")
-                    return f"Image Error: Error processing image array: {str(e)}"
+                    return None, f"Image Error: Error processing image array: {str(e)}"
                     
             elif image_path:
                 try:
@@ -366,110 +547,230 @@ class multimodalLLM:
                         image = self.cv2_imread(image_path)
                         if image is None:
                             print(f"이미지를 읽어들이는 데 실패했습니다: {image_path}")
-                            return f"Image Error: Failed to read image file: {image_path}"
+                            return None, f"Image Error: Failed to read image file: {image_path}"
                         
-                        # BGR -> RGB 변환
-                        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-                        pil_image = Image.fromarray(image_rgb)
-                        
-                        # PIL Image를 bytes로 변환
-                        img_byte_arr = io.BytesIO()
-                        pil_image.save(img_byte_arr, format='JPEG')
-                        img_bytes = img_byte_arr.getvalue()
-                        contents.append(types.Part.from_bytes(data=img_bytes, mime_type="image/jpeg"))
+                        encoded_image = self._to_encoded_image(image)
+                        if isinstance(encoded_image, str):
+                            return None, encoded_image
+                        contents.append(types.Part.from_bytes(data=encoded_image.jpeg_bytes, mime_type="image/jpeg"))
+                        encoded_images.append(encoded_image.jpeg_bytes)
+                        image_sizes.append((encoded_image.width, encoded_image.height))
                     
                     # 비디오 파일 처리
                     elif ext in ['.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv', '.webm', '.mpeg']:
                         if not supports_video:
                             print(f"경고: {self.llm_name} 모델은 비디오 입력을 지원하지 않습니다.")
-                            return f"Video Error: {self.llm_name} model does not support video input."
-                        
-                        video = cv2.VideoCapture(image_path)
-                        if not video.isOpened():
-                            print(f"비디오 파일을 열 수 없습니다: {image_path}")
-                            return f"Image Error: Failed to open video file: {image_path}"
-                        
-                        frames = []
-                        frame_count = 0
-                        while video.isOpened():
-                            success, frame = video.read()
-                            if not success:
-                                break
-                            frames.append(frame)
-                            frame_count += 1
-                        video.release()
+                            return None, f"Video Error: {self.llm_name} model does not support video input."
                         
-                        if not frames:
-                            print("비디오에서 프레임을 추출할 수 없습니다.")
-                            return "Image Error: Failed to extract frames from video."
-                        
-                        # 일정 간격 추출
-                        extract_frames = frames[0::extract_video]
-                        print(f"video: input frames {len(frames)} --> extracted frames {len(extract_frames)}")
-                        
-                        # 프레임들을 PIL Image로 변환 후 bytes로 변환
-                        for frame in extract_frames:
-                            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                            pil_image = Image.fromarray(frame_rgb)
-                            img_byte_arr = io.BytesIO()
-                            pil_image.save(img_byte_arr, format='JPEG')
-                            img_bytes = img_byte_arr.getvalue()
-                            contents.append(types.Part.from_bytes(data=img_bytes, mime_type="image/jpeg"))
+                        # 일정 간격 추출 (나머지 프레임은 디코딩/인코딩 생략)
+                        frames = self._sample_video(image_path, extract_video)
+                        if isinstance(frames, str):
+                            return None, frames
+                        for frame in frames:
+                            contents.append(types.Part.from_bytes(data=frame.jpeg_bytes, mime_type="image/jpeg"))
+                            encoded_images.append(frame.jpeg_bytes)
+                            image_sizes.append((frame.width, frame.height))
                     
                     else:
                         print(f"Unknown media file format: {ext}")
-                        return f"Image Error: Unknown media file format: {ext}"
+                        return None, f"Image Error: Unknown media file format: {ext}"
                         
                 except Exception as e:
                     print(f"이미지 파일 처리 중 오류 발생: {e}")
-                    return f"Image Error: Error processing image file: {str(e)}"
+                    return None, f"Image Error: Error processing image file: {str(e)}"
             
-            # Gemini API 호출 (새 SDK 사용) - 재시도 로직 포함
+            # LLM 응답 캐시 조회 (Gemini는 seed 미사용)
+            cache_key, cached_answer = self._lookup_cache(system_prompt, user_prompt, temperature, None, max_output_tokens, encoded_images)
+            if cached_answer is not None:
+                return None, cached_answer
+
             generation_config = types.GenerateContentConfig(
                 max_output_tokens=max_output_tokens,
                 temperature=temperature,
             )
+            estimated_tokens = rate_limiter.estimate_request_tokens(self.provider, [combined_prompt], image_sizes)
+            return {"contents": contents, "config": generation_config, "cache_key": cache_key, "estimated_tokens": estimated_tokens}, None
 
-            max_retries = 2
-            last_error = None
-            for attempt in range(max_retries + 1):
+        except Exception as e:
+            error_msg = str(e)
+            print(f"{self.llm_name} API 호출 중 예외 발생: {error_msg}")
+            return None, self._gemini_error_message(error_msg)
+
+    async def _asend(self, request):
+        """준비된 요청을 공유 async 클라이언트로 전송 (공용 LLM 루프에서 실행)"""
+        if self.provider == "google":
+            return await self._asend_gemini(request)
+        return await self._asend_openai(request)
+
+    async def _acall_with_retry(self, request, make_call, max_retries=2):
+        """
+        API 호출 1회마다 rate limiter 슬롯을 받고 반납 (재시도도 provider 공용 한도 안에서 수행)
+        - 429/rate_limit 응답은 limiter에 알려 동시 요청 수를 줄이고, 일시적 오류는 지수 백오프 후 재시도
+        Returns:
+            API 응답 객체 (모든 재시도 실패 시 마지막 예외 발생)
+        """
+        limiter = rate_limiter.get_rate_limiter()
+        last_error = None
+        for attempt in range(max_retries + 1):
+            lease_id = None
+            if limiter is not None:
                 try:
-                    response = self.client.models.generate_content(
-                        model=self.llm_name,
-                        contents=contents,
-                        config=generation_config
-                    )
-                    return response.text
+                    lease_id = await limiter.acquire(self.provider, self.llm_name, request["estimated_tokens"])
                 except Exception as e:
-                    last_error = e
-                    if attempt < max_retries and self._is_retryable_error(e):
-                        wait_time = 2 ** attempt  # 1초, 2초
-                        print(f"[{self.llm_name}] 일시적 오류, 재시도 {attempt+1}/{max_retries} ({wait_time}초 대기): {e}")
-                        time.sleep(wait_time)
-                        continue
-                    break
+                    print(f"[rate limiter] 슬롯 획득 실패, 제한 없이 진행: {e}")
+            rate_limited = False
+            completed = False  # 취소(CancelledError)된 요청은 AIMD에 반영하지 않고 슬롯만 반납
+            try:
+                response = await make_call()
+                completed = True
+                return response
+            except Exception as e:
+                completed = True
+                last_error = e
+                rate_limited = rate_limiter.is_rate_limit_error(e)
+            finally:
+                if lease_id is not None:
+                    try:
+                        if completed:
+                            await asyncio.to_thread(limiter.release, self.provider, self.llm_name, lease_id, rate_limited)
+                        else:
+                            await asyncio.to_thread(limiter.discard, lease_id)
+                    except BaseException as e:
+                        print(f"[rate limiter] 슬롯 반납 실패: {e}")
 
-            # 모든 재시도 실패 시 오류 반환
-            error_msg = str(last_error)
-            print(f"{self.llm_name} API 호출 중 오류 발생 (재시도 {max_retries}회 포함): {error_msg}")
+            if attempt < max_retries and self._is_retryable_error(last_error):
+                # rate limit 응답은 limiter가 대기시키므로 일반 오류만 백오프
+                wait_time = 0 if rate_limited and limiter is not None else 2 ** attempt  # 1초, 2초
+                print(f"[{self.llm_name}] 일시적 오류, 재시도 {attempt+1}/{max_retries} ({wait_time}초 대기): {last_error}")
+                await asyncio.sleep(wait_time)
+                continue
+            break
+        raise last_error
 
+    async def _asend_openai(self, request):
+        """OpenAI API 호출 (AsyncOpenAI) - 재시도 로직 포함"""
+        try:
+            client = get_async_client(self.provider, self.api_key)
+            response = await self._acall_with_retry(
+                request, lambda: client.chat.completions.create(**request["api_params"])
+            )
+            answer = response.choices[0].message.content
+            await asyncio.to_thread(self._store_cache, request["cache_key"], answer)
+            return answer
+            
+        except Exception as e:
+            error_msg = str(e)
+            print(f"{self.llm_name} API 호출 중 오류 발생: {error_msg}")
+            
             # 구체적인 오류 메시지 제공
-            if "quota" in error_msg.lower() or "rate" in error_msg.lower():
+            if "context_length_exceeded" in error_msg.lower():
+                return f"API Error: 입력이 {self.llm_name}의 최대 입력 토큰 제한(Context Window: {self.model_config['context_window']})을 초과했습니다."
+            elif "rate_limit" in error_msg.lower():
                 return f"API Error: API 호출 한도 초과. 잠시 후 다시 시도해주세요."
-            elif "invalid" in error_msg.lower() and "api" in error_msg.lower():
-                return f"API Error: API 키가 유효하지 않습니다."
+            elif "model_not_found" in error_msg.lower():
+                return f"API Error: {self.llm_name} 모델을 찾을 수 없습니다. 모델명을 확인해주세요."
             else:
                 return f"API Error: {error_msg}"
 
+    async def _asend_gemini(self, request):
+        """Gemini API 호출 (genai aio 클라이언트) - 재시도 로직 포함, 대기는 asyncio.sleep으로 루프를 막지 않음"""
+        max_retries = 2
+        try:
+            client = get_async_client(self.provider, self.api_key)
+            response = await self._acall_with_retry(
+                request,
+                lambda: client.aio.models.generate_content(
+                    model=self.llm_name,
+                    contents=request["contents"],
+                    config=request["config"]
+                ),
+                max_retries=max_retries,
+            )
+            await asyncio.to_thread(self._store_cache, request["cache_key"], response.text)
+            return response.text
         except Exception as e:
+            # 모든 재시도 실패 시 오류 반환
             error_msg = str(e)
-            print(f"{self.llm_name} API 호출 중 예외 발생: {error_msg}")
-            if "quota" in error_msg.lower() or "rate" in error_msg.lower():
-                return f"API Error: API 호출 한도 초과. 잠시 후 다시 시도해주세요."
-            elif "invalid" in error_msg.lower() and "api" in error_msg.lower():
-                return f"API Error: API 키가 유효하지 않습니다."
-            else:
-                return f"API Error: {error_msg}"
+            print(f"{self.llm_name} API 호출 중 오류 발생 (재시도 {max_retries}회 포함): {error_msg}")
+            return self._gemini_error_message(error_msg)
+
+    def _gemini_error_message(self, error_msg):
+        """Gemini 오류 메시지 → "API Error: ..." 응답 (구체적인 오류 메시지 제공)"""
+        if "quota" in error_msg.lower() or "rate" in error_msg.lower():
+            return f"API Error: API 호출 한도 초과. 잠시 후 다시 시도해주세요."
+        elif "invalid" in error_msg.lower() and "api" in error_msg.lower():
+            return f"API Error: API 키가 유효하지 않습니다."
+        else:
+            return f"API Error: {error_msg}"
+
+    def _sample_video(self, video_path, extract_video):
+        """
+        VideoFrameSampler로 비디오 프레임을 샘플링
+        Returns:
+            list[EncodedImage] 또는 "Image Error: ..." 문자열
+        """
+        sampler = VideoFrameSampler(video_path, every_n=extract_video)
+        try:
+            frames = list(sampler)
+        except IOError:
+            print(f"비디오 파일을 열 수 없습니다: {video_path}")
+            return f"Image Error: Failed to open video file: {video_path}"
+        if not frames:
+            print("비디오에서 프레임을 추출할 수 없습니다.")
+            return "Image Error: Failed to extract frames from video."
+        print(f"video: input frames {sampler.frames_read} --> extracted frames {sampler.frames_kept} "
+              f"({sampler.payload_bytes / (1024*1024):.1f}MB{', truncated' if sampler.truncated else ''})")
+        return frames
+
+    def _to_encoded_image(self, image_array):
+        """
+        image_array 인자를 EncodedImage로 변환 (이미 EncodedImage이면 그대로 사용)
+        Returns:
+            EncodedImage 또는 "Image Error: ..." 문자열
+        """
+        if isinstance(image_array, EncodedImage):
+            return image_array
+        try:
+            return EncodedImage.from_array(image_array)
+        except ValueError as e:
+            print(f"이미지 배열을 JPEG로 변환하는 데 실패했습니다: {e}")
+            return f"Image Error: {e}"
+
+    def _lookup_cache(self, system_prompt, user_prompt, temperature, seed, max_output_tokens, encoded_images):
+        """
+        LLM 응답 캐시 조회
+        Returns:
+            (cache_key, 응답) - 캐시 미사용 시 (None, None), 캐시에 없으면 (cache_key, None)
+            replay 모드에서 캐시에 없으면 API를 호출하지 않도록 "API Error:" 응답 반환
+        """
+        cache = llm_cache.get_llm_cache()
+        if cache is None:
+            return None, None
+        try:
+            cache_key = llm_cache.make_cache_key(
+                self.llm_name, system_prompt, user_prompt, temperature, seed, max_output_tokens,
+                llm_cache.media_digest(encoded_images)
+            )
+            answer = cache.get(cache_key)
+        except Exception as e:
+            print(f"[LLM 캐시] 조회 실패, API 호출로 진행: {e}")
+            return None, None
+        if answer is None and cache.read_only:
+            print(f"[LLM 캐시] replay 모드 캐시 미스: {self.llm_name}")
+            return cache_key, "API Error: replay 모드 - 캐시된 응답이 없습니다."
+        return cache_key, answer
+
+    def _store_cache(self, cache_key, answer):
+        """정상 응답만 LLM 응답 캐시에 저장 (오류 응답/빈 응답은 저장하지 않음)"""
+        if cache_key is None or not isinstance(answer, str) or not answer:
+            return
+        cache = llm_cache.get_llm_cache()
+        if cache is None:
+            return
+        try:
+            cache.put(cache_key, self.llm_name, answer)
+        except Exception as e:
+            print(f"[LLM 캐시] 저장 실패: {e}")
 
     def _is_retryable_error(self, error):
         """일시적/재시도 가능한 오류인지 판별"""
@@ -504,41 +805,14 @@ class multimodalLLM:
         self.model_config = self.SUPPORTED_MODELS[new_model_name]
         self.provider = self.model_config["provider"]
         
-        # provider가 변경된 경우 클라이언트 재초기화
-        if old_provider != self.provider:
-            if api_key is None:
-                print(f"경고: provider가 {old_provider}에서 {self.provider}로 변경되었습니다. API 키를 제공해야 합니다.")
-                return False
-            
-            if self.provider == "openai":
-                from openai import OpenAI
-                import httpx
-                self.client = OpenAI(
-                    api_key=api_key,
-                    timeout=httpx.Timeout(LLM_API_TIMEOUT_SECONDS, connect=LLM_API_CONNECT_TIMEOUT_SECONDS),
-                    max_retries=2,
-                )
-            elif self.provider == "google":
-                from google import genai
-                from google.genai import types as genai_types
-                self.client = genai.Client(
-                    api_key=api_key,
-                    http_options=genai_types.HttpOptions(timeout=LLM_API_TIMEOUT_SECONDS * 1000),
-                )
-                self.llm_name_for_api = self.llm_name
-        elif self.provider == "google":
-            # Gemini는 모델이 변경되면 새 Client 인스턴스 필요 (실제로는 동일 클라이언트 사용 가능)
-            from google import genai
-            from google.genai import types as genai_types
-            if api_key is None:
-                # 기존 클라이언트 재사용 (모델명만 변경)
-                self.llm_name_for_api = self.llm_name
-            else:
-                self.client = genai.Client(
-                    api_key=api_key,
-                    http_options=genai_types.HttpOptions(timeout=LLM_API_TIMEOUT_SECONDS * 1000),
-                )
-                self.llm_name_for_api = self.llm_name
+        # provider가 변경된 경우 새 API 키 필요 (클라이언트는 공용 풀에서 API 키별로 공유)
+        if old_provider != self.provider and api_key is None:
+            print(f"경고: provider가 {old_provider}에서 {self.provider}로 변경되었습니다. API 키를 제공해야 합니다.")
+            return False
+        if api_key is not None:
+            self.api_key = api_key
+        if self.provider == "google":
+            self.llm_name_for_api = self.llm_name
         
         print(f"모델이 {new_model_name}로 변경되었습니다.")
         return True
@@ -0,0 +1,364 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+분석 작업 저장소 (api_server의 analysis_storage dict 대체)
+
+[구현]
+- JobStore: 저장소 인터페이스 (create / get / update / append_log / get_logs / count_by_status / delete_expired / fail_orphaned)
+- SQLiteJobStore: WAL 모드 SQLite (기본값, JOB_STORE_BACKEND=sqlite)
+  - 여러 uvicorn 워커가 같은 DB 파일을 공유 (한 포트 뒤에 여러 API 워커 실행 가능)
+  - 서버가 재시작되어도 작업 상태/로그/결과 유지, 완료된 결과는 JOB_RETENTION_HOURS 동안 보관
+- MemoryJobStore: 프로세스 메모리 dict (JOB_STORE_BACKEND=memory, 기존 동작, ANALYSIS_STORAGE_TTL_HOURS 후 정리)
+
+[SQLite 스키마]
+- jobs: 작업 한 건 = 한 행 (analysis_id PK, status/created_at 인덱스 → 상태 조회 O(1), 통계는 인덱스 집계)
+  - result, raw_result: zlib 압축 JSON BLOB (상태 조회 시에는 읽지 않음)
+  - owner_pid: 작업을 실행 중인 API 프로세스 PID (프로세스가 죽으면 pending/processing 작업을 오류로 정리)
+- job_logs: 로그 한 줄 = 한 행 (append-only, analysis_id 인덱스)
+
+[연결]
+- 요청마다 연결을 새로 열어 사용 (result_store와 동일, FastAPI 이벤트 루프/스레드 풀 어디서 호출해도 안전)
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+JOB_STORE_BACKEND = os.getenv("JOB_STORE_BACKEND", "sqlite")
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", os.path.join(project_root, "data", "analysis_jobs.db"))
+JOB_RETENTION_HOURS = int(os.getenv("JOB_RETENTION_HOURS", str(24 * 30)))  # 영구 저장소의 완료/오류 작업 보관 기간
+
+# jobs 테이블의 일반 컬럼 (result/raw_result는 압축 BLOB으로 별도 처리)
+JOB_FIELDS = ("status", "progress", "current_stage", "error", "device_type", "video_path", "eta_seconds",
+              "queue_position", "estimated_start_at")
+RESULT_FIELDS = ("result", "raw_result")
+ACTIVE_STATUSES = ("pending", "processing")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    analysis_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    current_stage TEXT,
+    error TEXT,
+    device_type TEXT,
+    video_path TEXT,
+    eta_seconds INTEGER,
+    queue_position INTEGER,
+    estimated_start_at REAL,
+    result BLOB,
+    raw_result BLOB,
+    owner_pid INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status);
+CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at);
+CREATE TABLE IF NOT EXISTS job_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    analysis_id TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_job_logs_analysis_id ON job_logs (analysis_id, id);
+"""
+
+# 기존 DB 파일에 없으면 추가하는 jobs 컬럼 (이름, 타입)
+_ADDED_COLUMNS = (("eta_seconds", "INTEGER"), ("queue_position", "INTEGER"), ("estimated_start_at", "REAL"))
+
+
+def _pack(value: Any) -> Optional[bytes]:
+    """결과 딕셔너리 → zlib 압축 JSON"""
+    if value is None:
+        return None
+    return zlib.compress(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def _unpack(blob: Optional[bytes]) -> Any:
+    if blob is None:
+        return None
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    """같은 호스트에서 pid 프로세스가 살아 있는지 확인 (권한 없음 = 살아 있음)"""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore(ABC):
+    """
+    분석 작업 저장소 인터페이스 (구현하지 않은 메서드가 있으면 생성 시 TypeError)
+
+    작업 레코드 (get 반환값):
+        status, progress, current_stage, logs (문자열 리스트), error, result, raw_result,
+        device_type, video_path, eta_seconds (예상 남은 시간),
+        queue_position (대기 순서), estimated_start_at (예상 시작 시각, epoch 초), created_at (datetime)
+    """
+
+    persistent = False  # 서버 재시작 후에도 유지되는 저장소인지
+
+    @abstractmethod
+    def create(self, analysis_id: str, logs: Optional[List[str]] = None, **fields):
+        """작업 생성 (fields: JOB_FIELDS + result/raw_result)"""
+
+    @abstractmethod
+    def get(self, analysis_id: str, include_result: bool = True, include_logs: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        작업 조회
+        - include_result=False: result/raw_result를 읽지 않음 (None)
+        - include_logs=False: logs를 읽지 않음 (None, 로그는 get_logs로 커서 이후만 조회)
+        """
+
+    @abstractmethod
+    def update(self, analysis_id: str, **fields):
+        """작업 필드 갱신"""
+
+    @abstractmethod
+    def append_log(self, analysis_id: str, message: str):
+        """작업 로그 한 줄 추가"""
+
+    @abstractmethod
+    def get_logs(self, analysis_id: str, after: int = 0) -> List[Tuple[int, str]]:
+        """after 커서 이후의 로그 [(커서, 메시지), ...] (커서는 작업 안에서 증가하는 정수)"""
+
+    @abstractmethod
+    def count_by_status(self) -> Dict[str, int]:
+        """상태별 작업 수"""
+
+    @abstractmethod
+    def delete_expired(self, cutoff: datetime) -> int:
+        """cutoff 이전에 생성된 완료/오류 작업 삭제, 삭제한 작업 수 반환"""
+
+    def fail_orphaned(self, message: str) -> int:
+        """실행하던 API 프로세스가 종료된 pending/processing 작업을 오류로 표시, 정리한 작업 수 반환"""
+        return 0
+
+
+class MemoryJobStore(JobStore):
+    """프로세스 메모리 dict 저장소 (서버 재시작 시 소실, 단일 API 프로세스 전용)"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, analysis_id: str, logs: Optional[List[str]] = None, **fields):
+        job = {field: None for field in JOB_FIELDS + RESULT_FIELDS}
+        job.update(progress=0, logs=list(logs or []), created_at=datetime.now())
+        job.update(fields)
+        with self._lock:
+            self._jobs[analysis_id] = job
+
+    def get(self, analysis_id: str, include_result: bool = True, include_logs: bool = True) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(analysis_id)
+            if job is None:
+                return None
+            job = dict(job, logs=list(job["logs"]) if include_logs else None)
+        if not include_result:
+            for field in RESULT_FIELDS:
+                job[field] = None
+        return job
+
+    def update(self, analysis_id: str, **fields):
+        with self._lock:
+            if analysis_id in self._jobs:
+                self._jobs[analysis_id].update(fields)
+
+    def append_log(self, analysis_id: str, message: str):
+        with self._lock:
+            if analysis_id in self._jobs:
+                self._jobs[analysis_id]["logs"].append(message)
+
+    def get_logs(self, analysis_id: str, after: int = 0) -> List[Tuple[int, str]]:
+        with self._lock:
+            logs = list(self._jobs.get(analysis_id, {}).get("logs", []))
+        return [(idx, message) for idx, message in enumerate(logs, 1) if idx > after]
+
+    def count_by_status(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return counts
+
+    def delete_expired(self, cutoff: datetime) -> int:
+        with self._lock:
+            ids_to_remove = [
+                aid for aid, job in self._jobs.items()
+                if job.get("status") not in ACTIVE_STATUSES
+                and job.get("created_at") and job["created_at"] < cutoff
+            ]
+            for aid in ids_to_remove:
+                del self._jobs[aid]
+        return len(ids_to_remove)
+
+
+class SQLiteJobStore(JobStore):
+    """WAL 모드 SQLite 작업 저장소 (여러 API 프로세스 공유, 재시작 후 유지)"""
+
+    persistent = True
+
+    def __init__(self, db_path: str = JOB_STORE_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            # WAL: 읽기(상태 폴링)가 쓰기(로그 추가)를 기다리지 않음, 설정은 DB 파일에 유지됨
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for name, column_type in _ADDED_COLUMNS:
+                if name not in existing:
+                    try:
+                        conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {column_type}")
+                    except sqlite3.OperationalError:
+                        pass  # 다른 API 워커가 먼저 추가함
+
+    @contextmanager
+    def _connect(self):
+        """트랜잭션 단위 연결 (블록 종료 시 commit 후 close)"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")  # WAL 모드에서는 NORMAL도 커밋 일관성 보장
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _columns(fields: Dict[str, Any]) -> Dict[str, Any]:
+        """갱신할 필드 → 컬럼 값 (알 수 없는 필드는 ValueError)"""
+        columns = {}
+        for field, value in fields.items():
+            if field in JOB_FIELDS:
+                columns[field] = value
+            elif field in RESULT_FIELDS:
+                columns[field] = _pack(value)
+            else:
+                raise ValueError(f"알 수 없는 작업 필드: {field}")
+        return columns
+
+    def create(self, analysis_id: str, logs: Optional[List[str]] = None, **fields):
+        now = time.time()
+        columns = {"status": "pending", "progress": 0}
+        columns.update(self._columns(fields))
+        columns.update(analysis_id=analysis_id, owner_pid=os.getpid(), created_at=now, updated_at=now)
+        names = ", ".join(columns)
+        placeholders = ", ".join("?" for _ in columns)
+        with self._connect() as conn:
+            conn.execute(f"INSERT OR REPLACE INTO jobs ({names}) VALUES ({placeholders})", tuple(columns.values()))
+            conn.execute("DELETE FROM job_logs WHERE analysis_id = ?", (analysis_id,))
+            conn.executemany(
+                "INSERT INTO job_logs (analysis_id, message, created_at) VALUES (?, ?, ?)",
+                [(analysis_id, message, now) for message in (logs or [])]
+            )
+
+    def get(self, analysis_id: str, include_result: bool = True, include_logs: bool = True) -> Optional[Dict[str, Any]]:
+        names = list(JOB_FIELDS) + (list(RESULT_FIELDS) if include_result else []) + ["created_at"]
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(names)} FROM jobs WHERE analysis_id = ?", (analysis_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            logs = [r[0] for r in conn.execute(
+                "SELECT message FROM job_logs WHERE analysis_id = ? ORDER BY id", (analysis_id,)
+            )] if include_logs else None
+        job = dict(zip(names, row))
+        for field in RESULT_FIELDS:
+            job[field] = _unpack(job.get(field))
+        job["created_at"] = datetime.fromtimestamp(job["created_at"])
+        job["logs"] = logs
+        return job
+
+    def update(self, analysis_id: str, **fields):
+        if not fields:
+            return
+        columns = self._columns(fields)
+        assignments = ", ".join(f"{name} = ?" for name in columns)
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? WHERE analysis_id = ?",
+                tuple(columns.values()) + (time.time(), analysis_id)
+            )
+
+    def append_log(self, analysis_id: str, message: str):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO job_logs (analysis_id, message, created_at) VALUES (?, ?, ?)",
+                (analysis_id, message, now)
+            )
+            conn.execute("UPDATE jobs SET updated_at = ? WHERE analysis_id = ?", (now, analysis_id))
+
+    def get_logs(self, analysis_id: str, after: int = 0) -> List[Tuple[int, str]]:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT id, message FROM job_logs WHERE analysis_id = ? AND id > ? ORDER BY id", (analysis_id, after)
+            ).fetchall()
+
+    def count_by_status(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def delete_expired(self, cutoff: datetime) -> int:
+        placeholders = ", ".join("?" for _ in ACTIVE_STATUSES)
+        with self._connect() as conn:
+            ids = [r[0] for r in conn.execute(
+                f"SELECT analysis_id FROM jobs WHERE created_at < ? AND status NOT IN ({placeholders})",
+                (cutoff.timestamp(),) + ACTIVE_STATUSES
+            )]
+            conn.executemany("DELETE FROM job_logs WHERE analysis_id = ?", [(aid,) for aid in ids])
+            conn.executemany("DELETE FROM jobs WHERE analysis_id = ?", [(aid,) for aid in ids])
+        return len(ids)
+
+    def fail_orphaned(self, message: str) -> int:
+        placeholders = ", ".join("?" for _ in ACTIVE_STATUSES)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT analysis_id, owner_pid FROM jobs WHERE status IN ({placeholders})", ACTIVE_STATUSES
+            ).fetchall()
+        orphaned = [aid for aid, pid in rows if not _pid_alive(pid)]
+        now = time.time()
+        failed = 0
+        with self._connect() as conn:
+            for aid in orphaned:
+                # 조회 이후 상태가 바뀐 작업은 건드리지 않음
+                cursor = conn.execute(
+                    f"UPDATE jobs SET status = 'error', error = ?, current_stage = '분석 중단', updated_at = ? "
+                    f"WHERE analysis_id = ? AND status IN ({placeholders})",
+                    (message, now, aid) + ACTIVE_STATUSES
+                )
+                if cursor.rowcount:
+                    conn.execute(
+                        "INSERT INTO job_logs (analysis_id, message, created_at) VALUES (?, ?, ?)",
+                        (aid, f"[{datetime.now().strftime('%H:%M:%S')}] {message}", now)
+                    )
+                    failed += 1
+        return failed
+
+
+def create_job_store(backend: str = JOB_STORE_BACKEND) -> JobStore:
+    """JOB_STORE_BACKEND에 따른 작업 저장소 생성 (sqlite | memory)"""
+    if backend == "memory":
+        return MemoryJobStore()
+    if backend == "sqlite":
+        return SQLiteJobStore()
+    raise ValueError(f"지원하지 않는 JOB_STORE_BACKEND: {backend} (sqlite | memory)")
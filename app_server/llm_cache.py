@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+LLM 응답 영구 캐시 (SQLite)
+multimodalLLM이 API 호출 전에 먼저 조회합니다.
+
+[캐시 키]
+- (llm_name, system prompt, user prompt, temperature, seed, max_output_tokens, 인코딩된 JPEG 바이트의 SHA-256)
+- 같은 영상/프롬프트로 재분석하면 (예: ReporterAgent 규칙만 변경) API 호출 없이 응답 재사용
+
+[모드] (환경변수 LLM_CACHE_MODE)
+- "readwrite" (기본값): 조회 후 없으면 API 호출, 정상 응답 저장
+- "replay": 읽기 전용, 캐시에 없으면 API 호출 없이 "API Error:" 반환 (회귀 테스트용, API 비용 0)
+- "off": 캐시 사용 안 함
+
+[용량 관리]
+- LLM_CACHE_MAX_BYTES 초과 시 마지막 사용 시각이 오래된 항목부터 삭제 (LRU)
+- 저장 용량은 counters 테이블의 size_bytes에 저장/삭제와 같은 트랜잭션으로 누적 (저장마다 전체 합계를 다시 계산하지 않음)
+- 분석 프로세스 여러 개가 같은 파일을 공유 (WAL 모드, 요청마다 연결)
+
+[통계]
+- 프로세스 내 hit/miss 카운터 (stats())
+- readwrite 모드에서는 누적 카운터를 counters 테이블에도 기록
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Optional, List
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(project_root, "data", "llm_cache.db"))
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "readwrite").lower()  # readwrite | replay | off
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))  # 512MB
+LLM_CACHE_EVICT_RATIO = 0.9  # 상한 초과 시 상한의 90%까지 삭제 (매 저장마다 삭제가 일어나지 않도록)
+
+CACHE_MODES = ("readwrite", "replay", "off")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    cache_key TEXT PRIMARY KEY,
+    llm_name TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def media_digest(encoded_images: List[bytes]) -> Optional[str]:
+    """API로 전송할 인코딩된 이미지(JPEG) 바이트들의 SHA-256 (이미지가 없으면 None)"""
+    if not encoded_images:
+        return None
+    sha256 = hashlib.sha256()
+    for data in encoded_images:
+        sha256.update(len(data).to_bytes(8, "little"))
+        sha256.update(data)
+    return sha256.hexdigest()
+
+
+def make_cache_key(llm_name: str, system_prompt: str, user_prompt: str, temperature, seed,
+                   max_output_tokens, media_sha: Optional[str]) -> str:
+    """캐시 키 생성 (요청 구성 요소의 JSON 직렬화 SHA-256)"""
+    payload = json.dumps(
+        [llm_name, system_prompt, user_prompt, temperature, seed, max_output_tokens, media_sha],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite 기반 LLM 응답 캐시 (LRU 용량 제한)"""
+
+    def __init__(self, db_path: str = LLM_CACHE_PATH, max_bytes: int = LLM_CACHE_MAX_BYTES, mode: str = LLM_CACHE_MODE):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"지원하지 않는 LLM_CACHE_MODE: {mode} (허용: {', '.join(CACHE_MODES)})")
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if mode == "replay" and not os.path.exists(db_path):
+            print(f"[LLM 캐시] replay 모드이지만 캐시 파일이 없습니다: {db_path}")
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            # 누적 용량 카운터가 없는 기존 캐시 파일은 한 번만 합계 계산
+            conn.execute(
+                "INSERT OR IGNORE INTO counters (name, value) SELECT 'size_bytes', COALESCE(SUM(size), 0) FROM responses"
+            )
+
+    @property
+    def read_only(self) -> bool:
+        return self.mode == "replay"
+
+    @contextmanager
+    def _connect(self):
+        """트랜잭션 단위 연결 (블록 종료 시 commit 후 close)"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _count(self, conn, name: str):
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,)
+        )
+
+    def get(self, cache_key: str) -> Optional[str]:
+        """캐시된 응답 반환 (없으면 None). readwrite 모드에서는 마지막 사용 시각과 누적 카운터 갱신"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT response FROM responses WHERE cache_key = ?", (cache_key,)).fetchone()
+            if not self.read_only:
+                if row is not None:
+                    conn.execute("UPDATE responses SET last_access = ? WHERE cache_key = ?", (time.time(), cache_key))
+                self._count(conn, "hits" if row is not None else "misses")
+        with self._lock:
+            if row is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return row[0] if row is not None else None
+
+    def put(self, cache_key: str, llm_name: str, response: str):
+        """응답 저장 후 용량 상한 초과 시 LRU 삭제 (replay 모드에서는 저장하지 않음)"""
+        if self.read_only:
+            return
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._connect() as conn:
+            previous = conn.execute("SELECT size FROM responses WHERE cache_key = ?", (cache_key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (cache_key, llm_name, response, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (cache_key, llm_name, response, size, now, now)
+            )
+            total = self._add_size(conn, size - (previous[0] if previous else 0))
+            if total > self.max_bytes:
+                self._evict(conn, total - int(self.max_bytes * LLM_CACHE_EVICT_RATIO))
+
+    def _add_size(self, conn, delta: int) -> int:
+        """누적 용량 카운터 갱신 후 현재 용량 반환"""
+        conn.execute("UPDATE counters SET value = value + ? WHERE name = 'size_bytes'", (delta,))
+        return conn.execute("SELECT value FROM counters WHERE name = 'size_bytes'").fetchone()[0]
+
+    def _evict(self, conn, bytes_to_free: int):
+        """마지막 사용 시각이 오래된 항목부터 bytes_to_free 이상 삭제"""
+        freed = 0
+        evicted = []
+        for cache_key, size in conn.execute("SELECT cache_key, size FROM responses ORDER BY last_access ASC"):
+            if freed >= bytes_to_free:
+                break
+            evicted.append((cache_key,))
+            freed += size
+        conn.executemany("DELETE FROM responses WHERE cache_key = ?", evicted)
+        self._add_size(conn, -freed)
+        print(f"[LLM 캐시] 용량 상한 초과 → {len(evicted)}개 항목 삭제 ({freed / 1024:.0f}KB)")
+
+    def stats(self) -> dict:
+        """프로세스 내 hit/miss 카운터와 누적 카운터, 저장 용량"""
+        with self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "mode": self.mode,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "total_hits": counters.get("hits", 0),
+            "total_misses": counters.get("misses", 0),
+            "entries": entries,
+            "size_bytes": total,
+        }
+
+
+_cache_instance: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """프로세스 공용 캐시 인스턴스 (LLM_CACHE_MODE=off이거나 초기화 실패 시 None)"""
+    global _cache_instance
+    if LLM_CACHE_MODE == "off":
+        return None
+    with _cache_lock:
+        if _cache_instance is None:
+            try:
+                _cache_instance = LLMResponseCache()
+            except Exception as e:
+                print(f"[LLM 캐시] 초기화 실패, 캐시 없이 진행: {e}")
+                return None
+        return _cache_instance
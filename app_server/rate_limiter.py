@@ -0,0 +1,322 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+LLM API 공용 rate limiter (분석 프로세스 간 공유)
+multimodalLLM이 API를 호출할 때마다 먼저 슬롯을 받고, 응답 후 반납합니다.
+
+[제한 단위] provider/모델별 ("openai/gpt-4.1", "google/gemini-3-flash-preview")
+- 토큰 버킷 2개: 분당 요청 수(rpm), 분당 토큰 수(tpm, 요청 전 추정치로 차감)
+- AIMD 동시 요청 수: 정상 응답마다 +1/현재값 (한 라운드에 약 +1), 429/rate_limit 응답 시 절반으로 감소
+  → 동시 분석 5개 x analyzer 4개가 각자 재시도하지 않고, 전체 처리량이 provider 한도에 맞춰짐
+
+[프로세스 간 공유]
+- SQLite 파일 (LLM_RATE_LIMIT_PATH, 기본값: <project_root>/data/llm_rate_limit.db)
+- 상태 갱신은 BEGIN IMMEDIATE 트랜잭션 (파일 잠금으로 프로세스 간 직렬화)
+- 진행 중 요청은 lease 행으로 기록하고 만료 시각 이후 자동 회수 (분석 프로세스가 강제 종료되어도 슬롯 누수 없음)
+
+[설정] (환경변수)
+- LLM_RATE_LIMIT_ENABLED=0 이면 사용 안 함
+- LLM_RATE_LIMITS: 기본 한도 덮어쓰기 (JSON, 키는 provider 또는 "provider/모델")
+  예: {"openai": {"rpm": 5000, "tpm": 2000000}, "google/gemini-3-flash-preview": {"rpm": 2000}}
+"""
+
+import os
+import json
+import math
+import time
+import uuid
+import asyncio
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Optional, Dict, List, Tuple
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LLM_RATE_LIMIT_PATH = os.getenv("LLM_RATE_LIMIT_PATH", os.path.join(project_root, "data", "llm_rate_limit.db"))
+LLM_RATE_LIMIT_ENABLED = os.getenv("LLM_RATE_LIMIT_ENABLED", "1") != "0"
+
+# provider별 기본 한도 (유료 tier 기준 보수적 값, LLM_RATE_LIMITS로 조정)
+DEFAULT_RATE_LIMITS = {
+    "openai": {"rpm": 500, "tpm": 450_000},
+    "google": {"rpm": 1_000, "tpm": 1_000_000},
+}
+
+# AIMD 동시 요청 수 설정 (provider/모델별)
+AIMD_INITIAL_CONCURRENCY = 8
+AIMD_MIN_CONCURRENCY = 1
+AIMD_MAX_CONCURRENCY = 64
+AIMD_DECREASE_FACTOR = 0.5
+AIMD_DECREASE_INTERVAL = 2.0  # 동시에 들어온 429 여러 개로 연속 감소하지 않도록 최소 간격 (초)
+RATE_LIMIT_COOLDOWN_SECONDS = 2.0  # 429 응답 직후 신규 요청을 보내지 않는 시간 (초)
+
+LEASE_TTL_SECONDS = 600  # 진행 중 요청 lease 만료 시간 (API 타임아웃 + 재시도보다 충분히 길게)
+ACQUIRE_POLL_MAX_SECONDS = 1.0  # 대기 중 재확인 최대 간격 (다른 프로세스의 반납을 감지)
+
+# 요청 토큰 추정 (tpm 버킷 차감용)
+TEXT_BYTES_PER_TOKEN = 4
+OUTPUT_TOKENS_ESTIMATE = 256  # 응답 길이 추정 (Q1~Q6 답변 형식, max_output_tokens 대신 사용)
+GEMINI_TOKENS_PER_IMAGE = 258
+
+RATE_LIMIT_KEYWORDS = ("429", "rate_limit", "rate limit", "resource_exhausted", "resource exhausted", "quota")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    key TEXT PRIMARY KEY,
+    request_tokens REAL NOT NULL,
+    token_tokens REAL NOT NULL,
+    concurrency REAL NOT NULL,
+    cooldown_until REAL NOT NULL,
+    last_decrease REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    lease_id TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_leases_key ON leases (key);
+"""
+
+
+def _load_rate_limits() -> Dict[str, Dict[str, float]]:
+    limits = {provider: dict(values) for provider, values in DEFAULT_RATE_LIMITS.items()}
+    override = os.getenv("LLM_RATE_LIMITS")
+    if override:
+        try:
+            for key, values in json.loads(override).items():
+                limits.setdefault(key, {}).update(values)
+        except (ValueError, AttributeError) as e:
+            print(f"[rate limiter] LLM_RATE_LIMITS 형식 오류, 기본값 사용: {e}")
+    return limits
+
+
+def is_rate_limit_error(error) -> bool:
+    """429 / rate_limit / quota 초과 오류인지 판별"""
+    if getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429:
+        return True
+    error_msg = str(error).lower()
+    return any(kw in error_msg for kw in RATE_LIMIT_KEYWORDS)
+
+
+def estimate_request_tokens(provider: str, texts: List[str], image_sizes: List[Tuple[int, int]]) -> int:
+    """
+    요청 토큰 수 추정 (tpm 버킷 차감용)
+    - 텍스트: UTF-8 바이트 / 4
+    - 이미지: OpenAI는 high detail 타일 공식 (2048 이내, 짧은 변 768로 축소 후 512 타일당 170 + 85),
+              Gemini는 이미지당 고정값
+    """
+    tokens = sum(len(text.encode("utf-8")) for text in texts if text) // TEXT_BYTES_PER_TOKEN
+    for width, height in image_sizes:
+        if provider == "google":
+            tokens += GEMINI_TOKENS_PER_IMAGE
+            continue
+        scale = min(1.0, 2048 / max(width, height))
+        width, height = width * scale, height * scale
+        scale = min(1.0, 768 / min(width, height)) if min(width, height) > 0 else 1.0
+        width, height = width * scale, height * scale
+        tokens += 85 + 170 * math.ceil(width / 512) * math.ceil(height / 512)
+    return tokens + OUTPUT_TOKENS_ESTIMATE
+
+
+class RateLimiter:
+    """SQLite 기반 프로세스 간 공유 토큰 버킷 + AIMD 동시 요청 제한"""
+
+    def __init__(self, db_path: str = LLM_RATE_LIMIT_PATH, limits: Optional[Dict[str, Dict[str, float]]] = None):
+        self.db_path = db_path
+        self.limits = limits if limits is not None else _load_rate_limits()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _connect(self):
+        """BEGIN IMMEDIATE 트랜잭션 (쓰기 잠금을 먼저 잡아 프로세스 간 상태 갱신을 직렬화)"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    def limits_for(self, provider: str, model: str) -> Dict[str, float]:
+        """provider 기본값 위에 "provider/모델" 설정을 덮어쓴 한도"""
+        limits = dict(DEFAULT_RATE_LIMITS.get(provider, {"rpm": 60, "tpm": 100_000}))
+        limits.update(self.limits.get(provider, {}))
+        limits.update(self.limits.get(f"{provider}/{model}", {}))
+        return limits
+
+    def _load_bucket(self, conn, key: str, limits: Dict[str, float], now: float) -> dict:
+        """버킷 상태를 읽고 경과 시간만큼 토큰 보충"""
+        row = conn.execute(
+            "SELECT request_tokens, token_tokens, concurrency, cooldown_until, last_decrease, updated_at "
+            "FROM buckets WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return {
+                "request_tokens": float(limits["rpm"]), "token_tokens": float(limits["tpm"]),
+                "concurrency": float(AIMD_INITIAL_CONCURRENCY), "cooldown_until": 0.0, "last_decrease": 0.0,
+            }
+        request_tokens, token_tokens, concurrency, cooldown_until, last_decrease, updated_at = row
+        elapsed = max(0.0, now - updated_at)
+        return {
+            "request_tokens": min(float(limits["rpm"]), request_tokens + elapsed * limits["rpm"] / 60.0),
+            "token_tokens": min(float(limits["tpm"]), token_tokens + elapsed * limits["tpm"] / 60.0),
+            "concurrency": concurrency, "cooldown_until": cooldown_until, "last_decrease": last_decrease,
+        }
+
+    def _save_bucket(self, conn, key: str, bucket: dict, now: float):
+        conn.execute(
+            "INSERT OR REPLACE INTO buckets "
+            "(key, request_tokens, token_tokens, concurrency, cooldown_until, last_decrease, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, bucket["request_tokens"], bucket["token_tokens"], bucket["concurrency"],
+             bucket["cooldown_until"], bucket["last_decrease"], now)
+        )
+
+    def try_acquire(self, provider: str, model: str, tokens: int) -> Tuple[Optional[str], float]:
+        """
+        슬롯 1개 획득 시도 (대기하지 않음)
+        Returns:
+            (lease_id, 0) - 획득 성공
+            (None, 대기 시간(초)) - 한도 도달 (이 시간 이후 다시 시도)
+        """
+        key = f"{provider}/{model}"
+        limits = self.limits_for(provider, model)
+        tokens = min(float(tokens), float(limits["tpm"]))  # 한 요청이 버킷 용량보다 크면 가득 찬 버킷으로 허용
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+            bucket = self._load_bucket(conn, key, limits, now)
+            in_flight = conn.execute("SELECT COUNT(*) FROM leases WHERE key = ?", (key,)).fetchone()[0]
+
+            wait = 0.0
+            if now < bucket["cooldown_until"]:
+                wait = bucket["cooldown_until"] - now
+            elif in_flight >= int(bucket["concurrency"]):
+                wait = ACQUIRE_POLL_MAX_SECONDS  # 다른 요청의 반납 대기
+            else:
+                if bucket["request_tokens"] < 1:
+                    wait = max(wait, (1 - bucket["request_tokens"]) * 60.0 / limits["rpm"])
+                if bucket["token_tokens"] < tokens:
+                    wait = max(wait, (tokens - bucket["token_tokens"]) * 60.0 / limits["tpm"])
+
+            if wait > 0:
+                self._save_bucket(conn, key, bucket, now)
+                return None, wait
+
+            bucket["request_tokens"] -= 1
+            bucket["token_tokens"] -= tokens
+            self._save_bucket(conn, key, bucket, now)
+            lease_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO leases (lease_id, key, pid, expires_at) VALUES (?, ?, ?, ?)",
+                (lease_id, key, os.getpid(), now + LEASE_TTL_SECONDS)
+            )
+            return lease_id, 0.0
+
+    def release(self, provider: str, model: str, lease_id: str, rate_limited: bool = False):
+        """
+        슬롯 반납 + AIMD 갱신
+        - 정상/일반 오류: 동시 요청 수 += 1/현재값 (상한 AIMD_MAX_CONCURRENCY)
+        - 429/rate_limit: 동시 요청 수 *= AIMD_DECREASE_FACTOR, 잠시 신규 요청 중지
+        """
+        key = f"{provider}/{model}"
+        limits = self.limits_for(provider, model)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM leases WHERE lease_id = ?", (lease_id,))
+            bucket = self._load_bucket(conn, key, limits, now)
+            if rate_limited:
+                bucket["cooldown_until"] = max(bucket["cooldown_until"], now + RATE_LIMIT_COOLDOWN_SECONDS)
+                if now - bucket["last_decrease"] >= AIMD_DECREASE_INTERVAL:
+                    old = bucket["concurrency"]
+                    bucket["concurrency"] = max(float(AIMD_MIN_CONCURRENCY), old * AIMD_DECREASE_FACTOR)
+                    bucket["last_decrease"] = now
+                    print(f"[rate limiter] {key} 한도 초과 응답 → 동시 요청 수 {old:.1f} → {bucket['concurrency']:.1f}")
+            else:
+                bucket["concurrency"] = min(float(AIMD_MAX_CONCURRENCY), bucket["concurrency"] + 1.0 / bucket["concurrency"])
+            self._save_bucket(conn, key, bucket, now)
+
+    def discard(self, lease_id: str):
+        """취소된 요청의 슬롯 반납 (AIMD 갱신 없음)"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM leases WHERE lease_id = ?", (lease_id,))
+
+    def _discard_granted(self, future):
+        """acquire 대기 중 취소되었지만 스레드에서는 슬롯을 받은 경우 반납"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        lease_id, _ = future.result()
+        if lease_id is not None:
+            asyncio.get_running_loop().run_in_executor(None, self.discard, lease_id)
+
+    async def acquire(self, provider: str, model: str, tokens: int) -> str:
+        """슬롯을 받을 때까지 대기 (asyncio.sleep, SQLite 트랜잭션은 스레드에서 실행)"""
+        waited = 0.0
+        while True:
+            attempt = asyncio.ensure_future(asyncio.to_thread(self.try_acquire, provider, model, tokens))
+            try:
+                lease_id, wait = await asyncio.shield(attempt)
+            except asyncio.CancelledError:
+                attempt.add_done_callback(self._discard_granted)
+                raise
+            if lease_id is not None:
+                if waited >= 5.0:
+                    print(f"[rate limiter] {provider}/{model} 슬롯 대기 {waited:.1f}초")
+                return lease_id
+            wait = min(wait, ACQUIRE_POLL_MAX_SECONDS)
+            waited += wait
+            await asyncio.sleep(wait)
+
+    def stats(self) -> dict:
+        """provider/모델별 현재 동시 요청 한도, 진행 중 요청 수, 남은 토큰"""
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT key, request_tokens, token_tokens, concurrency, cooldown_until FROM buckets"
+            ).fetchall()
+            in_flight = dict(conn.execute(
+                "SELECT key, COUNT(*) FROM leases WHERE expires_at >= ? GROUP BY key", (now,)
+            ).fetchall())
+        return {
+            key: {
+                "concurrency": round(concurrency, 2),
+                "in_flight": in_flight.get(key, 0),
+                "request_tokens": round(request_tokens, 1),
+                "token_tokens": round(token_tokens),
+                "cooling_down": cooldown_until > now,
+            }
+            for key, request_tokens, token_tokens, concurrency, cooldown_until in rows
+        }
+
+
+_limiter_instance: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """프로세스 공용 rate limiter 인스턴스 (LLM_RATE_LIMIT_ENABLED=0이거나 초기화 실패 시 None)"""
+    global _limiter_instance
+    if not LLM_RATE_LIMIT_ENABLED:
+        return None
+    with _limiter_lock:
+        if _limiter_instance is None:
+            try:
+                _limiter_instance = RateLimiter()
+            except Exception as e:
+                print(f"[rate limiter] 초기화 실패, 제한 없이 진행: {e}")
+                return None
+        return _limiter_instance
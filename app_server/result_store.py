@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+분석 결과 영구 저장소 (content-addressed 중복 분석 방지)
+
+[중복 분석 방지]
+- 업로드는 내용 해시(SHA-256)로 식별: 같은 파일을 다시 올리면 기존 videoId 재사용
+- 분석 결과는 (해시, deviceType, 모델 리스트, prompt-bank 버전) 키로 저장
+- 같은 키로 분석을 시작하면 LLM 분석 없이 저장된 결과를 바로 반환
+
+[영구 저장]
+- SQLite 파일 (RESULT_STORE_PATH, 기본값: <project_root>/data/analysis_results.db)
+- 작업 저장소(job_store)에서 보관 기간이 지나 정리되어도 analysisId로 결과 조회 가능
+- 요청마다 연결을 새로 열어 사용 (FastAPI 이벤트 루프/스레드 풀 어디서 호출해도 안전)
+"""
+
+import os
+import glob
+import json
+import sqlite3
+import hashlib
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RESULT_STORE_PATH = os.getenv("RESULT_STORE_PATH", os.path.join(project_root, "data", "analysis_results.db"))
+
+# prompt-bank 버전 계산에 포함할 디바이스 패키지 파일 (프롬프트/판정 로직이 바뀌면 이전 결과 재사용 안 함)
+PROMPTBANK_VERSION_PATTERNS = ["class_PromptBank_*.py", "graph_workflow.py", os.path.join("agents", "*.py")]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    content_hash TEXT PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    video_path TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    dedup_key TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    device_type TEXT NOT NULL,
+    llm_models TEXT NOT NULL,
+    promptbank_version TEXT NOT NULL,
+    result TEXT NOT NULL,
+    raw_result TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analyses (
+    analysis_id TEXT PRIMARY KEY,
+    dedup_key TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+"""
+
+
+def compute_promptbank_version(app_dir: str) -> str:
+    """디바이스 패키지의 PromptBank/agent 소스 내용 해시 (앞 16자리)"""
+    sha256 = hashlib.sha256()
+    for pattern in PROMPTBANK_VERSION_PATTERNS:
+        for path in sorted(glob.glob(os.path.join(app_dir, pattern))):
+            sha256.update(os.path.relpath(path, app_dir).encode("utf-8"))
+            with open(path, "rb") as f:
+                sha256.update(f.read())
+    return sha256.hexdigest()[:16]
+
+
+def make_dedup_key(content_hash: str, device_type: str, llm_models: List[str], promptbank_version: str) -> str:
+    """(해시, deviceType, 모델 리스트, prompt-bank 버전) → 결과 저장 키"""
+    payload = json.dumps([content_hash, device_type, list(llm_models), promptbank_version])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultStore:
+    """업로드 해시 인덱스 + 분석 결과 SQLite 저장소"""
+
+    def __init__(self, db_path: str = RESULT_STORE_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """트랜잭션 단위 연결 (블록 종료 시 commit 후 close)"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ---------- 업로드 해시 인덱스 ----------
+    def find_upload(self, content_hash: str) -> Optional[Dict[str, str]]:
+        """같은 내용의 기존 업로드 (파일이 정리되어 없어졌으면 None)"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT video_id, video_path FROM uploads WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+        if row is None or not os.path.exists(row[1]):
+            return None
+        return {"video_id": row[0], "video_path": row[1]}
+
+    def register_upload(self, content_hash: str, video_id: str, video_path: str):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO uploads (content_hash, video_id, video_path, created_at) VALUES (?, ?, ?, ?)",
+                (content_hash, video_id, video_path, datetime.now().isoformat())
+            )
+
+    # ---------- 분석 결과 ----------
+    def get_result(self, dedup_key: str) -> Optional[Dict[str, Any]]:
+        """저장된 분석 결과 ({"result", "raw_result", "created_at"}) 또는 None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT result, raw_result, created_at FROM results WHERE dedup_key = ?", (dedup_key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "result": json.loads(row[0]),
+            "raw_result": json.loads(row[1]) if row[1] else None,
+            "created_at": row[2],
+        }
+
+    def save_result(self, dedup_key: str, content_hash: str, device_type: str, llm_models: List[str],
+                    promptbank_version: str, result: Dict[str, Any], raw_result: Optional[Dict[str, Any]]):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results "
+                "(dedup_key, content_hash, device_type, llm_models, promptbank_version, result, raw_result, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    dedup_key, content_hash, device_type, json.dumps(list(llm_models)), promptbank_version,
+                    json.dumps(result, ensure_ascii=False, default=str),
+                    json.dumps(raw_result, ensure_ascii=False, default=str) if raw_result is not None else None,
+                    datetime.now().isoformat()
+                )
+            )
+
+    def link_analysis(self, analysis_id: str, dedup_key: str):
+        """analysisId → 결과 키 연결 (메모리에서 정리된 뒤에도 analysisId로 조회 가능)"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO analyses (analysis_id, dedup_key, created_at) VALUES (?, ?, ?)",
+                (analysis_id, dedup_key, datetime.now().isoformat())
+            )
+
+    def get_analysis(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """analysisId로 저장된 분석 결과 조회"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT dedup_key FROM analyses WHERE analysis_id = ?", (analysis_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return self.get_result(row[0])
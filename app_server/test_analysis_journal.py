@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+분석 체크포인트 저널 단위 테스트
+AnalysisJournal의 기록/조회, 다시 열었을 때의 재개,
+강제 종료로 잘린 마지막 줄을 무시하고 이어 쓰는지,
+JournalLock이 다른 프로세스의 같은 저널 잠금을 막는지 확인합니다.
+
+실행: python app_server/test_analysis_journal.py (또는 pytest)
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+
+# 프로젝트 루트 경로 추가
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from app_server import analysis_journal
+from app_server.analysis_journal import AnalysisJournal, JournalLock, journal_path, prompt_digest
+
+PROMPT = prompt_digest("system", "user", 512)
+ANSWERS = {"Q1": ["yes", 0.9]}
+
+
+def _record(journal, start_time, response, event="inhalerIN"):
+    journal.record("gpt-4.1", event, start_time, start_time + 1.0, PROMPT, "ok", ANSWERS, response)
+
+
+def test_record_and_lookup():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        journal = AnalysisJournal(os.path.join(tmp_dir, "j.jsonl"))
+        _record(journal, 1.0, "응답 1")
+        _record(journal, 1.0, "중복 기록은 무시")
+        assert journal.lookup("gpt-4.1", "inhalerIN", 1.0, PROMPT) == "응답 1"
+        assert journal.lookup("gpt-4.1", "inhalerIN", 1.0004, PROMPT) == "응답 1", "start_time은 소수 셋째 자리까지 비교"
+        assert journal.lookup("gpt-4.1", "inhalerIN", 2.0, PROMPT) is None
+        assert journal.lookup("gpt-4.1", "inhalerIN", 1.0, prompt_digest("system", "user", 1024)) is None, \
+            "프롬프트가 바뀌면 재사용하지 않음"
+        assert journal.lookup("gemini", "inhalerIN", 1.0, PROMPT) is None
+        assert journal.recorded == 1 and journal.resumed == 2 and len(journal) == 1
+        journal.close()
+
+
+def test_reopen_resumes():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "j.jsonl")
+        journal = AnalysisJournal(path)
+        _record(journal, 1.0, "응답 1")
+        _record(journal, 2.0, "응답 2", event=None)
+        journal.close()
+
+        reopened = AnalysisJournal(path)
+        assert len(reopened) == 2
+        assert reopened.lookup("gpt-4.1", None, 2.0, PROMPT) == "응답 2"
+        assert reopened.lookup("gpt-4.1", "", 2.0, PROMPT) == "응답 2"
+        reopened.close()
+
+
+def test_truncated_last_line():
+    """강제 종료로 잘린 마지막 줄은 무시하고, 다음 기록은 새 줄에서 시작"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "j.jsonl")
+        journal = AnalysisJournal(path)
+        _record(journal, 1.0, "응답 1")
+        _record(journal, 2.0, "응답 2")
+        journal.close()
+        with open(path, "rb") as f:
+            content = f.read()
+        with open(path, "wb") as f:
+            f.write(content[:-20])  # 마지막 줄 중간에서 잘림
+
+        resumed = AnalysisJournal(path)
+        assert len(resumed) == 1
+        assert resumed.lookup("gpt-4.1", "inhalerIN", 1.0, PROMPT) == "응답 1"
+        assert resumed.lookup("gpt-4.1", "inhalerIN", 2.0, PROMPT) is None
+        _record(resumed, 2.0, "응답 2 (재요청)")
+        resumed.close()
+
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 3, lines
+        assert json.loads(lines[2])["response"] == "응답 2 (재요청)", "잘린 줄 뒤에 이어 쓰지 않음"
+
+        reloaded = AnalysisJournal(path)
+        assert len(reloaded) == 2
+        assert reloaded.lookup("gpt-4.1", "inhalerIN", 2.0, PROMPT) == "응답 2 (재요청)"
+        reloaded.close()
+
+
+def test_record_after_close_is_ignored():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        journal = AnalysisJournal(os.path.join(tmp_dir, "j.jsonl"))
+        journal.close()
+        _record(journal, 1.0, "닫힌 뒤 기록")
+        assert len(journal) == 0 and journal.recorded == 0
+
+
+def test_journal_path_sanitizes_id():
+    path = journal_path("../video id/pMDI_type1:gpt-4.1")
+    assert os.path.dirname(path) == os.path.dirname(journal_path("x"))
+    assert os.path.basename(path) == ".._video_id_pMDI_type1_gpt-4.1.jsonl", path
+
+
+def _hold_lock_in_subprocess(journal_dir, journal_id):
+    """다른 프로세스(다른 API 워커)에서 저널 잠금을 잡고 stdin이 닫힐 때까지 보유"""
+    code = (
+        "import sys; from app_server.analysis_journal import JournalLock; "
+        f"lock = JournalLock({journal_id!r}); assert lock.acquire(); print('locked', flush=True); sys.stdin.read()"
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-c", code], cwd=project_root, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        env=dict(os.environ, ANALYSIS_JOURNAL_DIR=journal_dir, PYTHONPATH=project_root), text=True
+    )
+    assert process.stdout.readline().strip() == "locked"
+    return process
+
+
+def test_journal_lock_excludes_other_process():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        original_dir = analysis_journal.ANALYSIS_JOURNAL_DIR
+        analysis_journal.ANALYSIS_JOURNAL_DIR = tmp_dir
+        try:
+            holder = _hold_lock_in_subprocess(tmp_dir, "same-journal")
+            lock = JournalLock("same-journal")
+            try:
+                assert not lock.acquire(), "다른 프로세스가 보유 중인 저널은 잠글 수 없음"
+                other = JournalLock("other-journal")
+                assert other.acquire(), "다른 저널은 독립적으로 잠금"
+                other.release()
+                analysis_journal.cleanup_journals(time.time() + 60)
+                assert os.path.exists(lock.path), "사용 중인 잠금 파일은 정리하지 않음"
+            finally:
+                holder.stdin.close()
+                holder.wait(10)
+            assert lock.acquire(), "보유 프로세스가 끝나면 잠금 획득"
+            assert lock.acquire(), "이미 보유 중이면 True"
+            lock.release()
+
+            analysis_journal.cleanup_journals(time.time() + 60)
+            assert not os.path.exists(lock.path), "보유자가 없는 오래된 잠금 파일은 정리"
+            assert lock.acquire()
+            lock.release()
+        finally:
+            analysis_journal.ANALYSIS_JOURNAL_DIR = original_dir
+
+
+def main():
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"✗ {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} 통과")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
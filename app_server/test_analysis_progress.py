@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+분석 진행 이벤트 단위 테스트
+ProgressTracker가 진행 이벤트로부터 진행률(감소하지 않음, 완료 전 최대 99%)과 ETA를 계산하고,
+report()가 설정된 reporter에만 이벤트를 전달하는지 확인합니다.
+
+실행: python app_server/test_analysis_progress.py (또는 pytest)
+"""
+
+import os
+import sys
+import time
+
+# 프로젝트 루트 경로 추가
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from app_server import analysis_progress
+from app_server.analysis_progress import ProgressTracker
+
+
+def _started_ago(tracker, seconds):
+    tracker.started = time.monotonic() - seconds
+
+
+def test_progress_follows_events_and_never_decreases():
+    tracker = ProgressTracker(num_models=2)
+    assert tracker.progress == 0
+    assert tracker.update({"stage": "video_loaded", "play_time": 20.0})
+    assert tracker.progress == 2 and tracker.stage == "비디오 분석 중..."
+
+    history = [tracker.progress]
+    events = [
+        {"stage": "search", "model_id": "m1", "event": "inhalerIN", "position": 10.0},
+        {"stage": "search", "model_id": "m1", "event": "inhalerIN", "position": 5.0},  # 뒤로 간 위치는 무시
+        {"stage": "search", "model_id": "m2", "event": "inhalerIN", "position": 20.0},
+        {"stage": "action_qa", "model_id": "m1", "done": 3, "total": 6},
+        {"stage": "analyzer_done", "model_id": "m1"},
+        {"stage": "analyzer_done", "model_id": "m2"},
+    ]
+    for event in events:
+        tracker.update(event)
+        history.append(tracker.progress)
+    assert history == sorted(history), history
+    # 탐색 비중 0.6: m1 (0.6*0.5) + m2 (0.6*1.0) → 분석 에이전트 평균 0.45
+    assert history[1] == int((0.02 + 0.88 * 0.6 * 0.5 / 2) * 100), history
+    assert history[-1] == 90, history
+
+    tracker.update({"stage": "reporter", "step": "final_report", "done": 1, "total": 1})
+    assert tracker.progress == 99, "완료 표시는 api_server가 100으로"
+    assert tracker.stage == "리포트 생성 중..."
+
+
+def test_update_reports_visible_changes_only():
+    tracker = ProgressTracker(num_models=1, play_time=100.0)
+    assert tracker.update({"stage": "search", "model_id": "m1", "event": "inhalerIN", "position": 10.0})
+    assert not tracker.update({"stage": "search", "model_id": "m1", "event": "inhalerIN", "position": 10.0})
+    assert tracker.stage == "inhalerIN 탐색 중... (10.0초)"
+
+
+def test_search_without_play_time_uses_segments():
+    tracker = ProgressTracker(num_models=1)
+    tracker.update({"stage": "search", "model_id": "m1", "event": "inhalerIN",
+                    "position": 3.0, "segments": 5, "max_segments": 10})
+    assert tracker.progress == int(0.88 * 0.6 * 0.5 * 100), tracker.progress
+
+
+def test_eta_blends_prior_and_measured_speed():
+    tracker = ProgressTracker(num_models=1, play_time=50.0)
+    tracker.estimate = 300
+    _started_ago(tracker, 30)
+    assert abs(tracker.eta_seconds() - 270) <= 1, "진행 전에는 초기 추정값 - 경과 시간"
+
+    tracker._fraction = 0.5  # ETA_MIN_PROGRESS 이상 → 실제 진행 속도만 사용
+    _started_ago(tracker, 60)
+    assert abs(tracker.eta_seconds() - 60) <= 1, tracker.eta_seconds()
+
+    tracker._fraction = 0.1  # ETA_MIN_PROGRESS의 절반 → 측정값과 초기 추정값을 반씩
+    _started_ago(tracker, 10)
+    expected = 0.5 * (10 * 0.9 / 0.1) + 0.5 * (300 - 10)
+    assert abs(tracker.eta_seconds() - expected) <= 1, (tracker.eta_seconds(), expected)
+
+
+def test_estimate_follows_recorded_durations():
+    rate = analysis_progress._seconds_per_video_second
+    try:
+        assert analysis_progress.estimate_analysis_seconds(None) == analysis_progress.ANALYSIS_DEFAULT_ESTIMATE_SECONDS
+        analysis_progress._seconds_per_video_second = 6.0
+        assert analysis_progress.estimate_analysis_seconds(10.0) == 60
+
+        analysis_progress.record_analysis_duration(10.0, 160.0)  # 영상 1초당 16초
+        expected = 6.0 + analysis_progress.DURATION_EMA_ALPHA * (16.0 - 6.0)
+        assert analysis_progress.estimate_analysis_seconds(10.0) == int(round(10.0 * expected))
+
+        analysis_progress.record_analysis_duration(None, 160.0)  # 영상 길이를 모르면 반영하지 않음
+        assert analysis_progress.estimate_analysis_seconds(10.0) == int(round(10.0 * expected))
+    finally:
+        analysis_progress._seconds_per_video_second = rate
+
+
+def test_report_goes_to_reporter_only_while_set():
+    events = []
+    analysis_progress.report("start", models=1)  # reporter가 없으면 무시
+    analysis_progress.set_reporter(events.append)
+    try:
+        analysis_progress.report("search_done", model_id="m1", event="inhalerIN", reference_time=3.5)
+    finally:
+        analysis_progress.clear_reporter()
+    analysis_progress.report("analyzer_done", model_id="m1")
+
+    assert len(events) == 1, events
+    assert events[0]["stage"] == "search_done" and events[0]["reference_time"] == 3.5 and "time" in events[0]
+
+
+def test_report_ignores_reporter_errors():
+    def broken_reporter(event):
+        raise BrokenPipeError("결과 큐 닫힘")
+
+    analysis_progress.set_reporter(broken_reporter)
+    try:
+        analysis_progress.report("start", models=1)
+    finally:
+        analysis_progress.clear_reporter()
+
+
+def main():
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"✗ {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} 통과")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
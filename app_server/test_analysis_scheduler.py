@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+분석 스케줄러 단위 테스트
+AnalysisScheduler의 배정 순서(우선순위 가중 라운드 로빈 + tenant 라운드 로빈),
+대기 취소 정리, 대기열 상한(QueueFullError / retry_after)을 확인합니다.
+
+실행: python app_server/test_analysis_scheduler.py (또는 pytest)
+"""
+
+import os
+import sys
+import asyncio
+
+# 프로젝트 루트 경로 추가
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from app_server.analysis_scheduler import AnalysisScheduler, QueueFullError
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_weighted_round_robin_order():
+    """interactive 3 : batch 1, 같은 클래스 안에서는 tenant 라운드 로빈"""
+    async def scenario():
+        scheduler = AnalysisScheduler(slots=1)
+        scheduler.submit("running", "hospital-A")
+        await scheduler.acquire("running")
+        for analysis_id, tenant, priority in [
+            ("A1", "hospital-A", "interactive"),
+            ("A2", "hospital-A", "interactive"),
+            ("A3", "hospital-A", "interactive"),
+            ("B1", "hospital-B", "interactive"),
+            ("C1", "hospital-C", "batch"),
+        ]:
+            scheduler.submit(analysis_id, tenant, priority)
+
+        snapshot = scheduler.queue_snapshot()
+        predicted = sorted(snapshot, key=lambda analysis_id: snapshot[analysis_id]["position"])
+
+        started = []
+        current = "running"
+        while True:
+            scheduler.release(current)
+            if not scheduler._running:
+                break
+            current = next(iter(scheduler._running))
+            await scheduler.acquire(current)
+            started.append(current)
+        return predicted, started
+
+    predicted, started = _run(scenario())
+    assert started == ["A1", "B1", "A2", "C1", "A3"], started
+    assert predicted == started, (predicted, started)
+
+
+def test_single_class_does_not_consume_cycle():
+    """batch만 대기 중이면 모든 슬롯을 batch가 사용"""
+    async def scenario():
+        scheduler = AnalysisScheduler(slots=2)
+        scheduler.submit("b1", "hospital-A", "batch")
+        scheduler.submit("b2", "hospital-B", "batch")
+        return set(scheduler._running), scheduler.stats()
+
+    running, stats = _run(scenario())
+    assert running == {"b1", "b2"}, running
+    assert stats["queued"] == 0 and stats["startedTotal"] == 2, stats
+
+
+def test_cancelled_acquire_leaves_no_state():
+    """acquire 대기 중 취소되면 대기열/대기자 목록에서 제거"""
+    async def scenario():
+        scheduler = AnalysisScheduler(slots=1)
+        scheduler.submit("running", "hospital-A")
+        await scheduler.acquire("running")
+        scheduler.submit("waiting", "hospital-B")
+        task = asyncio.ensure_future(scheduler.acquire("waiting"))
+        await asyncio.sleep(0)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        state = (dict(scheduler._queued), dict(scheduler._waiters), scheduler.stats()["queued"])
+        scheduler.release("running")
+        return state, dict(scheduler._running)
+
+    (queued, waiters, queued_count), running = _run(scenario())
+    assert "waiting" not in queued and "waiting" not in waiters, (queued, waiters)
+    assert queued_count == 0
+    assert running == {}, running
+
+
+def test_release_of_dispatched_job_without_acquire():
+    """배정되었지만 acquire하지 않고 release한 작업 (결과 공유) → 슬롯과 대기자 정리"""
+    async def scenario():
+        scheduler = AnalysisScheduler(slots=1)
+        scheduler.submit("shared", "hospital-A")
+        scheduler.submit("next", "hospital-A")
+        scheduler.release("shared")
+        return set(scheduler._running), set(scheduler._waiters)
+
+    running, waiters = _run(scenario())
+    assert running == {"next"}, running
+    assert waiters == {"next"}, waiters
+
+
+def test_queue_full_and_retry_after():
+    """전체/tenant 대기열 상한 초과 시 QueueFullError, retry_after는 실행 중 작업의 남은 시간"""
+    async def scenario():
+        scheduler = AnalysisScheduler(slots=1, queue_limit=2, tenant_queue_limit=1)
+        scheduler.submit("running", "hospital-A", estimated_seconds=30)
+        scheduler.submit("A1", "hospital-A")
+        errors = []
+        for analysis_id, tenant in [("A2", "hospital-A"), ("B1", "hospital-B"), ("C1", "hospital-C")]:
+            try:
+                scheduler.submit(analysis_id, tenant)
+            except QueueFullError as e:
+                errors.append((analysis_id, e.retry_after))
+        return errors, scheduler.stats()
+
+    errors, stats = _run(scenario())
+    assert [analysis_id for analysis_id, _ in errors] == ["A2", "C1"], errors
+    for _, retry_after in errors:
+        assert 29 <= retry_after <= 30, errors
+    assert stats["queued"] == 2 and stats["running"] == 1, stats
+
+
+def test_unknown_priority():
+    async def scenario():
+        scheduler = AnalysisScheduler(slots=1)
+        try:
+            scheduler.submit("x", "hospital-A", "urgent")
+        except ValueError:
+            return scheduler.stats()
+        raise AssertionError("ValueError가 발생하지 않음")
+
+    stats = _run(scenario())
+    assert stats["queued"] == 0 and stats["running"] == 0, stats
+
+
+def test_queue_snapshot_estimated_start():
+    """예상 시작 시각 = 슬롯이 비는 시각 + 앞선 대기 작업의 예상 소요 시간"""
+    async def scenario():
+        scheduler = AnalysisScheduler(slots=1)
+        scheduler.submit("running", "hospital-A", estimated_seconds=60)
+        scheduler.update_remaining("running", 10)
+        scheduler.submit("q1", "hospital-A", estimated_seconds=20)
+        scheduler.submit("q2", "hospital-B", estimated_seconds=20)
+        started_at = scheduler._running["running"]["started_at"]
+        return scheduler.queue_snapshot(), started_at
+
+    snapshot, started_at = _run(scenario())
+    assert snapshot["q1"]["position"] == 1 and snapshot["q2"]["position"] == 2, snapshot
+    assert abs(snapshot["q2"]["estimated_start_at"] - snapshot["q1"]["estimated_start_at"] - 20) < 0.01, snapshot
+    assert abs(snapshot["q1"]["estimated_start_at"] - started_at - 10) < 1.0, snapshot
+
+
+def main():
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"✗ {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} 통과")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
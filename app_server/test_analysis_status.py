@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+분석 상태 조회 API 테스트 (FastAPI TestClient, 서버 실행 불필요)
+GET /api/analysis/status/{id}의 since 커서(이후 로그만 반환)와
+ETag / If-None-Match(변경이 없으면 본문 없이 304)를 확인합니다.
+
+실행: python app_server/test_analysis_status.py (또는 pytest)
+"""
+
+import os
+import sys
+import tempfile
+
+# 프로젝트 루트 경로 추가
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+# api_server import 전에 설정 (메모리 작업 저장소, 임시 결과 저장소)
+_tmp_dir = tempfile.mkdtemp(prefix="test_analysis_status_")
+os.environ["JOB_STORE_BACKEND"] = "memory"
+os.environ.setdefault("RESULT_STORE_PATH", os.path.join(_tmp_dir, "analysis_results.db"))
+
+from fastapi.testclient import TestClient
+
+from app_server import api_server
+from app_server.job_store import MemoryJobStore
+
+client = TestClient(api_server.app)
+
+
+def _new_job(analysis_id, logs):
+    api_server.job_store = MemoryJobStore()
+    store = api_server.get_job_store()
+    store.create(analysis_id, logs=logs, status="processing", progress=10, current_stage="비디오 분석 중...")
+    return store
+
+
+def _status(analysis_id, since=None, etag=None):
+    url = f"/api/analysis/status/{analysis_id}" + (f"?since={since}" if since is not None else "")
+    return client.get(url, headers={"If-None-Match": etag} if etag else {})
+
+
+def test_since_returns_only_new_logs():
+    store = _new_job("a1", ["업로드 완료", "분석 시작"])
+    first = _status("a1")
+    assert first.status_code == 200
+    body = first.json()
+    assert body["logs"] == ["업로드 완료", "분석 시작"] and body["cursor"] > 0, body
+
+    store.append_log("a1", "inhalerIN 탐지")
+    second = _status("a1", since=body["cursor"]).json()
+    assert second["logs"] == ["inhalerIN 탐지"] and second["cursor"] > body["cursor"], second
+
+    third = _status("a1", since=second["cursor"]).json()
+    assert third["logs"] == [] and third["cursor"] == second["cursor"], third
+    assert _status("a1", since=0).json()["logs"] == ["업로드 완료", "분석 시작", "inhalerIN 탐지"]
+
+
+def test_etag_304_until_state_or_logs_change():
+    store = _new_job("a2", ["업로드 완료"])
+    first = _status("a2")
+    etag, cursor = first.headers["ETag"], first.json()["cursor"]
+
+    unchanged = _status("a2", since=cursor, etag=etag)
+    assert unchanged.status_code == 304 and unchanged.content == b"", unchanged.status_code
+    assert unchanged.headers["ETag"] == etag
+
+    store.update("a2", progress=40)
+    changed = _status("a2", since=cursor, etag=etag)
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert changed.json()["progress"] == 40 and changed.json()["logs"] == []
+
+    etag = changed.headers["ETag"]
+    store.append_log("a2", "새 로그")
+    with_log = _status("a2", since=cursor, etag=etag)
+    assert with_log.status_code == 200 and with_log.json()["logs"] == ["새 로그"]
+    assert _status("a2", since=with_log.json()["cursor"], etag=with_log.headers["ETag"]).status_code == 304
+
+
+def test_unknown_analysis_404():
+    api_server.job_store = MemoryJobStore()
+    assert _status("missing").status_code == 404
+
+
+def main():
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"✗ {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} 통과")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
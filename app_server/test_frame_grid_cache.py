@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+그리드 캐시 단위 테스트
+FrameGridCache가 병렬 analyzer의 같은 그리드 요청을 한 번만 생성하여 공유하고,
+생성이 실패하면 기다리던 요청과 이후 요청이 None 대신 다시 생성하는지 확인합니다.
+
+실행: python app_server/test_frame_grid_cache.py (또는 pytest)
+"""
+
+import os
+import sys
+import time
+import threading
+
+# 프로젝트 루트 경로 추가
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from app_server.class_Media_Edit_251107 import FrameGridCache
+
+KEY = ("clip.mp4", 1.0, 1.5, "3x3", 640, 0)
+
+
+def _run_threads(targets):
+    threads = [threading.Thread(target=target) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return threads
+
+
+def test_concurrent_requests_share_one_build():
+    cache = FrameGridCache(consumers=3)
+    calls = []
+    results = []
+
+    def build():
+        calls.append(1)
+        time.sleep(0.1)
+        return object()
+
+    _run_threads([lambda: results.append(cache.get_or_build(KEY, build)) for _ in range(3)])
+    assert len(calls) == 1, len(calls)
+    assert len(results) == 3 and all(result is results[0] for result in results)
+    assert cache.hits == 2 and cache.misses == 1, (cache.hits, cache.misses)
+    assert KEY not in cache._entries, "consumers 수만큼 가져가면 해제"
+
+
+def test_failed_build_is_rebuilt_by_waiter():
+    cache = FrameGridCache(consumers=2)
+    building = threading.Event()
+    release = threading.Event()
+    errors = []
+    results = []
+
+    def failing_build():
+        building.set()
+        release.wait(5)
+        raise RuntimeError("decode error")
+
+    def builder():
+        try:
+            cache.get_or_build(KEY, failing_build)
+        except RuntimeError as e:
+            errors.append(e)
+
+    def waiter():
+        building.wait(5)
+        results.append(cache.get_or_build(KEY, lambda: "grid"))
+
+    threads = [threading.Thread(target=builder), threading.Thread(target=waiter)]
+    for thread in threads:
+        thread.start()
+    building.wait(5)
+    time.sleep(0.05)  # waiter가 생성 완료를 기다리는 상태가 되도록
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(errors) == 1, errors
+    assert results == ["grid"], results
+    assert cache.get_or_build(KEY, lambda: "grid again") in ("grid", "grid again")
+
+
+def test_failed_build_does_not_poison_later_callers():
+    cache = FrameGridCache(consumers=4)
+
+    def failing_build():
+        raise RuntimeError("decode error")
+
+    try:
+        cache.get_or_build(KEY, failing_build)
+    except RuntimeError:
+        pass
+    assert KEY not in cache._entries
+    assert cache.get_or_build(KEY, lambda: "grid") == "grid"
+
+
+def test_max_entries_evicts_oldest():
+    cache = FrameGridCache(consumers=10, max_entries=2)
+    for start in range(4):
+        cache.get_or_build(("clip.mp4", start), lambda start=start: start)
+    assert list(cache._entries) == [("clip.mp4", 2), ("clip.mp4", 3)], list(cache._entries)
+
+
+def main():
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"✗ {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} 통과")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+프레임 읽기 계획 단위 테스트
+plan_frame_reads()가 GOP 이내 간격은 grab()으로 건너뛰고,
+GOP보다 먼 프레임이나 이미 지나간 프레임에서만 seek하는지 확인합니다.
+
+실행: python app_server/test_frame_reads.py (또는 pytest)
+"""
+
+import os
+import sys
+
+# 프로젝트 루트 경로 추가
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from app_server.class_Media_Edit_251107 import plan_frame_reads
+
+
+def test_unknown_position_seeks_first():
+    assert plan_frame_reads([5, 6], None, 30) == [("seek", 5), ("retrieve", 5), ("retrieve", 6)]
+
+
+def test_gap_within_gop_grabs():
+    assert plan_frame_reads([10, 40], 10, 30) == [("retrieve", 10), ("grab", 29), ("retrieve", 40)]
+
+
+def test_gap_beyond_gop_seeks():
+    assert plan_frame_reads([0, 100], 0, 30) == [("retrieve", 0), ("seek", 100), ("retrieve", 100)]
+
+
+def test_backward_frame_seeks():
+    assert plan_frame_reads([3], 10, 30) == [("seek", 3), ("retrieve", 3)]
+
+
+def test_sorted_and_deduplicated():
+    plan = plan_frame_reads([20, 10, 20, 15], 10, 30)
+    assert plan == [("retrieve", 10), ("grab", 4), ("retrieve", 15), ("grab", 4), ("retrieve", 20)], plan
+    assert plan_frame_reads([], 0, 30) == []
+
+
+def main():
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"✗ {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} 통과")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+저해상도 프레임 저장소 단위 테스트
+MediaEdit.build_frame_store / FrameStore.read_frames가 정수가 아닌 fps(59.94)에서도
+int(t*fps) 프레임 번호를 가장 가까운 저장 프레임으로 읽고, 크기 상한을 넘으면 앞부분만 저장하는지 확인합니다.
+
+실행: python app_server/test_frame_store.py (또는 pytest)
+"""
+
+import os
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+
+# 프로젝트 루트 경로 추가
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from app_server.class_Media_Edit_251107 import MediaEdit
+
+FPS = 59.94
+NUM_FRAMES = 60
+CELL_SIZE = (32, 24)
+
+
+def _write_video(path, fps=FPS, num_frames=NUM_FRAMES):
+    """프레임 번호 i의 밝기가 i*4인 회색 비디오 (MJPG)"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (64, 48))
+    for i in range(num_frames):
+        writer.write(np.full((48, 64, 3), i * 4, np.uint8))
+    writer.release()
+
+
+def _brightness(frame):
+    return int(round(float(frame.mean()) / 4))
+
+
+def test_non_integer_fps_reads_nearest_row():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        video_path = os.path.join(tmp_dir, "clip.avi")
+        _write_video(video_path)
+        media = MediaEdit()
+        assert media.build_frame_store(video_path, cell_size=CELL_SIZE) is not None
+        store = media.load_frame_store(video_path)
+        assert store.stride == 2 and store.num_frames == NUM_FRAMES // 2, (store.stride, store.num_frames)
+
+        # analyzer와 같은 방식으로 0.5초 구간의 프레임 번호 계산 → 모두 저장소에서 읽힘
+        for window in range(2):
+            frame_indices = [int((window * 0.5 + k * 0.05) * FPS) for k in range(10)]
+            frames = store.read_frames(frame_indices)
+            assert frames is not None, frame_indices
+            for frame_index, frame in zip(frame_indices, frames):
+                assert frame.shape == (CELL_SIZE[1], CELL_SIZE[0], 3)
+                assert abs(_brightness(frame) - frame_index) <= store.stride // 2, (frame_index, _brightness(frame))
+
+        assert store.read_frames([NUM_FRAMES - 1])[0] is not None, "마지막 프레임은 마지막 저장 프레임으로 대체"
+        assert store.read_frames([NUM_FRAMES]) is None
+        assert store.read_frames([-1]) is None
+
+
+def test_max_bytes_stores_prefix():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        video_path = os.path.join(tmp_dir, "clip.avi")
+        _write_video(video_path)
+        frame_bytes = CELL_SIZE[0] * CELL_SIZE[1] * 3
+        media = MediaEdit()
+        media.build_frame_store(video_path, cell_size=CELL_SIZE, max_bytes=frame_bytes * 5)
+        store = media.load_frame_store(video_path)
+        assert store.num_frames == 5, store.num_frames
+        assert os.path.getsize(store.npy_path) <= frame_bytes * 5 + 4096
+
+        assert store.read_frames([0, 4, 9]) is not None
+        assert store.read_frames([0, 10]) is None, "저장된 앞부분 이후 프레임은 원본 디코딩 경로로"
+
+
+def test_existing_store_is_reused():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        video_path = os.path.join(tmp_dir, "clip.avi")
+        _write_video(video_path)
+        media = MediaEdit()
+        npy_path = media.build_frame_store(video_path, cell_size=CELL_SIZE)
+        mtime = os.path.getmtime(npy_path)
+        assert media.build_frame_store(video_path, cell_size=CELL_SIZE) == npy_path
+        assert os.path.getmtime(npy_path) == mtime
+        assert sorted(os.listdir(tmp_dir)) == ["clip.avi", "clip_frames.json", "clip_frames.npy"], os.listdir(tmp_dir)
+
+
+def main():
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"✗ {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} 통과")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+분석 작업 저장소 단위 테스트
+SQLiteJobStore / MemoryJobStore의 create / update / get / get_logs 커서 / delete_expired와
+SQLiteJobStore.fail_orphaned(종료된 API 프로세스의 작업 정리), 불완전한 저장소의 생성 실패를 확인합니다.
+
+실행: python app_server/test_job_store.py (또는 pytest)
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import subprocess
+from datetime import datetime, timedelta
+
+# 프로젝트 루트 경로 추가
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from app_server.job_store import JobStore, SQLiteJobStore, MemoryJobStore, create_job_store
+
+
+def _sqlite_store(tmp_dir):
+    return SQLiteJobStore(os.path.join(tmp_dir, "jobs", "analysis_jobs.db"))
+
+
+def _dead_pid():
+    """이미 종료된 프로세스의 PID"""
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def _check_create_update_get(store):
+    store.create("a1", logs=["업로드 완료"], status="pending", device_type="pMDI_type1", video_path="/tmp/a1.mp4")
+    store.update("a1", status="processing", progress=40, current_stage="영상 분석")
+    store.update("a1", result={"score": 7, "items": ["Q1", "Q2"]}, raw_result={"한글": True})
+
+    job = store.get("a1")
+    assert job["status"] == "processing" and job["progress"] == 40, job
+    assert job["current_stage"] == "영상 분석" and job["device_type"] == "pMDI_type1", job
+    assert job["result"] == {"score": 7, "items": ["Q1", "Q2"]}, job["result"]
+    assert job["raw_result"] == {"한글": True}, job["raw_result"]
+    assert job["logs"] == ["업로드 완료"], job["logs"]
+    assert isinstance(job["created_at"], datetime)
+
+    light = store.get("a1", include_result=False, include_logs=False)
+    assert light["result"] is None and light["raw_result"] is None and light["logs"] is None, light
+    assert store.get("missing") is None
+
+
+def _check_log_cursor(store):
+    store.create("a2", logs=["첫 줄"], status="pending")
+    store.append_log("a2", "둘째 줄")
+    store.append_log("a2", "셋째 줄")
+    store.create("other", logs=["다른 작업"], status="pending")
+
+    logs = store.get_logs("a2")
+    assert [message for _, message in logs] == ["첫 줄", "둘째 줄", "셋째 줄"], logs
+    cursors = [cursor for cursor, _ in logs]
+    assert cursors == sorted(cursors) and len(set(cursors)) == 3, cursors
+
+    after_first = store.get_logs("a2", after=cursors[0])
+    assert [message for _, message in after_first] == ["둘째 줄", "셋째 줄"], after_first
+    assert store.get_logs("a2", after=cursors[-1]) == []
+
+
+def _check_delete_expired(store):
+    store.create("done", status="completed")
+    store.create("running", status="processing")
+    assert store.delete_expired(datetime.now() + timedelta(seconds=1)) >= 1
+    assert store.get("done") is None
+    assert store.get("running") is not None, "진행 중인 작업은 삭제하지 않음"
+
+
+def test_sqlite_create_update_get():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _check_create_update_get(_sqlite_store(tmp_dir))
+
+
+def test_memory_create_update_get():
+    _check_create_update_get(MemoryJobStore())
+
+
+def test_sqlite_log_cursor():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _check_log_cursor(_sqlite_store(tmp_dir))
+
+
+def test_memory_log_cursor():
+    _check_log_cursor(MemoryJobStore())
+
+
+def test_sqlite_delete_expired():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _check_delete_expired(_sqlite_store(tmp_dir))
+
+
+def test_memory_delete_expired():
+    _check_delete_expired(MemoryJobStore())
+
+
+def test_sqlite_create_defaults_and_replace():
+    """status 기본값 pending, 같은 analysis_id로 다시 만들면 이전 로그 삭제"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = _sqlite_store(tmp_dir)
+        store.create("a1", logs=["이전 로그"])
+        assert store.get("a1")["status"] == "pending"
+        store.create("a1", logs=["새 로그"], status="processing")
+        job = store.get("a1")
+        assert job["status"] == "processing" and job["logs"] == ["새 로그"], job
+
+
+def test_sqlite_unknown_field():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = _sqlite_store(tmp_dir)
+        store.create("a1")
+        try:
+            store.update("a1", unknown_field=1)
+        except ValueError:
+            return
+        raise AssertionError("ValueError가 발생하지 않음")
+
+
+def test_sqlite_shared_between_instances():
+    """같은 DB 파일을 여는 다른 인스턴스(다른 API 워커)가 같은 작업을 조회"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        writer = _sqlite_store(tmp_dir)
+        reader = _sqlite_store(tmp_dir)
+        writer.create("a1", status="processing")
+        writer.append_log("a1", "진행 중")
+        assert reader.get("a1")["logs"] == ["진행 중"]
+        assert reader.count_by_status() == {"processing": 1}
+
+
+def test_sqlite_fail_orphaned():
+    """종료된 프로세스가 실행하던 pending/processing 작업만 오류로 정리"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = _sqlite_store(tmp_dir)
+        store.create("orphan_pending", status="pending")
+        store.create("orphan_processing", status="processing")
+        store.create("orphan_completed", status="completed")
+        store.create("alive", status="processing")
+        dead_pid = _dead_pid()
+        conn = sqlite3.connect(store.db_path)
+        with conn:
+            conn.execute(
+                "UPDATE jobs SET owner_pid = ? WHERE analysis_id LIKE 'orphan_%'", (dead_pid,)
+            )
+        conn.close()
+
+        assert store.fail_orphaned("서버 재시작으로 분석이 중단되었습니다.") == 2
+        for analysis_id in ("orphan_pending", "orphan_processing"):
+            job = store.get(analysis_id)
+            assert job["status"] == "error", job
+            assert job["error"] == "서버 재시작으로 분석이 중단되었습니다.", job
+            assert job["logs"][-1].endswith("서버 재시작으로 분석이 중단되었습니다."), job["logs"]
+        assert store.get("orphan_completed")["status"] == "completed"
+        assert store.get("alive")["status"] == "processing"
+        assert store.fail_orphaned("다시 호출") == 0, "이미 정리한 작업은 다시 정리하지 않음"
+
+
+def test_incomplete_store_fails_at_construction():
+    """인터페이스 메서드를 구현하지 않은 저장소는 첫 호출이 아니라 생성 시 실패"""
+    class IncompleteJobStore(JobStore):
+        def create(self, analysis_id, logs=None, **fields):
+            pass
+
+    try:
+        IncompleteJobStore()
+    except TypeError:
+        return
+    raise AssertionError("TypeError가 발생하지 않음")
+
+
+def test_create_job_store_backend():
+    assert isinstance(create_job_store("memory"), MemoryJobStore)
+    try:
+        create_job_store("redis")
+    except ValueError:
+        return
+    raise AssertionError("ValueError가 발생하지 않음")
+
+
+def main():
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"✗ {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} 통과")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
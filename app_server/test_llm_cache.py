@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+LLM 응답 캐시 단위 테스트
+LLMResponseCache의 캐시 키 구성, 저장/조회, LRU 용량 제한과 누적 용량 카운터,
+replay 모드(읽기 전용)를 확인합니다.
+
+실행: python app_server/test_llm_cache.py (또는 pytest)
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+
+# 프로젝트 루트 경로 추가
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from app_server import llm_cache
+from app_server.llm_cache import LLMResponseCache, make_cache_key, media_digest
+
+
+def _key(user_prompt, media_sha=None):
+    return make_cache_key("gpt-4.1", "system", user_prompt, 0.0, 42, 256, media_sha)
+
+
+def _size_counter(cache):
+    conn = sqlite3.connect(cache.db_path)
+    try:
+        return conn.execute("SELECT value FROM counters WHERE name = 'size_bytes'").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_cache_key_components():
+    assert media_digest([]) is None
+    assert media_digest([b"ab", b"c"]) != media_digest([b"a", b"bc"]), "이미지 경계가 다르면 다른 digest"
+    base = _key("Q1", media_digest([b"jpeg"]))
+    assert base == _key("Q1", media_digest([b"jpeg"]))
+    assert base != _key("Q1", media_digest([b"other jpeg"]))
+    assert base != _key("Q2", media_digest([b"jpeg"]))
+    assert base != make_cache_key("gpt-4.1", "system", "Q1", 0.0, 43, 256, media_digest([b"jpeg"]))
+
+
+def test_put_get_and_stats():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = LLMResponseCache(os.path.join(tmp_dir, "llm_cache.db"), max_bytes=1024 * 1024, mode="readwrite")
+        assert cache.get(_key("Q1")) is None
+        cache.put(_key("Q1"), "gpt-4.1", "예")
+        assert cache.get(_key("Q1")) == "예"
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5), stats
+        assert (stats["total_hits"], stats["total_misses"]) == (1, 1), stats
+        assert stats["entries"] == 1 and stats["size_bytes"] == len("예".encode("utf-8")), stats
+
+
+def test_lru_eviction_keeps_recently_used():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = LLMResponseCache(os.path.join(tmp_dir, "llm_cache.db"), max_bytes=300, mode="readwrite")
+        for name in ("a", "b", "c"):
+            cache.put(_key(name), "gpt-4.1", name * 100)
+        assert cache.get(_key("a")) == "a" * 100  # a를 최근 사용으로 갱신 → b가 가장 오래됨
+
+        cache.put(_key("d"), "gpt-4.1", "d" * 100)  # 400B > 300B → 270B 이하가 될 때까지 삭제
+        assert cache.get(_key("b")) is None and cache.get(_key("c")) is None
+        assert cache.get(_key("a")) == "a" * 100 and cache.get(_key("d")) == "d" * 100
+        assert _size_counter(cache) == cache.stats()["size_bytes"] == 200
+
+
+def test_size_counter_on_replace_and_reopen():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "llm_cache.db")
+        cache = LLMResponseCache(db_path, max_bytes=1024 * 1024, mode="readwrite")
+        cache.put(_key("Q1"), "gpt-4.1", "x" * 50)
+        cache.put(_key("Q1"), "gpt-4.1", "x" * 30)  # 같은 키 교체 → 차이만 반영
+        cache.put(_key("Q2"), "gpt-4.1", "y" * 20)
+        assert _size_counter(cache) == 50
+
+        assert _size_counter(LLMResponseCache(db_path, max_bytes=1024 * 1024, mode="readwrite")) == 50, \
+            "다시 열어도 누적 카운터 유지"
+
+
+def test_replay_mode_is_read_only():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "llm_cache.db")
+        LLMResponseCache(db_path, mode="readwrite").put(_key("Q1"), "gpt-4.1", "예")
+
+        replay = LLMResponseCache(db_path, mode="replay")
+        assert replay.read_only
+        assert replay.get(_key("Q1")) == "예"
+        assert replay.get(_key("Q2")) is None
+        replay.put(_key("Q2"), "gpt-4.1", "아니오")
+        assert replay.get(_key("Q2")) is None, "replay 모드에서는 저장하지 않음"
+
+        stats = replay.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 2), stats
+        assert (stats["total_hits"], stats["total_misses"]) == (0, 0), "replay 모드는 누적 카운터를 기록하지 않음"
+
+
+def test_invalid_mode():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        try:
+            LLMResponseCache(os.path.join(tmp_dir, "llm_cache.db"), mode="write-only")
+        except ValueError:
+            return
+        raise AssertionError("ValueError가 발생하지 않음")
+
+
+def test_off_mode_disables_shared_cache():
+    mode = llm_cache.LLM_CACHE_MODE
+    llm_cache.LLM_CACHE_MODE = "off"
+    try:
+        assert llm_cache.get_llm_cache() is None
+    finally:
+        llm_cache.LLM_CACHE_MODE = mode
+
+
+def main():
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"✗ {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} 통과")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+LLM rate limiter 단위 테스트
+RateLimiter의 AIMD 동시 요청 한도(성공 시 +1/현재값, 429 시 절반 + 감소 최소 간격)와
+동시 요청 한도 / 429 직후 대기를 확인합니다.
+
+실행: python app_server/test_rate_limiter.py (또는 pytest)
+"""
+
+import os
+import sys
+import tempfile
+
+# 프로젝트 루트 경로 추가
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from app_server import rate_limiter
+from app_server.rate_limiter import RateLimiter
+
+LIMITS = {"openai": {"rpm": 10_000, "tpm": 10_000_000}}
+
+
+def _concurrency(limiter):
+    return limiter.stats()["openai/gpt-4.1"]["concurrency"]
+
+
+def _acquire(limiter):
+    lease_id, wait = limiter.try_acquire("openai", "gpt-4.1", 1000)
+    assert lease_id is not None, wait
+    return lease_id
+
+
+def test_additive_increase():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        limiter = RateLimiter(os.path.join(tmp_dir, "rl.db"), LIMITS)
+        limiter.release("openai", "gpt-4.1", _acquire(limiter))
+        expected = rate_limiter.AIMD_INITIAL_CONCURRENCY + 1.0 / rate_limiter.AIMD_INITIAL_CONCURRENCY
+        assert abs(_concurrency(limiter) - round(expected, 2)) < 0.01, _concurrency(limiter)
+
+
+def test_multiplicative_decrease_once_per_interval():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        limiter = RateLimiter(os.path.join(tmp_dir, "rl.db"), LIMITS)
+        leases = [_acquire(limiter) for _ in range(3)]
+        for lease_id in leases:
+            limiter.release("openai", "gpt-4.1", lease_id, rate_limited=True)
+        expected = rate_limiter.AIMD_INITIAL_CONCURRENCY * rate_limiter.AIMD_DECREASE_FACTOR
+        assert _concurrency(limiter) == expected, "동시에 들어온 429는 한 번만 감소"
+        assert limiter.stats()["openai/gpt-4.1"]["cooling_down"]
+
+        lease_id, wait = limiter.try_acquire("openai", "gpt-4.1", 1000)
+        assert lease_id is None and 0 < wait <= rate_limiter.RATE_LIMIT_COOLDOWN_SECONDS, (lease_id, wait)
+
+
+def test_concurrency_floor():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        limiter = RateLimiter(os.path.join(tmp_dir, "rl.db"), LIMITS)
+        interval = rate_limiter.AIMD_DECREASE_INTERVAL
+        rate_limiter.AIMD_DECREASE_INTERVAL = 0.0
+        try:
+            for _ in range(10):
+                limiter.release("openai", "gpt-4.1", "no-lease", rate_limited=True)
+        finally:
+            rate_limiter.AIMD_DECREASE_INTERVAL = interval
+        assert _concurrency(limiter) == rate_limiter.AIMD_MIN_CONCURRENCY, _concurrency(limiter)
+
+
+def test_in_flight_limit():
+    """진행 중 요청 수가 동시 요청 한도에 도달하면 반납될 때까지 대기"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        limiter = RateLimiter(os.path.join(tmp_dir, "rl.db"), LIMITS)
+        leases = [_acquire(limiter) for _ in range(rate_limiter.AIMD_INITIAL_CONCURRENCY)]
+        lease_id, wait = limiter.try_acquire("openai", "gpt-4.1", 1000)
+        assert lease_id is None and wait > 0, (lease_id, wait)
+        limiter.discard(leases[0])
+        _acquire(limiter)
+
+
+def main():
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"✗ {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} 통과")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+분석 결과 저장소 단위 테스트
+중복 분석 방지 키(make_dedup_key / compute_promptbank_version)와
+ResultStore의 업로드 해시 재사용, 저장된 결과 재사용(get_result / link_analysis / get_analysis)을 확인합니다.
+
+실행: python app_server/test_result_store.py (또는 pytest)
+"""
+
+import os
+import sys
+import tempfile
+
+# 프로젝트 루트 경로 추가
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from app_server.result_store import ResultStore, make_dedup_key, compute_promptbank_version
+
+CONTENT_HASH = "a" * 64
+MODELS = ["gpt-4.1", "gemini-2.5-pro"]
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_dedup_key_components():
+    key = make_dedup_key(CONTENT_HASH, "pMDI_type2", MODELS, "v1")
+    assert key == make_dedup_key(CONTENT_HASH, "pMDI_type2", list(MODELS), "v1")
+    others = [
+        make_dedup_key("b" * 64, "pMDI_type2", MODELS, "v1"),
+        make_dedup_key(CONTENT_HASH, "DPI_type1", MODELS, "v1"),
+        make_dedup_key(CONTENT_HASH, "pMDI_type2", MODELS[:1], "v1"),
+        make_dedup_key(CONTENT_HASH, "pMDI_type2", list(reversed(MODELS)), "v1"),
+        make_dedup_key(CONTENT_HASH, "pMDI_type2", MODELS, "v2"),
+    ]
+    assert len(set(others + [key])) == len(others) + 1, "구성 요소가 하나라도 다르면 다른 키"
+
+
+def test_promptbank_version_tracks_prompt_and_agent_sources():
+    with tempfile.TemporaryDirectory() as app_dir:
+        _write(os.path.join(app_dir, "class_PromptBank_x.py"), "Q1 = '흡입기를 흔드는가?'\n")
+        _write(os.path.join(app_dir, "agents", "video_analyzer_agent.py"), "THRESHOLD = 0.5\n")
+        version = compute_promptbank_version(app_dir)
+        assert len(version) == 16
+
+        _write(os.path.join(app_dir, "README.md"), "문서 변경\n")
+        assert compute_promptbank_version(app_dir) == version, "프롬프트/판정 로직 외 파일은 무시"
+
+        _write(os.path.join(app_dir, "agents", "video_analyzer_agent.py"), "THRESHOLD = 0.6\n")
+        changed = compute_promptbank_version(app_dir)
+        assert changed != version
+
+        _write(os.path.join(app_dir, "class_PromptBank_x.py"), "Q1 = '흡입기를 흔드는가? (3회 이상)'\n")
+        assert compute_promptbank_version(app_dir) not in (version, changed)
+
+
+def test_upload_reused_while_file_exists():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = ResultStore(os.path.join(tmp_dir, "data", "analysis_results.db"))
+        video_path = os.path.join(tmp_dir, "video_1.mp4")
+        _write(video_path, "video")
+        assert store.find_upload(CONTENT_HASH) is None
+
+        store.register_upload(CONTENT_HASH, "video_1", video_path)
+        assert store.find_upload(CONTENT_HASH) == {"video_id": "video_1", "video_path": video_path}
+
+        os.remove(video_path)
+        assert store.find_upload(CONTENT_HASH) is None, "정리된 업로드는 재사용하지 않음"
+
+
+def test_result_reused_by_key_and_analysis_id():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = ResultStore(os.path.join(tmp_dir, "analysis_results.db"))
+        key = make_dedup_key(CONTENT_HASH, "pMDI_type2", MODELS, "v1")
+        assert store.get_result(key) is None
+
+        result = {"summary": {"score": 80.0}, "finalSummary": "정상 사용"}
+        store.save_result(key, CONTENT_HASH, "pMDI_type2", MODELS, "v1", result, None)
+        stored = store.get_result(key)
+        assert stored["result"] == result and stored["raw_result"] is None, stored
+
+        store.link_analysis("analysis_1", key)
+        assert store.get_analysis("analysis_1")["result"] == result
+        assert store.get_analysis("missing") is None
+
+        # 같은 키로 다시 저장하면 마지막 결과로 교체
+        store.save_result(key, CONTENT_HASH, "pMDI_type2", MODELS, "v1", {"summary": {"score": 90.0}}, {"raw": 1})
+        assert store.get_analysis("analysis_1")["raw_result"] == {"raw": 1}
+
+
+def test_store_shared_between_instances():
+    """같은 DB 파일을 여는 다른 인스턴스(재시작한 서버)가 저장된 결과를 조회"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "analysis_results.db")
+        key = make_dedup_key(CONTENT_HASH, "pMDI_type2", MODELS, "v1")
+        writer = ResultStore(db_path)
+        writer.save_result(key, CONTENT_HASH, "pMDI_type2", MODELS, "v1", {"score": 1}, None)
+        writer.link_analysis("analysis_1", key)
+        assert ResultStore(db_path).get_analysis("analysis_1")["result"] == {"score": 1}
+
+
+def main():
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"✗ {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} 통과")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
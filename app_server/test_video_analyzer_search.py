@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+VideoAnalyzerAgent 기준 시점 탐색 단위 테스트
+LLM과 그리드 생성 대신 구간 시작 시각으로 답하는 가짜 LLM/VideoProcessor를 사용하여
+모든 디바이스 패키지의 탐색 결과(기준 시간, 누적 Q 답변)와 LLM 요청 수를 확인합니다.
+
+- speculative 탐색(W > 1)이 순차 탐색(W = 1)과 같은 결과를 내는지
+- coarse_to_fine 탐색이 순차 탐색과 같은 기준 시간을 더 적은 요청으로 찾는지
+- 2단계 분석의 행동 Q 단계가 ReporterAgent 규칙이 쓰는 구간에만 질문하는지
+- API 오류 구간을 재시도하고, 재시도 한도를 넘은 구간만 제외하는지
+
+실행: python app_server/test_video_analyzer_search.py (또는 pytest)
+"""
+
+import os
+import re
+import sys
+import threading
+import importlib
+from concurrent.futures import Future
+
+# 프로젝트 루트 경로 추가
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+PACKAGES = ["app_pMDI_type1", "app_pMDI_type2", "app_DPI_type1", "app_DPI_type2", "app_DPI_type3", "app_SMI_type1"]
+SYSTEM_PROMPT = "system"
+USER_PROMPT = "user"
+
+
+def _agent_classes():
+    """디바이스 패키지별 VideoAnalyzerAgent 클래스 (class_PromptBank_* 모듈을 찾도록 패키지 경로 추가)"""
+    classes = []
+    for package in PACKAGES:
+        package_dir = os.path.join(project_root, package)
+        if package_dir not in sys.path:
+            sys.path.insert(0, package_dir)
+        module = importlib.import_module(f"{package}.agents.video_analyzer_agent")
+        classes.append(module.VideoAnalyzerAgent)
+    return classes
+
+
+class FakeVideoProcessor:
+    """그리드 대신 (구간 시작, 끝) 시각을 이미지로 반환"""
+
+    def extract_encoded_frames(self, video_path, start_time, end_time, M, N, gridSize, padSize):
+        return (round(start_time, 3), round(end_time, 3)), None, None
+
+    def prefetch_encoded_frames(self, *args, **kwargs):
+        return None
+
+
+class FakeLLM:
+    """
+    구간 시작 시각으로 답하는 가짜 LLM (요청 즉시 완료된 Future 반환)
+    - yes_from: 이 시각 이후 구간은 Overall_Answer: YES (None이면 항상 NO)
+    - errors: {구간 시작 시각: API 오류로 응답할 횟수}
+    """
+
+    def __init__(self, yes_from=None, errors=None):
+        self.yes_from = yes_from
+        self.errors = dict(errors or {})
+        self.requests = []  # (구간 시작 시각, user_prompt)
+        self._lock = threading.Lock()
+
+    def submit_query_answer(self, system_prompt, user_prompt, image_array=None, max_output_tokens=None, **kwargs):
+        start_time = image_array[0]
+        with self._lock:
+            self.requests.append((start_time, user_prompt))
+            remaining_errors = self.errors.get(start_time, 0)
+            if remaining_errors:
+                self.errors[start_time] = remaining_errors - 1
+        future = Future()
+        if remaining_errors:
+            future.set_result("API Error: 429 rate limit")
+            return future
+        overall = "YES" if self.yes_from is not None and start_time >= self.yes_from - 1e-6 else "NO"
+        q_keys = re.findall(r"^(Q\d+)[.:]", user_prompt, re.MULTILINE) or ["Q1"]
+        answers = "\n".join(f"{q_key}_Answer: {overall}\n{q_key}_Confidence: 0.9" for q_key in q_keys)
+        future.set_result(f"Overall_Answer: {overall}\n{answers}")
+        return future
+
+    def request_times(self):
+        return sorted(start_time for start_time, _ in self.requests)
+
+
+def _search(agent_class, llm, speculative_window=1, search_strategy="linear", play_time=10.0, segment_time=0.5):
+    agent = agent_class(llm, FakeVideoProcessor(), "fake_0", "fake")
+    return agent._search_reference_time(
+        "clip.mp4", SYSTEM_PROMPT, USER_PROMPT, play_time, 0.0, segment_time, segment_time, segment_time / 10.0,
+        speculative_window=speculative_window, search_strategy=search_strategy
+    )
+
+
+def _times(q_answers):
+    return [time for time, _, _ in q_answers.get("Q1", [])]
+
+
+# ----------------------------------------
+# speculative 탐색 (user-013)
+# ----------------------------------------
+def test_speculative_matches_sequential():
+    for agent_class in _agent_classes():
+        expected = _search(agent_class, FakeLLM(yes_from=3.0))
+        assert expected[0] == 3.0, expected
+        assert _times(expected[1]) == [round(0.5 * i, 1) for i in range(7)], expected[1]
+        for speculative_window in (2, 4, 8):
+            result = _search(agent_class, FakeLLM(yes_from=3.0), speculative_window=speculative_window)
+            assert result == expected, (agent_class.__module__, speculative_window, result)
+
+
+def test_speculative_requests_are_bounded_by_window():
+    for agent_class in _agent_classes():
+        llm = FakeLLM(yes_from=3.0)
+        _search(agent_class, llm, speculative_window=4)
+        # YES 구간(3.0초) 이후로는 최대 W-1개 구간만 미리 요청
+        assert max(llm.request_times()) <= 3.0 + 0.5 * 3 + 1e-6, llm.request_times()
+
+
+def test_no_yes_reaches_end_of_video():
+    for agent_class in _agent_classes():
+        expected = _search(agent_class, FakeLLM(), speculative_window=1, play_time=3.0)
+        assert expected[0] == 2.5, expected
+        assert _search(agent_class, FakeLLM(), speculative_window=4, play_time=3.0) == expected
+
+
+# ----------------------------------------
+# coarse_to_fine 탐색 (user-014)
+# ----------------------------------------
+def test_coarse_to_fine_matches_linear_reference_time():
+    for agent_class in _agent_classes():
+        for yes_from in (0.0, 0.5, 2.0, 3.5, 7.0, 9.0):
+            linear_llm, coarse_llm = FakeLLM(yes_from=yes_from), FakeLLM(yes_from=yes_from)
+            linear = _search(agent_class, linear_llm)
+            coarse = _search(agent_class, coarse_llm, speculative_window=2, search_strategy="coarse_to_fine")
+            assert coarse[0] == linear[0] == yes_from, (yes_from, linear[0], coarse[0])
+            # 시점 규칙에 필요한 기준 시간과 직전 구간 답변 포함
+            times = _times(coarse[1])
+            assert yes_from in times and max(times) == yes_from, (yes_from, times)
+            if yes_from > 0:
+                assert round(yes_from - 0.5, 1) in times, (yes_from, times)
+
+
+def test_coarse_to_fine_uses_fewer_requests_for_late_events():
+    for agent_class in _agent_classes():
+        linear_llm, coarse_llm = FakeLLM(yes_from=40.0), FakeLLM(yes_from=40.0)
+        _search(agent_class, linear_llm, play_time=60.0)
+        result = _search(agent_class, coarse_llm, speculative_window=2, search_strategy="coarse_to_fine", play_time=60.0)
+        assert result[0] == 40.0, result[0]
+        assert len(coarse_llm.requests) * 2 < len(linear_llm.requests), (len(coarse_llm.requests), len(linear_llm.requests))
+
+
+def test_coarse_to_fine_without_yes():
+    for agent_class in _agent_classes():
+        linear = _search(agent_class, FakeLLM(), play_time=5.0)
+        coarse = _search(agent_class, FakeLLM(), search_strategy="coarse_to_fine", play_time=5.0)
+        assert coarse[0] == linear[0], (linear[0], coarse[0])
+
+
+# ----------------------------------------
+# 2단계 분석 행동 Q 구간 (user-016)
+# ----------------------------------------
+def test_two_phase_face_point_rule_windows():
+    for agent_class in _agent_classes():
+        llm = FakeLLM(yes_from=0.0)
+        agent = agent_class(llm, FakeVideoProcessor(), "fake_0", "fake")
+        q_in, q_face, q_out = agent._analyze_action_windows("clip.mp4", 2.0, 4.0, 5.0)
+        for q_key, action_key in agent.Q_MAPPINGS["faceONinhaler"].items():
+            times = [time for time, _, _ in q_face[q_key]]
+            if action_key in agent.POINT_RULE_ACTIONS:
+                assert times == [3.5, 4.0], (agent_class.__module__, action_key, times)  # T_face와 직전 구간
+            else:
+                assert times == [2.0, 2.5, 3.0, 3.5, 4.0], (agent_class.__module__, action_key, times)
+        assert q_in == {}, "T_face > T_in이면 inhalerIN Q는 질문하지 않음"
+        assert set(q_out) == set(agent.Q_MAPPINGS["inhalerOUT"]), q_out
+        assert [time for time, _, _ in q_out["Q1"]] == [4.0, 4.5, 5.0], q_out
+
+
+def test_two_phase_face_equal_in_asks_previous_window():
+    """T_face == T_in이면 T_in 직전 구간에서 inhalerIN 시점 규칙 Q를 질문 (1단계 방식의 직전 구간 점수 보존)"""
+    for agent_class in _agent_classes():
+        llm = FakeLLM(yes_from=0.0)
+        agent = agent_class(llm, FakeVideoProcessor(), "fake_0", "fake")
+        q_in, q_face, _ = agent._analyze_action_windows("clip.mp4", 2.0, 2.0, 3.0)
+        assert [time for time, _, _ in q_in["Q1"]] == [1.5], (agent_class.__module__, q_in)
+        assert [time for time, _, _ in q_face["Q1"]] == [2.0], q_face
+
+        llm = FakeLLM(yes_from=0.0)
+        agent = agent_class(llm, FakeVideoProcessor(), "fake_0", "fake")
+        q_in, _, _ = agent._analyze_action_windows("clip.mp4", 0.0, 0.0, 1.0)
+        assert q_in == {}, "T_in 직전 구간이 없으면 질문하지 않음"
+
+
+def test_two_phase_search_strategies():
+    for agent_class in _agent_classes():
+        assert agent_class.TWO_PHASE_SEARCH_STRATEGIES["faceONinhaler"] == "linear", agent_class.__module__
+        for event_key, strategy in agent_class.TWO_PHASE_SEARCH_STRATEGIES.items():
+            assert strategy in ("linear", "coarse_to_fine"), (event_key, strategy)
+
+
+# ----------------------------------------
+# API 오류 구간 재시도 (user-017)
+# ----------------------------------------
+def test_error_window_is_retried_without_changing_result():
+    for agent_class in _agent_classes():
+        for search_strategy in ("linear", "coarse_to_fine"):
+            expected = _search(agent_class, FakeLLM(yes_from=3.0), speculative_window=4, search_strategy=search_strategy)
+            llm = FakeLLM(yes_from=3.0, errors={1.0: 2, 3.0: 1})
+            result = _search(agent_class, llm, speculative_window=4, search_strategy=search_strategy)
+            assert result == expected, (search_strategy, result, expected)
+
+
+def test_window_over_retry_limit_is_excluded():
+    for agent_class in _agent_classes():
+        llm = FakeLLM(yes_from=3.0, errors={1.0: agent_class.SEARCH_RETRY_LIMIT + 1})
+        final_time, q_answers = _search(agent_class, llm, speculative_window=2)
+        assert final_time == 3.0, final_time
+        assert 1.0 not in _times(q_answers) and 1.5 in _times(q_answers), _times(q_answers)
+        assert llm.request_times().count(1.0) == agent_class.SEARCH_RETRY_LIMIT + 1, llm.request_times()
+
+
+def test_consecutive_errors_abort_search():
+    for agent_class in _agent_classes():
+        errors = {round(0.5 * i, 1): 100 for i in range(20)}
+        final_time, _ = _search(agent_class, FakeLLM(yes_from=3.0, errors=errors), speculative_window=2)
+        assert final_time == 0.0, "연속 오류 한도 도달 시 기준 시간은 탐색 시작 시각"
+
+
+def main():
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"✗ {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} 통과")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+업로드 비디오 ingest 파이프라인
+업로드 시점에 한 번만 계산해 두고 분석에서 재사용하는 데이터를 생성합니다.
+
+[ingest 단계]
+- 업로드 중: 청크 단위 SHA-256 해시 계산 (ContentHasher, api_server.upload_video에서 사용)
+- 업로드 직후 (probe_video): 컨테이너 메타데이터(fps, 프레임 수, 해상도) + 썸네일 → 업로드 응답에 포함
+- 백그라운드 (build_derived_media): 저해상도 프레임 저장소(.npy) 생성
+
+[결과 캐시]
+- <video_id>_ingest.json 에 기록 (비디오 파일과 같은 uploads/ 디렉토리)
+- 분석 시작 시 load_ingest_record()의 video_info를 초기 상태에 전달 → VideoProcessorAgent가 파일 재탐색 생략
+
+[실행 환경]
+- probe_video / build_derived_media는 api_server의 프로세스 풀(ingest_executor)에서 실행 (이벤트 루프 블로킹 방지)
+- 모듈 최상위 함수이므로 spawn 방식 프로세스에서도 pickle 가능
+"""
+
+import os
+import json
+import time
+import uuid
+import base64
+import hashlib
+from datetime import datetime
+
+import cv2
+
+from app_server import class_Media_Edit_251107 as ME
+
+# ============================================
+# 설정
+# ============================================
+THUMBNAIL_SIZE = (320, 180)  # 썸네일 크기 (16:9)
+THUMBNAIL_TIME = 1.0  # 썸네일 추출 시점 (초, 영상이 더 짧으면 중간 지점)
+THUMBNAIL_JPEG_QUALITY = 80
+
+
+class ContentHasher:
+    """업로드 청크를 받는 대로 SHA-256을 갱신하는 해시 계산기 (파일을 다시 읽지 않음)"""
+
+    def __init__(self):
+        self._sha256 = hashlib.sha256()
+        self.size = 0
+
+    def update(self, chunk: bytes):
+        self._sha256.update(chunk)
+        self.size += len(chunk)
+
+    def hexdigest(self) -> str:
+        return self._sha256.hexdigest()
+
+
+def ingest_paths(video_path: str) -> dict:
+    """비디오에 대한 ingest 산출물 경로 (ingest 기록, 썸네일)"""
+    base = os.path.splitext(video_path)[0]
+    return {
+        "record": f"{base}_ingest.json",
+        "thumbnail": f"{base}_thumb.jpg",
+    }
+
+
+def derived_file_paths(video_path: str) -> list:
+    """비디오에서 파생된 모든 파일 경로 (ingest 기록, 썸네일, 프레임 저장소), 비디오와 함께 보관/정리"""
+    paths = ingest_paths(video_path)
+    return [paths["record"], paths["thumbnail"], *ME.MediaEdit().frame_store_paths(video_path)]
+
+
+def touch_video(video_path: str):
+    """비디오와 파생 파일의 수정 시각 갱신 (같은 영상 재업로드 시 업로드 파일 정리 기준을 함께 연장)"""
+    for path in [video_path] + derived_file_paths(video_path):
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+
+def load_ingest_record(video_path: str):
+    """ingest 기록을 읽어 반환합니다. 없거나 손상되었으면 None을 반환합니다."""
+    record_path = ingest_paths(video_path)["record"]
+    if not os.path.exists(record_path):
+        return None
+    try:
+        with open(record_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[ingest] 기록 읽기 실패: {record_path} - {e}")
+        return None
+
+
+def _write_ingest_record(video_path: str, record: dict):
+    """ingest 기록을 원자적으로 저장 (임시 파일 기록 후 os.replace)"""
+    record_path = ingest_paths(video_path)["record"]
+    tmp_path = f"{record_path}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, record_path)
+
+
+def thumbnail_data_url(video_path: str):
+    """썸네일 JPEG를 data URL로 반환합니다. (업로드 응답용, 없으면 빈 문자열)"""
+    thumbnail_path = ingest_paths(video_path)["thumbnail"]
+    if not os.path.exists(thumbnail_path):
+        return ""
+    with open(thumbnail_path, "rb") as f:
+        return "data:image/jpeg;base64," + base64.b64encode(f.read()).decode("ascii")
+
+
+def probe_video(video_path: str, content_hash: str = None, file_name: str = None) -> dict:
+    """
+    컨테이너 메타데이터와 썸네일을 생성하여 ingest 기록에 저장합니다. (업로드 직후, 프로세스 풀에서 실행)
+
+    Returns:
+        dict: ingest 기록 (비디오를 열 수 없으면 video_info가 None)
+    """
+    start = time.time()
+    paths = ingest_paths(video_path)
+    record = {
+        "video_path": video_path,
+        "file_name": file_name,
+        "content_hash": content_hash,
+        "created_at": datetime.now().isoformat(),
+        "video_info": None,
+        "fps": None,
+        "thumbnail_path": None,
+        "frame_store_path": None,
+        "status": "probed",
+    }
+
+    capture = cv2.VideoCapture(video_path)
+    try:
+        if not capture.isOpened():
+            print(f"[ingest] 비디오를 열 수 없습니다: {video_path}")
+            record["status"] = "error"
+            _write_ingest_record(video_path, record)
+            return record
+
+        fps = capture.get(cv2.CAP_PROP_FPS)
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        video_width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        video_height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        play_time = round(frame_count / fps, 2) if fps > 0 else 0
+
+        # VideoProcessorAgent.process와 동일한 형식 (MediaEdit.query_videoInfo 결과)
+        record["fps"] = fps
+        record["video_info"] = {
+            "video_name": os.path.splitext(os.path.basename(video_path))[0],
+            "play_time": play_time,
+            "frame_count": frame_count,
+            "video_width": video_width,
+            "video_height": video_height,
+            "file_size": os.path.getsize(video_path),
+        }
+
+        # 썸네일: THUMBNAIL_TIME 지점 (짧은 영상은 중간 지점) 프레임 1장
+        thumbnail_index = min(int(THUMBNAIL_TIME * fps), frame_count // 2) if fps > 0 else 0
+        if thumbnail_index > 0:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, thumbnail_index)
+        success, frame = capture.read()
+        if success and frame is not None:
+            thumbnail = cv2.resize(frame, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+            if cv2.imwrite(paths["thumbnail"], thumbnail, [cv2.IMWRITE_JPEG_QUALITY, THUMBNAIL_JPEG_QUALITY]):
+                record["thumbnail_path"] = paths["thumbnail"]
+    finally:
+        capture.release()
+
+    _write_ingest_record(video_path, record)
+    print(f"[ingest] 메타데이터/썸네일 완료: {os.path.basename(video_path)} ({time.time() - start:.2f}초)")
+    return record
+
+
+def build_derived_media(video_path: str) -> dict:
+    """
+    저해상도 프레임 저장소를 생성하여 ingest 기록을 갱신합니다.
+    (업로드 응답 이후 프로세스 풀에서 실행, 실패해도 분석은 원본 디코딩 경로로 동작)
+    """
+    start = time.time()
+    record = load_ingest_record(video_path) or probe_video(video_path)
+    if record.get("status") == "error":
+        return record
+
+    record["frame_store_path"] = ME.MediaEdit().build_frame_store(video_path)
+    record["status"] = "complete"
+    _write_ingest_record(video_path, record)
+    print(f"[ingest] 프레임 저장소 완료: {os.path.basename(video_path)} ({time.time() - start:.1f}초)")
+    return record
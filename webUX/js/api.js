@@ -133,16 +133,24 @@ class APIClient {
      * @param {string} videoId - 업로드된 비디오 ID
      * @param {string} deviceType - 디바이스 타입
      * @param {boolean} saveIndividualReport - 개별 리포트 저장 여부
-     * @returns {Promise<Object>} 분석 시작 응답 (analysisId, estimatedTime)
+     * @param {Object} options - { priority: 'interactive' | 'batch', clinicId: 공정 대기열 단위 (없으면 서버가 요청 IP 사용) }
+     * @returns {Promise<Object>} 분석 시작 응답 (analysisId, estimatedTime: 예상 소요 시간(초),
+     *          대기 중이면 queuePosition: 대기 순서, estimatedStartSeconds: 예상 시작까지 남은 시간(초))
      */
-    async startAnalysis(videoId, deviceType, saveIndividualReport = true) {
+    async startAnalysis(videoId, deviceType, saveIndividualReport = true, options = {}) {
         try {
             const response = await this.fetchWithTimeout(
                 `${API_BASE_URL}/analysis/start`,
                 {
                     method: 'POST',
                     headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ videoId, deviceType, saveIndividualReport })
+                    body: JSON.stringify({
+                        videoId,
+                        deviceType,
+                        saveIndividualReport,
+                        priority: options.priority || 'interactive',
+                        clinicId: options.clinicId || null
+                    })
                 },
                 30000
             );
@@ -160,6 +168,14 @@ class APIClient {
                     }
                 }
 
+                // 429: 분석 대기열이 가득 참 (Retry-After: 다시 시도할 때까지 기다릴 시간, 초)
+                if (response.status === 429) {
+                    const retryAfter = parseInt(response.headers.get('Retry-After'), 10);
+                    if (retryAfter > 0) {
+                        errorMessage += ` 약 ${Math.ceil(retryAfter / 60)}분 후 다시 시도해 주세요.`;
+                    }
+                }
+
                 throw new Error(errorMessage);
             }
 
@@ -176,18 +192,25 @@ class APIClient {
      * 분석 상태 조회
      * 캐시 방지를 위해 타임스탬프 파라미터 추가.
      * Safari가 동일 URL의 GET 응답을 캐싱하여 stale 상태를 반환하는 문제 방지.
+     * since 커서 이후의 로그만 받고, etag가 같으면(변경 없음) 서버가 본문 없이 304를 반환.
      *
      * @param {string} analysisId - 분석 ID
-     * @returns {Promise<Object>} 분석 상태 (status, progress, current_stage, logs, error)
+     * @param {number} since - 이전 응답의 cursor (0이면 전체 로그)
+     * @param {string|null} etag - 이전 응답의 etag
+     * @returns {Promise<Object|null>} 분석 상태 (status, progress, current_stage, logs, error, cursor, eta_seconds, etag), 변경 없으면 null
      */
-    async getAnalysisStatus(analysisId) {
+    async getAnalysisStatus(analysisId, since = 0, etag = null) {
         try {
             const response = await this.fetchWithTimeout(
-                `${API_BASE_URL}/analysis/status/${analysisId}?_t=${Date.now()}`,
-                {},
+                `${API_BASE_URL}/analysis/status/${analysisId}?since=${since}&_t=${Date.now()}`,
+                etag ? { headers: { 'If-None-Match': etag } } : {},
                 10000
             );
 
+            if (response.status === 304) {
+                return null;
+            }
+
             if (!response.ok) {
                 if (response.status === 404) {
                     throw new Error('분석 작업을 찾을 수 없습니다.');
@@ -195,7 +218,9 @@ class APIClient {
                 throw new Error(`상태 조회 실패: ${response.status}`);
             }
 
-            return await response.json();
+            const status = await response.json();
+            status.etag = response.headers.get('ETag');
+            return status;
         } catch (error) {
             if (error.message) {
                 throw error;
@@ -204,6 +229,18 @@ class APIClient {
         }
     }
 
+    /**
+     * 분석 진행 상황 스트림 URL (Server-Sent Events)
+     * status 이벤트: {status, progress, current_stage, error, eta_seconds}
+     * 로그는 전송하지 않음 (필요하면 getAnalysisStatus의 since/cursor 사용)
+     *
+     * @param {string} analysisId - 분석 ID
+     * @returns {string} EventSource에 전달할 URL
+     */
+    getAnalysisEventsUrl(analysisId) {
+        return `${API_BASE_URL}/analysis/events/${analysisId}`;
+    }
+
     /**
      * 분석 결과 조회
      * @param {string} analysisId - 분석 ID
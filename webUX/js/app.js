@@ -16,9 +16,10 @@ class InhalerAnalysisApp {
         this.analysisId = null;
         this.analysisResult = null;
         this.statusPollInterval = null;
-        this.progressInterval = null; // 프로그레스 바 자동 증가용
+        this.statusEventSource = null; // 분석 진행 상황 SSE 스트림
         this.analysisStartTime = null; // 분석 시작 시간
         this.progressUpdateInterval = null; // 진행 중 로그 업데이트용
+        this.etaSeconds = null; // 서버가 계산한 예상 남은 시간 (초)
         
         // LLM 모델 정보 (백엔드에서 조회)
         this.llmModels = [];
@@ -216,6 +217,7 @@ class InhalerAnalysisApp {
         try {
             // 분석 시작 시간 기록
             this.analysisStartTime = new Date();
+            this.etaSeconds = null;
 
             // 분석 로그 초기화 및 시작 시간 표시
             this.clearAnalysisLogs();
@@ -229,9 +231,6 @@ class InhalerAnalysisApp {
             // 분석 정보 표시
             this.showAnalysisInfo();
 
-            // 프로그레스 바 자동 증가 시작 (3초마다)
-            this.startProgressAutoUpdate();
-
             // 진행 중 로그 업데이트 시작 (10초마다)
             this.startProgressLogUpdate();
 
@@ -243,53 +242,26 @@ class InhalerAnalysisApp {
             );
 
             this.analysisId = response.analysisId;
+            if (response.estimatedTime) {
+                this.etaSeconds = response.estimatedTime;
+                this.addLog(`예상 소요 시간: 약 ${this.formatDuration(response.estimatedTime)}`);
+            }
+            if (response.queuePosition) {
+                this.etaSeconds = (response.estimatedTime || 0) + (response.estimatedStartSeconds || 0);
+                this.addLog(`동시 분석 제한으로 대기 중: 대기 순서 ${response.queuePosition}번째 (예상 시작 약 ${this.formatDuration(response.estimatedStartSeconds || 0)} 후)`);
+            }
 
-            // 상태 폴링 시작
-            this.startStatusPolling();
+            // 상태 업데이트 시작 (SSE 스트림, 미지원/연결 실패 시 폴링)
+            this.startStatusUpdates();
         } catch (error) {
             console.error('분석 시작 오류:', error);
             this.showError('분석 시작 실패', error.message || '분석을 시작할 수 없습니다.');
-            this.stopProgressAutoUpdate();
             this.stopProgressLogUpdate();
             // [FIX] 오류 시 버튼 다시 활성화
             startBtn.disabled = !(this.selectedDevice && this.videoId);
         }
     }
     
-    /**
-     * 프로그레스 바 자동 증가 (3초마다)
-     */
-    startProgressAutoUpdate() {
-        let currentProgress = 0;
-        
-        this.progressInterval = setInterval(() => {
-            if (currentProgress < 95) { // 95%까지만 자동 증가
-                currentProgress += 1;
-                const progressFill = document.getElementById('progressFill');
-                const progressPercent = document.getElementById('progressPercent');
-                const progressStage = document.getElementById('progressStage');
-                
-                if (progressFill && progressPercent) {
-                    progressFill.style.width = `${currentProgress}%`;
-                    progressPercent.textContent = `${currentProgress}%`;
-                }
-                if (progressStage && !progressStage.textContent.includes('완료')) {
-                    progressStage.textContent = '처리 중...';
-                }
-            }
-        }, 7000); // 7초마다
-    }
-    
-    /**
-     * 프로그레스 바 자동 증가 중지
-     */
-    stopProgressAutoUpdate() {
-        if (this.progressInterval) {
-            clearInterval(this.progressInterval);
-            this.progressInterval = null;
-        }
-    }
-    
     /**
      * 진행 중 로그 업데이트 (10초마다)
      */
@@ -297,10 +269,8 @@ class InhalerAnalysisApp {
         this.progressUpdateInterval = setInterval(() => {
             if (this.analysisStartTime) {
                 const elapsed = Math.floor((new Date() - this.analysisStartTime) / 1000);
-                const minutes = Math.floor(elapsed / 60);
-                const seconds = elapsed % 60;
-                const timeStr = `${minutes}분 ${seconds}초`;
-                this.addLog(`진행 중: ${timeStr}`);
+                const remaining = this.etaSeconds !== null ? ` (남은 시간 약 ${this.formatDuration(this.etaSeconds)})` : '';
+                this.addLog(`진행 중: ${this.formatDuration(elapsed)}${remaining}`);
             }
         }, 10000); // 10초마다
     }
@@ -316,7 +286,82 @@ class InhalerAnalysisApp {
     }
     
     /**
-     * 분석 상태 폴링 시작
+     * 분석 상태 업데이트 시작
+     * EventSource를 지원하면 SSE 스트림으로 받고, 아니면 기존 폴링 사용.
+     */
+    startStatusUpdates() {
+        if (window.EventSource) {
+            this.startStatusStream();
+        } else {
+            this.startStatusPolling();
+        }
+    }
+
+    /**
+     * 분석 상태 SSE 스트림 시작
+     * 서버가 상태가 바뀔 때만 status 이벤트를 보내므로 폴링 요청 없이 진행률을 갱신.
+     * 연결이 끊기면 EventSource가 자동 재연결하고, 재연결도 실패하면 폴링으로 전환.
+     */
+    startStatusStream() {
+        const MAX_STREAM_ERRORS = 3; // 연속 연결 오류 상한: 넘으면 폴링으로 전환
+        let streamErrors = 0;
+
+        const source = new EventSource(this.api.getAnalysisEventsUrl(this.analysisId));
+        this.statusEventSource = source;
+
+        source.addEventListener('status', async (event) => {
+            streamErrors = 0;
+            this.hideNetworkWarning();
+
+            let status;
+            try {
+                status = JSON.parse(event.data);
+            } catch (error) {
+                console.error('상태 이벤트 파싱 오류:', error);
+                return;
+            }
+
+            // 프로그레스 바 업데이트 (서버에서 받은 실제 진행률 사용)
+            this.updateProgressBar(status.progress, this.formatStage(status), status.eta_seconds);
+
+            if (status.status === 'completed') {
+                this.stopStatusPolling();
+                await this.loadAnalysisResult();
+            } else if (status.status === 'error') {
+                this.stopStatusPolling();
+                this.updateButtonStates();
+                this.showError('분석 오류', status.error || '알 수 없는 오류가 발생했습니다.');
+            }
+        });
+
+        source.onerror = () => {
+            if (this.statusEventSource !== source) {
+                return;
+            }
+            streamErrors++;
+            console.warn(`상태 스트림 연결 오류 (${streamErrors}/${MAX_STREAM_ERRORS})`);
+
+            // 재연결 불가(CLOSED: 404 등) 또는 연속 오류 → 폴링으로 전환 (폴링이 404/네트워크 오류 처리)
+            if (source.readyState === EventSource.CLOSED || streamErrors >= MAX_STREAM_ERRORS) {
+                console.log('상태 스트림 사용 불가, 폴링으로 전환');
+                this.closeStatusStream();
+                this.startStatusPolling();
+            }
+        };
+    }
+
+    /**
+     * 분석 상태 SSE 스트림 종료
+     */
+    closeStatusStream() {
+        if (this.statusEventSource) {
+            this.statusEventSource.close();
+            this.statusEventSource = null;
+        }
+    }
+
+    /**
+     * 분석 상태 폴링 시작 (SSE 스트림을 사용할 수 없을 때)
      */
     startStatusPolling() {
         const NORMAL_POLL_INTERVAL = 2000;   // 정상 폴링 간격: 2초
@@ -329,6 +374,8 @@ class InhalerAnalysisApp {
         let consecutiveErrors = 0;
         let healthCheckFailCount = 0;
         let currentPollInterval = NORMAL_POLL_INTERVAL;
+        let statusCursor = 0;   // 받은 로그 커서 (다음 조회에서 이후 로그만 요청)
+        let statusEtag = null;  // 마지막 응답 ETag (변경 없으면 304)
 
         const poll = async () => {
             // 전체 타임아웃 검사
@@ -342,23 +389,29 @@ class InhalerAnalysisApp {
             }
 
             try {
-                const status = await this.api.getAnalysisStatus(this.analysisId);
+                const status = await this.api.getAnalysisStatus(this.analysisId, statusCursor, statusEtag);
                 consecutiveErrors = 0;
                 healthCheckFailCount = 0;
                 currentPollInterval = NORMAL_POLL_INTERVAL;
                 this.hideNetworkWarning();
 
+                // 304: 마지막 응답 이후 변경 없음
+                if (status === null) {
+                    this.statusPollInterval = setTimeout(poll, currentPollInterval);
+                    return;
+                }
+                statusCursor = status.cursor || statusCursor;
+                statusEtag = status.etag;
+
                 // 프로그레스 바 업데이트 (서버에서 받은 실제 진행률 사용)
-                this.updateProgressBar(status.progress, status.current_stage);
+                this.updateProgressBar(status.progress, this.formatStage(status), status.eta_seconds);
 
                 if (status.status === 'completed') {
                     this.stopStatusPolling();
-                    this.stopProgressAutoUpdate();
                     this.stopProgressLogUpdate();
                     await this.loadAnalysisResult();
                 } else if (status.status === 'error') {
                     this.stopStatusPolling();
-                    this.stopProgressAutoUpdate();
                     this.stopProgressLogUpdate();
                     this.updateButtonStates();
                     this.showError('분석 오류', status.error || '알 수 없는 오류가 발생했습니다.');
@@ -435,14 +488,14 @@ class InhalerAnalysisApp {
     }
     
     /**
-     * 상태 폴링 중지
+     * 상태 폴링/스트림 중지
      */
     stopStatusPolling() {
+        this.closeStatusStream();
         if (this.statusPollInterval) {
             clearTimeout(this.statusPollInterval);
             this.statusPollInterval = null;
         }
-        this.stopProgressAutoUpdate();
         this.stopProgressLogUpdate();
     }
 
@@ -462,6 +515,7 @@ class InhalerAnalysisApp {
         this.analysisId = null;
         this.analysisResult = null;
         this.analysisStartTime = null;
+        this.etaSeconds = null;
 
         // 3. 파일 입력 초기화
         const fileInput = document.getElementById('fileInput');
@@ -673,8 +727,9 @@ class InhalerAnalysisApp {
      * 프로그레스 바 업데이트
      * @param {number} progress - 진행률 (0-100)
      * @param {string} stage - 현재 단계
+     * @param {number|null} etaSeconds - 예상 남은 시간 (초)
      */
-    updateProgressBar(progress, stage) {
+    updateProgressBar(progress, stage, etaSeconds = null) {
         const progressFill = document.getElementById('progressFill');
         const progressPercent = document.getElementById('progressPercent');
         const progressStage = document.getElementById('progressStage');
@@ -692,6 +747,32 @@ class InhalerAnalysisApp {
         if (progressStage && stage && !stage.includes('초기화')) {
             progressStage.textContent = stage;
         }
+
+        if (etaSeconds !== null && etaSeconds !== undefined) {
+            this.etaSeconds = etaSeconds;
+        }
+    }
+
+    /**
+     * 상태 응답 → 단계 문구 (대기 중이면 예상 시작까지 남은 시간 추가)
+     * @param {Object} status - 상태 응답 / SSE status 이벤트
+     * @returns {string}
+     */
+    formatStage(status) {
+        if (status.status === 'pending' && status.estimated_start_seconds !== null && status.estimated_start_seconds !== undefined) {
+            return `${status.current_stage} - 예상 시작 약 ${this.formatDuration(status.estimated_start_seconds)} 후`;
+        }
+        return status.current_stage;
+    }
+
+    /**
+     * 초 → "M분 S초"
+     * @param {number} totalSeconds - 시간 (초)
+     * @returns {string}
+     */
+    formatDuration(totalSeconds) {
+        const seconds = Math.max(0, Math.round(totalSeconds));
+        return `${Math.floor(seconds / 60)}분 ${seconds % 60}초`;
     }
     
     /**